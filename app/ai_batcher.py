@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.ai_cache import CacheKey
+
+
+class MicroBatcher:
+    """
+    Collect concurrent suggestion requests over a short window and dispatch
+    them together with bounded parallelism.
+
+    The first request after a quiet period opens a window of `window`
+    seconds; the batch is dispatched when the window closes or `max_batch`
+    distinct requests are waiting. Requests with the same key while an
+    identical one is waiting or running share its call. At most
+    `max_parallel` calls run at once across all batches; the rest queue in
+    arrival order, so a burst is spread over the provider rate budgets
+    instead of being sent all at once.
+
+    The batcher is only touched from the event loop. Its state is bound to
+    the loop of the first request and reset if a new loop shows up.
+
+    Extra arguments to `submit` (e.g. a generation profile) are passed on
+    to `compute`; requests sharing a key must agree on them.
+    """
+
+    def __init__(self, compute: Callable[..., Awaitable[Optional[str]]],
+                 window: float = 0.005, max_batch: int = 64, max_parallel: int = 8):
+        self.compute = compute
+        self.window = window
+        self.max_batch = max_batch
+        self.max_parallel = max_parallel
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counters: Dict[str, int] = {
+            "requests": 0, "deduplicated": 0, "batches": 0, "dispatched": 0, "failed": 0,
+            "largest_batch": 0,
+        }
+
+    async def submit(self, key: CacheKey, ingredients: List[str], *args: Any) -> Optional[str]:
+        """Get the result for one request, sharing a call with identical requests."""
+        self._bind_loop()
+        self.counters["requests"] += 1
+        future = self._futures.get(key)
+        if future is not None:
+            self.counters["deduplicated"] += 1
+        else:
+            future = self._futures[key] = self._loop.create_future()
+            future.add_done_callback(lambda f: self._forget(key, f))
+            self._waiting.append(((ingredients,) + args, future))
+            if len(self._waiting) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = self._loop.call_later(self.window, self._flush)
+        # Shield the shared call so one caller going away does not cancel it
+        # for everyone else waiting on the same key
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self.window,
+            "max_batch": self.max_batch,
+            "max_parallel": self.max_parallel,
+            "waiting": len(self._waiting) if self._loop else 0,
+            "in_flight": len(self._tasks) if self._loop else 0,
+            **self.counters,
+        }
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._futures: Dict[CacheKey, asyncio.Future] = {}
+        self._waiting: List[Tuple[tuple, asyncio.Future]] = []
+        self._tasks: Set[asyncio.Task] = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._slots = asyncio.Semaphore(self.max_parallel)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._waiting = self._waiting, []
+        if not batch:
+            return
+        self.counters["batches"] += 1
+        self.counters["largest_batch"] = max(self.counters["largest_batch"], len(batch))
+        for args, future in batch:
+            task = self._loop.create_task(self._dispatch(args, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, args: tuple, future: asyncio.Future) -> None:
+        try:
+            async with self._slots:
+                self.counters["dispatched"] += 1
+                try:
+                    result = await self.compute(*args)
+                except Exception as e:
+                    self.counters["failed"] += 1
+                    if not future.done():
+                        future.set_exception(e)
+                    return
+            if not future.done():
+                future.set_result(result)
+        finally:
+            # A dispatch cancelled while queued or running (e.g. at shutdown)
+            # must still release everyone waiting on its future
+            if not future.done():
+                self.counters["failed"] += 1
+                future.set_exception(RuntimeError("Suggestion request was cancelled"))
+
+    def _forget(self, key: CacheKey, future: asyncio.Future) -> None:
+        if self._futures.get(key) is future:
+            del self._futures[key]
+        # Nobody may be left to await a failed call; mark it retrieved
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+CacheKey = Tuple[str, ...]
+
+
+def cache_key(ingredients: Iterable[str]) -> CacheKey:
+    """Normalize an ingredient list into an order-insensitive cache key."""
+    return tuple(sorted({i.strip().casefold() for i in ingredients if i.strip()}))
+
+
+class SuggestionCache:
+    """
+    TTL + LRU cache for AI suggestions with single-flight coalescing.
+
+    Entries expire `ttl` seconds after being stored and the least recently
+    used entry is evicted once `max_size` is reached. When several callers
+    miss on the same key at once, only one upstream call is made and every
+    caller awaits its result. Failed calls (None or an exception) are not
+    cached.
+
+    The cache is only touched from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, "asyncio.Task[Optional[str]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get_or_compute(self, key: CacheKey,
+                             compute: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Return the cached value for key, computing it at most once concurrently."""
+        value = self._lookup(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._inflight[key] = asyncio.ensure_future(compute())
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        # Shield the shared call so one caller going away does not cancel it
+        # for everyone else waiting on the same key
+        return await asyncio.shield(task)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Return a cached value without computing it on a miss."""
+        value = self._lookup(key)
+        if value is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return value
+
+    def put(self, key: CacheKey, value: str) -> None:
+        """Store a value computed outside get_or_compute (e.g. a finished stream)."""
+        self._store(key, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "in_flight": len(self._inflight),
+        }
+
+    def _finish(self, key: CacheKey, task: "asyncio.Task[Optional[str]]") -> None:
+        del self._inflight[key]
+        if not task.cancelled() and task.exception() is None and task.result() is not None:
+            self._store(key, task.result())
+
+    def _lookup(self, key: CacheKey) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: CacheKey, value: str) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
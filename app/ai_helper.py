@@ -1,13 +1,31 @@
-import requests
+import asyncio
+import httpx
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
-from typing import List
+from typing import AsyncIterator, List, Optional
+
+from app.ai_batcher import MicroBatcher
+from app.ai_cache import CacheKey, SuggestionCache, cache_key
+from app.metrics import count_tokens, llm_errors, observe_llm_call
+from app.fuzzy_index import NAME
+from app.generation import COMPACT, PROMPT_STYLES, GenerationProfile, build_prompt
+from app.models import Recipe
+from app.repository import RecipeRepository
+from app.provider_router import CircuitBreaker, Provider, ProviderRouter
+from app.rate_limit import ProviderBudget, RateBudgetExhausted, estimate_tokens
+from app.recipe_parser import parse_recipe
+
+logger = logging.getLogger(__name__)
 
 # Import Groq client
 try:
-    from groq import Groq
+    from groq import AsyncGroq
 except ImportError:
-    Groq = None
+    AsyncGroq = None
 
 load_dotenv()
 
@@ -17,26 +35,89 @@ HF_API_KEY = os.getenv("HF_API_KEY")
 
 HF_API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.1"
 
-def get_ai_recipe_suggestion(ingredients: List[str]) -> dict:
-    """
-    Get AI-powered recipe suggestion using Groq API (primary) or Hugging Face (fallback).
-    
-    Args:
-        ingredients: List of available ingredients or dish names
-        
-    Returns:
-        Dictionary with suggestion and ingredients used
-    """
-    if not ingredients:
-        return {
-            "suggestion": "Please provide at least one ingredient or dish name.",
-            "ingredients_used": []
-        }
-    
-    # Check if API keys are configured
-    if not GROQ_API_KEY and not HF_API_KEY:
-        return {
-            "suggestion": """🚨 AI API Key Not Configured!
+# Per-provider limits: requests beyond the concurrency limit wait for a slot,
+# and each provider call (including that wait) is bounded by AI_TIMEOUT
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "32"))
+HF_MAX_CONCURRENCY = int(os.getenv("HF_MAX_CONCURRENCY", "16"))
+
+# Hedging: if the primary provider has not answered after its observed p95
+# latency (AI_HEDGE_DELAY until enough calls are seen), the fallback is fired
+# too and the first good answer wins. Circuit breakers skip failing providers.
+AI_HEDGE_DELAY = float(os.getenv("AI_HEDGE_DELAY", "2.0"))
+AI_HEDGE_PERCENTILE = float(os.getenv("AI_HEDGE_PERCENTILE", "0.95"))
+AI_BREAKER_FAILURE_RATE = float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5"))
+AI_BREAKER_OPEN_SECONDS = float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30"))
+# Successful calls slower than this count as failures for the breaker (0 = off).
+# It must sit well below AI_TIMEOUT: a call that reaches AI_TIMEOUT has
+# already failed by timing out
+AI_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("AI_BREAKER_SLOW_CALL_SECONDS", str(AI_TIMEOUT / 3)))
+
+# Rate budgets per provider (0 = unlimited). Calls wait up to
+# AI_RATE_LIMIT_MAX_WAIT seconds for room in the budget instead of being
+# rejected upstream with a 429; past that the provider is skipped. The wait
+# happens before the call is timed, so it does not count against the
+# provider's breaker or hedge delay. Defaults match Groq's free tier for
+# llama-3.1-8b-instant.
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+HF_REQUESTS_PER_MINUTE = float(os.getenv("HF_REQUESTS_PER_MINUTE", "0"))
+AI_RATE_LIMIT_MAX_WAIT = float(os.getenv("AI_RATE_LIMIT_MAX_WAIT", "10"))
+
+GROQ_MODEL = "llama-3.1-8b-instant"
+
+# Generation profiles: AI_PROMPT_STYLE picks the compact prompt or the
+# original full one, and each endpoint has its own completion cap, which is
+# also what a call reserves in the Groq token budget. Requests made with
+# summary=true ask for a short overview capped at AI_MAX_TOKENS_SUMMARY.
+AI_PROMPT_STYLE = os.getenv("AI_PROMPT_STYLE", COMPACT)
+if AI_PROMPT_STYLE not in PROMPT_STYLES:
+    logger.warning("Unknown AI_PROMPT_STYLE %r; using %r", AI_PROMPT_STYLE, COMPACT)
+    AI_PROMPT_STYLE = COMPACT
+AI_MAX_TOKENS = int(os.getenv("AI_MAX_TOKENS", "700"))
+GENERATION_PROFILES = {
+    name: GenerationProfile(name, AI_PROMPT_STYLE,
+                            int(os.getenv(f"AI_MAX_TOKENS_{name.upper()}", str(AI_MAX_TOKENS))))
+    for name in ("suggest", "stream", "batch")
+}
+GENERATION_PROFILES["summary"] = GenerationProfile(
+    "summary", AI_PROMPT_STYLE, int(os.getenv("AI_MAX_TOKENS_SUMMARY", "200")), summary=True
+)
+
+groq_budget = ProviderBudget("groq", GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE)
+hf_budget = ProviderBudget("huggingface", HF_REQUESTS_PER_MINUTE)
+
+# Concurrent cache misses are collected for AI_BATCH_WINDOW seconds and sent
+# with at most AI_BATCH_MAX_PARALLEL upstream calls in flight
+AI_BATCH_WINDOW = float(os.getenv("AI_BATCH_WINDOW", "0.005"))
+AI_BATCH_MAX_SIZE = int(os.getenv("AI_BATCH_MAX_SIZE", "64"))
+AI_BATCH_MAX_PARALLEL = int(os.getenv("AI_BATCH_MAX_PARALLEL", "8"))
+
+# Cache identical ingredient sets so repeated requests skip the LLM call
+suggestion_cache = SuggestionCache(
+    max_size=int(os.getenv("AI_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("AI_CACHE_TTL", "3600"))
+)
+
+# Requests that look like the name of a stored recipe are answered with that
+# recipe instead of an LLM call: the best fuzzy hit must be a recipe name
+# covering at least AI_LOCAL_MATCH_COVERAGE of the query's trigrams, with a
+# similarity of at least AI_LOCAL_MATCH_SCORE. Set AI_LOCAL_MATCH=false to
+# always ask the LLM.
+AI_LOCAL_MATCH = os.getenv("AI_LOCAL_MATCH", "true").lower() in ("1", "true", "yes")
+AI_LOCAL_MATCH_COVERAGE = float(os.getenv("AI_LOCAL_MATCH_COVERAGE", "0.8"))
+AI_LOCAL_MATCH_SCORE = float(os.getenv("AI_LOCAL_MATCH_SCORE", "0.4"))
+
+# With AI_SAVE_RECIPES=true, generated recipes that parse cleanly are added to
+# the store, and the same request (ignoring order and case) is then answered
+# with the stored recipe. Dish-name requests also find it through the local
+# name match above.
+AI_SAVE_RECIPES = os.getenv("AI_SAVE_RECIPES", "false").lower() in ("1", "true", "yes")
+GENERATED_INDEX_SIZE = 10_000
+
+EMPTY_INPUT_MESSAGE = "Please provide at least one ingredient or dish name."
+
+NOT_CONFIGURED_MESSAGE = """🚨 AI API Key Not Configured!
 
 To use AI recipe suggestions:
 
@@ -56,84 +137,366 @@ To use AI recipe suggestions:
    
 4. Restart the server
 
-Need help? See QUICK_START.md or AI_INTEGRATION_GUIDE.md""",
-            "ingredients_used": ingredients
+Need help? See QUICK_START.md or AI_INTEGRATION_GUIDE.md"""
+
+UNAVAILABLE_MESSAGE = "⚠️ AI services are temporarily unavailable. Please try again in a moment."
+
+class _ProviderClients:
+    """Long-lived pooled async clients and concurrency limits for one event loop."""
+    
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.groq_limit = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+        self.hf_limit = asyncio.Semaphore(HF_MAX_CONCURRENCY)
+        self.hf = httpx.AsyncClient(
+            timeout=AI_TIMEOUT,
+            limits=httpx.Limits(max_connections=HF_MAX_CONCURRENCY)
+        )
+        self.groq = None
+        if AsyncGroq and GROQ_API_KEY:
+            self.groq = AsyncGroq(
+                api_key=GROQ_API_KEY,
+                timeout=AI_TIMEOUT,
+                max_retries=1,
+                http_client=httpx.AsyncClient(
+                    timeout=AI_TIMEOUT,
+                    limits=httpx.Limits(max_connections=GROQ_MAX_CONCURRENCY)
+                )
+            )
+    
+    async def aclose(self):
+        await self.hf.aclose()
+        if self.groq is not None:
+            await self.groq.close()
+
+_clients: Optional[_ProviderClients] = None
+
+def _get_clients() -> _ProviderClients:
+    """Get the shared clients, creating them on first use in the running loop."""
+    global _clients
+    if _clients is None or _clients.loop is not asyncio.get_running_loop():
+        _clients = _ProviderClients()
+    return _clients
+
+async def close_ai_clients():
+    """Close the shared provider clients (called on application shutdown)."""
+    global _clients
+    if _clients is not None:
+        await _clients.aclose()
+        _clients = None
+
+def generation_profile(endpoint: str, summary: bool = False) -> GenerationProfile:
+    """The profile for an endpoint ("suggest", "stream" or "batch"), or the summary profile."""
+    return GENERATION_PROFILES["summary" if summary else endpoint]
+
+def suggestion_key(ingredients: List[str], profile: GenerationProfile) -> CacheKey:
+    """
+    Cache and batching key for a request under a profile.
+
+    Full recipes are shared by every endpoint; summaries are kept apart with
+    a leading "", which cache_key never produces.
+    """
+    key = cache_key(ingredients)
+    return ("",) + key if profile.summary else key
+
+# Request key -> id of the recipe saved from its answer; oldest dropped first
+_generated: "OrderedDict[CacheKey, int]" = OrderedDict()
+_generated_lock = threading.Lock()
+
+def find_local_recipe(store: RecipeRepository, ingredients: List[str]) -> Optional[Recipe]:
+    """
+    A stored recipe the user most likely asked for by name, or None.
+
+    Ingredient lists ("chicken, garlic") rarely match a single name well, and
+    a lone ingredient ("rice") matches the ingredient itself better than any
+    name containing it, so those still go to the LLM, unless a recipe saved
+    from an earlier answer to the same request is still stored.
+    """
+    if not AI_LOCAL_MATCH or not ingredients:
+        return None
+    recipe_id = _generated.get(cache_key(ingredients))
+    if recipe_id is not None:
+        recipe = store.get(recipe_id)
+        if recipe is not None:
+            return recipe
+    matches = store.fuzzy_search(", ".join(ingredients), limit=1, min_score=AI_LOCAL_MATCH_SCORE)
+    if not matches:
+        return None
+    recipe, hit = matches[0]
+    if hit.field != NAME or hit.coverage < AI_LOCAL_MATCH_COVERAGE:
+        return None
+    return recipe
+
+def structure_suggestion(store: RecipeRepository, ingredients: List[str], text: str) -> Optional[Recipe]:
+    """
+    Parse a generated suggestion into a Recipe, or None if it does not read as one.
+
+    With AI_SAVE_RECIPES the recipe is also stored (or matched to a stored
+    recipe of the same name) and returned with its id, and the request is
+    remembered so find_local_recipe answers it next time.
+    """
+    recipe = parse_recipe(text, default_name=", ".join(ingredients).title())
+    if recipe is None or not AI_SAVE_RECIPES:
+        return recipe
+    with _generated_lock:
+        saved = _stored_by_name(store, recipe.name) or store.add(recipe)
+        key = cache_key(ingredients)
+        _generated[key] = saved.id
+        _generated.move_to_end(key)
+        while len(_generated) > GENERATED_INDEX_SIZE:
+            _generated.popitem(last=False)
+    return saved
+
+def _stored_by_name(store: RecipeRepository, name: str) -> Optional[Recipe]:
+    target = name.casefold()
+    for recipe, _ in store.fuzzy_search(name, limit=5, min_score=0.5):
+        if recipe.name.casefold() == target:
+            return recipe
+    return None
+
+def format_local_suggestion(recipe: Recipe) -> str:
+    """Render a stored recipe in the same markdown layout the LLM is asked for."""
+    lines = [
+        f"**Recipe Name:** {recipe.name}",
+        f"**Cuisine:** {recipe.cuisine}",
+    ]
+    if recipe.prep_time is not None:
+        lines.append(f"**Prep Time:** {recipe.prep_time} min")
+    if recipe.cook_time is not None:
+        lines.append(f"**Cook Time:** {recipe.cook_time} min")
+    if recipe.servings is not None:
+        lines.append(f"**Servings:** {recipe.servings}")
+    lines += ["", "**Ingredients:**"]
+    lines += [f"- {ingredient}" for ingredient in recipe.ingredients]
+    lines += ["", "**Instructions:**", recipe.instructions]
+    return "\n".join(lines)
+
+async def get_ai_recipe_suggestion(ingredients: List[str],
+                                   profile: Optional[GenerationProfile] = None) -> dict:
+    """
+    Get AI-powered recipe suggestion using Groq API (primary) or Hugging Face (fallback).
+    
+    Args:
+        ingredients: List of available ingredients or dish names
+        profile: Prompt and token cap to use (default: the "suggest" profile)
+        
+    Returns:
+        Dictionary with suggestion and ingredients used
+    """
+    if not ingredients:
+        return {
+            "suggestion": EMPTY_INPUT_MESSAGE,
+            "ingredients_used": []
         }
     
-    # Try Groq API first (if key is available)
-    if GROQ_API_KEY:
-        result = _get_groq_suggestion(ingredients)
-        if result:
-            return result
+    # Check if API keys are configured
+    if not GROQ_API_KEY and not HF_API_KEY:
+        return {
+            "suggestion": NOT_CONFIGURED_MESSAGE,
+            "ingredients_used": ingredients
+        }
     
-    # Fallback to Hugging Face
-    if HF_API_KEY:
-        result = _get_huggingface_suggestion(ingredients)
-        if result:
-            return result
+    profile = profile or GENERATION_PROFILES["suggest"]
+    key = suggestion_key(ingredients, profile)
+    suggestion = await suggestion_cache.get_or_compute(
+        key,
+        lambda: suggestion_batcher.submit(key, ingredients, profile)
+    )
+    if suggestion:
+        return {
+            "suggestion": suggestion,
+            "ingredients_used": ingredients
+        }
     
     # If both fail, return error message with instructions
     return {
-        "suggestion": "⚠️ AI services are temporarily unavailable. Please try again in a moment.",
+        "suggestion": UNAVAILABLE_MESSAGE,
         "ingredients_used": ingredients
     }
 
-def _get_groq_suggestion(ingredients: List[str]) -> dict:
-    """Get recipe suggestion using Groq API."""
+async def stream_ai_recipe_suggestion(ingredients: List[str],
+                                      profile: Optional[GenerationProfile] = None) -> AsyncIterator[str]:
+    """
+    Stream an AI recipe suggestion chunk by chunk.
+    
+    Groq tokens are forwarded as they arrive and the finished text is cached.
+    Cached suggestions, the Hugging Face fallback (which cannot stream) and
+    error messages are yielded as a single chunk.
+    """
+    if not ingredients:
+        yield EMPTY_INPUT_MESSAGE
+        return
+    if not GROQ_API_KEY and not HF_API_KEY:
+        yield NOT_CONFIGURED_MESSAGE
+        return
+    
+    profile = profile or GENERATION_PROFILES["stream"]
+    key = suggestion_key(ingredients, profile)
+    cached = suggestion_cache.get(key)
+    if cached:
+        yield cached
+        return
+    
+    groq = provider_router.provider("groq")
+    if groq.enabled() and groq.breaker.allow():
+        parts = []
+        groq.counters["calls"] += 1
+        try:
+            async for token in _stream_groq_suggestion(ingredients, profile):
+                parts.append(token)
+                yield token
+        except RateBudgetExhausted as e:
+            # Our own limiter said no before anything was sent
+            groq.breaker.release()
+            groq.counters["throttled"] += 1
+            logger.warning("Groq API error: %s", e)
+        except Exception as e:
+            groq.breaker.record_failure()
+            groq.counters["failures"] += 1
+            llm_errors.labels("groq", "stream_error").inc()
+            # Tokens already sent cannot be taken back, so only fall back
+            # to Hugging Face if Groq failed before the first token
+            if parts:
+                raise
+            logger.warning("Groq API error: %s", e)
+        except BaseException:
+            # Client went away mid-stream; not the provider's fault
+            groq.breaker.release()
+            groq.counters["cancelled"] += 1
+            raise
+        else:
+            # Stream durations are not comparable to completion latencies,
+            # so record the outcome without a latency sample
+            groq.breaker.record_success()
+            groq.counters["successes"] += 1
+        if parts:
+            suggestion_cache.put(key, "".join(parts))
+            return
+    
+    result = await provider_router.call_one("huggingface", ingredients, profile)
+    if result:
+        suggestion_cache.put(key, result["suggestion"])
+        yield result["suggestion"]
+        return
+    
+    yield UNAVAILABLE_MESSAGE
+
+async def _fetch_suggestion(ingredients: List[str], profile: GenerationProfile) -> Optional[str]:
+    """Route to Groq (primary) and Hugging Face (hedge/fallback); None if both fail."""
+    result = await provider_router.complete(ingredients, profile)
+    return result["suggestion"] if result else None
+
+# Looked up at call time so _fetch_suggestion can be swapped in tests
+suggestion_batcher = MicroBatcher(
+    lambda ingredients, profile: _fetch_suggestion(ingredients, profile),
+    window=AI_BATCH_WINDOW,
+    max_batch=AI_BATCH_MAX_SIZE,
+    max_parallel=AI_BATCH_MAX_PARALLEL
+)
+
+def build_provider_router() -> ProviderRouter:
+    """Create a router over Groq (primary) and Hugging Face with fresh breakers."""
+    def breaker():
+        return CircuitBreaker(
+            failure_rate=AI_BREAKER_FAILURE_RATE,
+            open_seconds=AI_BREAKER_OPEN_SECONDS,
+            slow_call_seconds=AI_BREAKER_SLOW_CALL_SECONDS or None
+        )
+    
+    # Provider functions are looked up at call time so they can be swapped in tests
+    return ProviderRouter(
+        [
+            Provider(
+                "groq",
+                lambda ingredients, profile: _with_timeout(
+                    "groq", "Groq", _get_groq_suggestion(ingredients, profile)
+                ),
+                enabled=lambda: bool(GROQ_API_KEY),
+                breaker=breaker(),
+                admit=lambda ingredients, profile: _admit_groq(ingredients, profile)
+            ),
+            Provider(
+                "huggingface",
+                lambda ingredients, profile: _with_timeout(
+                    "huggingface", "Hugging Face", _get_huggingface_suggestion(ingredients, profile)
+                ),
+                enabled=lambda: bool(HF_API_KEY),
+                breaker=breaker(),
+                admit=lambda ingredients, profile: _admit_huggingface(ingredients, profile)
+            ),
+        ],
+        hedge_percentile=AI_HEDGE_PERCENTILE,
+        default_hedge_delay=AI_HEDGE_DELAY
+    )
+
+provider_router = build_provider_router()
+
+async def _with_timeout(name: str, label: str, call) -> Optional[dict]:
+    """Await a provider call, giving up after AI_TIMEOUT seconds, and record its latency."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await asyncio.wait_for(call, timeout=AI_TIMEOUT)
+        outcome = "success" if result else "error"
+        return result
+    except asyncio.CancelledError:
+        # A hedge loser, or the caller went away
+        outcome = "cancelled"
+        raise
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        logger.warning("%s API error: timed out after %ss", label, AI_TIMEOUT)
+        return None
+    finally:
+        observe_llm_call(name, outcome, time.perf_counter() - started)
+
+def _groq_reservation(prompt: str, profile: GenerationProfile) -> int:
+    """Tokens a call reserves in the Groq budget: its prompt estimate plus the completion cap."""
+    return estimate_tokens(prompt) + profile.max_tokens
+
+async def _admit_groq(ingredients: List[str], profile: GenerationProfile) -> bool:
+    """Wait for room in the Groq budget for one suggestion call; False if none came in time."""
+    reserved = _groq_reservation(build_prompt(ingredients, profile), profile)
+    if await groq_budget.acquire(reserved, AI_RATE_LIMIT_MAX_WAIT):
+        return True
+    logger.warning("Groq API error: rate budget exhausted")
+    return False
+
+async def _admit_huggingface(ingredients: List[str], profile: Optional[GenerationProfile] = None) -> bool:
+    """Wait for room in the Hugging Face request budget; False if none came in time."""
+    if await hf_budget.acquire(0, AI_RATE_LIMIT_MAX_WAIT):
+        return True
+    logger.warning("Hugging Face API error: rate budget exhausted")
+    return False
+
+async def _get_groq_suggestion(ingredients: List[str], profile: GenerationProfile) -> dict:
+    """
+    Get recipe suggestion using Groq API, with the profile's prompt and token cap.
+    
+    The router has already reserved the call in the Groq budget (_admit_groq).
+    """
     try:
-        if not Groq:
-            print("Groq library not available")
+        clients = _get_clients()
+        if clients.groq is None:
+            logger.warning("Groq library not available")
             return None
-            
-        client = Groq(api_key=GROQ_API_KEY)
         
-        # Check if input is a dish name or ingredients
-        input_text = ', '.join(ingredients)
+        prompt = build_prompt(ingredients, profile)
+        reserved = _groq_reservation(prompt, profile)
         
-        # Create a smart prompt that handles both dish names and ingredients
-        prompt = f"""You are an expert chef. The user wants a recipe.
-
-They provided: {input_text}
-
-This could be:
-- A dish name (like "poha", "biryani", "pasta carbonara")
-- Ingredients they have (like "chicken, garlic, tomato")
-
-Please provide a COMPLETE RECIPE that either:
-1. Is for the exact dish they named, OR
-2. Uses the ingredients they provided
-
-Format your response as:
-**Recipe Name:** [name]
-**Cuisine:** [type]
-**Prep Time:** [minutes] min
-**Cook Time:** [minutes] min
-**Servings:** [number]
-
-**Ingredients:**
-- [ingredient with quantity]
-- [ingredient with quantity]
-(list all needed ingredients)
-
-**Instructions:**
-1. [step 1]
-2. [step 2]
-3. [step 3]
-(continue with clear steps)
-
-**Tips:** [any helpful tips]
-
-Be specific, practical, and delicious!"""
-
-        message = client.chat.completions.create(
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.1-8b-instant",
-            temperature=0.7,
-            max_tokens=1000
-        )
+        async with clients.groq_limit:
+            message = await clients.groq.chat.completions.create(
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                model=GROQ_MODEL,
+                temperature=0.7,
+                max_tokens=profile.max_tokens
+            )
         
+        usage = getattr(message, "usage", None)
+        count_tokens("groq", usage, profile.name, message.choices[0].finish_reason)
+        groq_budget.settle(reserved, getattr(usage, "total_tokens", None))
         suggestion = message.choices[0].message.content
         return {
             "suggestion": suggestion,
@@ -141,25 +504,86 @@ Be specific, practical, and delicious!"""
         }
             
     except Exception as e:
-        print(f"Groq API error: {str(e)}")
+        _check_throttled(groq_budget, getattr(e, "status_code", None))
+        logger.warning("Groq API error: %s", e)
         return None
 
-def _get_huggingface_suggestion(ingredients: List[str]) -> dict:
-    """Get recipe suggestion using Hugging Face API."""
+async def _stream_groq_suggestion(ingredients: List[str], profile: GenerationProfile) -> AsyncIterator[str]:
+    """Stream recipe suggestion tokens from Groq's streaming completion API."""
+    clients = _get_clients()
+    if clients.groq is None:
+        raise RuntimeError("Groq library not available")
+    
+    prompt = build_prompt(ingredients, profile)
+    reserved = _groq_reservation(prompt, profile)
+    if not await groq_budget.acquire(reserved, AI_RATE_LIMIT_MAX_WAIT):
+        raise RateBudgetExhausted("Groq rate budget exhausted")
+    
+    async with clients.groq_limit:
+        try:
+            stream = await clients.groq.chat.completions.create(
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                model=GROQ_MODEL,
+                temperature=0.7,
+                max_tokens=profile.max_tokens,
+                stream=True
+            )
+        except Exception as e:
+            _check_throttled(groq_budget, getattr(e, "status_code", None))
+            raise
+        used = None
+        finish_reason = None
+        try:
+            async for chunk in stream:
+                # Groq reports usage on the final chunk of a stream
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if chunk.choices and chunk.choices[0].finish_reason:
+                    finish_reason = chunk.choices[0].finish_reason
+                if usage is not None:
+                    count_tokens("groq", usage, profile.name, finish_reason)
+                    used = getattr(usage, "total_tokens", None)
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    yield token
+        finally:
+            groq_budget.settle(reserved, used)
+            # Closing the HTTP response tells Groq to stop generating; shield
+            # it so the close completes even when the caller was cancelled
+            await asyncio.shield(stream.response.aclose())
+
+def _check_throttled(budget: ProviderBudget, status_code: Optional[int]) -> None:
+    """On a 429 the provider's budget is emptier than ours thinks; hold off until it refills."""
+    if status_code == 429:
+        budget.throttled()
+
+async def _get_huggingface_suggestion(ingredients: List[str],
+                                     profile: Optional[GenerationProfile] = None) -> dict:
+    """
+    Get recipe suggestion using Hugging Face API.
+    
+    The Mistral endpoint gets its own one-line prompt whatever the profile
+    and is not sent a token cap. The router has already reserved the call
+    in the request budget (_admit_huggingface).
+    """
     try:
+        clients = _get_clients()
         prompt = f"Suggest a simple recipe using these ingredients: {', '.join(ingredients)}. Include cooking instructions."
         
         headers = {
             "Authorization": f"Bearer {HF_API_KEY}"
         }
         
-        response = requests.post(
-            HF_API_URL,
-            headers=headers,
-            json={"inputs": prompt},
-            timeout=10
-        )
+        async with clients.hf_limit:
+            response = await clients.hf.post(
+                HF_API_URL,
+                headers=headers,
+                json={"inputs": prompt},
+                timeout=10
+            )
         
+        _check_throttled(hf_budget, response.status_code)
         if response.status_code == 200:
             result = response.json()
             if isinstance(result, list) and len(result) > 0:
@@ -172,5 +596,5 @@ def _get_huggingface_suggestion(ingredients: List[str]) -> dict:
         return None
         
     except Exception as e:
-        print(f"Hugging Face API error: {str(e)}")
+        logger.warning("Hugging Face API error: %s", e)
         return None
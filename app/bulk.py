@@ -0,0 +1,325 @@
+"""
+Bulk recipe import/export in NDJSON or CSV.
+
+Imports are fed line by line, validated and stored in batches, so memory
+stays bounded by the batch size however large the input is. Rows that fail
+validation (or are not valid UTF-8) are reported with their row number and
+skipped; the rest of the batch is still stored.
+
+CSV files have a header row with the Recipe field names; ingredients are
+separated by "|" within their column, with "\\|" and "\\\\" standing for a
+literal "|" and backslash inside an ingredient. An empty cell leaves the
+field at its default, while "null" sets it to None, so exported rows
+re-import unchanged.
+
+Command line:
+    python -m app.bulk import recipes.ndjson              # into RECIPE_DB_PATH
+    python -m app.bulk import recipes.csv --db other.db
+    python -m app.bulk import recipes.ndjson --url http://127.0.0.1:8000
+    python -m app.bulk export backup.csv --db recipes.db
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+
+from app.models import BulkImportReport, BulkRowError, Recipe
+from app.pagination import ndjson_chunks
+from app.repository import RecipeRepository, check_recipe_id
+
+FORMATS = ("ndjson", "csv")
+CSV_FIELDS = ("id", "name", "ingredients", "instructions", "cuisine", "servings", "prep_time", "cook_time")
+INGREDIENT_SEPARATOR = "|"
+CSV_NULL = "null"
+_ESCAPED = re.compile(r"[\\|]")
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+_INVALID_UTF8 = "row: not valid UTF-8"
+
+
+class RecipeImporter:
+    """
+    Validate and store recipes fed as batches of input lines.
+
+    With keep_ids=False every recipe gets a fresh ID from the store's
+    allocator, as POST /api/recipes does; with keep_ids=True the given IDs
+    are kept unless they are already taken, and rows whose ID the store
+    cannot hold (outside 1..MAX_INT32) are reported as errors.
+    """
+
+    def __init__(self, store: RecipeRepository, fmt: str = "ndjson", keep_ids: bool = False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+        self.store = store
+        self.fmt = fmt
+        self.keep_ids = keep_ids
+        self._header: Optional[List[str]] = None
+        self._row = 0
+        self._imported = 0
+        self._failed = 0
+        self._first_id: Optional[int] = None
+        self._last_id: Optional[int] = None
+        self._errors: List[BulkRowError] = []
+
+    def feed(self, lines: List[str]) -> None:
+        """Validate a batch of complete lines and store the valid recipes."""
+        valid = []
+        for row, parsed in self._parse(lines):
+            try:
+                recipe = (Recipe.model_validate_json(parsed) if isinstance(parsed, str)
+                          else Recipe.model_validate(parsed))
+            except ValidationError as exc:
+                self._error(row, _describe(exc))
+                continue
+            if not self.keep_ids:
+                recipe.id = None
+            else:
+                try:
+                    check_recipe_id(recipe.id)
+                except ValueError as exc:
+                    self._error(row, f"id: {exc}")
+                    continue
+            valid.append(recipe)
+
+        added = self.store.add_many(valid)
+        if added:
+            self._imported += len(added)
+            self._first_id = added[0].id if self._first_id is None else self._first_id
+            self._last_id = added[-1].id
+
+    def report(self) -> BulkImportReport:
+        return BulkImportReport(
+            imported=self._imported,
+            failed=self._failed,
+            first_id=self._first_id,
+            last_id=self._last_id,
+            errors=self._errors,
+            errors_truncated=self._failed > len(self._errors),
+        )
+
+    def _parse(self, lines: List[str]):
+        if self.fmt == "ndjson":
+            for line in lines:
+                self._row += 1
+                if not _is_utf8(line):
+                    self._error(self._row, _INVALID_UTF8)
+                elif line.strip():
+                    yield self._row, line
+            return
+
+        for record in csv.reader(lines):
+            if not record:
+                continue
+            if self._header is None:
+                self._header = [name.strip() for name in record]
+                continue
+            self._row += 1
+            if not all(map(_is_utf8, record)):
+                self._error(self._row, _INVALID_UTF8)
+                continue
+            yield self._row, _csv_to_dict(self._header, record)
+
+    def _error(self, row: int, message: str) -> None:
+        self._failed += 1
+        if len(self._errors) < MAX_REPORTED_ERRORS:
+            self._errors.append(BulkRowError(row=row, error=message))
+
+
+class LineBatcher:
+    """
+    Group input lines into batches that end on a record boundary.
+
+    A CSV record may span lines when a quoted field contains a newline; such
+    a record is never split, because a batch only ends where the number of
+    quote characters seen so far is even.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._lines: List[str] = []
+        self._quotes = 0
+
+    def push(self, line: str) -> Optional[List[str]]:
+        self._lines.append(line)
+        self._quotes += line.count('"')
+        if len(self._lines) >= self.batch_size and self._quotes % 2 == 0:
+            return self.flush()
+        return None
+
+    def flush(self) -> List[str]:
+        lines, self._lines, self._quotes = self._lines, [], 0
+        return lines
+
+
+def import_lines(importer: RecipeImporter, lines: Iterable[str],
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> BulkImportReport:
+    """Feed an iterable of text lines (e.g. an open file) to an importer."""
+    batcher = LineBatcher(batch_size)
+    for line in lines:
+        batch = batcher.push(line)
+        if batch:
+            importer.feed(batch)
+    importer.feed(batcher.flush())
+    return importer.report()
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks (e.g. a request body) into text lines.
+
+    Invalid UTF-8 is decoded with surrogateescape rather than raising, so
+    the importer can report the line it is on as a row error.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", "surrogateescape") + "\n"
+    if buffer:
+        yield buffer.decode("utf-8", "surrogateescape")
+
+
+def export_chunks(recipes: Iterator[Recipe], fmt: str = "ndjson") -> Iterator[str]:
+    """Serialize recipes lazily, a chunk of rows at a time."""
+    if fmt == "ndjson":
+        for chunk in ndjson_chunks(recipes, None):
+            yield chunk.decode("utf-8")
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(CSV_FIELDS)
+    for i, recipe in enumerate(recipes, 1):
+        writer.writerow([
+            recipe.id, recipe.name, INGREDIENT_SEPARATOR.join(map(_escape_ingredient, recipe.ingredients)),
+            recipe.instructions, recipe.cuisine,
+            *(CSV_NULL if value is None else value
+              for value in (recipe.servings, recipe.prep_time, recipe.cook_time)),
+        ])
+        if i % DEFAULT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _csv_to_dict(header: List[str], record: List[str]) -> dict:
+    data = {}
+    for name, value in zip(header, record):
+        value = value.strip()
+        if name == "ingredients":
+            data[name] = _split_ingredients(value)
+        elif name not in ("id", "servings", "prep_time", "cook_time"):
+            data[name] = value
+        elif value == CSV_NULL:
+            data[name] = None
+        elif value:
+            data[name] = value
+    return data
+
+
+def _escape_ingredient(ingredient: str) -> str:
+    return _ESCAPED.sub(lambda match: "\\" + match.group(), ingredient)
+
+
+def _split_ingredients(value: str) -> List[str]:
+    # Split on unescaped separators; a backslash before anything other than
+    # the separator or another backslash is kept as it is
+    items, current = [], []
+    chars = iter(value)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            current.append(escaped if escaped in (INGREDIENT_SEPARATOR, "\\") else char + escaped)
+        elif char == INGREDIENT_SEPARATOR:
+            items.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    items.append("".join(current))
+    return [item.strip() for item in items if item.strip()]
+
+
+def _is_utf8(text: str) -> bool:
+    # Bytes that were not valid UTF-8 come through as lone surrogates
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _guess_format(path: str, fmt: Optional[str]) -> str:
+    return fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.sqlite_store import SQLiteRecipeStore
+
+    parser = argparse.ArgumentParser(description="Bulk import/export recipes as NDJSON or CSV.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    load = sub.add_parser("import", help="load recipes from a file")
+    load.add_argument("path")
+    load.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    load.add_argument("--db", default=os.getenv("RECIPE_DB_PATH", "recipes.db"),
+                      help="SQLite database to load into")
+    load.add_argument("--url", help="send to a running API instead, e.g. http://127.0.0.1:8000")
+    load.add_argument("--keep-ids", action="store_true", help="keep IDs from the file when free")
+    load.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    dump = sub.add_parser("export", help="write all recipes to a file ('-' for stdout)")
+    dump.add_argument("path")
+    dump.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    dump.add_argument("--db", default=os.getenv("RECIPE_DB_PATH", "recipes.db"))
+
+    args = parser.parse_args(argv)
+    fmt = _guess_format(args.path, args.format)
+
+    if args.command == "export":
+        store = SQLiteRecipeStore(args.db)
+        out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="")
+        with out:
+            for chunk in export_chunks(store.iter_all(), fmt):
+                out.write(chunk)
+        store.close()
+        return 0
+
+    if args.url:
+        import httpx
+
+        with open(args.path, "rb") as f:
+            response = httpx.post(
+                f"{args.url.rstrip('/')}/api/recipes/bulk",
+                params={"format": fmt, "keep_ids": args.keep_ids},
+                content=iter(lambda: f.read(1 << 16), b""),
+                timeout=None,
+            )
+        print(response.text)
+        return 0 if response.is_success else 1
+
+    store = SQLiteRecipeStore(args.db)
+    importer = RecipeImporter(store, fmt, keep_ids=args.keep_ids)
+    with open(args.path, encoding="utf-8", errors="surrogateescape", newline="") as f:
+        report = import_lines(importer, f, args.batch_size)
+    store.close()
+    print(report.model_dump_json(indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.models import Recipe, SearchFilters
+from app.stats import BUCKET_LABELS, time_bucket
+
+_MIN_CAPACITY = 1024
+_MAX_CACHED_TERMS = 1024
+
+# Sort keys pack (value, id) into one int64 so a single argpartition orders
+# by value then ID; missing values sort last in either direction. Values are
+# clamped below _VALUE_LIMIT; IDs fit in 32 bits, as the stores only accept
+# IDs in 1..MAX_INT32 (app.repository.check_recipe_id)
+_VALUE_LIMIT = 1 << 30
+_MISSING_KEY = _VALUE_LIMIT
+
+# Per-row int arrays grown and compacted together
+_ROW_ARRAYS = ("_ids", "_prep", "_cook", "_servings", "_cuisine", "_prep_bucket", "_cook_bucket")
+
+
+class FacetResult(NamedTuple):
+    ids: List[int]                # the requested page, in sort order
+    total: int                    # recipes matching every filter
+    facets: Optional[dict]        # facet counts, when requested
+
+
+class FacetIndex:
+    """
+    Columnar filter engine behind advanced search.
+
+    Every recipe occupies a row in parallel NumPy arrays: prep/cook time
+    (-1 when missing), servings, a categorical cuisine code and prep/cook
+    histogram buckets. Every distinct (normalized) ingredient is a column of
+    rows, as in PantryIndex. A query turns each filter into a boolean mask
+    over the rows (an ingredient term sets the rows of every ingredient
+    containing it) and ANDs them, so its cost is a few vector operations
+    plus the postings of the ingredient terms used.
+
+    Facet counts come out of the same masks. They are disjunctive: each
+    facet is counted with every filter except its own, so a client can show
+    how many recipes each other cuisine or time bucket would add.
+
+    Removing a recipe clears its alive flag; dead rows are compacted away
+    once they outnumber the live ones.
+    """
+
+    def __init__(self):
+        self._row_of: Dict[int, int] = {}
+        self._ids = np.zeros(_MIN_CAPACITY, dtype=np.int64)
+        self._prep = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._cook = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._servings = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._cuisine = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._prep_bucket = np.zeros(_MIN_CAPACITY, dtype=np.int8)
+        self._cook_bucket = np.zeros(_MIN_CAPACITY, dtype=np.int8)
+        self._alive = np.zeros(_MIN_CAPACITY, dtype=bool)
+        self._rows = 0
+        self._dead = 0
+        self._cuisine_codes: Dict[str, int] = {}
+        self._cuisine_labels: List[str] = []
+        self._columns: Dict[str, List[int]] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._term_names: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def add(self, recipe: Recipe) -> None:
+        """Add (or replace) a recipe."""
+        if recipe.id in self._row_of:
+            self.remove(recipe.id)
+
+        row = self._rows
+        if row == len(self._ids):
+            self._grow()
+        self._rows += 1
+        self._row_of[recipe.id] = row
+        self._ids[row] = recipe.id
+        self._prep[row] = -1 if recipe.prep_time is None else recipe.prep_time
+        self._cook[row] = -1 if recipe.cook_time is None else recipe.cook_time
+        self._servings[row] = -1 if recipe.servings is None else recipe.servings
+        self._cuisine[row] = self._cuisine_code(recipe.cuisine)
+        self._prep_bucket[row] = time_bucket(recipe.prep_time)
+        self._cook_bucket[row] = time_bucket(recipe.cook_time)
+        self._alive[row] = True
+        for name in {ingredient.casefold() for ingredient in recipe.ingredients}:
+            column = self._columns.get(name)
+            if column is None:
+                column = self._columns[name] = []
+                self._term_names.clear()
+            column.append(row)
+            self._arrays.pop(name, None)
+
+    def remove(self, recipe_id: int) -> None:
+        row = self._row_of.pop(recipe_id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._dead += 1
+        if self._dead > _MIN_CAPACITY and self._dead * 2 > self._rows:
+            self._compact()
+
+    def search(self, filters: SearchFilters, after_id: int = 0, limit: Optional[int] = None,
+               with_facets: bool = False) -> FacetResult:
+        """
+        Recipes matching every filter, ordered by `filters.sort`.
+
+        `after_id` is the keyset cursor: the ID of the last recipe of the
+        previous page. For sorts other than by ID the cursor recipe must
+        still exist, since its sort value marks where the next page starts.
+        """
+        n = self._rows
+        cuisine = self._cuisine_mask(filters)
+        # A max of 0 means no limit, as it always did for advanced search
+        prep = _time_mask(self._prep[:n], filters.prep_time_min, filters.prep_time_max or None)
+        cook = _time_mask(self._cook[:n], filters.cook_time_min, filters.cook_time_max or None)
+        other = self._alive[:n].copy()
+        if filters.servings_min is not None:
+            other &= self._servings[:n] >= filters.servings_min
+        if filters.servings_max is not None:
+            other &= (self._servings[:n] >= 0) & (self._servings[:n] <= filters.servings_max)
+        for term in _include_terms(filters):
+            other &= self._term_mask(term)
+        for term in filters.exclude_ingredients:
+            other &= ~self._term_mask(term)
+
+        facets = None
+        if with_facets:
+            facets = {
+                "cuisine": self._cuisine_counts(_all(other, prep, cook)),
+                "prep_time": _histogram(self._prep_bucket[:n], _all(other, cuisine, cook)),
+                "cook_time": _histogram(self._cook_bucket[:n], _all(other, cuisine, prep)),
+            }
+
+        rows = np.flatnonzero(_all(other, cuisine, prep, cook))
+        page = self._page(rows, filters.sort, after_id, limit)
+        return FacetResult(self._ids[page].tolist(), len(rows), facets)
+
+    # ==================== INTERNALS ====================
+    def _cuisine_code(self, cuisine: str) -> int:
+        key = cuisine.casefold()
+        code = self._cuisine_codes.get(key)
+        if code is None:
+            code = self._cuisine_codes[key] = len(self._cuisine_labels)
+            self._cuisine_labels.append(cuisine)
+        return code
+
+    def _cuisine_mask(self, filters: SearchFilters) -> Optional[np.ndarray]:
+        wanted = list(filters.cuisines)
+        if filters.cuisine:
+            wanted.append(filters.cuisine)
+        if not wanted:
+            return None
+        codes = [self._cuisine_codes[c.casefold()] for c in wanted if c.casefold() in self._cuisine_codes]
+        column = self._cuisine[:self._rows]
+        if len(codes) == 1:
+            return column == codes[0]
+        return np.isin(column, codes)
+
+    def _cuisine_counts(self, mask: np.ndarray) -> Dict[str, int]:
+        counts = np.bincount(self._cuisine[:self._rows][mask], minlength=len(self._cuisine_labels))
+        return {self._cuisine_labels[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def _term_mask(self, term: str) -> np.ndarray:
+        """Rows with an ingredient containing the term (case-insensitive)."""
+        mask = np.zeros(self._rows, dtype=bool)
+        for name in self._matching_names(term.casefold()):
+            mask[self._column(name)] = True
+        return mask
+
+    def _matching_names(self, term: str) -> List[str]:
+        # The ingredient vocabulary is small and rarely changes, so matched
+        # names are cached per term until a new ingredient shows up
+        names = self._term_names.get(term)
+        if names is None:
+            if len(self._term_names) >= _MAX_CACHED_TERMS:
+                self._term_names.clear()
+            names = self._term_names[term] = [name for name in self._columns if term in name]
+        return names
+
+    def _column(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = np.array(self._columns[name], dtype=np.int64)
+        return array
+
+    def _page(self, rows: np.ndarray, sort: str, after_id: int, limit: Optional[int]) -> np.ndarray:
+        """The rows of one page, in sort order."""
+        keys = self._sort_keys(rows, sort)
+        if after_id:
+            later = keys > self._cursor_key(after_id, sort)
+            rows, keys = rows[later], keys[later]
+        if limit is not None and len(rows) > limit:
+            nearest = np.argpartition(keys, limit - 1)[:limit]
+            rows, keys = rows[nearest], keys[nearest]
+        return rows[np.argsort(keys, kind="stable")]
+
+    def _cursor_key(self, after_id: int, sort: str) -> int:
+        if sort == "id":
+            return after_id
+        if sort == "-id":
+            return -after_id
+        row = self._row_of.get(after_id)
+        if row is None:
+            raise KeyError(after_id)
+        return int(self._sort_keys(np.array([row]), sort)[0])
+
+    def _sort_keys(self, rows: np.ndarray, sort: str) -> np.ndarray:
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        ids = self._ids[rows]
+        if field == "id":
+            return -ids if descending else ids
+
+        if field == "total_time":
+            prep, cook = self._prep[rows], self._cook[rows]
+            values = np.maximum(prep, 0) + np.maximum(cook, 0)
+            missing = (prep < 0) & (cook < 0)
+        else:
+            values = {"prep_time": self._prep, "cook_time": self._cook,
+                      "servings": self._servings}[field][rows]
+            missing = values < 0
+        values = np.minimum(values.astype(np.int64), _VALUE_LIMIT - 1)
+        if descending:
+            values = _VALUE_LIMIT - 1 - values
+        values[missing] = _MISSING_KEY
+        return (values << 32) | ids
+
+    def _grow(self) -> None:
+        capacity = max(_MIN_CAPACITY, len(self._ids) * 2)
+        for name in _ROW_ARRAYS:
+            setattr(self, name, np.resize(getattr(self, name), capacity))
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._rows] = self._alive[:self._rows]
+        self._alive = alive
+
+    def _compact(self) -> None:
+        alive = self._alive[:self._rows]
+        new_row = np.cumsum(alive) - 1
+
+        columns: Dict[str, List[int]] = {}
+        for name, rows in self._columns.items():
+            array = np.array(rows, dtype=np.int64)
+            array = new_row[array[alive[array]]]
+            if len(array):
+                columns[name] = array.tolist()
+
+        live = np.flatnonzero(alive)
+        for name in _ROW_ARRAYS:
+            array = getattr(self, name)
+            array[:len(live)] = array[live]
+        self._rows = len(live)
+        self._alive[:self._rows] = True
+        self._alive[self._rows:] = False
+        self._row_of = {int(rid): row for row, rid in enumerate(self._ids[:self._rows])}
+        self._columns = columns
+        self._arrays = {}
+        self._term_names = {}
+        self._dead = 0
+
+
+def _include_terms(filters: SearchFilters) -> List[str]:
+    terms = list(filters.include_ingredients)
+    if filters.ingredient:
+        terms.append(filters.ingredient)
+    return terms
+
+
+def _time_mask(times: np.ndarray, low: Optional[int], high: Optional[int]) -> Optional[np.ndarray]:
+    # Any time filter excludes recipes with a missing or zero time, like the
+    # by-time search does
+    if low is None and high is None:
+        return None
+    mask = times > 0
+    if low is not None:
+        mask &= times >= low
+    if high is not None:
+        mask &= times <= high
+    return mask
+
+
+def _all(*masks: Optional[np.ndarray]) -> np.ndarray:
+    result = None
+    for mask in masks:
+        if mask is not None:
+            result = mask if result is None else result & mask
+    return result
+
+
+def _histogram(buckets: np.ndarray, mask: np.ndarray) -> Dict[str, int]:
+    counts = np.bincount(buckets[mask], minlength=len(BUCKET_LABELS))
+    return dict(zip(BUCKET_LABELS, counts.tolist()))
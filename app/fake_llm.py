@@ -0,0 +1,157 @@
+import asyncio
+from types import SimpleNamespace
+from typing import AsyncIterator, List, Optional
+
+from app.generation import GenerationProfile
+
+DEFAULT_RECIPE = """**Recipe Name:** Garlic Tomato Chicken
+**Cuisine:** Italian
+**Prep Time:** 10 min
+**Cook Time:** 25 min
+**Servings:** 4
+
+**Ingredients:**
+- 500g chicken thighs
+- 4 cloves garlic, minced
+- 400g chopped tomatoes
+- 2 tbsp olive oil
+- Salt and pepper
+
+**Instructions:**
+1. Season the chicken with salt and pepper.
+2. Brown the chicken in olive oil, then set aside.
+3. Soften the garlic, add the tomatoes and simmer for 10 minutes.
+4. Return the chicken to the pan and cook through.
+
+**Tips:** Finish with fresh basil."""
+
+SUMMARY_REPLY = """**Recipe Name:** Garlic Tomato Chicken
+**Cuisine:** Italian
+**Prep Time:** 10 min
+**Cook Time:** 25 min
+**Servings:** 4
+**Main Ingredients:** chicken thighs, garlic, chopped tomatoes, olive oil
+**Summary:** Brown the seasoned chicken, then simmer it in a garlicky tomato sauce until cooked through. Serve with bread or pasta."""
+
+# Long, open prompts get chattier answers than the compact format asks for
+FULL_PREAMBLE = "Here's a delicious and practical recipe that makes the most of what you have! "
+
+
+def word_tokens(text: str) -> List[str]:
+    """Split text into the word-sized tokens the fakes stream and bill for."""
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + words[-1:]
+
+
+class FakeLLM:
+    """
+    Local stand-in for an LLM provider, for tests and offline benchmarks.
+
+    Streams a canned recipe word by word with configurable latency and can be
+    told to fail. Records how many tokens were sent and whether the consumer
+    stopped reading before the end (e.g. because the client disconnected).
+    """
+
+    def __init__(self, text: str = DEFAULT_RECIPE, token_delay: float = 0.0,
+                 first_token_delay: float = 0.0, fail: bool = False):
+        self.text = text
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.fail = fail
+        self.calls = 0
+        self.tokens_sent = 0
+        self.cancelled = False
+
+    def tokens(self, max_tokens: Optional[int] = None) -> List[str]:
+        return word_tokens(self.text)[:max_tokens]
+
+    async def stream(self, ingredients: List[str],
+                     profile: Optional[GenerationProfile] = None) -> AsyncIterator[str]:
+        self.calls += 1
+        finished = False
+        try:
+            await asyncio.sleep(self.first_token_delay)
+            if self.fail:
+                raise RuntimeError("fake provider failure")
+            for token in self.tokens(profile.max_tokens if profile else None):
+                yield token
+                self.tokens_sent += 1
+                await asyncio.sleep(self.token_delay)
+            finished = True
+        finally:
+            if not finished and not self.fail:
+                self.cancelled = True
+
+    async def complete(self, ingredients: List[str],
+                       profile: Optional[GenerationProfile] = None) -> Optional[dict]:
+        parts = [token async for token in self.stream(ingredients, profile)]
+        return {"suggestion": "".join(parts), "ingredients_used": ingredients}
+
+
+class FakeGroq:
+    """
+    Local stand-in for the AsyncGroq client, for prompt and token-budget benchmarks.
+
+    Answers `chat.completions.create` (plain or streamed) with a canned
+    summary, full recipe or compact recipe depending on the prompt, cut off
+    at max_tokens, and reports usage like Groq does. A call takes
+    `prefill_delay` per prompt token plus `token_delay` per completion
+    token, so longer prompts and answers cost latency as well as budget.
+    Tokens are whitespace-separated words.
+    """
+
+    def __init__(self, prefill_delay: float = 0.0, token_delay: float = 0.0):
+        self.prefill_delay = prefill_delay
+        self.token_delay = token_delay
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def reply(self, prompt: str) -> str:
+        if "**Summary:**" in prompt:
+            return SUMMARY_REPLY
+        if "**Tips:**" in prompt:
+            return FULL_PREAMBLE + DEFAULT_RECIPE
+        return DEFAULT_RECIPE.split("\n\n**Tips:**")[0]
+
+    async def create(self, messages: List[dict], model: str, temperature: float,
+                     max_tokens: int, stream: bool = False):
+        self.calls += 1
+        prompt = "\n".join(message["content"] for message in messages)
+        prompt_tokens = len(word_tokens(prompt))
+        reply = word_tokens(self.reply(prompt))
+        tokens = reply[:max_tokens]
+        finish_reason = "length" if len(reply) > max_tokens else "stop"
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(tokens),
+                                total_tokens=prompt_tokens + len(tokens))
+        await asyncio.sleep(prompt_tokens * self.prefill_delay)
+        if stream:
+            return _FakeGroqStream(tokens, finish_reason, usage, self.token_delay)
+        await asyncio.sleep(len(tokens) * self.token_delay)
+        choice = SimpleNamespace(message=SimpleNamespace(content="".join(tokens)), finish_reason=finish_reason)
+        return SimpleNamespace(choices=[choice], usage=usage)
+
+
+class _FakeGroqStream:
+    """Streamed chunks as Groq sends them: usage and finish_reason arrive on the last one."""
+
+    def __init__(self, tokens: List[str], finish_reason: str, usage, token_delay: float):
+        self.tokens = tokens
+        self.finish_reason = finish_reason
+        self.usage = usage
+        self.token_delay = token_delay
+        self.response = SimpleNamespace(aclose=self._aclose)
+        self.closed = False
+
+    async def _aclose(self) -> None:
+        self.closed = True
+
+    async def __aiter__(self):
+        for token in self.tokens:
+            if self.closed:
+                return
+            await asyncio.sleep(self.token_delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token), finish_reason=None)],
+                                  x_groq=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None),
+                                                       finish_reason=self.finish_reason)],
+                              x_groq=SimpleNamespace(usage=self.usage))
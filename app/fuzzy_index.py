@@ -0,0 +1,284 @@
+import heapq
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+import numpy as np
+
+NAME = "name"
+INGREDIENT = "ingredient"
+
+# An ingredient match ranks below an equally similar name match
+FIELD_WEIGHTS = {NAME: 1.0, INGREDIENT: 0.8}
+DEFAULT_MIN_SCORE = 0.3
+
+_WORD_RE = re.compile(r"\w+")
+_MIN_CAPACITY = 1024
+
+
+def word_trigrams(word: str) -> Set[str]:
+    """
+    Trigrams of a word padded with one space on each side (" wo", ..., "rd ").
+
+    PostgreSQL's pg_trgm pads the front with two spaces; the extra "  w"
+    trigram is shared by every word starting with w, which makes it costly
+    to look up and makes words of one phrase overlap far more often.
+    """
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def text_words(text: str) -> Set[str]:
+    return set(_WORD_RE.findall(text.casefold()))
+
+
+def text_trigrams(text: str) -> Set[str]:
+    return set().union(*map(word_trigrams, text_words(text)))
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Shared trigrams over all distinct trigrams of two strings, as in pg_trgm."""
+    grams_a, grams_b = text_trigrams(a), text_trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+class FuzzyHit(NamedTuple):
+    recipe_id: int
+    score: float      # trigram similarity times the field weight
+    field: str        # "name" or "ingredient"
+    text: str         # the matched name or ingredient
+    coverage: float   # share of the query's trigrams found in `text`
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant search over recipe names and ingredients.
+
+    Every distinct (case-folded) name and ingredient is a phrase occupying a
+    row; every distinct word is a column holding the rows of the phrases
+    that contain it, and words are found through a trigram -> words map. A
+    query looks up the words that share trigrams with its own words, then
+    adds up the shared trigram counts per row with a weighted np.bincount
+    over those columns, so the cost follows the postings touched rather than
+    the number of phrases scanned in Python.
+
+    Rows are scored with the trigram similarity shared / (query trigrams +
+    phrase trigrams - shared). Summing per word is exact unless two words of
+    a phrase have a trigram in common; such phrases are flagged when added
+    and rescored exactly whenever they come up as candidates.
+
+    Like PantryIndex, removing the last recipe of a phrase just zeroes its
+    row; dead rows are compacted away once they outnumber the live ones.
+    """
+
+    def __init__(self):
+        self._row_of: Dict[Tuple[str, str], int] = {}
+        self._row_keys: List[Tuple[str, str]] = []
+        self._row_texts: List[str] = []
+        self._row_recipes: List[Set[int]] = []
+        self._row_grams = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._row_weights = np.zeros(_MIN_CAPACITY, dtype=np.float64)
+        self._row_overlaps = np.zeros(_MIN_CAPACITY, dtype=bool)
+        self._overlap_grams: Dict[int, Set[str]] = {}
+        self._rows = 0
+        self._dead = 0
+        self._columns: Dict[str, List[int]] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._word_grams: Dict[str, Set[str]] = {}
+        self._gram_words: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def add(self, recipe_id: int, name: str, ingredients: Iterable[str]) -> None:
+        self._add_phrase(NAME, name, recipe_id)
+        for ingredient in set(ingredients):
+            self._add_phrase(INGREDIENT, ingredient, recipe_id)
+
+    def remove(self, recipe_id: int, name: str, ingredients: Iterable[str]) -> None:
+        self._remove_phrase(NAME, name, recipe_id)
+        for ingredient in set(ingredients):
+            self._remove_phrase(INGREDIENT, ingredient, recipe_id)
+
+    def search(self, query: str, limit: int = 10,
+               min_score: float = DEFAULT_MIN_SCORE) -> List[FuzzyHit]:
+        """
+        The `limit` recipes whose name or an ingredient best matches a query.
+
+        A recipe is scored by its best matching phrase. Results are ordered
+        by score, then recipe ID.
+        """
+        query_grams = text_trigrams(query)
+        if not query_grams or limit <= 0 or not self._row_of:
+            return []
+
+        shared_by_word: Counter = Counter()
+        for gram in query_grams:
+            words = self._gram_words.get(gram)
+            if words:
+                shared_by_word.update(words)
+
+        words, counts = [], []
+        for word, shared in shared_by_word.items():
+            # A word sharing a single trigram with the query cannot lift a
+            # phrase over the threshold on its own, but may touch many rows
+            if shared >= 2 or shared == len(self._word_grams[word]):
+                words.append(word)
+                counts.append(shared)
+        if not words:
+            return []
+
+        arrays = [self._column(word) for word in words]
+        weights = np.repeat(np.array(counts, dtype=np.float64), [len(a) for a in arrays])
+        shared = np.bincount(np.concatenate(arrays), weights=weights, minlength=self._rows)
+        grams = self._row_grams[:self._rows]
+        similarity = np.divide(shared, len(query_grams) + grams - shared,
+                               out=np.zeros(self._rows), where=grams > 0)
+        scores = similarity * self._row_weights[:self._rows]
+
+        # Overlapping phrases can only be overestimated, so rescoring the
+        # ones above the threshold is enough
+        for row in np.flatnonzero((scores >= min_score) & self._row_overlaps[:self._rows]).tolist():
+            shared[row] = len(query_grams & self._overlap_grams[row])
+            scores[row] = (shared[row] / (len(query_grams) + grams[row] - shared[row])
+                           * self._row_weights[row])
+
+        rows = np.flatnonzero(scores >= min_score)
+        if not len(rows):
+            return []
+        # Every phrase has at least one recipe, so the best `limit` phrases
+        # (plus ties with the last of them) hold the best `limit` recipes
+        if len(rows) > limit:
+            cutoff = np.partition(scores[rows], len(rows) - limit)[len(rows) - limit]
+            rows = rows[scores[rows] >= cutoff]
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        return self._collect(rows.tolist(), scores, shared, len(query_grams), limit)
+
+    def _collect(self, rows: List[int], scores: np.ndarray, shared: np.ndarray,
+                 query_size: int, limit: int) -> List[FuzzyHit]:
+        """Turn phrase rows, best first, into the best `limit` recipes."""
+        hits: List[FuzzyHit] = []
+        seen: Set[int] = set()
+        start = 0
+        while start < len(rows) and len(hits) < limit:
+            # Rows tied on score form one level; within it, lower IDs win
+            score = float(scores[rows[start]])
+            end = start + 1
+            while end < len(rows) and scores[rows[end]] == score:
+                end += 1
+            row_of: Dict[int, int] = {}
+            for row in rows[start:end]:
+                for rid in self._row_recipes[row]:
+                    if rid not in seen:
+                        row_of.setdefault(rid, row)
+            for rid in heapq.nsmallest(limit - len(hits), row_of):
+                row = row_of[rid]
+                seen.add(rid)
+                hits.append(FuzzyHit(rid, score, self._row_keys[row][0], self._row_texts[row],
+                                     float(shared[row]) / query_size))
+            start = end
+        return hits
+
+    # ==================== INTERNALS ====================
+    def _add_phrase(self, field: str, text: str, recipe_id: int) -> None:
+        key = (field, text.casefold())
+        row = self._row_of.get(key)
+        if row is None:
+            row = self._new_row(key, text)
+        self._row_recipes[row].add(recipe_id)
+
+    def _new_row(self, key: Tuple[str, str], text: str) -> int:
+        row = self._rows
+        if row == len(self._row_grams):
+            self._grow()
+        self._rows += 1
+        self._row_of[key] = row
+        self._row_keys.append(key)
+        self._row_texts.append(text)
+        self._row_recipes.append(set())
+
+        grams: Set[str] = set()
+        total = 0
+        for word in text_words(key[1]):
+            word_grams = self._add_word(word)
+            grams |= word_grams
+            total += len(word_grams)
+            self._columns[word].append(row)
+            self._arrays.pop(word, None)
+        self._row_grams[row] = len(grams)
+        self._row_overlaps[row] = len(grams) < total
+        if len(grams) < total:
+            self._overlap_grams[row] = grams
+        self._row_weights[row] = FIELD_WEIGHTS[key[0]]
+        return row
+
+    def _remove_phrase(self, field: str, text: str, recipe_id: int) -> None:
+        key = (field, text.casefold())
+        row = self._row_of.get(key)
+        if row is None:
+            return
+        recipes = self._row_recipes[row]
+        recipes.discard(recipe_id)
+        if recipes:
+            return
+        del self._row_of[key]
+        self._overlap_grams.pop(row, None)
+        self._row_grams[row] = 0
+        self._dead += 1
+        if self._dead > _MIN_CAPACITY and self._dead * 2 > self._rows:
+            self._compact()
+
+    def _add_word(self, word: str) -> Set[str]:
+        grams = self._word_grams.get(word)
+        if grams is None:
+            grams = self._word_grams[word] = word_trigrams(word)
+            self._columns[word] = []
+            for gram in grams:
+                self._gram_words.setdefault(gram, set()).add(word)
+        return grams
+
+    def _column(self, word: str) -> np.ndarray:
+        array = self._arrays.get(word)
+        if array is None:
+            array = self._arrays[word] = np.array(self._columns[word], dtype=np.int64)
+        return array
+
+    def _grow(self) -> None:
+        capacity = max(_MIN_CAPACITY, len(self._row_grams) * 2)
+        self._row_grams = np.resize(self._row_grams, capacity)
+        self._row_weights = np.resize(self._row_weights, capacity)
+        self._row_overlaps = np.resize(self._row_overlaps, capacity)
+
+    def _compact(self) -> None:
+        alive = self._row_grams[:self._rows] > 0
+        new_row = np.cumsum(alive) - 1
+
+        columns: Dict[str, List[int]] = {}
+        for word, rows in self._columns.items():
+            array = np.array(rows, dtype=np.int64)
+            array = new_row[array[alive[array]]]
+            if len(array):
+                columns[word] = array.tolist()
+        for word in self._word_grams.keys() - columns.keys():
+            for gram in self._word_grams.pop(word):
+                words = self._gram_words[gram]
+                words.discard(word)
+                if not words:
+                    del self._gram_words[gram]
+
+        live = np.flatnonzero(alive)
+        self._rows = len(live)
+        self._row_grams[:self._rows] = self._row_grams[live]
+        self._row_weights[:self._rows] = self._row_weights[live]
+        self._row_overlaps[:self._rows] = self._row_overlaps[live]
+        self._row_grams[self._rows:] = 0
+        self._row_keys = [self._row_keys[row] for row in live.tolist()]
+        self._row_texts = [self._row_texts[row] for row in live.tolist()]
+        self._row_recipes = [self._row_recipes[row] for row in live.tolist()]
+        self._row_of = {key: row for row, key in enumerate(self._row_keys)}
+        self._overlap_grams = {int(new_row[row]): grams for row, grams in self._overlap_grams.items()}
+        self._columns = columns
+        self._arrays = {}
+        self._dead = 0
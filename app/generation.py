@@ -0,0 +1,86 @@
+from typing import List, NamedTuple
+
+COMPACT = "compact"
+FULL = "full"
+PROMPT_STYLES = (COMPACT, FULL)
+
+
+class GenerationProfile(NamedTuple):
+    """How a suggestion is requested from the LLM."""
+    name: str          # the endpoint it is used for, or "summary"; a metrics label
+    style: str         # COMPACT or FULL prompt
+    max_tokens: int    # completion cap sent upstream and reserved in the rate budget
+    summary: bool = False  # a short overview instead of the full recipe
+
+
+# The original prompt: explains the task at length and asks for tips
+FULL_PROMPT = """You are an expert chef. The user wants a recipe.
+
+They provided: {request}
+
+This could be:
+- A dish name (like "poha", "biryani", "pasta carbonara")
+- Ingredients they have (like "chicken, garlic, tomato")
+
+Please provide a COMPLETE RECIPE that either:
+1. Is for the exact dish they named, OR
+2. Uses the ingredients they provided
+
+Format your response as:
+**Recipe Name:** [name]
+**Cuisine:** [type]
+**Prep Time:** [minutes] min
+**Cook Time:** [minutes] min
+**Servings:** [number]
+
+**Ingredients:**
+- [ingredient with quantity]
+- [ingredient with quantity]
+(list all needed ingredients)
+
+**Instructions:**
+1. [step 1]
+2. [step 2]
+3. [step 3]
+(continue with clear steps)
+
+**Tips:** [any helpful tips]
+
+Be specific, practical, and delicious!"""
+
+# The same layout (which app.recipe_parser reads) in about a third of the
+# tokens, without the tips section and with no room for preambles
+COMPACT_PROMPT = """Recipe for: {request} (a dish name, or ingredients to use).
+Reply only in this format, with short steps:
+**Recipe Name:** name
+**Cuisine:** type
+**Prep Time:** N min
+**Cook Time:** N min
+**Servings:** N
+
+**Ingredients:**
+- quantity ingredient
+
+**Instructions:**
+1. step"""
+
+SUMMARY_PROMPT = """Recipe summary for: {request} (a dish name, or ingredients to use).
+Reply only in this format:
+**Recipe Name:** name
+**Cuisine:** type
+**Prep Time:** N min
+**Cook Time:** N min
+**Servings:** N
+**Main Ingredients:** comma-separated
+**Summary:** two sentences on how it is made"""
+
+
+def build_prompt(ingredients: List[str], profile: GenerationProfile) -> str:
+    """The prompt for a dish name or ingredient list under a generation profile."""
+    if profile.summary:
+        template = SUMMARY_PROMPT
+    elif profile.style == FULL:
+        template = FULL_PROMPT
+    else:
+        template = COMPACT_PROMPT
+    return template.format(request=", ".join(ingredients))
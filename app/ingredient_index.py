@@ -0,0 +1,117 @@
+import re
+from typing import Dict, Iterable, List, Set
+
+GRAM_SIZE = 3
+
+
+def word_pattern(needle: str) -> "re.Pattern[str]":
+    """Regex matching the needle as whole words (not inside a longer word)."""
+    return re.compile(rf"(?<!\w){re.escape(needle)}(?!\w)")
+
+
+def _grams(text: str, size: int) -> Set[str]:
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class IngredientIndex:
+    """
+    Substring index over normalized ingredient strings.
+
+    Each distinct ingredient string is stored once in a vocabulary and mapped
+    to a posting set of recipe IDs. An n-gram index (all 1-, 2- and 3-grams)
+    maps to vocabulary entries, so a substring query only has to verify the
+    few ingredient strings that share every trigram of the search term
+    instead of scanning every ingredient of every recipe.
+
+    Callers pass already-normalized strings (see app.store.normalize).
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        """Number of distinct ingredient strings."""
+        return len(self._postings)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._postings
+
+    def names(self) -> Iterable[str]:
+        return self._postings.keys()
+
+    def postings(self, name: str) -> Set[int]:
+        """Recipe IDs for an exact (normalized) ingredient string."""
+        return self._postings.get(name, set())
+
+    def add(self, name: str, recipe_id: int) -> None:
+        postings = self._postings.get(name)
+        if postings is None:
+            postings = self._postings[name] = set()
+            for gram in self._all_grams(name):
+                self._grams.setdefault(gram, set()).add(name)
+        postings.add(recipe_id)
+
+    def discard(self, name: str, recipe_id: int) -> None:
+        postings = self._postings.get(name)
+        if postings is None:
+            return
+        postings.discard(recipe_id)
+        if postings:
+            return
+
+        del self._postings[name]
+        for gram in self._all_grams(name):
+            names = self._grams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._grams[gram]
+
+    def matching_names(self, needle: str) -> List[str]:
+        """Ingredient strings containing the (normalized) needle."""
+        if not needle:
+            return list(self._postings)
+        if len(needle) <= GRAM_SIZE:
+            return list(self._grams.get(needle, ()))
+
+        # Intersect trigram candidate sets, smallest first, then verify
+        candidate_sets = []
+        for gram in _grams(needle, GRAM_SIZE):
+            names = self._grams.get(gram)
+            if not names:
+                return []
+            candidate_sets.append(names)
+        candidate_sets.sort(key=len)
+
+        candidates = set(candidate_sets[0])
+        for names in candidate_sets[1:]:
+            candidates &= names
+            if not candidates:
+                return []
+        return [name for name in candidates if needle in name]
+
+    def matching_words(self, needle: str) -> List[str]:
+        """
+        Ingredient strings containing the needle as whole words, so "cheese"
+        matches "parmesan cheese" but "egg" does not match "eggplant".
+        """
+        pattern = word_pattern(needle)
+        return [name for name in self.matching_names(needle) if pattern.search(name)]
+
+    def search(self, needle: str) -> Set[int]:
+        """Recipe IDs with any ingredient containing the (normalized) needle."""
+        names = self.matching_names(needle)
+        if len(names) == 1:
+            return set(self._postings[names[0]])
+        ids: Set[int] = set()
+        for name in names:
+            ids |= self._postings[name]
+        return ids
+
+    @staticmethod
+    def _all_grams(name: str) -> Set[str]:
+        grams: Set[str] = set()
+        for size in range(1, GRAM_SIZE + 1):
+            grams |= _grams(name, size)
+        return grams
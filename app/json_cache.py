@@ -0,0 +1,96 @@
+import hashlib
+from typing import Dict, Optional, Set, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.models import Recipe
+from app.repository import RecipeRepository
+
+DEFAULT_CACHE_SIZE = 100_000
+JSON_MEDIA_TYPE = "application/json"
+# Clients may keep responses but must revalidate them (cheap with an ETag)
+CACHE_CONTROL = "no-cache"
+
+# pydantic-core's serializer writes JSON bytes directly, without building a
+# dict first as model_dump + json.dumps does
+_to_json = Recipe.__pydantic_serializer__.to_json
+
+
+class RecipeJSONCache:
+    """
+    JSON bytes of served recipes, so an unchanged recipe is serialized once.
+
+    Entries are keyed by recipe ID and remember the Recipe object they were
+    built from; a lookup only hits when the store hands back that same
+    object. Stores replace a recipe object on update instead of modifying
+    it (SQLiteRecipeStore reuses one object per unchanged row), so an
+    updated recipe misses and is re-serialized without explicit
+    invalidation. Once `max_size` entries are held the cache starts over.
+
+    Lookups and inserts are single dict operations, so threadpool workers
+    share the cache without a lock.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: Dict[int, Tuple[Recipe, bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, recipe: Recipe) -> bytes:
+        entry = self._entries.get(recipe.id)
+        if entry is not None and entry[0] is recipe:
+            return entry[1]
+        body = _to_json(recipe)
+        if len(self._entries) >= self.max_size:
+            self._entries = {}
+        self._entries[recipe.id] = (recipe, body)
+        return body
+
+    def render(self, recipe: Recipe, fields: Optional[Set[str]] = None) -> bytes:
+        """Full recipes come from the cache; `fields=` projections are serialized per call."""
+        if fields is None:
+            return self.get(recipe)
+        return _to_json(recipe, include=fields)
+
+
+recipe_json_cache = RecipeJSONCache()
+
+
+# ==================== CONDITIONAL REQUESTS ====================
+def catalog_etag(store: RecipeRepository) -> str:
+    """ETag for responses derived from the whole catalog; changes on every write."""
+    return f'"{store.catalog_version()}"'
+
+
+def content_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match names `etag` (weak comparison, as for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def recipe_json_response(recipe: Recipe, request: Request) -> Response:
+    """A single recipe from the JSON cache, or 304 if the client's copy is current."""
+    body = recipe_json_cache.get(recipe)
+    etag = content_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(body, media_type=JSON_MEDIA_TYPE, headers=cache_headers(etag))
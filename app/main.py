@@ -1,20 +1,48 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
 from typing import List, Optional
+import asyncio
+import json
+import logging
 import os
 from pathlib import Path
 
-from app.models import Recipe, RecipeResponse, AIResponse, SearchFilters
+from app.models import (
+    Recipe, RecipeResponse, AIResponse, AIBatchRequest, SearchFilters, PantryQuery, PantryMatch, BulkImportReport,
+    FuzzyMatch, FacetedSearchResponse, SimilarRecipe
+)
+from app.bulk import LineBatcher, RecipeImporter, aiter_lines, export_chunks
+from app.pagination import ListParams, recipe_list_response
+from app.json_cache import catalog_etag, etag_matches, not_modified, recipe_json_response
+from app.store import normalize
 from app.recipes import recipes_db
-from app.ai_helper import get_ai_recipe_suggestion
+from app import ai_helper
+from app.generation import GenerationProfile
+from app.ai_helper import (
+    get_ai_recipe_suggestion, stream_ai_recipe_suggestion, suggestion_cache, close_ai_clients,
+    find_local_recipe, format_local_suggestion, structure_suggestion, generation_profile
+)
+from app.fuzzy_index import DEFAULT_MIN_SCORE
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, http_request_duration, registry
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled AI provider connections
+    await close_ai_clients()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Smart Recipe Explorer API",
     description="A FastAPI-based recipe management application with AI-powered recipe suggestions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -26,6 +54,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency covers every other middleware
+app.add_middleware(MetricsMiddleware, histogram=http_request_duration)
+
 # Serve static files
 static_dir = Path(__file__).parent.parent / "static"
 if static_dir.exists():
@@ -43,145 +74,389 @@ def serve_ui():
 
 # ==================== RECIPE ENDPOINTS ====================
 @app.get("/api/recipes", response_model=List[RecipeResponse])
-def get_all_recipes():
-    """Get all recipes from the database."""
-    return recipes_db
+def get_all_recipes(request: Request, page: ListParams = Depends()):
+    """Get all recipes from the database, optionally paginated and projected."""
+    # Taken before the read, so a write racing with it only costs a refetch
+    etag = catalog_etag(recipes_db)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    results = recipes_db.iter_search(after_id=page.after_id, limit=page.fetch_limit)
+    return recipe_list_response(results, page, etag=etag)
+
+@app.post("/api/recipes/bulk", response_model=BulkImportReport)
+async def bulk_import_recipes(request: Request,
+                              format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+                              keep_ids: bool = False,
+                              batch_size: int = Query(1000, ge=1, le=10000)):
+    """
+    Import recipes from an NDJSON or CSV request body.
+
+    The body is read as a stream and stored batch by batch; invalid rows are
+    skipped and reported instead of failing the whole import.
+    """
+    importer = RecipeImporter(recipes_db, format, keep_ids=keep_ids)
+    batcher = LineBatcher(batch_size)
+    async for line in aiter_lines(request.stream()):
+        batch = batcher.push(line)
+        if batch:
+            await run_in_threadpool(importer.feed, batch)
+    await run_in_threadpool(importer.feed, batcher.flush())
+    return importer.report()
+
+@app.get("/api/recipes/export")
+def export_recipes(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every recipe as NDJSON or CSV (the bulk import formats)."""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_chunks(recipes_db.iter_all(), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="recipes.{format}"'},
+    )
 
 @app.get("/api/recipes/{recipe_id}", response_model=RecipeResponse)
-def get_recipe(recipe_id: int):
+def get_recipe(recipe_id: int, request: Request):
     """Get a specific recipe by ID."""
-    recipe = next((r for r in recipes_db if r.id == recipe_id), None)
+    recipe = recipes_db.get(recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
-    return recipe
+    return recipe_json_response(recipe, request)
 
 @app.post("/api/recipes", response_model=RecipeResponse, status_code=201)
 def add_recipe(recipe: Recipe):
     """Add a new recipe to the database."""
-    # Generate new ID
-    new_id = max([r.id for r in recipes_db], default=0) + 1
-    recipe.id = new_id
-    recipes_db.append(recipe)
-    return recipe
+    # The store assigns the next free ID
+    recipe.id = None
+    return recipes_db.add(recipe)
 
 @app.put("/api/recipes/{recipe_id}", response_model=RecipeResponse)
 def update_recipe(recipe_id: int, recipe: Recipe):
     """Update an existing recipe."""
-    index = next((i for i, r in enumerate(recipes_db) if r.id == recipe_id), None)
-    if index is None:
+    updated = recipes_db.update(recipe_id, recipe)
+    if updated is None:
         raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
-    
-    recipe.id = recipe_id
-    recipes_db[index] = recipe
-    return recipe
+    return updated
 
 @app.delete("/api/recipes/{recipe_id}")
 def delete_recipe(recipe_id: int):
     """Delete a recipe by ID."""
-    global recipes_db
-    if not any(r.id == recipe_id for r in recipes_db):
+    if recipes_db.delete(recipe_id) is None:
         raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
-    
-    recipes_db = [r for r in recipes_db if r.id != recipe_id]
     return {"message": f"Recipe with ID {recipe_id} deleted successfully"}
 
 # ==================== SEARCH & FILTERING ENDPOINTS ====================
 @app.get("/api/recipes/search/by-cuisine", response_model=List[RecipeResponse])
-def search_by_cuisine(cuisine: str = Query(..., min_length=1)):
+def search_by_cuisine(request: Request, cuisine: str = Query(..., min_length=1),
+                      page: ListParams = Depends()):
     """Search recipes by cuisine type."""
-    results = [r for r in recipes_db if r.cuisine.lower() == cuisine.lower()]
-    if not results:
-        raise HTTPException(status_code=404, detail=f"No recipes found for cuisine: {cuisine}")
-    return results
+    etag = catalog_etag(recipes_db)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    results = recipes_db.iter_search(cuisine=cuisine, after_id=page.after_id, limit=page.fetch_limit)
+    return recipe_list_response(results, page, f"No recipes found for cuisine: {cuisine}", etag)
 
 @app.get("/api/recipes/search/by-ingredient", response_model=List[RecipeResponse])
-def search_by_ingredient(ingredient: str = Query(..., min_length=1)):
+def search_by_ingredient(request: Request, ingredient: str = Query(..., min_length=1),
+                         page: ListParams = Depends()):
     """Search recipes by ingredient."""
-    results = [
-        r for r in recipes_db 
-        if any(ingredient.lower() in ing.lower() for ing in r.ingredients)
-    ]
-    if not results:
-        raise HTTPException(status_code=404, detail=f"No recipes found with ingredient: {ingredient}")
-    return results
+    etag = catalog_etag(recipes_db)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    results = recipes_db.iter_search(ingredient=ingredient, after_id=page.after_id, limit=page.fetch_limit)
+    return recipe_list_response(results, page, f"No recipes found with ingredient: {ingredient}", etag)
 
 @app.get("/api/recipes/search/by-time", response_model=List[RecipeResponse])
-def search_by_time(max_prep_time: Optional[int] = None, max_cook_time: Optional[int] = None):
+def search_by_time(request: Request, max_prep_time: Optional[int] = None,
+                   max_cook_time: Optional[int] = None, page: ListParams = Depends()):
     """Search recipes by preparation and cooking time."""
-    results = recipes_db
-    
-    if max_prep_time is not None:
-        results = [r for r in results if r.prep_time and r.prep_time <= max_prep_time]
-    
-    if max_cook_time is not None:
-        results = [r for r in results if r.cook_time and r.cook_time <= max_cook_time]
+    etag = catalog_etag(recipes_db)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    results = recipes_db.iter_search(max_prep_time=max_prep_time, max_cook_time=max_cook_time,
+                                     after_id=page.after_id, limit=page.fetch_limit)
+    return recipe_list_response(results, page, "No recipes match the specified time criteria", etag)
+
+@app.post("/api/recipes/advanced-search", response_model=List[RecipeResponse],
+          responses={200: {"model": FacetedSearchResponse, "description": "With facets=true"}})
+def advanced_search(filters: SearchFilters, page: ListParams = Depends(), facets: bool = False):
+    """
+    Advanced search with multiple filters and sorting.
+
+    With facets=true the response is an object holding the total number of
+    matches, per-cuisine and per-time-bucket counts, and the page of recipes.
+    """
+    if facets and page.ndjson:
+        raise HTTPException(status_code=422, detail="facets=true is not available with format=ndjson")
+    try:
+        recipes, result = recipes_db.faceted_search(filters, page.after_id, page.fetch_limit, facets)
+    except KeyError:
+        raise HTTPException(status_code=400, detail="The cursor recipe no longer exists; start again from the first page")
+    if not facets:
+        return recipe_list_response(iter(recipes), page, "No recipes match the search criteria")
     
-    if not results:
-        raise HTTPException(status_code=404, detail="No recipes match the specified time criteria")
+    headers = {}
+    if page.limit is not None and len(recipes) > page.limit:
+        recipes.pop()
+        headers["X-Next-Cursor"] = str(recipes[-1].id)
+    body = FacetedSearchResponse(
+        total=result.total,
+        facets=result.facets,
+        recipes=[recipe.model_dump(include=page.fields) for recipe in recipes]
+    )
+    return JSONResponse(body.model_dump(), headers=headers)
+
+@app.get("/api/recipes/search/cache")
+def search_cache_stats():
+    """Hit rate, size and invalidation counters of the search result cache."""
+    return recipes_db.query_cache.stats()
+
+@app.get("/api/recipes/search/fuzzy", response_model=List[FuzzyMatch])
+def search_fuzzy(q: str = Query(..., min_length=1, max_length=200),
+                 limit: int = Query(10, ge=1, le=100),
+                 min_score: float = Query(DEFAULT_MIN_SCORE, ge=0, le=1)):
+    """Typo-tolerant search over recipe names and ingredients, best match first."""
+    matches = recipes_db.fuzzy_search(q, limit, min_score)
+    if not matches:
+        raise HTTPException(status_code=404, detail=f"No recipes match: {q}")
+    return [
+        FuzzyMatch(
+            recipe=recipe.model_dump(),
+            score=round(hit.score, 4),
+            matched_field=hit.field,
+            matched_text=hit.text,
+            coverage=round(hit.coverage, 4)
+        )
+        for recipe, hit in matches
+    ]
+
+@app.post("/api/recipes/what-can-i-cook", response_model=List[PantryMatch])
+def what_can_i_cook(query: PantryQuery):
+    """Rank recipes by how many of their ingredients are in the given pantry."""
+    matches, matched_names = recipes_db.pantry_matches(query.ingredients, query.limit)
+    if not matches:
+        raise HTTPException(status_code=404, detail="No recipes use any of the given ingredients")
     
+    results = []
+    for recipe, hit in matches:
+        have = [ing for ing in recipe.ingredients if normalize(ing) in matched_names]
+        need = [ing for ing in recipe.ingredients if normalize(ing) not in matched_names]
+        results.append(PantryMatch(
+            recipe=recipe.model_dump(),
+            matched=hit.matched,
+            missing=hit.total - hit.matched,
+            score=round(hit.score, 4),
+            matched_ingredients=have,
+            missing_ingredients=need
+        ))
     return results
 
-@app.post("/api/recipes/advanced-search", response_model=List[RecipeResponse])
-def advanced_search(filters: SearchFilters):
-    """Advanced search with multiple filters."""
-    results = recipes_db
+@app.get("/api/recipes/{recipe_id}/similar", response_model=List[SimilarRecipe])
+def similar_recipes(recipe_id: int, limit: int = Query(10, ge=1, le=100)):
+    """Recipes most like a stored one, by shared ingredients, cuisine and name words."""
+    matches = recipes_db.similar_recipes(recipe_id, limit)
+    if matches is None:
+        raise HTTPException(status_code=404, detail=f"Recipe with ID {recipe_id} not found")
+    return [SimilarRecipe(recipe=recipe.model_dump(), score=round(hit.score, 4)) for recipe, hit in matches]
+
+@app.post("/api/recipes/similar-to-pantry", response_model=List[SimilarRecipe])
+def similar_to_pantry(query: PantryQuery):
+    """Recipes whose ingredients are most like the given pantry, computed locally without the LLM."""
+    matches = recipes_db.similar_to_pantry(query.ingredients, query.limit)
+    if not matches:
+        raise HTTPException(status_code=404, detail="No recipes resemble the given ingredients")
+    return [SimilarRecipe(recipe=recipe.model_dump(), score=round(hit.score, 4)) for recipe, hit in matches]
+
+# ==================== AI ENDPOINTS ====================
+async def _suggest(ingredient_list: List[str], profile: GenerationProfile) -> AIResponse:
+    # A request naming a stored recipe is answered locally, without an LLM call
+    recipe = await run_in_threadpool(find_local_recipe, recipes_db, ingredient_list)
+    if recipe is not None:
+        return AIResponse(
+            suggestion=format_local_suggestion(recipe),
+            ingredients_used=ingredient_list,
+            source="local",
+            recipe_id=recipe.id,
+            recipe=recipe
+        )
     
-    if filters.cuisine:
-        results = [r for r in results if r.cuisine.lower() == filters.cuisine.lower()]
+    result = await get_ai_recipe_suggestion(ingredient_list, profile)
+    if profile.summary:
+        # A summary has no steps to parse or save; the client asks again for the full recipe
+        return AIResponse(suggestion=result["suggestion"], ingredients_used=result["ingredients_used"], summary=True)
+    recipe = await run_in_threadpool(structure_suggestion, recipes_db, ingredient_list, result["suggestion"])
+    return AIResponse(
+        suggestion=result["suggestion"],
+        ingredients_used=result["ingredients_used"],
+        recipe_id=recipe.id if recipe is not None else None,
+        recipe=recipe
+    )
+
+@app.get("/api/ai/suggest", response_model=AIResponse)
+async def ai_suggest(ingredients: str = Query(..., min_length=1), summary: bool = Query(False)):
+    """
+    Get AI-powered recipe suggestion based on ingredients.
     
-    if filters.ingredient:
-        results = [
-            r for r in results 
-            if any(filters.ingredient.lower() in ing.lower() for ing in r.ingredients)
-        ]
+    With summary=true the answer is a short overview (name, timings, main
+    ingredients, two sentences), which costs a fraction of the tokens.
+    """
+    ingredient_list = [ing.strip() for ing in ingredients.split(",")]
+    return await _suggest(ingredient_list, generation_profile("suggest", summary))
+
+@app.get("/api/ai/suggest/stream")
+async def ai_suggest_stream(ingredients: str = Query(..., min_length=1), summary: bool = Query(False)):
+    """
+    Stream an AI recipe suggestion as Server-Sent Events.
     
-    if filters.prep_time_max:
-        results = [r for r in results if r.prep_time and r.prep_time <= filters.prep_time_max]
+    Each chunk is sent as a `data: {"token": "..."}` message, followed by an
+    `event: done` message. If the client disconnects, Starlette cancels the
+    generator, which closes the upstream stream so no more tokens are billed.
+    A stored recipe matching the request by name is sent as a single chunk.
+    If the generated recipe is saved (AI_SAVE_RECIPES), `done` carries its
+    `recipe_id`. With summary=true a short overview is streamed instead and
+    never saved.
+    """
+    ingredient_list = [ing.strip() for ing in ingredients.split(",")]
+    profile = generation_profile("stream", summary)
+    recipe = await run_in_threadpool(find_local_recipe, recipes_db, ingredient_list)
     
-    if not results:
-        raise HTTPException(status_code=404, detail="No recipes match the search criteria")
+    async def local_events():
+        yield f"data: {json.dumps({'token': format_local_suggestion(recipe)})}\n\n"
+        done = {'ingredients_used': ingredient_list, 'source': 'local', 'recipe_id': recipe.id}
+        yield f"event: done\ndata: {json.dumps(done)}\n\n"
     
-    return results
-
-# ==================== AI ENDPOINTS ====================
-@app.get("/api/ai/suggest", response_model=AIResponse)
-def ai_suggest(ingredients: str = Query(..., min_length=1)):
-    """Get AI-powered recipe suggestion based on ingredients."""
-    ingredient_list = [ing.strip() for ing in ingredients.split(",")]
-    result = get_ai_recipe_suggestion(ingredient_list)
-    return AIResponse(
-        suggestion=result["suggestion"],
-        ingredients_used=result["ingredients_used"]
+    async def events():
+        stream = stream_ai_recipe_suggestion(ingredient_list, profile)
+        parts = []
+        try:
+            async for token in stream:
+                parts.append(token)
+                yield f"data: {json.dumps({'token': token})}\n\n"
+            done = {'ingredients_used': ingredient_list}
+            if profile.summary:
+                done['summary'] = True
+            else:
+                generated = await run_in_threadpool(structure_suggestion, recipes_db, ingredient_list, "".join(parts))
+                if generated is not None and generated.id is not None:
+                    done['recipe_id'] = generated.id
+            yield f"event: done\ndata: {json.dumps(done)}\n\n"
+        except Exception:
+            logger.exception("AI stream interrupted")
+            yield f"event: error\ndata: {json.dumps({'detail': 'AI stream interrupted'})}\n\n"
+        finally:
+            await stream.aclose()
+    
+    return StreamingResponse(
+        events() if recipe is None else local_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 @app.post("/api/ai/suggest", response_model=AIResponse)
-def ai_suggest_post(ingredient_list: List[str]):
+async def ai_suggest_post(ingredient_list: List[str], summary: bool = Query(False)):
     """Get AI-powered recipe suggestion (POST endpoint)."""
     if not ingredient_list:
         raise HTTPException(status_code=400, detail="At least one ingredient is required")
     
-    result = get_ai_recipe_suggestion(ingredient_list)
-    return AIResponse(
-        suggestion=result["suggestion"],
-        ingredients_used=result["ingredients_used"]
-    )
+    return await _suggest(ingredient_list, generation_profile("suggest", summary))
 
-# ==================== STATS ENDPOINT ====================
-@app.get("/api/stats")
-def get_stats():
-    """Get statistics about the recipe database."""
-    cuisines = list(set(r.cuisine for r in recipes_db))
-    all_ingredients = []
-    for r in recipes_db:
-        all_ingredients.extend(r.ingredients)
+@app.post("/api/ai/suggest/batch", response_model=List[AIResponse])
+async def ai_suggest_batch(batch: AIBatchRequest):
+    """
+    Get AI recipe suggestions for many ingredient lists, in request order.
+    
+    Identical lists share one upstream call, and uncached lists go through
+    the micro-batcher, which bounds parallel provider calls and waits for
+    room in the provider rate budgets instead of hitting 429s.
+    """
+    if any(not ingredient_list for ingredient_list in batch.requests):
+        raise HTTPException(status_code=400, detail="Every request needs at least one ingredient")
     
+    profile = generation_profile("batch", batch.summary)
+    return await asyncio.gather(*(_suggest(ingredient_list, profile) for ingredient_list in batch.requests))
+
+@app.get("/api/ai/cache")
+def ai_cache_stats():
+    """Get hit/miss/coalesce counters for the AI suggestion cache."""
+    return suggestion_cache.stats()
+
+@app.get("/api/ai/providers")
+def ai_provider_stats():
+    """Get routing, hedging, breaker, rate budget and micro-batcher state for the AI providers."""
     return {
-        "total_recipes": len(recipes_db),
-        "cuisines": cuisines,
-        "total_unique_ingredients": len(set(all_ingredients)),
-        "avg_prep_time": sum(r.prep_time or 0 for r in recipes_db) / len(recipes_db) if recipes_db else 0
+        **ai_helper.provider_router.metrics(),
+        "budgets": {budget.name: budget.stats() for budget in (ai_helper.groq_budget, ai_helper.hf_budget)},
+        "batcher": ai_helper.suggestion_batcher.stats(),
     }
 
+# ==================== STATS ENDPOINT ====================
+@app.get("/api/stats")
+def get_stats(top: int = Query(10, ge=1, le=100)):
+    """Get statistics about the recipe database (maintained incrementally by the store)."""
+    return recipes_db.stats_summary(top_n=top)
+
+# ==================== METRICS ====================
+# Gauges read at scrape time; module globals are looked up on each scrape so
+# they follow a swapped store or cache
+def _cache_counters(stats_keys: dict):
+    def collect():
+        stats = ai_helper.suggestion_cache.stats()
+        return [((label,), stats[key]) for label, key in stats_keys.items()]
+    return collect
+
+registry.collected(
+    "recipes_stored", "Number of recipes in the store.", "gauge",
+    lambda: [((), len(recipes_db))]
+)
+registry.collected(
+    "ai_cache_entries", "Number of suggestions held in the AI suggestion cache.", "gauge",
+    lambda: [((), ai_helper.suggestion_cache.stats()["size"])]
+)
+registry.collected(
+    "ai_cache_lookups_total", "AI suggestion cache lookups by result.", "counter",
+    _cache_counters({"hit": "hits", "miss": "misses", "coalesced": "coalesced"}), ("result",)
+)
+registry.collected(
+    "ai_cache_removals_total", "AI suggestion cache entries dropped, by reason.", "counter",
+    _cache_counters({"evicted": "evictions", "expired": "expirations"}), ("reason",)
+)
+registry.collected(
+    "search_cache_entries", "Number of search results held in the search result cache.", "gauge",
+    lambda: [((), len(recipes_db.query_cache))]
+)
+registry.collected(
+    "search_cache_lookups_total", "Search result cache lookups by result.", "counter",
+    lambda: [((label,), recipes_db.query_cache.counters[key]) for label, key in (("hit", "hits"), ("miss", "misses"))],
+    ("result",)
+)
+registry.collected(
+    "search_cache_removals_total",
+    "Search result cache entries dropped, by reason (invalidated by a write or evicted as least recently used).",
+    "counter",
+    lambda: [((label,), recipes_db.query_cache.counters[key])
+             for label, key in (("invalidated", "invalidated"), ("evicted", "evictions"))],
+    ("reason",)
+)
+registry.collected(
+    "search_cache_flushes_total", "Times the whole search result cache was dropped (bulk loads, rebuilds).",
+    "counter", lambda: [((), recipes_db.query_cache.counters["flushes"])]
+)
+registry.collected(
+    "llm_circuit_breaker_open", "1 while a provider's circuit breaker is open or half-open.", "gauge",
+    lambda: [((p.name,), int(p.breaker.state != "closed")) for p in ai_helper.provider_router.providers],
+    ("provider",)
+)
+registry.collected(
+    "llm_rate_budget_total", "Provider rate budget reservations by result.", "counter",
+    lambda: [((budget.name, result), budget.counters[result])
+             for budget in (ai_helper.groq_budget, ai_helper.hf_budget)
+             for result in ("granted", "waited", "rejected", "provider_throttled")],
+    ("provider", "result")
+)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # ==================== HEALTH CHECK ====================
 @app.get("/api/health")
 def health_check():
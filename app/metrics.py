@@ -0,0 +1,343 @@
+"""
+Prometheus-style metrics: counters, histograms and scrape-time gauges.
+
+Recording never takes a lock. Each metric child keeps one shard of counts
+per thread (the event loop thread and each threadpool worker), so an
+increment only touches memory no other thread writes; a scrape sums the
+shards. A thread's shard is registered under a lock once, on its first
+observation.
+
+Exposition follows the Prometheus text format (version 0.0.4), so the
+/metrics endpoint can be scraped directly.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+# Route label for requests no route matched (404s, static files)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Seconds; spans cached/local answers (sub-millisecond) to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Sharded:
+    """A fixed-size list of numbers with one private copy per recording thread."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def shard(self) -> List[float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = [0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] if shards else [0] * self._size
+
+
+class CounterChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self.shard()[0] += amount
+
+    def value(self) -> float:
+        return self.totals()[0]
+
+
+class HistogramChild(_Sharded):
+    """Per-bucket counts plus sum and count; the last bucket is +Inf."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        super().__init__(len(buckets) + 3)
+        self._buckets = buckets
+
+    def observe(self, value: float) -> None:
+        shard = self.shard()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Cumulative bucket counts (ending with +Inf), sum and count."""
+        totals = self.totals()
+        cumulative, running = [], 0
+        for count in totals[:-2]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """The child for these label values, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _items(self) -> List[Tuple[LabelValues, object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for values, child in self._items():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(child.value())}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterator[str]:
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        for values, child in self._items():
+            cumulative, total, count = child.snapshot()
+            for bound, running in zip(bounds, cumulative):
+                labels = _labels(self.labelnames + ("le",), values + (bound,))
+                yield f"{self.name}_bucket{labels} {_number(running)}"
+            labels = _labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_number(total)}"
+            yield f"{self.name}_count{labels} {_number(count)}"
+
+
+class Collected(_Metric):
+    """A gauge or counter whose samples are read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, kind: str,
+                 collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+                 labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._collect = collect
+
+    def _samples(self) -> Iterator[str]:
+        for values, value in self._collect():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(value)}"
+
+
+class Registry:
+    """Holds metrics in registration order and renders them for a scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collected(self, name: str, documentation: str, kind: str,
+                  collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+                  labelnames: Iterable[str] = ()) -> Collected:
+        return self.register(Collected(name, documentation, kind, collect, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(list(metric.render()))
+            except Exception:
+                # One broken collector must not hide every other metric
+                logger.exception("Metrics collection error in %s", metric.name)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording a latency histogram per route template.
+
+    The route is the matched path template (e.g. /api/recipes/{recipe_id}),
+    so label cardinality stays bounded; unmatched paths share one label.
+    Latency runs until the response body is fully sent, so streamed
+    responses count their whole stream.
+    """
+
+    def __init__(self, app, histogram: Histogram):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self.histogram.labels(scope["method"], path, str(status)).observe(
+                time.perf_counter() - started)
+
+
+def _labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# ==================== APPLICATION METRICS ====================
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code.",
+    ("method", "route", "status"),
+)
+
+llm_request_duration = registry.histogram(
+    "llm_request_duration_seconds",
+    "Upstream LLM call latency by provider and outcome (success, error, timeout, cancelled).",
+    ("provider", "outcome"),
+)
+
+llm_tokens = registry.counter(
+    "llm_tokens_total",
+    "Tokens reported by upstream LLM providers, by provider and kind (prompt or completion).",
+    ("provider", "kind"),
+)
+
+llm_request_tokens = registry.histogram(
+    "llm_request_tokens",
+    "Tokens per upstream LLM request, by provider, generation profile and kind (prompt or completion).",
+    ("provider", "profile", "kind"),
+    buckets=(25, 50, 100, 200, 400, 700, 1000, 1500, 2500),
+)
+
+llm_truncated = registry.counter(
+    "llm_truncated_total",
+    "Upstream LLM completions cut off at the profile's max_tokens, by provider and profile.",
+    ("provider", "profile"),
+)
+
+llm_errors = registry.counter(
+    "llm_errors_total",
+    "Failed upstream LLM calls by provider and reason.",
+    ("provider", "reason"),
+)
+
+snapshot_index_rebuilds = registry.counter(
+    "snapshot_index_rebuilds_total",
+    "Snapshots whose saved indexes were rebuilt instead of loaded, by reason "
+    "(error: loading them failed; unusable: written by other index classes).",
+    ("reason",),
+)
+
+
+def observe_llm_call(provider: str, outcome: str, seconds: float) -> None:
+    """Record one upstream call; non-success outcomes also count as errors."""
+    llm_request_duration.labels(provider, outcome).observe(seconds)
+    if outcome not in ("success", "cancelled"):
+        llm_errors.labels(provider, outcome).inc()
+
+
+def count_tokens(provider: str, usage: Optional[object], profile: Optional[str] = None,
+                 finish_reason: Optional[str] = None) -> None:
+    """
+    Add the prompt/completion token counts from a provider usage object, if any.
+
+    With a generation profile name, also record the request's token usage
+    per profile, and whether the completion hit its max_tokens cap.
+    """
+    if profile is not None and finish_reason == "length":
+        llm_truncated.labels(provider, profile).inc()
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            llm_tokens.labels(provider, kind).inc(tokens)
+            if profile is not None:
+                llm_request_tokens.labels(provider, profile, kind).observe(tokens)
@@ -1,5 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+# Largest servings and times (and recipe IDs) the stores hold: they are kept in 32-bit columns
+MAX_INT32 = 2**31 - 1
 
 class Recipe(BaseModel):
     id: Optional[int] = None
@@ -7,9 +10,9 @@ class Recipe(BaseModel):
     ingredients: List[str] = Field(..., min_items=1)
     instructions: str = Field(..., min_length=10)
     cuisine: str = Field(..., min_length=1)
-    servings: Optional[int] = 4
-    prep_time: Optional[int] = None  # in minutes
-    cook_time: Optional[int] = None  # in minutes
+    servings: Optional[int] = Field(4, ge=0, le=MAX_INT32)
+    prep_time: Optional[int] = Field(None, ge=0, le=MAX_INT32)  # in minutes
+    cook_time: Optional[int] = Field(None, ge=0, le=MAX_INT32)  # in minutes
 
     class Config:
         json_schema_extra = {
@@ -30,8 +33,67 @@ class RecipeResponse(Recipe):
 class AIResponse(BaseModel):
     suggestion: str
     ingredients_used: List[str]
+    source: str = "ai"  # "local" when a stored recipe answered the request
+    recipe_id: Optional[int] = None
+    recipe: Optional[Recipe] = None  # structured form, when the suggestion parses as a recipe
+    summary: bool = False  # a short overview was asked for instead of the full recipe
+
+class AIBatchRequest(BaseModel):
+    # Each item is one ingredient list (or dish name), as for POST /api/ai/suggest
+    requests: List[List[str]] = Field(..., min_items=1, max_items=100)
+    summary: bool = False  # short overviews instead of full recipes
 
 class SearchFilters(BaseModel):
     cuisine: Optional[str] = None
+    cuisines: List[str] = []  # any of these
     ingredient: Optional[str] = None
+    include_ingredients: List[str] = []  # every term must match an ingredient
+    exclude_ingredients: List[str] = []  # no term may match an ingredient
+    prep_time_min: Optional[int] = None
     prep_time_max: Optional[int] = None
+    cook_time_min: Optional[int] = None
+    cook_time_max: Optional[int] = None
+    servings_min: Optional[int] = None
+    servings_max: Optional[int] = None
+    # "id", "prep_time", "cook_time", "total_time" or "servings"; "-" for descending
+    sort: str = Field("id", pattern="^-?(id|prep_time|cook_time|total_time|servings)$")
+
+class FacetedSearchResponse(BaseModel):
+    total: int
+    facets: Dict[str, Dict[str, int]]
+    recipes: List[dict]
+
+class PantryQuery(BaseModel):
+    ingredients: List[str] = Field(..., min_items=1)
+    limit: int = Field(10, ge=1, le=100)
+
+class PantryMatch(BaseModel):
+    recipe: RecipeResponse
+    matched: int
+    missing: int
+    score: float
+    matched_ingredients: List[str]
+    missing_ingredients: List[str]
+
+class FuzzyMatch(BaseModel):
+    recipe: RecipeResponse
+    score: float
+    matched_field: str  # "name" or "ingredient"
+    matched_text: str
+    coverage: float
+
+class SimilarRecipe(BaseModel):
+    recipe: RecipeResponse
+    score: float  # cosine similarity, 0 to 1
+
+class BulkRowError(BaseModel):
+    row: int
+    error: str
+
+class BulkImportReport(BaseModel):
+    imported: int
+    failed: int
+    first_id: Optional[int] = None
+    last_id: Optional[int] = None
+    errors: List[BulkRowError]
+    errors_truncated: bool = False
@@ -0,0 +1,127 @@
+from itertools import chain, islice
+from typing import Iterator, List, Optional, Set
+
+from fastapi import HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+
+from app.json_cache import JSON_MEDIA_TYPE, cache_headers, recipe_json_cache
+from app.models import Recipe, RecipeResponse
+
+RECIPE_FIELDS = tuple(RecipeResponse.model_fields)
+MAX_PAGE_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CHUNK_RECIPES = 500
+
+
+class ListParams:
+    """
+    Query parameters shared by every endpoint that returns a recipe list.
+
+    - limit: page size; without it the whole result is streamed
+    - cursor: return recipes with an ID greater than this (keyset pagination;
+      pass the X-Next-Cursor header of the previous page)
+    - fields: comma-separated fields to include, e.g. "name,cuisine"; the ID
+      is always included
+    - format: "json" for a JSON array, "ndjson" for one recipe per line
+    """
+
+    def __init__(self,
+                 limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                 cursor: Optional[int] = Query(None, ge=0),
+                 fields: Optional[str] = Query(None, examples=["name,cuisine,prep_time"]),
+                 format: str = Query("json", pattern="^(json|ndjson)$")):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = parse_fields(fields)
+        self.ndjson = format == "ndjson"
+
+    @property
+    def after_id(self) -> int:
+        return self.cursor or 0
+
+    @property
+    def fetch_limit(self) -> Optional[int]:
+        # One extra recipe tells whether another page follows
+        return None if self.limit is None else self.limit + 1
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """Parse a `fields=` projection, rejecting unknown field names with a 422."""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(RECIPE_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                   f"Available: {', '.join(RECIPE_FIELDS)}"
+        )
+    return requested | {"id"}
+
+
+def recipe_list_response(results: Iterator[Recipe], params: ListParams,
+                         not_found: Optional[str] = None, etag: Optional[str] = None) -> Response:
+    """
+    Serialize recipes as a JSON array or NDJSON from cached per-recipe bytes.
+
+    A page (`limit` set) is assembled into one body; without a limit,
+    recipes are pulled from the store and written out a chunk at a time so
+    only one chunk is ever held in memory. When more results follow the
+    page, the ID to resume from is sent in the X-Next-Cursor header. An
+    `etag` is sent with the response for conditional GETs. `not_found`
+    turns an empty first page into a 404, as the search endpoints did
+    before pagination.
+    """
+    headers = cache_headers(etag) if etag else {}
+    media_type = NDJSON_MEDIA_TYPE if params.ndjson else JSON_MEDIA_TYPE
+    if params.limit is not None:
+        page = list(islice(results, params.limit + 1))
+        if len(page) > params.limit:
+            page.pop()
+            headers["X-Next-Cursor"] = str(page[-1].id)
+        if not page:
+            _check_found(not_found, params)
+        rendered = [recipe_json_cache.render(recipe, params.fields) for recipe in page]
+        if params.ndjson:
+            body = b"".join(line + b"\n" for line in rendered)
+        else:
+            body = b"[" + b",".join(rendered) + b"]"
+        return Response(body, media_type=media_type, headers=headers)
+
+    first = next(results, None)
+    if first is None:
+        _check_found(not_found, params)
+    recipes = chain([first], results) if first is not None else iter(())
+    if params.ndjson:
+        body = ndjson_chunks(recipes, params.fields)
+    else:
+        body = _json_array(recipes, params.fields)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+def _check_found(not_found: Optional[str], params: ListParams) -> None:
+    if not_found and params.cursor is None:
+        raise HTTPException(status_code=404, detail=not_found)
+
+
+def _json_array(recipes: Iterator[Recipe], fields: Optional[Set[str]]) -> Iterator[bytes]:
+    yield b"["
+    for i, chunk in enumerate(_chunks(recipes, fields)):
+        yield (b"," if i else b"") + b",".join(chunk)
+    yield b"]"
+
+
+def ndjson_chunks(recipes: Iterator[Recipe], fields: Optional[Set[str]]) -> Iterator[bytes]:
+    for chunk in _chunks(recipes, fields):
+        yield b"\n".join(chunk) + b"\n"
+
+
+def _chunks(recipes: Iterator[Recipe], fields: Optional[Set[str]]) -> Iterator[List[bytes]]:
+    # Starlette hops to a worker thread for every chunk of a sync generator,
+    # so render a batch of recipes per chunk rather than one at a time
+    while True:
+        chunk = [recipe_json_cache.render(r, fields) for r in islice(recipes, CHUNK_RECIPES)]
+        if not chunk:
+            return
+        yield chunk
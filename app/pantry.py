@@ -0,0 +1,137 @@
+from typing import Dict, Iterable, List, NamedTuple
+
+import numpy as np
+
+_MIN_CAPACITY = 1024
+
+
+class PantryHit(NamedTuple):
+    recipe_id: int
+    matched: int
+    total: int
+    score: float
+
+
+def pantry_score(matched: int, total: int, pantry_size: int) -> float:
+    """Jaccard overlap of a pantry and a recipe, capped so it never exceeds 1."""
+    return matched / max(total + pantry_size - matched, total)
+
+
+class PantryIndex:
+    """
+    Column-oriented recipe x ingredient incidence matrix for pantry ranking.
+
+    Every recipe occupies a row; every distinct (normalized) ingredient is a
+    column holding the rows that use it. A pantry query concatenates the
+    columns of the matched ingredients and counts rows with np.bincount, so
+    the cost is proportional to the postings touched rather than to the
+    number of recipes times ingredients. Column arrays are cached and only
+    rebuilt after the column changes.
+
+    Removing a recipe just zeroes its row; dead rows are compacted away once
+    they outnumber the live ones.
+    """
+
+    def __init__(self):
+        self._row_of: Dict[int, int] = {}
+        self._row_ids = np.zeros(_MIN_CAPACITY, dtype=np.int64)
+        self._row_sizes = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._rows = 0
+        self._dead = 0
+        self._columns: Dict[str, List[int]] = {}
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def add(self, recipe_id: int, names: Iterable[str]) -> None:
+        """Add (or replace) a recipe's set of normalized ingredient names."""
+        if recipe_id in self._row_of:
+            self.remove(recipe_id)
+
+        names = set(names)
+        row = self._rows
+        if row == len(self._row_ids):
+            self._grow()
+        self._rows += 1
+        self._row_of[recipe_id] = row
+        self._row_ids[row] = recipe_id
+        self._row_sizes[row] = len(names)
+
+        for name in names:
+            self._columns.setdefault(name, []).append(row)
+            self._arrays.pop(name, None)
+
+    def remove(self, recipe_id: int) -> None:
+        row = self._row_of.pop(recipe_id, None)
+        if row is None:
+            return
+        self._row_sizes[row] = 0
+        self._dead += 1
+        if self._dead > _MIN_CAPACITY and self._dead * 2 > self._rows:
+            self._compact()
+
+    def top_k(self, names: Iterable[str], pantry_size: int, k: int) -> List[PantryHit]:
+        """
+        Rank recipes by overlap with a pantry.
+
+        `names` are the recipe ingredient names matched by the pantry. The
+        score is the Jaccard similarity matched / (recipe size + unmatched
+        pantry items), capped so it never exceeds 1. Ties favour recipes with
+        fewer missing ingredients, then lower IDs.
+        """
+        arrays = [self._column(name) for name in set(names) if name in self._columns]
+        if not arrays or k <= 0:
+            return []
+
+        counts = np.bincount(np.concatenate(arrays), minlength=self._rows)
+        sizes = self._row_sizes[:self._rows].astype(np.int64)
+        denominators = np.maximum(sizes + pantry_size - counts, sizes)
+        # Dense scoring is cheaper than gathering nonzero rows first; dead
+        # rows (size 0) keep a score of 0
+        scores = np.divide(counts, denominators, out=np.zeros(self._rows), where=sizes > 0)
+
+        # Keep everything tied with the k-th score so tie-breaks are exact
+        cutoff = np.partition(scores, self._rows - k)[self._rows - k] if k < self._rows else 0.0
+        rows = np.flatnonzero(scores >= cutoff) if cutoff > 0 else np.flatnonzero(scores)
+        matched, sizes, scores = counts[rows], sizes[rows], scores[rows]
+
+        ids = self._row_ids[rows]
+        order = np.lexsort((ids, sizes - matched, -scores))[:k]
+        return [
+            PantryHit(int(ids[i]), int(matched[i]), int(sizes[i]), float(scores[i]))
+            for i in order
+        ]
+
+    # ==================== INTERNALS ====================
+    def _column(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = np.array(self._columns[name], dtype=np.int64)
+        return array
+
+    def _grow(self) -> None:
+        capacity = max(_MIN_CAPACITY, len(self._row_ids) * 2)
+        self._row_ids = np.resize(self._row_ids, capacity)
+        self._row_sizes = np.resize(self._row_sizes, capacity)
+
+    def _compact(self) -> None:
+        alive = self._row_sizes[:self._rows] > 0
+        new_row = np.cumsum(alive) - 1
+
+        columns: Dict[str, List[int]] = {}
+        for name, rows in self._columns.items():
+            array = np.array(rows, dtype=np.int64)
+            array = new_row[array[alive[array]]]
+            if len(array):
+                columns[name] = array.tolist()
+
+        live = np.flatnonzero(alive)
+        self._rows = len(live)
+        self._row_ids[:self._rows] = self._row_ids[live]
+        self._row_sizes[:self._rows] = self._row_sizes[live]
+        self._row_sizes[self._rows:] = 0
+        self._row_of = {int(rid): row for row, rid in enumerate(self._row_ids[:self._rows])}
+        self._columns = columns
+        self._arrays = {}
+        self._dead = 0
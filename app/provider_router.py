@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+# Called with the ingredients plus any extra arguments given to the router
+ProviderCall = Callable[..., Awaitable[Optional[dict]]]
+# Same arguments; waits for room in our own rate budget, False if none came
+ProviderAdmit = Callable[..., Awaitable[bool]]
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker over a rolling window of recent calls.
+
+    The breaker opens when at least `min_calls` calls are in the window and
+    the share of failed or slow calls reaches `failure_rate`. After
+    `open_seconds` it goes half-open and lets a single probe through: a good
+    probe closes the breaker, a bad one opens it again.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, failure_rate: float = 0.5,
+                 open_seconds: float = 30.0, slow_call_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._latencies: Deque[float] = deque(maxlen=window * 5)
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may be sent to the provider right now."""
+        if self.state == OPEN:
+            if self._clock() - self._opened_at < self.open_seconds:
+                return False
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: Optional[float] = None) -> None:
+        """Record a good call; latency (if given) feeds the hedge delay and slow-call check."""
+        slow = False
+        if latency is not None:
+            self._latencies.append(latency)
+            slow = self.slow_call_seconds is not None and latency >= self.slow_call_seconds
+        self._record(not slow)
+
+    def record_failure(self) -> None:
+        self._record(False)
+
+    def release(self) -> None:
+        """Forget a call that was cancelled before it finished (e.g. a hedge loser)."""
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _record(self, ok: bool) -> None:
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            if ok:
+                self.state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+
+        self._outcomes.append(ok)
+        if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                and self.error_rate() >= self.failure_rate):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = self._clock()
+        self.times_opened += 1
+
+
+class Provider:
+    """
+    An upstream LLM provider: a name, an async call, and whether it is configured.
+
+    `admit`, if given, is awaited before the call to wait for room in our
+    own rate budget. The wait is not the provider's latency and a refusal is
+    not the provider's failure, so neither reaches the breaker or the hedge
+    timer; a refused provider is counted as throttled and skipped.
+    """
+
+    def __init__(self, name: str, call: ProviderCall,
+                 enabled: Callable[[], bool] = lambda: True,
+                 breaker: Optional[CircuitBreaker] = None,
+                 admit: Optional[ProviderAdmit] = None):
+        self.name = name
+        self.call = call
+        self.enabled = enabled
+        self.breaker = breaker or CircuitBreaker()
+        self.admit = admit
+        self.counters: Dict[str, int] = {
+            "calls": 0, "successes": 0, "failures": 0, "cancelled": 0, "rejected": 0,
+            "throttled": 0,
+        }
+
+
+class ProviderRouter:
+    """
+    Route suggestion requests across providers in priority order.
+
+    The first available provider gets the request. If it has not answered
+    after the hedge delay (its observed p`hedge_percentile` latency, clamped
+    to [min_hedge_delay, max_hedge_delay], or `default_hedge_delay` before
+    any latency is known), the next provider is fired as well; the first
+    good answer wins and the others are cancelled. A provider that fails
+    outright, or that its own rate budget turns away, is replaced by the
+    next one immediately. Providers whose circuit breaker is open are
+    skipped. The hedge delay and latencies are counted from the moment a
+    provider is admitted, not from when it started waiting for its budget.
+    """
+
+    def __init__(self, providers: List[Provider], hedge_percentile: float = 0.95,
+                 default_hedge_delay: float = 2.0, min_hedge_delay: float = 0.05,
+                 max_hedge_delay: float = 10.0):
+        self.providers = providers
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.counters: Dict[str, int] = {
+            "requests": 0, "primary_wins": 0, "hedge_wins": 0, "fallback_wins": 0,
+            "hedges_fired": 0, "fallbacks": 0, "all_failed": 0, "no_provider_available": 0,
+        }
+
+    def provider(self, name: str) -> Provider:
+        return next(p for p in self.providers if p.name == name)
+
+    def hedge_delay(self, provider: Provider) -> float:
+        observed = provider.breaker.latency_percentile(self.hedge_percentile)
+        if observed is None:
+            return self.default_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, observed))
+
+    async def call_one(self, name: str, ingredients: List[str], *args: Any) -> Optional[dict]:
+        """Call a single provider through its circuit breaker, without hedging."""
+        provider = self.provider(name)
+        if not provider.enabled() or not provider.breaker.allow():
+            provider.counters["rejected"] += 1
+            return None
+        if provider.admit is not None:
+            try:
+                admitted = await provider.admit(ingredients, *args)
+            except BaseException:
+                provider.breaker.release()
+                raise
+            if not admitted:
+                provider.breaker.release()
+                provider.counters["throttled"] += 1
+                return None
+        provider.counters["calls"] += 1
+        started = time.monotonic()
+        task = asyncio.ensure_future(provider.call(ingredients, *args))
+        try:
+            await asyncio.wait([task])
+        finally:
+            if not task.done():
+                task.cancel()
+                task.add_done_callback(_discard_outcome)
+                provider.breaker.release()
+                provider.counters["cancelled"] += 1
+        result = _task_result(provider, task)
+        if result:
+            provider.breaker.record_success(time.monotonic() - started)
+            provider.counters["successes"] += 1
+        else:
+            provider.breaker.record_failure()
+            provider.counters["failures"] += 1
+        return result
+
+    async def complete(self, ingredients: List[str], *args: Any) -> Optional[dict]:
+        """Get a suggestion from the fastest healthy provider, or None."""
+        self.counters["requests"] += 1
+        queue = [p for p in self.providers if p.enabled()]
+        # Start time of each call; None while it is still waiting to be admitted
+        running: Dict["asyncio.Task", Tuple[Provider, Optional[float], str]] = {}
+
+        def start(provider: Provider, role: str) -> None:
+            provider.counters["calls"] += 1
+            task = asyncio.ensure_future(provider.call(ingredients, *args))
+            running[task] = (provider, time.monotonic(), role)
+
+        def launch(role: str) -> bool:
+            while queue:
+                provider = queue.pop(0)
+                if provider.breaker.allow():
+                    if provider.admit is None:
+                        start(provider, role)
+                    else:
+                        task = asyncio.ensure_future(provider.admit(ingredients, *args))
+                        running[task] = (provider, None, role)
+                    return True
+                provider.counters["rejected"] += 1
+            return False
+
+        if not launch("primary"):
+            self.counters["no_provider_available"] += 1
+            return None
+
+        try:
+            while running:
+                timeout = None
+                current, started, _ = next(iter(running.values()))
+                if queue and len(running) == 1 and started is not None:
+                    timeout = max(0.0, self.hedge_delay(current) - (time.monotonic() - started))
+                done, _ = await asyncio.wait(running, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if launch("hedge"):
+                        self.counters["hedges_fired"] += 1
+                    continue
+
+                for task in done:
+                    provider, started, role = running.pop(task)
+                    result = _task_result(provider, task)
+                    if started is None:
+                        if result:
+                            start(provider, role)
+                        else:
+                            provider.breaker.release()
+                            provider.counters["throttled"] += 1
+                        continue
+                    if result:
+                        provider.breaker.record_success(time.monotonic() - started)
+                        provider.counters["successes"] += 1
+                        self.counters[f"{role}_wins"] += 1
+                        return result
+                    provider.breaker.record_failure()
+                    provider.counters["failures"] += 1
+
+                if not running and launch("fallback"):
+                    self.counters["fallbacks"] += 1
+
+            self.counters["all_failed"] += 1
+            return None
+        finally:
+            # Cancel losers (or everything, if the caller itself was cancelled)
+            for task, (provider, _, _) in running.items():
+                task.cancel()
+                task.add_done_callback(_discard_outcome)
+                provider.breaker.release()
+                provider.counters["cancelled"] += 1
+
+    def metrics(self) -> dict:
+        return {
+            "routing": dict(self.counters),
+            "providers": {
+                p.name: {
+                    "enabled": p.enabled(),
+                    "breaker_state": p.breaker.state,
+                    "breaker_times_opened": p.breaker.times_opened,
+                    "error_rate": round(p.breaker.error_rate(), 3),
+                    "latency_p50_seconds": p.breaker.latency_percentile(0.5),
+                    "latency_p95_seconds": p.breaker.latency_percentile(0.95),
+                    "hedge_delay_seconds": round(self.hedge_delay(p), 3),
+                    **p.counters,
+                }
+                for p in self.providers
+            },
+        }
+
+
+def _task_result(provider: Provider, task: "asyncio.Task") -> Optional[dict]:
+    if task.cancelled():
+        return None
+    error = task.exception()
+    if error is not None:
+        logger.warning("%s provider error: %s", provider.name, error)
+        return None
+    return task.result()
+
+
+def _discard_outcome(task: "asyncio.Task") -> None:
+    # Retrieve the exception of an abandoned task so asyncio does not warn
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,233 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Set
+
+from app.models import Recipe, SearchFilters
+
+DEFAULT_QUERY_CACHE_SIZE = 1024
+# Recipe IDs held across all entries; a few MB at most
+DEFAULT_QUERY_CACHE_IDS = 1_000_000
+
+
+class QueryScope(NamedTuple):
+    """Which recipes a cached result depends on."""
+    cuisines: Optional[FrozenSet[str]]  # case-folded; None when a recipe of any cuisine can affect it
+    matches: Callable[[Recipe], bool]   # False only for recipes that cannot affect it
+
+
+class QueryCache:
+    """
+    Bounded LRU of search results, invalidated by the recipes a write touches.
+
+    Stores call `invalidate` with the old and the new version of every
+    recipe they add, update or delete. It drops only the entries whose scope
+    the recipe falls in: entries restricted to some cuisines are filed under
+    them and only looked at when a recipe of one of those cuisines changes,
+    and each candidate's predicate (the query's own filters) decides whether
+    the recipe could be in its result. Bulk loads and index rebuilds call
+    `clear` instead.
+
+    Every invalidation bumps `generation`. A query reads it before computing
+    its result and hands it to `put`, which drops the result if a write came
+    in between, so a result computed from the catalog before a write is
+    never stored after that write's invalidation ran.
+
+    At most `max_size` entries holding `max_ids` recipe IDs in total are
+    kept; the least recently used go first. Threadpool workers share the
+    cache under one lock.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_QUERY_CACHE_SIZE,
+                 max_ids: int = DEFAULT_QUERY_CACHE_IDS):
+        self.max_size = max_size
+        self.max_ids = max_ids
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, scope, cost)
+        self._by_cuisine: Dict[str, Set[Hashable]] = {}
+        self._any_cuisine: Set[Hashable] = set()
+        self._ids = 0
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "hits": 0, "misses": 0, "stored": 0, "discarded": 0, "invalidated": 0, "evictions": 0,
+            "flushes": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, scope: QueryScope, generation: int, cost: int) -> None:
+        """Store a result computed at `generation`; `cost` is the number of recipe IDs it holds."""
+        if self.max_size <= 0 or cost > self.max_ids:
+            return
+        with self._lock:
+            if generation != self.generation:
+                self.counters["discarded"] += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, scope, cost)
+            self._ids += cost
+            if scope.cuisines is None:
+                self._any_cuisine.add(key)
+            else:
+                for cuisine in scope.cuisines:
+                    self._by_cuisine.setdefault(cuisine, set()).add(key)
+            self.counters["stored"] += 1
+            while len(self._entries) > self.max_size or self._ids > self.max_ids:
+                self._drop(next(iter(self._entries)))
+                self.counters["evictions"] += 1
+
+    def invalidate(self, recipe: Recipe) -> None:
+        """Drop the entries whose result could change when `recipe` is added or removed."""
+        with self._lock:
+            self.generation += 1
+            candidates = list(self._any_cuisine)
+            candidates.extend(self._by_cuisine.get(recipe.cuisine.casefold(), ()))
+            for key in candidates:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1].matches(recipe):
+                    self._drop(key)
+                    self.counters["invalidated"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._by_cuisine.clear()
+            self._any_cuisine.clear()
+            self._ids = 0
+            self.counters["flushes"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ids": self._ids,
+                "max_ids": self.max_ids,
+                "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+                **self.counters,
+            }
+
+    def _drop(self, key: Hashable) -> None:
+        _, scope, cost = self._entries.pop(key)
+        self._ids -= cost
+        if scope.cuisines is None:
+            self._any_cuisine.discard(key)
+            return
+        for cuisine in scope.cuisines:
+            keys = self._by_cuisine.get(cuisine)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_cuisine[cuisine]
+
+
+# ==================== KEYS AND SCOPES ====================
+# Keys are built from case-folded parameters, so queries differing only in
+# case or filter order share an entry. Predicates mirror the filters of
+# RecipeRepository.iter_search and FacetIndex.search, and may only err
+# towards matching.
+
+def search_key(cuisine: Optional[str], ingredient: Optional[str], max_prep_time: Optional[int],
+               max_cook_time: Optional[int], after_id: int, limit: Optional[int]) -> tuple:
+    return ("search", _fold(cuisine), _fold(ingredient), max_prep_time, max_cook_time, after_id, limit)
+
+
+def search_scope(cuisine: Optional[str], ingredient: Optional[str], max_prep_time: Optional[int],
+                 max_cook_time: Optional[int]) -> QueryScope:
+    checks = []
+    if ingredient is not None:
+        checks.append(_has_term(ingredient.casefold()))
+    if max_prep_time is not None:
+        checks.append(lambda r: _time_in(r.prep_time, None, max_prep_time))
+    if max_cook_time is not None:
+        checks.append(lambda r: _time_in(r.cook_time, None, max_cook_time))
+    cuisines = None if cuisine is None else frozenset([cuisine.casefold()])
+    return QueryScope(cuisines, _all(checks))
+
+
+def filters_key(filters: SearchFilters, after_id: int, limit: Optional[int], with_facets: bool) -> tuple:
+    return (
+        "filters", _fold(filters.cuisine), frozenset(map(str.casefold, filters.cuisines)),
+        _fold(filters.ingredient), frozenset(map(str.casefold, filters.include_ingredients)),
+        frozenset(map(str.casefold, filters.exclude_ingredients)),
+        filters.prep_time_min, filters.prep_time_max or None,
+        filters.cook_time_min, filters.cook_time_max or None,
+        filters.servings_min, filters.servings_max, filters.sort, after_id, limit, with_facets,
+    )
+
+
+def filters_scope(filters: SearchFilters, after_id: int, with_facets: bool) -> QueryScope:
+    """
+    Scope of an advanced search. Facet counts leave out the facet's own
+    filter, so with facets only the servings and ingredient filters narrow it.
+    """
+    checks = []
+    if filters.servings_min is not None or filters.servings_max is not None:
+        checks.append(lambda r: _servings_in(r.servings, filters.servings_min, filters.servings_max))
+    terms = list(filters.include_ingredients) + ([filters.ingredient] if filters.ingredient else [])
+    checks.extend(_has_term(term.casefold()) for term in terms)
+    checks.extend(_lacks_term(term.casefold()) for term in filters.exclude_ingredients)
+    cuisines = None
+    if not with_facets:
+        prep = (filters.prep_time_min, filters.prep_time_max or None)
+        cook = (filters.cook_time_min, filters.cook_time_max or None)
+        if prep != (None, None):
+            checks.append(lambda r: _time_in(r.prep_time, *prep))
+        if cook != (None, None):
+            checks.append(lambda r: _time_in(r.cook_time, *cook))
+        wanted = list(filters.cuisines) + ([filters.cuisine] if filters.cuisine else [])
+        if wanted:
+            cuisines = frozenset(c.casefold() for c in wanted)
+    matches = _all(checks)
+    if after_id and filters.sort.lstrip("-") != "id":
+        # The cursor recipe's sort value is where the page starts
+        return QueryScope(cuisines, lambda r: r.id == after_id or matches(r))
+    return QueryScope(cuisines, matches)
+
+
+def _fold(text: Optional[str]) -> Optional[str]:
+    return None if text is None else text.casefold()
+
+
+def _all(checks: List[Callable[[Recipe], bool]]) -> Callable[[Recipe], bool]:
+    if not checks:
+        return lambda recipe: True
+    if len(checks) == 1:
+        return checks[0]
+    return lambda recipe: all(check(recipe) for check in checks)
+
+
+def _names(recipe: Recipe) -> Iterable[str]:
+    return (ingredient.casefold() for ingredient in recipe.ingredients)
+
+
+def _has_term(term: str) -> Callable[[Recipe], bool]:
+    return lambda recipe: any(term in name for name in _names(recipe))
+
+
+def _lacks_term(term: str) -> Callable[[Recipe], bool]:
+    return lambda recipe: not any(term in name for name in _names(recipe))
+
+
+def _time_in(minutes: Optional[int], low: Optional[int], high: Optional[int]) -> bool:
+    # Time filters exclude recipes with a missing or zero time
+    return bool(minutes) and (low is None or minutes >= low) and (high is None or minutes <= high)
+
+
+def _servings_in(servings: Optional[int], low: Optional[int], high: Optional[int]) -> bool:
+    # As in FacetIndex, missing servings count as -1
+    value = -1 if servings is None else servings
+    return (low is None or value >= low) and (high is None or 0 <= value <= high)
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class RateBudgetExhausted(RuntimeError):
+    """A call was turned away by our own rate budget before reaching the provider."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` units per minute.
+
+    The bucket holds at most `capacity` units (one minute's worth unless
+    given), so an idle provider can absorb a burst up to that size. A rate
+    of 0 disables the limit.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.per_minute = per_minute
+        self.capacity = capacity if capacity is not None else per_minute
+        self._clock = clock
+        self._available = self.capacity
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def available(self) -> float:
+        self._refill()
+        return self._available
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        if self.unlimited:
+            return 0.0
+        amount = min(amount, self.capacity)
+        missing = amount - self.available()
+        return max(0.0, missing * 60.0 / self.per_minute)
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self._available -= min(amount, self.capacity)
+
+    def give_back(self, amount: float) -> None:
+        """Return units reserved but not used (e.g. an overestimated token count)."""
+        if not self.unlimited:
+            self._refill()
+            self._available = min(self.capacity, self._available + amount)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the provider answered 429 anyway."""
+        self._refill()
+        self._available = min(self._available, 0.0)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        if not self.unlimited:
+            self._available = min(self.capacity, self._available + elapsed * self.per_minute / 60.0)
+
+
+class ProviderBudget:
+    """
+    Requests-per-minute and tokens-per-minute budgets for one LLM provider.
+
+    A call reserves one request and its estimated tokens before it is sent,
+    waiting for both buckets to have room rather than letting the provider
+    reject it with a 429. The estimate is settled against the usage the
+    provider reports afterwards. Only touched from the event loop.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.counters = {"granted": 0, "waited": 0, "rejected": 0, "provider_throttled": 0}
+
+    async def acquire(self, tokens: int, max_wait: float) -> bool:
+        """
+        Reserve one request and `tokens` tokens, waiting up to `max_wait`
+        seconds for room. Returns False if the budget cannot be met in time.
+        """
+        deadline = time.monotonic() + max_wait
+        waited = False
+        while True:
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait == 0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                self.counters["granted"] += 1
+                self.counters["waited"] += waited
+                return True
+            if time.monotonic() + wait > deadline:
+                self.counters["rejected"] += 1
+                return False
+            waited = True
+            await asyncio.sleep(wait)
+
+    def settle(self, reserved: int, used: Optional[int]) -> None:
+        """Give back tokens reserved beyond what the call actually used."""
+        if used is not None and used < reserved:
+            self.tokens.give_back(reserved - used)
+
+    def throttled(self) -> None:
+        """The provider rejected a call for rate limiting; stop sending until the budget refills."""
+        self.counters["provider_throttled"] += 1
+        self.requests.drain()
+        self.tokens.drain()
+
+    def stats(self) -> dict:
+        return {
+            "requests_per_minute": self.requests.per_minute,
+            "tokens_per_minute": self.tokens.per_minute,
+            "requests_available": None if self.requests.unlimited else int(self.requests.available()),
+            "tokens_available": None if self.tokens.unlimited else int(self.tokens.available()),
+            **self.counters,
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting: about four characters per token."""
+    return len(text) // 4 + 1
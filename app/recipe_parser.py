@@ -0,0 +1,241 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.models import MAX_INT32, Recipe
+
+# Cuisine used when the text does not name one (Recipe requires a cuisine)
+UNKNOWN_CUISINE = "International"
+
+# Field labels in the layout the Groq prompt asks for, plus common drift
+_FIELD_LABELS = {
+    "name": ("recipe name", "recipe", "name", "dish", "dish name", "title"),
+    "cuisine": ("cuisine", "cuisine type", "type of cuisine", "origin"),
+    "prep_time": ("prep time", "preparation time", "prep"),
+    "cook_time": ("cook time", "cooking time", "cook"),
+    "total_time": ("total time",),
+    "servings": ("servings", "serves", "yield", "portions", "serving size"),
+}
+_SECTION_LABELS = {
+    "ingredients": ("ingredients", "ingredient list", "what you need", "you will need"),
+    "instructions": ("instructions", "directions", "method", "steps", "preparation", "procedure",
+                     "how to make it", "cooking instructions"),
+    # Anything after these is commentary, not part of the recipe
+    "end": ("tips", "tip", "notes", "note", "variations", "serving suggestions", "nutrition",
+            "nutritional information", "enjoy", "chef's tips", "storage"),
+}
+_LABEL_FIELDS = {label: field for field, labels in {**_FIELD_LABELS, **_SECTION_LABELS}.items()
+                 for label in labels}
+
+# "**Prep Time:** 15 min", "Prep Time - 15 min", "### Ingredients", "INSTRUCTIONS:"
+_LABEL_RE = re.compile(
+    r"^\s*(?:#{1,6}\s*)?[*_]*\s*(?:\d+[.)]\s*)?([A-Za-z' ]{2,40}?)\s*[*_]*\s*(?:[:\-–]\s*[*_]*|$)\s*(.*)$"
+)
+_SERVES_RE = re.compile(r"^\W*(?:serves|makes)\s+(\d.*)$", re.IGNORECASE)
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s+(.+?)\s*#*\s*$")
+_BOLD_LINE_RE = re.compile(r"^\s*(?:\*\*|__)(.+?)(?:\*\*|__)\s*$")
+_BULLET_RE = re.compile(r"^\s*(?:\*\*|__)?\s*(?:[-*•·▪+]|\d+\s*[.)]|step\s*\d+\s*[:.)-]?|[a-z]\))\s*", re.IGNORECASE)
+_NUMBERED_RE = re.compile(r"^\s*(?:\*\*|__)?\s*(?:\d+\s*[.)]|step\s*\d+\s*[:.)-]?)\s*", re.IGNORECASE)
+_FIELD_SEPARATOR_RE = re.compile(r"\s+\|\s+")
+_MARKUP_RE = re.compile(r"[*_`]+")
+
+_HOURS_RE = re.compile(r"(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*(?:hours?|hrs?|h)\b", re.IGNORECASE)
+_MINUTES_RE = re.compile(r"(\d+)(?:\s*(?:-|–|to)\s*(\d+))?\s*(?:minutes?|mins?|m)\b", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"\d+")
+
+# Leading amounts and units stripped from ingredient lines: "2 1/2 cups", "½ tsp", "1-2 large"
+_AMOUNT_RE = re.compile(r"^(?:about|approx\.?|a|an|few|a few|some|pinch of|handful of|"
+                        r"[\d½⅓⅔¼¾⅛/.,\s\-–]+(?:to\s+[\d½⅓⅔¼¾⅛/.]+)?)\s+", re.IGNORECASE)
+_UNITS = (
+    "cups?", "c", "tablespoons?", "tbsps?", "tbs", "tbl", "teaspoons?", "tsps?", "grams?", "g", "gm",
+    "kilograms?", "kgs?", "milliliters?", "millilitres?", "ml", "liters?", "litres?", "l", "ounces?",
+    "oz", "pounds?", "lbs?", "pinch(?:es)?", "dash(?:es)?", "cloves?", "cans?", "tins?", "packets?",
+    "packages?", "pieces?", "pcs", "slices?", "sprigs?", "bunch(?:es)?", "stalks?", "sticks?",
+    "inch(?:es)?", "handfuls?", "heads?", "drops?", "bottles?", "jars?",
+)
+_UNIT_RE = re.compile(r"^(?:" + "|".join(_UNITS) + r")\.?\s+(?:of\s+)?", re.IGNORECASE)
+# "500g chicken": the unit is glued to the amount
+_GLUED_AMOUNT_RE = re.compile(r"^[\d.]+(?=(?:g|gm|kg|ml|l|oz|lbs?)\b)", re.IGNORECASE)
+_SIZE_RE = re.compile(r"^(?:small|medium|large|big|fresh|heaping|level|generous|chopped|minced|diced|"
+                      r"sliced|grated)\s+", re.IGNORECASE)
+_PARENTHESES_RE = re.compile(r"\s*\(.*?\)")
+_TRAILING_RE = re.compile(r"\s*(?:,.*|\bto taste\b.*|\bas needed\b.*|\bfor (?:garnish\w*|serving)\b.*|"
+                          r"\boptional\b.*)$", re.IGNORECASE)
+
+
+def parse_recipe(text: str, default_name: Optional[str] = None) -> Optional[Recipe]:
+    """
+    Turn a generated recipe into a Recipe, or None if it does not read as one.
+
+    Expects roughly the layout the Groq prompt asks for (labelled fields,
+    an ingredient list and numbered instructions) but tolerates drift:
+    markdown headings instead of bold labels, missing or reordered fields,
+    chatty preambles, numbered or bulleted ingredients, "Step 1:" style
+    steps, time ranges and hours. Ingredients are reduced to their names
+    ("2 cups basmati rice, rinsed" -> "basmati rice") to match how stored
+    recipes list them. Text after a Tips or Notes section is ignored.
+
+    `default_name` names the recipe when the text does not.
+    """
+    fields: Dict[str, str] = {}
+    sections: Dict[str, List[str]] = {"ingredients": [], "instructions": []}
+    title: Optional[str] = None
+    section: Optional[str] = None
+
+    # "Prep Time - 10 min | Cook Time - 30 min" holds two fields
+    for line in (part.strip() for raw in text.splitlines() for part in _FIELD_SEPARATOR_RE.split(raw)):
+        if not line:
+            continue
+        label, value = _split_label(line)
+        field = _LABEL_FIELDS.get(label) if label else None
+        # A numbered step that happens to start with "Cook: ..." is still a step
+        if field in _FIELD_LABELS and section == "instructions" and _NUMBERED_RE.match(line):
+            field = None
+        if field == "end":
+            if sections["instructions"]:
+                break
+            section = None
+            continue
+        if field in _SECTION_LABELS:
+            section = field
+            if value:
+                sections[section].append(value)
+            continue
+        if field in _FIELD_LABELS and value and field not in fields:
+            fields[field] = value
+            continue
+        if section == "instructions" and line.strip("*_ ").casefold().startswith("enjoy"):
+            break
+        if section is not None:
+            sections[section].append(line)
+        elif title is None:
+            title = _title_candidate(line)
+
+    ingredients = _ingredient_names(sections["ingredients"])
+    instructions = _instructions(sections["instructions"])
+    name = _clean(fields.get("name") or title or default_name or "")[:200]
+    if not name or not ingredients or len(instructions) < 10:
+        return None
+    prep_time = _minutes(fields.get("prep_time"))
+    cook_time = _minutes(fields.get("cook_time"))
+    total_time = _minutes(fields.get("total_time"))
+    if cook_time is None and total_time is not None:
+        cook_time = max(total_time - (prep_time or 0), 0)
+    cuisine = _PARENTHESES_RE.sub("", _clean(fields.get("cuisine", ""))).split(",")[0].strip()
+    return Recipe(
+        name=name,
+        cuisine=cuisine or UNKNOWN_CUISINE,
+        ingredients=ingredients,
+        instructions=instructions,
+        prep_time=_count(prep_time),
+        cook_time=_count(cook_time),
+        servings=_count(_first_number(fields.get("servings"))),
+    )
+
+
+def _count(value: Optional[int]) -> Optional[int]:
+    # A number too large for a recipe field is dropped rather than failing the parse
+    return value if value is None or value <= MAX_INT32 else None
+
+
+def _split_label(line: str) -> Tuple[Optional[str], str]:
+    """("prep time", "15 min") for a labelled line or heading, else (None, "")."""
+    heading = _HEADING_RE.match(line) or _BOLD_LINE_RE.match(line)
+    if heading:
+        text = heading.group(1).strip().rstrip(":").strip("*_ ")
+        if text.casefold() in _LABEL_FIELDS:
+            return text.casefold(), ""
+        if ":" in text:
+            label, _, value = text.partition(":")
+            return label.strip("*_ ").casefold(), value.strip("*_ ")
+        return None, ""
+    serves = _SERVES_RE.match(line)
+    if serves:
+        return "serves", serves.group(1)
+    match = _LABEL_RE.match(line)
+    if not match:
+        return None, ""
+    label = match.group(1).strip().casefold()
+    if label not in _LABEL_FIELDS:
+        return None, ""
+    return label, match.group(2).strip().strip("*_ ")
+
+
+def _title_candidate(line: str) -> Optional[str]:
+    """A line before any section that looks like a dish title rather than chatter."""
+    heading = _HEADING_RE.match(line) or _BOLD_LINE_RE.match(line)
+    text = _clean(heading.group(1) if heading else line)
+    if not text or len(text) > 80 or text[-1] in ".!?:" or ":" in text:
+        return None
+    return text
+
+
+def _ingredient_names(lines: List[str]) -> List[str]:
+    names: List[str] = []
+    for line in lines:
+        # "For the marinade:" group headers and stray sentences are not ingredients
+        if line.rstrip("*_ ").endswith(":"):
+            continue
+        if not _BULLET_RE.match(line) and len(line.split()) > 8:
+            continue
+        name = _ingredient_name(_BULLET_RE.sub("", line, count=1))
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _ingredient_name(text: str) -> str:
+    """Reduce "2 cups basmati rice, rinsed" to "basmati rice"."""
+    text = _PARENTHESES_RE.sub("", _clean(text))
+    text = _TRAILING_RE.sub("", text).strip()
+    for _ in range(3):
+        stripped = _GLUED_AMOUNT_RE.sub("", _AMOUNT_RE.sub("", text))
+        stripped = _SIZE_RE.sub("", _UNIT_RE.sub("", stripped))
+        if stripped == text:
+            break
+        text = stripped.strip()
+    text = re.sub(r"^of\s+", "", text, flags=re.IGNORECASE)
+    return text.strip(" .;-").casefold()
+
+
+def _instructions(lines: List[str]) -> str:
+    """Numbered steps, one per line; unnumbered lines continue the previous step."""
+    steps: List[str] = []
+    for line in lines:
+        text = _clean(_BULLET_RE.sub("", line, count=1))
+        if not text:
+            continue
+        if steps and not _BULLET_RE.match(line) and not text[0].isupper():
+            steps[-1] = f"{steps[-1]} {text}"
+        else:
+            steps.append(text)
+    return "\n".join(f"{number}. {step}" for number, step in enumerate(steps, 1))
+
+
+def _minutes(text: Optional[str]) -> Optional[int]:
+    """Minutes in "15 min", "1 hour 30 minutes", "1.5 hrs" or "20-25 minutes" (upper bound)."""
+    if not text:
+        return None
+    total = 0.0
+    found = False
+    for match in _HOURS_RE.finditer(text):
+        total += float(match.group(2) or match.group(1)) * 60
+        found = True
+    for match in _MINUTES_RE.finditer(text):
+        total += int(match.group(2) or match.group(1))
+        found = True
+    if not found:
+        # A bare number under a time label is minutes
+        number = _first_number(text)
+        return number
+    return int(round(total))
+
+
+def _first_number(text: Optional[str]) -> Optional[int]:
+    if not text:
+        return None
+    match = _NUMBER_RE.search(text)
+    return int(match.group()) if match else None
+
+
+def _clean(text: str) -> str:
+    return " ".join(_MARKUP_RE.sub("", text).split()).strip(" :")
@@ -0,0 +1,275 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.models import Recipe
+
+DEFAULT_OBJECT_CACHE_SIZE = 100_000
+
+# Dead rows are compacted away once there are more than this many and they
+# outnumber the live ones, as in FacetIndex
+_MIN_COMPACT_ROWS = 1024
+
+# Integer column value standing for None. Times and servings are stored as
+# 32-bit ints, which FacetIndex already requires of them
+_NONE = -(1 << 31)
+
+# Column name -> array typecode; the order snapshots store them in
+COLUMNS = {
+    "ids": "q", "servings": "i", "prep_time": "i", "cook_time": "i", "cuisine": "I",
+    "name_len": "I", "text_end": "Q", "ingredients_end": "I", "ingredient_codes": "I", "text": "B",
+}
+
+
+class RecipeTable:
+    """
+    Column-oriented storage for the recipes of an in-memory catalog.
+
+    A recipe is a row of parallel arrays rather than a pydantic object:
+    - servings, prep and cook time as 32-bit ints (_NONE when missing)
+    - the cuisine as a code into a vocabulary of distinct cuisine strings
+    - ingredients as a slice of one flat array of codes into a vocabulary
+      of distinct ingredient strings, so each spelling is held once
+    - name and instructions as UTF-8 in one shared byte buffer
+
+    Recipe objects are built from a row when read. The last
+    `object_cache_size` of them are kept, keyed by row, so repeated reads of
+    an unchanged recipe return the same object and the JSON cache keeps
+    hitting. Rows are only ever appended: an update adds a new row and
+    marks the old one dead, so a row (and any object built from it) never
+    changes. Once dead rows pile up, compacted() copies the live rows into
+    a new table, which the owner swaps in; readers holding the old table
+    still see consistent rows.
+
+    A table can also be opened over existing buffers (a memory-mapped
+    snapshot, see app.snapshot) whose rows are sorted by ID. IDs are then
+    found by binary search over the ID column, and the columns are copied
+    into growable arrays only on the first write.
+
+    Writes must be serialized by the caller; reads need no lock.
+    """
+
+    def __init__(self, object_cache_size: int = DEFAULT_OBJECT_CACHE_SIZE):
+        self.object_cache_size = object_cache_size
+        self._row_of: Dict[int, int] = {}
+        self._ids = array("q")
+        self._servings = array("i")
+        self._prep_time = array("i")
+        self._cook_time = array("i")
+        self._cuisine = array("I")
+        self._name_len = array("I")
+        # End offsets of each row's slice of _text and _ingredient_codes
+        self._text_end = array("Q")
+        self._ingredients_end = array("I")
+        self._text = bytearray()
+        self._ingredient_codes = array("I")
+        self._cuisines: List[str] = []
+        self._cuisine_codes: Dict[str, int] = {}
+        self._ingredients: List[str] = []
+        self._ingredient_vocab: Dict[str, int] = {}
+        self._objects: Dict[int, Recipe] = {}
+        self._mapped = False
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence[int]], cuisines: List[str], ingredients: List[str],
+                     object_cache_size: int = DEFAULT_OBJECT_CACHE_SIZE) -> "RecipeTable":
+        """A read-mostly table over existing buffers whose rows are sorted by ID."""
+        table = cls(object_cache_size)
+        for name in COLUMNS:
+            setattr(table, f"_{name}", columns[name])
+        table._row_of = _SortedRows(columns["ids"])
+        table._cuisines = list(cuisines)
+        table._cuisine_codes = {value: code for code, value in enumerate(cuisines)}
+        table._ingredients = list(ingredients)
+        table._ingredient_vocab = {value: code for code, value in enumerate(ingredients)}
+        table._mapped = True
+        return table
+
+    def columns(self) -> Dict[str, memoryview]:
+        """Every column as a buffer, keyed as in COLUMNS."""
+        return {name: memoryview(getattr(self, f"_{name}")) for name in COLUMNS}
+
+    def vocabularies(self) -> Tuple[List[str], List[str]]:
+        """The distinct cuisines and ingredient names that column codes refer to."""
+        return list(self._cuisines), list(self._ingredients)
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._row_of
+
+    def get(self, recipe_id: int) -> Optional[Recipe]:
+        row = self._row_of.get(recipe_id)
+        if row is None:
+            return None
+        recipe = self._objects.get(row)
+        return recipe if recipe is not None else self._build(row)
+
+    def get_many(self, ids: Iterable[int]) -> List[Recipe]:
+        """Recipes for IDs that are known to exist, in the given order."""
+        row_of, objects, build = self._row_of, self._objects, self._build
+        return [objects.get(row) or build(row) for row in map(row_of.__getitem__, ids)]
+
+    def add(self, recipe: Recipe) -> None:
+        """Store a recipe (its ID must be set), replacing any row with the same ID."""
+        self._append(
+            recipe.id, recipe.servings, recipe.prep_time, recipe.cook_time,
+            _code(self._cuisine_codes, self._cuisines, recipe.cuisine),
+            recipe.name.encode(), recipe.instructions.encode(),
+            [_code(self._ingredient_vocab, self._ingredients, name) for name in recipe.ingredients],
+        )
+
+    def remove(self, recipe_id: int) -> bool:
+        if self._mapped:
+            self._thaw()
+        return self._row_of.pop(recipe_id, None) is not None
+
+    @property
+    def dead_rows(self) -> int:
+        return len(self._ids) - len(self._row_of)
+
+    @property
+    def needs_compaction(self) -> bool:
+        dead = self.dead_rows
+        return dead > _MIN_COMPACT_ROWS and dead > len(self._row_of)
+
+    def compacted(self, ids: Optional[Iterable[int]] = None) -> "RecipeTable":
+        """
+        A copy holding only the live rows, and only the vocabulary they use.
+
+        Rows keep their order unless `ids` lists the recipes to copy, in the
+        order to copy them.
+        """
+        table = RecipeTable(self.object_cache_size)
+        rows = sorted(self._row_of.values()) if ids is None else map(self._row_of.__getitem__, ids)
+        for row in rows:
+            text_start, text_end = self._span(self._text_end, row)
+            name_end = text_start + self._name_len[row]
+            start, end = self._span(self._ingredients_end, row)
+            table._append(
+                self._ids[row], _value(self._servings[row]), _value(self._prep_time[row]),
+                _value(self._cook_time[row]),
+                _code(table._cuisine_codes, table._cuisines, self._cuisines[self._cuisine[row]]),
+                self._text[text_start:name_end], self._text[name_end:text_end],
+                [_code(table._ingredient_vocab, table._ingredients, self._ingredients[c])
+                 for c in self._ingredient_codes[start:end]],
+            )
+        return table
+
+    # ==================== INTERNALS ====================
+    def _append(self, recipe_id: int, servings: Optional[int], prep_time: Optional[int],
+                cook_time: Optional[int], cuisine: int, name: bytes, instructions: bytes,
+                ingredients: List[int]) -> None:
+        if self._mapped:
+            self._thaw()
+        row = len(self._ids)
+        text_size, codes_size = len(self._text), len(self._ingredient_codes)
+        try:
+            self._ids.append(recipe_id)
+            self._servings.append(_stored(servings))
+            self._prep_time.append(_stored(prep_time))
+            self._cook_time.append(_stored(cook_time))
+            self._cuisine.append(cuisine)
+            self._name_len.append(len(name))
+            self._text += name
+            self._text += instructions
+            self._text_end.append(len(self._text))
+            self._ingredient_codes.extend(ingredients)
+            self._ingredients_end.append(len(self._ingredient_codes))
+        except (OverflowError, TypeError, ValueError):
+            # A value that does not fit its column: cut every column back to
+            # `row` rows so later rows stay aligned
+            for column in COLUMNS:
+                if column not in ("text", "ingredient_codes"):
+                    del getattr(self, f"_{column}")[row:]
+            del self._text[text_size:]
+            del self._ingredient_codes[codes_size:]
+            raise
+        # Publish the row last, once every column holds it; this also retires
+        # the previous row of a replaced recipe in one step
+        self._row_of[recipe_id] = row
+
+    def _thaw(self) -> None:
+        # Copy mapped columns into arrays that can grow; rows keep their numbers
+        row_of = {recipe_id: row for row, recipe_id in enumerate(self._ids)}
+        for name, typecode in COLUMNS.items():
+            column = getattr(self, f"_{name}")
+            if typecode == "B":
+                copy = bytearray(column)
+            else:
+                copy = array(typecode)
+                copy.frombytes(memoryview(column).cast("B"))
+            setattr(self, f"_{name}", copy)
+        self._row_of = row_of
+        self._mapped = False
+
+    @staticmethod
+    def _span(ends: array, row: int) -> Tuple[int, int]:
+        return (ends[row - 1] if row else 0), ends[row]
+
+    def _build(self, row: int) -> Recipe:
+        text_start, text_end = self._span(self._text_end, row)
+        name_end = text_start + self._name_len[row]
+        start, end = self._span(self._ingredients_end, row)
+        ingredients = self._ingredients
+        recipe = Recipe.model_construct(
+            id=self._ids[row],
+            name=str(self._text[text_start:name_end], "utf-8"),
+            ingredients=[ingredients[c] for c in self._ingredient_codes[start:end]],
+            instructions=str(self._text[name_end:text_end], "utf-8"),
+            cuisine=self._cuisines[self._cuisine[row]],
+            servings=_value(self._servings[row]),
+            prep_time=_value(self._prep_time[row]),
+            cook_time=_value(self._cook_time[row]),
+        )
+        if len(self._objects) >= self.object_cache_size:
+            self._objects = {}
+        self._objects[row] = recipe
+        return recipe
+
+
+class _SortedRows:
+    """Read-only recipe ID -> row lookup over a sorted ID column (row i holds ids[i])."""
+
+    def __init__(self, ids: Sequence[int]):
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return self.get(recipe_id) is not None
+
+    def __getitem__(self, recipe_id: int) -> int:
+        row = self.get(recipe_id)
+        if row is None:
+            raise KeyError(recipe_id)
+        return row
+
+    def get(self, recipe_id: int, default: Optional[int] = None) -> Optional[int]:
+        row = bisect_left(self._ids, recipe_id)
+        return row if row < len(self._ids) and self._ids[row] == recipe_id else default
+
+    def values(self) -> Iterable[int]:
+        return range(len(self._ids))
+
+
+def _code(codes: Dict[str, int], values: List[str], value: str) -> int:
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(values)
+        values.append(value)
+    return code
+
+
+def _stored(value: Optional[int]) -> int:
+    if value is None:
+        return _NONE
+    if value == _NONE:
+        raise ValueError(f"{value} is reserved for missing values")
+    return value
+
+
+def _value(stored: int) -> Optional[int]:
+    return None if stored == _NONE else stored
@@ -1,6 +1,23 @@
+import logging
+import os
+
+from dotenv import load_dotenv
+
 from app.models import Recipe
+from app.repository import RecipeRepository
+from app.store import RecipeStore
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Storage backend: "memory" (default) or "sqlite" for a persistent WAL database
+RECIPE_STORE = os.getenv("RECIPE_STORE", "memory")
+RECIPE_DB_PATH = os.getenv("RECIPE_DB_PATH", "recipes.db")
+# Memory store only: open this snapshot (app/snapshot.py) instead of loading the seed recipes
+RECIPE_SNAPSHOT_PATH = os.getenv("RECIPE_SNAPSHOT_PATH", "")
 
-recipes_db = [
+seed_recipes = [
     Recipe(
         id=1,
         name="Veg Fried Rice",
@@ -52,3 +69,21 @@ recipes_db = [
         cook_time=30
     )
 ]
+
+
+
+def create_store() -> RecipeRepository:
+    """Build the configured recipe store, from a snapshot or seeded with the sample recipes."""
+    if RECIPE_STORE == "sqlite":
+        from app.sqlite_store import SQLiteRecipeStore
+        return SQLiteRecipeStore(RECIPE_DB_PATH, seed_recipes)
+    if RECIPE_SNAPSHOT_PATH and os.path.exists(RECIPE_SNAPSHOT_PATH):
+        from app.snapshot import open_snapshot
+        try:
+            return open_snapshot(RECIPE_SNAPSHOT_PATH)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not open snapshot %s (%s); loading the seed recipes", RECIPE_SNAPSHOT_PATH, e)
+    return RecipeStore(seed_recipes)
+
+
+recipes_db = create_store()
@@ -0,0 +1,171 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.facets import FacetResult
+from app.fuzzy_index import DEFAULT_MIN_SCORE, FuzzyHit
+from app.models import MAX_INT32, Recipe, SearchFilters
+from app.pantry import PantryHit
+from app.query_cache import QueryCache
+from app.similarity import SimilarHit
+from app.stats import CatalogStats
+
+PantryResult = Tuple[List[Tuple[Recipe, PantryHit]], Set[str]]
+FuzzyResult = List[Tuple[Recipe, FuzzyHit]]
+SimilarResult = List[Tuple[Recipe, SimilarHit]]
+
+
+def check_recipe_id(recipe_id: Optional[int]) -> None:
+    """
+    Reject an explicit recipe ID outside 1..MAX_INT32. Indexes pack IDs into
+    32 bits (see FacetIndex), so stores call this before storing a recipe.
+    """
+    if recipe_id is not None and not 0 < recipe_id <= MAX_INT32:
+        raise ValueError(f"Recipe ID {recipe_id} is outside 1..{MAX_INT32}")
+
+
+class RecipeRepository(ABC):
+    """
+    Storage interface the API handlers run against.
+
+    Implementations: RecipeStore (in-memory, app/store.py) and
+    SQLiteRecipeStore (persistent, app/sqlite_store.py). Query results are
+    ordered by recipe ID. Time filters keep the original semantics: recipes
+    with a missing or zero time are excluded whenever a limit is set.
+
+    Implementations keep `stats`, a FuzzyIndex, a FacetIndex and a
+    SimilarityIndex up to date on every mutation, so catalog statistics,
+    fuzzy search, advanced search and similar-recipe queries never require
+    a scan of the recipes.
+
+    Filtered `iter_search` and `faceted_search` results are served from
+    `query_cache`, which implementations invalidate with every recipe they
+    add, replace or remove.
+    """
+
+    stats: CatalogStats
+    query_cache: QueryCache
+
+    # ==================== PRIMARY KEY ====================
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def get(self, recipe_id: int) -> Optional[Recipe]:
+        """Get a recipe by ID, or None if it does not exist."""
+
+    @abstractmethod
+    def catalog_version(self) -> str:
+        """
+        Opaque token that changes whenever any recipe is added, updated or
+        deleted; list endpoints use it as their ETag.
+        """
+
+    def iter_all(self) -> Iterator[Recipe]:
+        """Iterate over all recipes in ID order without loading them all at once."""
+        return self.iter_search()
+
+    def __iter__(self) -> Iterator[Recipe]:
+        return self.iter_all()
+
+    def all(self) -> List[Recipe]:
+        """Get all recipes in ID order."""
+        return list(self.iter_all())
+
+    # ==================== MUTATIONS ====================
+    @abstractmethod
+    def add(self, recipe: Recipe) -> Recipe:
+        """
+        Add a recipe, assigning a new ID if it has none or its ID is taken.
+        Raises ValueError for an ID outside 1..MAX_INT32.
+        """
+
+    def add_many(self, recipes: Iterable[Recipe]) -> List[Recipe]:
+        """Add recipes in bulk; IDs are assigned as in add()."""
+        return [self.add(recipe) for recipe in recipes]
+
+    @abstractmethod
+    def update(self, recipe_id: int, recipe: Recipe) -> Optional[Recipe]:
+        """Replace an existing recipe. Returns None if the ID does not exist."""
+
+    @abstractmethod
+    def delete(self, recipe_id: int) -> Optional[Recipe]:
+        """Remove a recipe by ID. Returns the removed recipe, or None."""
+
+    # ==================== QUERIES ====================
+    @abstractmethod
+    def iter_search(self, cuisine: Optional[str] = None, ingredient: Optional[str] = None,
+                    max_prep_time: Optional[int] = None, max_cook_time: Optional[int] = None,
+                    after_id: int = 0, limit: Optional[int] = None) -> Iterator[Recipe]:
+        """
+        Lazily yield recipes matching every given filter: case-insensitive
+        cuisine, ingredient substring, and maximum prep/cook time.
+
+        Only recipes with an ID greater than `after_id` are returned, at most
+        `limit` of them, so callers can page through results by keyset
+        without the store materializing the full result.
+        """
+
+    def search(self, cuisine: Optional[str] = None, ingredient: Optional[str] = None,
+               max_prep_time: Optional[int] = None,
+               max_cook_time: Optional[int] = None) -> List[Recipe]:
+        """Get all recipes matching every given filter."""
+        return list(self.iter_search(cuisine, ingredient, max_prep_time, max_cook_time))
+
+    @abstractmethod
+    def pantry_matches(self, pantry: Iterable[str], limit: int) -> PantryResult:
+        """
+        Rank recipes by how well a pantry covers their ingredients.
+
+        Each pantry item matches recipe ingredients that contain it as whole
+        words. Returns the top `limit` (recipe, hit) pairs and the set of
+        normalized ingredient names the pantry matched.
+        """
+
+    @abstractmethod
+    def fuzzy_search(self, query: str, limit: int = 10,
+                     min_score: float = DEFAULT_MIN_SCORE) -> FuzzyResult:
+        """
+        Typo-tolerant search over recipe names and ingredients.
+
+        Returns up to `limit` (recipe, hit) pairs scoring at least
+        `min_score`, best first; see FuzzyIndex for the scoring.
+        """
+
+    @abstractmethod
+    def similar_recipes(self, recipe_id: int, limit: int = 10) -> Optional[SimilarResult]:
+        """
+        Up to `limit` (recipe, hit) pairs most like a stored recipe, best
+        first, by shared ingredients, cuisine and name words; see
+        SimilarityIndex. Returns None if the recipe does not exist.
+        """
+
+    @abstractmethod
+    def similar_to_pantry(self, pantry: Iterable[str], limit: int = 10) -> SimilarResult:
+        """Up to `limit` (recipe, hit) pairs whose ingredients are most like a pantry, best first."""
+
+    @abstractmethod
+    def faceted_search(self, filters: SearchFilters, after_id: int = 0, limit: Optional[int] = None,
+                       with_facets: bool = False) -> Tuple[List[Recipe], FacetResult]:
+        """
+        Advanced search: recipes matching every filter in `filters`, ordered
+        by `filters.sort`, with facet counts when `with_facets` is set.
+
+        Returns the page of recipes and the FacetResult it came from. Raises
+        KeyError when `after_id` names a recipe that no longer exists and the
+        sort is not by ID.
+        """
+
+    def stats_summary(self, top_n: int = 10) -> dict:
+        """The /api/stats payload, read consistently with concurrent mutations."""
+        return self.stats.summary(top_n)
+
+    def by_cuisine(self, cuisine: str) -> List[Recipe]:
+        return self.search(cuisine=cuisine)
+
+    def by_ingredient(self, ingredient: str) -> List[Recipe]:
+        return self.search(ingredient=ingredient)
+
+    def by_time(self, max_prep_time: Optional[int] = None,
+                max_cook_time: Optional[int] = None) -> List[Recipe]:
+        return self.search(max_prep_time=max_prep_time, max_cook_time=max_cook_time)
@@ -0,0 +1,56 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class RWLock:
+    """
+    Readers-writer lock: any number of readers, or a single writer.
+
+    Writers are preferred: once a writer is waiting, new readers queue
+    behind it, so a steady stream of searches cannot starve mutations. A
+    thread that already holds the read lock may take it again (nested
+    queries) without waiting. Upgrading a read lock to a write lock is not
+    supported and would deadlock.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            with self._cond:
+                while self._writer or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._cond:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
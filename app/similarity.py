@@ -0,0 +1,412 @@
+import math
+import re
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+DIMENSIONS = 128
+# Inverted-file lists scanned per query; see benchmarks/bench_similar.py for
+# the recall this buys at each setting
+DEFAULT_PROBES = 32
+
+# Feature weights by source, before IDF weighting. Whole ingredients count
+# most; a shared ingredient word ("cheese" in "parmesan cheese") counts half
+INGREDIENT_WEIGHT = 1.0
+WORD_WEIGHT = 0.5
+CUISINE_WEIGHT = 0.7
+NAME_WEIGHT = 0.4
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_MIN_CAPACITY = 1024
+# Below this many rows every query scans all vectors
+_MIN_CLUSTERED_ROWS = 4096
+# k-means trains on this many sampled rows per list, for this many rounds
+_TRAIN_ROWS_PER_LIST = 64
+_TRAIN_ITERATIONS = 12
+# Rows embedded or assigned per matrix product, to bound temporary memory
+_CHUNK_ROWS = 16384
+
+
+class SimilarHit(NamedTuple):
+    recipe_id: int
+    score: float  # cosine similarity of the two recipe vectors
+
+
+def ingredient_features(ingredients: Iterable[str]) -> Dict[str, float]:
+    """Weighted features of an ingredient list: each whole ingredient and each of its words."""
+    features: Dict[str, float] = {}
+    for ingredient in ingredients:
+        name = ingredient.casefold().strip()
+        if not name:
+            continue
+        features[f"i:{name}"] = INGREDIENT_WEIGHT
+        for word in _WORD_RE.findall(name):
+            features.setdefault(f"w:{word}", WORD_WEIGHT)
+    return features
+
+
+def recipe_features(name: str, cuisine: str, ingredients: Iterable[str]) -> Dict[str, float]:
+    """Weighted features of a recipe: its ingredients, its cuisine and the words of its name."""
+    features = ingredient_features(ingredients)
+    features[f"c:{cuisine.casefold()}"] = CUISINE_WEIGHT
+    for word in _WORD_RE.findall(name.casefold()):
+        features.setdefault(f"n:{word}", NAME_WEIGHT)
+    return features
+
+
+class SimilarityIndex:
+    """
+    Approximate nearest-neighbour search over TF-IDF recipe vectors.
+
+    Every recipe occupies a row holding its features (recipe_features) and
+    a unit vector of `dimensions` floats: each feature's weight times its
+    IDF is added, with a sign, to a dimension picked by a stable hash of the
+    feature (the hashing trick), so vectors need no fitted vocabulary and
+    can be computed one recipe at a time. Similarity is the dot product.
+
+    Queries are exact scans until the index holds _MIN_CLUSTERED_ROWS rows.
+    From then on rows are also grouped into about sqrt(n) inverted-file
+    lists around spherical k-means centroids; a query scores the centroids
+    and scans only the rows of the `probes` nearest lists. Rows are stored
+    in list order, so scanning a list is one matrix-vector product over a
+    slice of the vectors. New rows are appended and tracked in an overflow
+    list per centroid until the next refresh.
+
+    IDF weights and centroids drift as the catalog changes, so once the
+    index has seen as many changes as it had rows at its last refresh, it
+    drops dead rows (removal only clears a row's alive flag), re-embeds
+    every row with current IDF weights and retrains the centroids. Like a
+    growing array this costs O(1) amortized per change.
+
+    With auto_refresh=False the owner runs refreshes instead, so that the
+    expensive part happens outside its lock: once `needs_refresh` is set,
+    begin_refresh() (under the lock) copies the rows and starts logging
+    changes, refresh() runs on the copy without the lock, and
+    end_refresh() (under the lock again) replays the logged changes onto
+    the copy and returns it to be swapped in.
+    """
+
+    def __init__(self, dimensions: int = DIMENSIONS, auto_refresh: bool = True):
+        self.dimensions = dimensions
+        self.auto_refresh = auto_refresh
+        self._row_of: Dict[int, int] = {}
+        self._ids = np.zeros(_MIN_CAPACITY, dtype=np.int64)
+        self._alive = np.zeros(_MIN_CAPACITY, dtype=bool)
+        self._vectors = np.zeros((_MIN_CAPACITY, dimensions), dtype=np.float32)
+        # Each row's features are a slice of one flat array, ending here
+        self._feature_end = np.zeros(_MIN_CAPACITY, dtype=np.int64)
+        self._features = np.zeros(_MIN_CAPACITY * 16, dtype=np.int32)
+        self._weights = np.zeros(_MIN_CAPACITY * 16, dtype=np.float32)
+        self._rows = 0
+        self._dead = 0
+        # Feature -> code, with per-code document frequency and hashed position
+        self._feature_codes: Dict[str, int] = {}
+        self._df = np.zeros(_MIN_CAPACITY, dtype=np.int32)
+        self._buckets = np.zeros(_MIN_CAPACITY, dtype=np.int64)
+        self._signs = np.zeros(_MIN_CAPACITY, dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        # Rows [_list_bounds[i], _list_bounds[i + 1]) form list i; rows added
+        # since the lists were built are in _overflow[i]
+        self._list_bounds = np.zeros(1, dtype=np.int64)
+        self._overflow: List[List[int]] = []
+        self._arrays: Dict[int, np.ndarray] = {}
+        self._changes = 0
+        self._refreshed_rows = 0
+        # Changes since begin_refresh(), as add/remove arguments; None when no refresh is running
+        self._pending: Optional[List[tuple]] = None
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __getstate__(self) -> dict:
+        # A snapshot does not carry a refresh that is still running
+        return dict(self.__dict__, _pending=None)
+
+    @property
+    def needs_refresh(self) -> bool:
+        return self._changes > max(_MIN_CAPACITY, self._refreshed_rows)
+
+    def begin_refresh(self) -> Optional["SimilarityIndex"]:
+        """
+        A copy of the rows and features to refresh, or None if a refresh is
+        already running. Changes from now on are logged for end_refresh().
+        """
+        if self._pending is not None:
+            return None
+        self._pending = []
+        fresh = SimilarityIndex(self.dimensions, self.auto_refresh)
+        fresh._row_of = dict(self._row_of)
+        for name in ("_ids", "_alive", "_feature_end", "_features", "_weights", "_df", "_buckets",
+                     "_signs"):
+            setattr(fresh, name, getattr(self, name).copy())
+        # Rows are re-embedded by the refresh, so their vectors need not be copied
+        fresh._vectors = np.zeros_like(self._vectors)
+        fresh._feature_codes = dict(self._feature_codes)
+        fresh._rows = self._rows
+        fresh._dead = self._dead
+        return fresh
+
+    def refresh(self) -> None:
+        """Drop dead rows and unused features, re-embed every row and rebuild the lists."""
+        self._refresh()
+
+    def end_refresh(self, fresh: "SimilarityIndex") -> "SimilarityIndex":
+        """Replay the changes logged since begin_refresh() onto `fresh` and return it."""
+        pending, self._pending = self._pending or [], None
+        for change in pending:
+            if len(change) == 1:
+                fresh.remove(*change)
+            else:
+                fresh.add(*change)
+        return fresh
+
+    def abandon_refresh(self) -> None:
+        """Stop logging changes for a refresh that will not be ended."""
+        self._pending = None
+
+    def add(self, recipe_id: int, name: str, cuisine: str, ingredients: Iterable[str]) -> None:
+        """Add (or replace) a recipe."""
+        if recipe_id in self._row_of:
+            self.remove(recipe_id)
+        if self._pending is not None:
+            ingredients = list(ingredients)
+            self._pending.append((recipe_id, name, cuisine, ingredients))
+
+        features = recipe_features(name, cuisine, ingredients)
+        codes = np.fromiter(map(self._code, features), dtype=np.int32, count=len(features))
+        weights = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        row = self._rows
+        if row == len(self._ids):
+            self._grow_rows()
+        start = self._span(row)[0]
+        end = start + len(codes)
+        if end > len(self._features):
+            self._grow_features(end)
+        self._features[start:end] = codes
+        self._weights[start:end] = weights
+        self._feature_end[row] = end
+        self._df[codes] += 1
+
+        self._rows += 1
+        self._row_of[recipe_id] = row
+        self._ids[row] = recipe_id
+        self._alive[row] = True
+        vector = self._embed(codes, weights)
+        self._vectors[row] = vector
+        if self._centroids is not None:
+            nearest = int(np.argmax(self._centroids @ vector))
+            self._overflow[nearest].append(row)
+            self._arrays.pop(nearest, None)
+        self._changed()
+
+    def remove(self, recipe_id: int) -> None:
+        if self._pending is not None:
+            self._pending.append((recipe_id,))
+        row = self._row_of.pop(recipe_id, None)
+        if row is None:
+            return
+        start, end = self._span(row)
+        self._df[self._features[start:end]] -= 1
+        self._alive[row] = False
+        self._dead += 1
+        self._changed()
+
+    def similar_to(self, recipe_id: int, k: int, probes: int = DEFAULT_PROBES,
+                   exact: bool = False) -> Optional[List[SimilarHit]]:
+        """
+        The `k` recipes most similar to a stored one, best first, or None
+        if the recipe is not in the index. `exact` scans every row.
+        """
+        row = self._row_of.get(recipe_id)
+        if row is None:
+            return None
+        start, end = self._span(row)
+        vector = self._embed(self._features[start:end], self._weights[start:end])
+        return self._nearest(vector, k, probes, exact, exclude=row)
+
+    def similar_to_ingredients(self, ingredients: Iterable[str], k: int, probes: int = DEFAULT_PROBES,
+                               exact: bool = False) -> List[SimilarHit]:
+        """The `k` recipes most similar to an ingredient list (a pantry), best first."""
+        # Features no recipe has cannot match, so they are left out
+        known = [(self._feature_codes[feature], weight)
+                 for feature, weight in ingredient_features(ingredients).items()
+                 if feature in self._feature_codes and self._df[self._feature_codes[feature]] > 0]
+        if not known:
+            return []
+        codes = np.array([code for code, _ in known], dtype=np.int32)
+        weights = np.array([weight for _, weight in known], dtype=np.float32)
+        return self._nearest(self._embed(codes, weights), k, probes, exact)
+
+    # ==================== INTERNALS ====================
+    def _nearest(self, vector: np.ndarray, k: int, probes: int, exact: bool,
+                 exclude: Optional[int] = None) -> List[SimilarHit]:
+        if k <= 0 or not self._row_of:
+            return []
+        if exact or self._centroids is None or probes >= len(self._centroids):
+            # One product over the whole matrix; dead rows are masked after
+            rows = np.arange(self._rows)
+            scores = self._vectors[:self._rows] @ vector
+            scores[~self._alive[:self._rows]] = 0
+        else:
+            near = np.argpartition(self._centroids @ -vector, probes)[:probes].tolist()
+            bounds = self._list_bounds
+            rows = np.concatenate([np.arange(bounds[i], bounds[i + 1]) for i in near]
+                                  + [self._overflowed(i) for i in near])
+            scores = np.concatenate([self._vectors[bounds[i]:bounds[i + 1]] @ vector for i in near]
+                                    + [self._vectors[self._overflowed(i)] @ vector for i in near])
+            scores[~self._alive[rows]] = 0
+        if exclude is not None:
+            scores[rows == exclude] = 0
+
+        # Keep everything tied with the k-th score so ties go to lower IDs
+        if k < len(scores):
+            cutoff = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = np.flatnonzero((scores >= cutoff) & (scores > 0))
+        else:
+            keep = np.flatnonzero(scores > 0)
+        ids, scores = self._ids[rows[keep]], scores[keep]
+        order = np.lexsort((ids, -scores))[:k]
+        return [SimilarHit(int(ids[i]), float(scores[i])) for i in order]
+
+    def _code(self, feature: str) -> int:
+        code = self._feature_codes.get(feature)
+        if code is None:
+            code = self._feature_codes[feature] = len(self._feature_codes)
+            if code == len(self._df):
+                capacity = len(self._df) * 2
+                self._df = np.resize(self._df, capacity)
+                self._buckets = np.resize(self._buckets, capacity)
+                self._signs = np.resize(self._signs, capacity)
+            # crc32 rather than hash(), which differs between processes and
+            # would break indexes loaded from a snapshot
+            digest = zlib.crc32(feature.encode())
+            self._df[code] = 0
+            self._buckets[code] = digest % self.dimensions
+            self._signs[code] = 1.0 if digest & 0x80000000 else -1.0
+        return code
+
+    def _idf(self, codes: np.ndarray) -> np.ndarray:
+        return np.log((1 + len(self._row_of)) / (1 + self._df[codes])).astype(np.float32) + 1
+
+    def _embed(self, codes: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        values = weights * self._idf(codes) * self._signs[codes]
+        vector = np.bincount(self._buckets[codes], weights=values,
+                             minlength=self.dimensions).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _span(self, row: int):
+        return (int(self._feature_end[row - 1]) if row else 0), int(self._feature_end[row])
+
+    def _overflowed(self, i: int) -> np.ndarray:
+        array = self._arrays.get(i)
+        if array is None:
+            array = self._arrays[i] = np.array(self._overflow[i], dtype=np.int64)
+        return array
+
+    def _grow_rows(self) -> None:
+        capacity = len(self._ids) * 2
+        self._ids = np.resize(self._ids, capacity)
+        self._alive = np.resize(self._alive, capacity)
+        self._feature_end = np.resize(self._feature_end, capacity)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[:len(self._vectors)] = self._vectors
+        self._vectors = vectors
+
+    def _grow_features(self, needed: int) -> None:
+        capacity = max(needed, len(self._features) * 2)
+        self._features = np.resize(self._features, capacity)
+        self._weights = np.resize(self._weights, capacity)
+
+    def _changed(self) -> None:
+        self._changes += 1
+        if self.auto_refresh and self.needs_refresh:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """Drop dead rows and unused features, re-embed every row and rebuild the lists."""
+        # Renumber the features still in use
+        vocabulary = len(self._feature_codes)
+        used = self._df[:vocabulary] > 0
+        new_code = np.cumsum(used) - 1
+        self._feature_codes = {feature: int(new_code[code])
+                               for feature, code in self._feature_codes.items() if used[code]}
+        for name in ("_df", "_buckets", "_signs"):
+            column = getattr(self, name)
+            column[:len(self._feature_codes)] = column[:vocabulary][used]
+        count = int(self._feature_end[self._rows - 1]) if self._rows else 0
+        self._features[:count] = new_code[self._features[:count]]
+
+        self._keep_rows(np.flatnonzero(self._alive[:self._rows]))
+        self._embed_rows()
+        self._build_lists()
+        self._changes = 0
+        self._refreshed_rows = self._rows
+
+    def _keep_rows(self, rows: np.ndarray) -> None:
+        """Rewrite the rows as the given old rows, in that order."""
+        ends = self._feature_end[:self._rows]
+        starts = np.concatenate(([0], ends[:-1]))
+        counts = (ends - starts)[rows]
+        new_ends = np.cumsum(counts)
+        positions = np.arange(int(new_ends[-1]) if len(rows) else 0)
+        positions += np.repeat(starts[rows] - (new_ends - counts), counts)
+
+        kept = len(rows)
+        self._features[:len(positions)] = self._features[positions]
+        self._weights[:len(positions)] = self._weights[positions]
+        self._feature_end[:kept] = new_ends
+        self._ids[:kept] = self._ids[rows]
+        self._vectors[:kept] = self._vectors[rows]
+        self._alive[:kept] = True
+        self._alive[kept:] = False
+        self._row_of = {int(rid): row for row, rid in enumerate(self._ids[:kept])}
+        self._rows = kept
+        self._dead = 0
+
+    def _embed_rows(self) -> None:
+        idf = self._idf(np.arange(len(self._feature_codes)))
+        for start in range(0, self._rows, _CHUNK_ROWS):
+            end = min(start + _CHUNK_ROWS, self._rows)
+            first, last = self._span(start)[0], int(self._feature_end[end - 1])
+            codes = self._features[first:last]
+            counts = np.diff(self._feature_end[start:end], prepend=first)
+            cells = np.repeat(np.arange(end - start) * self.dimensions, counts) + self._buckets[codes]
+            values = self._weights[first:last] * idf[codes] * self._signs[codes]
+            block = np.bincount(cells, weights=values, minlength=(end - start) * self.dimensions)
+            block = block.reshape(end - start, self.dimensions).astype(np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            self._vectors[start:end] = block / np.where(norms > 0, norms, 1)
+
+    def _build_lists(self) -> None:
+        """Spherical k-means over a sample of rows, then store the rows grouped by nearest centroid."""
+        self._centroids = None
+        self._list_bounds = np.zeros(1, dtype=np.int64)
+        self._overflow = []
+        self._arrays = {}
+        if self._rows < _MIN_CLUSTERED_ROWS:
+            return
+
+        count = int(math.sqrt(self._rows))
+        rng = np.random.default_rng(0)
+        sample = self._vectors[rng.choice(self._rows, min(self._rows, count * _TRAIN_ROWS_PER_LIST),
+                                          replace=False)]
+        centroids = sample[:count].copy()
+        for _ in range(_TRAIN_ITERATIONS):
+            nearest = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # A centroid that attracted no rows keeps its place
+            centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1), centroids)
+
+        nearest = np.concatenate([
+            np.argmax(self._vectors[start:min(start + _CHUNK_ROWS, self._rows)] @ centroids.T, axis=1)
+            for start in range(0, self._rows, _CHUNK_ROWS)
+        ])
+        order = np.argsort(nearest, kind="stable")
+        self._keep_rows(order)
+        self._list_bounds = np.searchsorted(nearest[order], np.arange(count + 1))
+        self._overflow = [[] for _ in range(count)]
+        self._centroids = centroids
@@ -0,0 +1,225 @@
+"""
+Read-only binary snapshots of the in-memory recipe catalog.
+
+A snapshot holds the rows of a RecipeStore's RecipeTable, sorted by ID,
+and its secondary indexes. Opening one maps the file with mmap and serves
+the table columns straight from the mapping, so a worker is ready for
+lookups by ID and listings within milliseconds and workers opened on the
+same file share its pages through the OS page cache. The indexes are
+Python objects; they are unpickled on a background thread (searches and
+writes wait for them) and rebuilt from the table if the index classes
+have changed since the snapshot was written. Unpickling runs arbitrary
+code, so only open snapshots this application wrote.
+
+Layout (native byte order, recorded in the header):
+    8 bytes   MAGIC
+    4 bytes   format version (little-endian uint32)
+    4 bytes   header length (little-endian uint32)
+    header    JSON: versions, counts, vocabularies and a section directory
+              of {name: [offset, length]}, offsets relative to the data
+    padding   to an 8-byte boundary
+    data      the table columns (app.recipe_table.COLUMNS), then the
+              pickled indexes, each section 8-byte aligned
+
+Command line:
+    python -m app.snapshot save catalog.snap                      # the seed recipes
+    python -m app.snapshot save catalog.snap --from recipes.ndjson
+    python -m app.snapshot save catalog.snap --db recipes.db
+    python -m app.snapshot info catalog.snap
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import pickle
+import secrets
+import struct
+import sys
+import time
+from array import array
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from app.recipe_table import COLUMNS, DEFAULT_OBJECT_CACHE_SIZE, RecipeTable
+from app.store import INDEX_ATTRS, RecipeStore
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RCPSNAP\0"
+# Bump when the layout or the meaning of a section changes
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct("<8sII")
+_ALIGN = 8
+_INDEXES = "indexes"
+
+
+def save_snapshot(store: RecipeStore, path: str) -> dict:
+    """
+    Write the store's catalog and indexes to `path`, replacing it atomically.
+
+    Writes to the store wait while its rows are copied and its indexes
+    pickled; the file itself is written after they resume. Returns the
+    snapshot header.
+    """
+    with store.frozen_state() as state:
+        table = state.table
+        indexes = pickle.dumps(state.indexes, protocol=pickle.HIGHEST_PROTOCOL)
+    cuisines, ingredients = table.vocabularies()
+    sections = [(name, column) for name, column in table.columns().items()]
+    sections.append((_INDEXES, memoryview(indexes)))
+
+    directory: Dict[str, List[int]] = {}
+    offset = 0
+    for name, data in sections:
+        directory[name] = [offset, data.nbytes]
+        offset = _aligned(offset + data.nbytes)
+    header = {
+        "format_version": FORMAT_VERSION,
+        "snapshot_id": secrets.token_hex(4),
+        "source_version": state.version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "byteorder": sys.byteorder,
+        "itemsizes": {name: array(code).itemsize for name, code in COLUMNS.items()},
+        "index_layout": index_layout(),
+        "recipes": len(table),
+        "next_id": state.next_id,
+        "cuisines": cuisines,
+        "ingredients": ingredients,
+        "sections": directory,
+    }
+
+    encoded = json.dumps(header).encode()
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        _pad(f)
+        for name, data in sections:
+            f.write(data)
+            _pad(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return header
+
+
+def open_snapshot(path: str, object_cache_size: int = DEFAULT_OBJECT_CACHE_SIZE) -> RecipeStore:
+    """
+    A RecipeStore serving a snapshot from a read-only memory mapping.
+
+    Raises ValueError if the file is not a snapshot this version can read.
+    Writes to the returned store copy the mapped columns into memory first.
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header, start = _read_header(mapping)
+    if header["byteorder"] != sys.byteorder or header["itemsizes"] != {
+            name: array(code).itemsize for name, code in COLUMNS.items()}:
+        raise ValueError("Snapshot was written on a platform with a different binary layout")
+
+    view = memoryview(mapping)
+    sections = {name: view[start + offset:start + offset + length]
+                for name, (offset, length) in header["sections"].items()}
+    columns = {name: sections[name].cast(code) for name, code in COLUMNS.items()}
+    table = RecipeTable.from_columns(columns, header["cuisines"], header["ingredients"], object_cache_size)
+
+    def load_indexes() -> Optional[Dict[str, object]]:
+        if header["index_layout"] != index_layout():
+            logger.warning("Snapshot %s was written with other index classes; rebuilding its indexes", path)
+            return None
+        return pickle.loads(sections[_INDEXES])
+
+    return RecipeStore.restore(table, header["next_id"], header["snapshot_id"], load_indexes)
+
+
+def snapshot_info(path: str) -> dict:
+    """The header of a snapshot, with vocabulary sizes instead of the vocabularies."""
+    with open(path, "rb") as f:
+        header, _ = _read_header(f.read(_PREFIX.size + _header_length(f)))
+    header["cuisines"] = len(header["cuisines"])
+    header["ingredients"] = len(header["ingredients"])
+    header["file_bytes"] = os.path.getsize(path)
+    del header["index_layout"]
+    return header
+
+
+def index_layout() -> Dict[str, List[str]]:
+    """Attribute names of each secondary index class, to detect snapshots written by older code."""
+    indexes = {name: getattr(RecipeStore(), name) for name in INDEX_ATTRS}
+    return {name: sorted(vars(index)) if hasattr(index, "__dict__") else [type(index).__name__]
+            for name, index in indexes.items()}
+
+
+# ==================== INTERNALS ====================
+def _read_header(data) -> Tuple[dict, int]:
+    if len(data) < _PREFIX.size:
+        raise ValueError("Not a recipe snapshot")
+    magic, version, length = _PREFIX.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a recipe snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Snapshot format version {version} is not supported "
+                         f"(expected {FORMAT_VERSION}); rebuild it with python -m app.snapshot save")
+    end = _PREFIX.size + length
+    return json.loads(bytes(data[_PREFIX.size:end])), _aligned(end)
+
+
+def _header_length(f: BinaryIO) -> int:
+    prefix = f.read(_PREFIX.size)
+    f.seek(0)
+    return _PREFIX.unpack(prefix)[2] if len(prefix) == _PREFIX.size else 0
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _pad(f: BinaryIO) -> None:
+    f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.bulk import RecipeImporter, _guess_format, import_lines
+
+    parser = argparse.ArgumentParser(description="Build and inspect recipe catalog snapshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    save = sub.add_parser("save", help="write a snapshot of a catalog")
+    save.add_argument("path")
+    source = save.add_mutually_exclusive_group()
+    source.add_argument("--from", dest="source", help="NDJSON or CSV file to load (default: the seed recipes)")
+    source.add_argument("--db", help="SQLite database to load")
+
+    info = sub.add_parser("info", help="print a snapshot's header")
+    info.add_argument("path")
+
+    args = parser.parse_args(argv)
+    if args.command == "info":
+        print(json.dumps(snapshot_info(args.path), indent=2))
+        return 0
+
+    if args.db:
+        from app.sqlite_store import SQLiteRecipeStore
+
+        db = SQLiteRecipeStore(args.db)
+        store = RecipeStore(db.iter_all())
+        db.close()
+    elif args.source:
+        store = RecipeStore()
+        importer = RecipeImporter(store, _guess_format(args.source, None), keep_ids=True)
+        with open(args.source, encoding="utf-8", newline="") as f:
+            report = import_lines(importer, f)
+        if report.failed:
+            print(f"Skipped {report.failed} invalid rows", file=sys.stderr)
+    else:
+        from app.recipes import seed_recipes
+
+        store = RecipeStore(seed_recipes)
+    header = save_snapshot(store, args.path)
+    print(f"Wrote {header['recipes']} recipes to {args.path} (snapshot {header['snapshot_id']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,619 @@
+import heapq
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.facets import FacetIndex, FacetResult
+from app.fuzzy_index import DEFAULT_MIN_SCORE, FuzzyIndex
+from app.ingredient_index import word_pattern
+from app.models import Recipe, SearchFilters
+from app.pantry import PantryHit, pantry_score
+from app.query_cache import (
+    DEFAULT_QUERY_CACHE_SIZE, QueryCache, filters_key, filters_scope, search_key, search_scope
+)
+from app.repository import FuzzyResult, PantryResult, RecipeRepository, SimilarResult, check_recipe_id
+from app.rwlock import RWLock
+from app.similarity import SimilarHit, SimilarityIndex
+from app.stats import CatalogStats
+from app.store import normalize
+
+logger = logging.getLogger(__name__)
+
+# (old, new) recipe pair for one mutation; None on the missing side
+Change = Tuple[Optional[Recipe], Optional[Recipe]]
+
+# Replaying more changes than this flushes the query cache instead of
+# invalidating entries recipe by recipe
+_QUERY_CACHE_FLUSH_CHANGES = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    cuisine TEXT NOT NULL,
+    cuisine_key TEXT NOT NULL,
+    instructions TEXT NOT NULL,
+    servings INTEGER,
+    prep_time INTEGER,
+    cook_time INTEGER,
+    ingredients TEXT NOT NULL,
+    ingredient_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recipes_cuisine ON recipes (cuisine_key);
+CREATE INDEX IF NOT EXISTS idx_recipes_prep_time ON recipes (prep_time);
+CREATE INDEX IF NOT EXISTS idx_recipes_cook_time ON recipes (cook_time);
+
+CREATE TABLE IF NOT EXISTS ingredients (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+    recipe_id INTEGER NOT NULL REFERENCES recipes (id) ON DELETE CASCADE,
+    ingredient_id INTEGER NOT NULL REFERENCES ingredients (id),
+    PRIMARY KEY (recipe_id, ingredient_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_ingredient
+    ON recipe_ingredients (ingredient_id, recipe_id);
+
+-- Every committed mutation, so other processes sharing the file can replay
+-- it into their in-memory indexes. A row with neither old nor new recipe
+-- tells readers to rebuild from the recipes table instead.
+CREATE TABLE IF NOT EXISTS catalog_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    old TEXT,
+    new TEXT
+);
+
+-- A random epoch set when the file is created, so catalog versions (used
+-- as ETags) from a deleted and recreated file never collide
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Changes kept for lagging processes; one further behind rebuilds its indexes
+DEFAULT_CHANGE_LOG_SIZE = 10_000
+# Recipe objects kept for reuse while their row is unchanged
+DEFAULT_OBJECT_CACHE_SIZE = 100_000
+
+_COLUMNS = "id, name, cuisine, instructions, servings, prep_time, cook_time, ingredients"
+
+# Statements are module constants so sqlite3's per-connection statement
+# cache reuses the prepared statement on every call
+_SELECT_ONE = f"SELECT {_COLUMNS} FROM recipes WHERE id = ?"
+_SELECT_IDS = f"SELECT {_COLUMNS} FROM recipes WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id"
+_COUNT = "SELECT COUNT(*) FROM recipes"
+_INSERT = """
+    INSERT INTO recipes (id, name, cuisine, cuisine_key, instructions, servings,
+                         prep_time, cook_time, ingredients, ingredient_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_UPDATE = """
+    UPDATE recipes SET name = ?, cuisine = ?, cuisine_key = ?, instructions = ?, servings = ?,
+                       prep_time = ?, cook_time = ?, ingredients = ?, ingredient_count = ?
+    WHERE id = ?
+"""
+_DELETE = "DELETE FROM recipes WHERE id = ?"
+_EXISTS = "SELECT 1 FROM recipes WHERE id = ?"
+_INSERT_INGREDIENT = "INSERT OR IGNORE INTO ingredients (name) VALUES (?)"
+_LINK_INGREDIENT = """
+    INSERT OR IGNORE INTO recipe_ingredients (recipe_id, ingredient_id)
+    SELECT ?, id FROM ingredients WHERE name = ?
+"""
+_UNLINK_INGREDIENTS = "DELETE FROM recipe_ingredients WHERE recipe_id = ?"
+_VERSION = "SELECT COALESCE(MAX(seq), 0) FROM catalog_changes"
+_OLDEST_CHANGE = "SELECT MIN(seq) FROM catalog_changes"
+_CHANGES_SINCE = "SELECT old, new FROM catalog_changes WHERE seq > ? ORDER BY seq"
+_LOG_CHANGE = "INSERT INTO catalog_changes (old, new) VALUES (?, ?)"
+_PRUNE_CHANGES = "DELETE FROM catalog_changes WHERE seq <= ?"
+_SET_EPOCH = "INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('epoch', ?)"
+_EPOCH = "SELECT value FROM catalog_meta WHERE key = 'epoch'"
+_MATCH_INGREDIENTS = "SELECT id, name FROM ingredients WHERE instr(name, ?) > 0"
+_PANTRY_COUNTS = """
+    SELECT ri.recipe_id, COUNT(*), r.ingredient_count
+    FROM recipe_ingredients ri JOIN recipes r ON r.id = ri.recipe_id
+    WHERE ri.ingredient_id IN (SELECT value FROM json_each(?))
+    GROUP BY ri.recipe_id
+"""
+
+
+def _row_to_recipe(row: tuple) -> Recipe:
+    # Rows were validated on the way in, so skip Pydantic validation here
+    return Recipe.model_construct(
+        id=row[0], name=row[1], cuisine=row[2], instructions=row[3], servings=row[4],
+        prep_time=row[5], cook_time=row[6], ingredients=json.loads(row[7]),
+    )
+
+
+class SQLiteRecipeStore(RecipeRepository):
+    """
+    Persistent recipe repository backed by a SQLite file in WAL mode.
+
+    WAL lets many readers (threads or uvicorn worker processes) run while a
+    single writer commits. Each thread gets its own long-lived connection,
+    created on first use and reused afterwards. Cuisine and prep/cook time
+    are indexed columns; ingredients are normalized into a vocabulary table
+    plus a (recipe_id, ingredient_id) join table indexed both ways.
+
+    The original ingredient list is kept as JSON on the recipe row so reads
+    return it in its original order and casing. Catalog statistics and the
+    fuzzy and facet search indexes live in memory: they are built with one
+    scan when the store opens and then kept in step with the database.
+
+    Several processes (e.g. `uvicorn --workers N`) can share one file. Every
+    mutation appends the old and new recipe to the catalog_changes table in
+    the same transaction, and the table's highest sequence number serves as
+    the catalog version. Before using its in-memory indexes a store compares
+    that version with the one it last applied (a single primary-key lookup)
+    and replays the changes it missed, or rebuilds from the recipes table if
+    it fell further behind than the log reaches.
+
+    Reads hand back the same Recipe object for a row as long as the row is
+    unchanged, which skips rebuilding it and lets the JSON response cache
+    (app/json_cache.py) recognize it.
+
+    Filtered and advanced search results are kept in a QueryCache. Changes
+    are replayed into it like into the other in-memory indexes, so writes
+    from other processes invalidate it too.
+    """
+
+    def __init__(self, path: str, seed: Iterable[Recipe] = (), batch_size: int = 500,
+                 change_log_size: int = DEFAULT_CHANGE_LOG_SIZE,
+                 object_cache_size: int = DEFAULT_OBJECT_CACHE_SIZE,
+                 query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.change_log_size = change_log_size
+        self.object_cache_size = object_cache_size
+        self._objects: Dict[int, Tuple[tuple, Recipe]] = {}
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._catalog_lock = RWLock()
+
+        conn = self._conn()
+        with conn:
+            conn.executescript(SCHEMA)
+
+        self.stats = CatalogStats()
+        self._fuzzy = FuzzyIndex()
+        self._facets = FacetIndex()
+        self._similar = SimilarityIndex(auto_refresh=False)
+        # Background thread rebuilding a copy of _similar, if one was started
+        self._similar_refresh: Optional[threading.Thread] = None
+        self.query_cache = QueryCache(query_cache_size)
+        # Catalog version the in-memory indexes reflect; None until first loaded
+        self._version: Optional[int] = None
+        # Loading and seeding share one write transaction, so workers starting
+        # together on an empty file seed it exactly once
+        with self._mutation() as (conn, changes):
+            if conn.execute(_COUNT).fetchone()[0] == 0:
+                for recipe in seed:
+                    self._insert(conn, recipe)
+                    changes.append((None, recipe))
+            conn.execute(_SET_EPOCH, (secrets.token_hex(4),))
+            self._epoch = conn.execute(_EPOCH).fetchone()[0]
+
+    # ==================== CONNECTIONS ====================
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Each connection is only used by the thread that opened it;
+            # check_same_thread is off so close() can run from any thread
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=128,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _snapshot(self) -> Iterator[sqlite3.Connection]:
+        """Run several reads against one consistent WAL snapshot."""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close every connection opened by this store."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # ==================== PRIMARY KEY ====================
+    def __len__(self) -> int:
+        return self._conn().execute(_COUNT).fetchone()[0]
+
+    def get(self, recipe_id: int) -> Optional[Recipe]:
+        row = self._conn().execute(_SELECT_ONE, (recipe_id,)).fetchone()
+        return self._recipe(row) if row else None
+
+    def catalog_version(self) -> str:
+        return f"{self._epoch}-{self._conn().execute(_VERSION).fetchone()[0]}"
+
+    def _recipe(self, row: tuple) -> Recipe:
+        """The Recipe for a row, reusing the last one built for it if the row is unchanged."""
+        cached = self._objects.get(row[0])
+        if cached is not None and cached[0] == row:
+            return cached[1]
+        recipe = _row_to_recipe(row)
+        if len(self._objects) >= self.object_cache_size:
+            self._objects = {}
+        self._objects[row[0]] = (row, recipe)
+        return recipe
+
+    def _iter_rows(self, sql: str, params: tuple = ()) -> Iterator[tuple]:
+        """Stream rows from a cursor in batches instead of fetching them all."""
+        cursor = self._conn().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    # ==================== MUTATIONS ====================
+    # SQLite allows one writer at a time anyway; serializing this process's
+    # writers up front also keeps the ID check, the write and the in-memory
+    # stats and fuzzy index updates atomic with respect to each other and to
+    # readers of those structures
+    def add(self, recipe: Recipe) -> Recipe:
+        with self._mutation() as (conn, changes):
+            self._insert(conn, recipe)
+            changes.append((None, recipe))
+        return recipe
+
+    def add_many(self, recipes: Iterable[Recipe]) -> List[Recipe]:
+        added = []
+        with self._mutation() as (conn, changes):
+            for recipe in recipes:
+                self._insert(conn, recipe)
+                added.append(recipe)
+                changes.append((None, recipe))
+        return added
+
+    def update(self, recipe_id: int, recipe: Recipe) -> Optional[Recipe]:
+        key, payload, count = _encode(recipe)
+        with self._mutation() as (conn, changes):
+            old = conn.execute(_SELECT_ONE, (recipe_id,)).fetchone()
+            if old is None:
+                return None
+            conn.execute(_UPDATE, (
+                recipe.name, recipe.cuisine, key, recipe.instructions, recipe.servings,
+                recipe.prep_time, recipe.cook_time, payload, count, recipe_id,
+            ))
+            conn.execute(_UNLINK_INGREDIENTS, (recipe_id,))
+            self._link(conn, recipe_id, recipe.ingredients)
+            recipe.id = recipe_id
+            changes.append((_row_to_recipe(old), recipe))
+        return recipe
+
+    def delete(self, recipe_id: int) -> Optional[Recipe]:
+        with self._mutation() as (conn, changes):
+            row = conn.execute(_SELECT_ONE, (recipe_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(_DELETE, (recipe_id,))
+            old = _row_to_recipe(row)
+            changes.append((old, None))
+        return old
+
+    def stats_summary(self, top_n: int = 10) -> dict:
+        self._refresh()
+        with self._catalog_lock.read():
+            return self.stats.summary(top_n)
+
+    @contextmanager
+    def _mutation(self) -> Iterator[Tuple[sqlite3.Connection, List[Change]]]:
+        """
+        Run a write transaction and mirror it into the in-memory indexes.
+
+        BEGIN IMMEDIATE takes SQLite's write lock up front, so changes other
+        processes committed can be replayed first and nothing else commits
+        until this transaction does. The body appends (old, new) recipe pairs
+        to the yielded list; they are logged in the same transaction and
+        applied in memory once it commits.
+        """
+        conn = self._conn()
+        changes: List[Change] = []
+        with self._catalog_lock.write():
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._catch_up(conn)
+                yield conn, changes
+                version = self._log(conn, changes)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            self._replay(changes)
+            self._version = version
+        self._refresh_similar()
+
+    def _log(self, conn: sqlite3.Connection, changes: List[Change]) -> int:
+        """Record changes for other processes and return the new catalog version."""
+        if len(changes) > self.change_log_size:
+            # Replaying this many would cost more than a rebuild
+            conn.execute(_LOG_CHANGE, (None, None))
+        elif changes:
+            conn.executemany(_LOG_CHANGE, [(_dump(old), _dump(new)) for old, new in changes])
+        version = conn.execute(_VERSION).fetchone()[0]
+        if changes:
+            conn.execute(_PRUNE_CHANGES, (version - self.change_log_size,))
+        return version
+
+    def _refresh(self) -> None:
+        """Catch up with writes from other processes before an in-memory read."""
+        if self._conn().execute(_VERSION).fetchone()[0] == self._version:
+            return
+        with self._catalog_lock.write():
+            with self._snapshot() as conn:
+                self._catch_up(conn)
+        self._refresh_similar()
+
+    def _refresh_similar(self) -> None:
+        # As in RecipeStore: the SimilarityIndex refresh runs on a copy on a
+        # background thread; the catalog lock is only held to copy and swap
+        if not self._similar.needs_refresh:
+            return
+        with self._catalog_lock.write():
+            index = self._similar
+            fresh = index.begin_refresh() if index.needs_refresh else None
+        if fresh is None:
+            return
+        self._similar_refresh = threading.Thread(target=self._finish_similar_refresh, args=(index, fresh),
+                                                 name="similarity-refresh", daemon=True)
+        self._similar_refresh.start()
+
+    def _finish_similar_refresh(self, index: SimilarityIndex, fresh: SimilarityIndex) -> None:
+        try:
+            fresh.refresh()
+        except Exception:
+            # The old index keeps serving; the next write tries again
+            logger.exception("Could not refresh the similarity index")
+            with self._catalog_lock.write():
+                index.abandon_refresh()
+            return
+        with self._catalog_lock.write():
+            if self._similar is index:
+                self._similar = index.end_refresh(fresh)
+
+    def _catch_up(self, conn: sqlite3.Connection) -> None:
+        """Bring the in-memory indexes to the version visible on conn."""
+        version = conn.execute(_VERSION).fetchone()[0]
+        if version == self._version:
+            return
+        if self._version is not None and version > self._version:
+            oldest = conn.execute(_OLDEST_CHANGE).fetchone()[0]
+            if oldest is not None and oldest <= self._version + 1:
+                changes = [(_load(old), _load(new))
+                           for old, new in conn.execute(_CHANGES_SINCE, (self._version,))]
+                if all(old or new for old, new in changes):
+                    self._replay(changes)
+                    self._version = version
+                    return
+        self._rebuild()
+        self._version = version
+
+    def _rebuild(self) -> None:
+        self.stats = CatalogStats()
+        self._fuzzy = FuzzyIndex()
+        self._facets = FacetIndex()
+        self._similar = SimilarityIndex(auto_refresh=False)
+        self.query_cache.clear()
+        for row in self._iter_rows(f"SELECT {_COLUMNS} FROM recipes ORDER BY id"):
+            self._track(_row_to_recipe(row))
+
+    def _replay(self, changes: List[Change]) -> None:
+        targeted = len(changes) <= _QUERY_CACHE_FLUSH_CHANGES
+        if not targeted:
+            self.query_cache.clear()
+        for old, new in changes:
+            if old is not None:
+                self._untrack(old)
+            if new is not None:
+                self._track(new)
+            if targeted:
+                for recipe in (old, new):
+                    if recipe is not None:
+                        self.query_cache.invalidate(recipe)
+
+    def _track(self, recipe: Recipe) -> None:
+        self.stats.add(recipe)
+        self._fuzzy.add(recipe.id, recipe.name, recipe.ingredients)
+        self._facets.add(recipe)
+        self._similar.add(recipe.id, recipe.name, recipe.cuisine, recipe.ingredients)
+
+    def _untrack(self, recipe: Recipe) -> None:
+        self.stats.remove(recipe)
+        self._fuzzy.remove(recipe.id, recipe.name, recipe.ingredients)
+        self._facets.remove(recipe.id)
+        self._similar.remove(recipe.id)
+
+    def _insert(self, conn: sqlite3.Connection, recipe: Recipe) -> None:
+        check_recipe_id(recipe.id)
+        if recipe.id is not None and conn.execute(_EXISTS, (recipe.id,)).fetchone():
+            recipe.id = None
+        key, payload, count = _encode(recipe)
+        cursor = conn.execute(_INSERT, (
+            recipe.id, recipe.name, recipe.cuisine, key, recipe.instructions, recipe.servings,
+            recipe.prep_time, recipe.cook_time, payload, count,
+        ))
+        recipe.id = cursor.lastrowid
+        self._link(conn, recipe.id, recipe.ingredients)
+
+    @staticmethod
+    def _link(conn: sqlite3.Connection, recipe_id: int, ingredients: List[str]) -> None:
+        names = {normalize(i) for i in ingredients}
+        conn.executemany(_INSERT_INGREDIENT, [(name,) for name in names])
+        conn.executemany(_LINK_INGREDIENT, [(recipe_id, name) for name in names])
+
+    # ==================== QUERIES ====================
+    def iter_search(self, cuisine: Optional[str] = None, ingredient: Optional[str] = None,
+                    max_prep_time: Optional[int] = None, max_cook_time: Optional[int] = None,
+                    after_id: int = 0, limit: Optional[int] = None) -> Iterator[Recipe]:
+        clauses, params = ["id > ?"], []
+        if cuisine is not None:
+            clauses.append("cuisine_key = ?")
+            params.append(normalize(cuisine))
+        if ingredient is not None:
+            clauses.append(
+                "id IN (SELECT ri.recipe_id FROM recipe_ingredients ri "
+                "JOIN ingredients i ON i.id = ri.ingredient_id WHERE instr(i.name, ?) > 0)"
+            )
+            params.append(normalize(ingredient))
+        if max_prep_time is not None:
+            clauses.append("prep_time > 0 AND prep_time <= ?")
+            params.append(max_prep_time)
+        if max_cook_time is not None:
+            clauses.append("cook_time > 0 AND cook_time <= ?")
+            params.append(max_cook_time)
+
+        if len(clauses) == 1:
+            sql = f"SELECT {_COLUMNS} FROM recipes WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?"
+            return self._iter_pages(sql, params, after_id, limit)
+
+        # Filtered: the matching IDs come from the query cache, which the
+        # refresh brings up to date with other processes' writes
+        self._refresh()
+        key = search_key(cuisine, ingredient, max_prep_time, max_cook_time, after_id, limit)
+        ids = self.query_cache.get(key)
+        if ids is None:
+            generation = self.query_cache.generation
+            sql = f"SELECT id FROM recipes WHERE {' AND '.join(clauses)} ORDER BY id"
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            ids = tuple(row[0] for row in self._conn().execute(sql, (after_id, *params)))
+            self.query_cache.put(key, ids, search_scope(cuisine, ingredient, max_prep_time, max_cook_time),
+                                 generation, len(ids))
+        return self._iter_ids(ids)
+
+    def _iter_ids(self, ids: Tuple[int, ...]) -> Iterator[Recipe]:
+        # Recipes deleted since the IDs were collected are skipped
+        for start in range(0, len(ids), self.batch_size):
+            yield from self._fetch_ids(list(ids[start:start + self.batch_size]))
+
+    def _iter_pages(self, sql: str, params: list, after_id: int,
+                    limit: Optional[int]) -> Iterator[Recipe]:
+        """
+        Run a keyset query one page at a time, resuming after the last ID seen.
+
+        No cursor is held between pages, so the iterator can be resumed from
+        another thread (Starlette advances sync generators in its threadpool).
+        """
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = self.batch_size if remaining is None else min(remaining, self.batch_size)
+            rows = self._conn().execute(sql, (after_id, *params, size)).fetchall()
+            for row in rows:
+                yield self._recipe(row)
+            if len(rows) < size:
+                return
+            after_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def pantry_matches(self, pantry: Iterable[str], limit: int) -> PantryResult:
+        items = {normalize(item).strip() for item in pantry}
+        items.discard("")
+
+        ingredient_ids: Set[int] = set()
+        names: Set[str] = set()
+        # Counts and recipes must come from the same snapshot, or a recipe
+        # deleted in between would be ranked but missing
+        with self._snapshot() as conn:
+            for item in items:
+                pattern = word_pattern(item)
+                for ingredient_id, name in conn.execute(_MATCH_INGREDIENTS, (item,)):
+                    if pattern.search(name):
+                        ingredient_ids.add(ingredient_id)
+                        names.add(name)
+            if not ingredient_ids or limit <= 0:
+                return [], names
+
+            counts = self._iter_rows(_PANTRY_COUNTS, (json.dumps(sorted(ingredient_ids)),))
+            top = heapq.nsmallest(limit, (
+                (-pantry_score(matched, total, len(items)), total - matched, rid, matched, total)
+                for rid, matched, total in counts
+            ))
+            recipes = {r.id: r for r in self._fetch_ids([entry[2] for entry in top])}
+        return [
+            (recipes[rid], PantryHit(rid, matched, total, -neg_score))
+            for neg_score, _, rid, matched, total in top
+        ], names
+
+    def fuzzy_search(self, query: str, limit: int = 10,
+                     min_score: float = DEFAULT_MIN_SCORE) -> FuzzyResult:
+        self._refresh()
+        with self._catalog_lock.read():
+            hits = self._fuzzy.search(query, limit, min_score)
+        recipes = {r.id: r for r in self._fetch_ids([hit.recipe_id for hit in hits])}
+        # Another process may have deleted a hit since this one indexed it
+        return [(recipes[hit.recipe_id], hit) for hit in hits if hit.recipe_id in recipes]
+
+    def similar_recipes(self, recipe_id: int, limit: int = 10) -> Optional[SimilarResult]:
+        self._refresh()
+        with self._catalog_lock.read():
+            hits = self._similar.similar_to(recipe_id, limit)
+        if hits is None:
+            return None
+        return self._with_recipes(hits)
+
+    def similar_to_pantry(self, pantry: Iterable[str], limit: int = 10) -> SimilarResult:
+        self._refresh()
+        with self._catalog_lock.read():
+            hits = self._similar.similar_to_ingredients(pantry, limit)
+        return self._with_recipes(hits)
+
+    def _with_recipes(self, hits: List[SimilarHit]) -> SimilarResult:
+        recipes = {r.id: r for r in self._fetch_ids([hit.recipe_id for hit in hits])}
+        # Another process may have deleted a hit since this one indexed it
+        return [(recipes[hit.recipe_id], hit) for hit in hits if hit.recipe_id in recipes]
+
+    def faceted_search(self, filters: SearchFilters, after_id: int = 0, limit: Optional[int] = None,
+                       with_facets: bool = False) -> Tuple[List[Recipe], FacetResult]:
+        self._refresh()
+        key = filters_key(filters, after_id, limit, with_facets)
+        with self._catalog_lock.read():
+            result = self.query_cache.get(key)
+            if result is None:
+                generation = self.query_cache.generation
+                result = self._facets.search(filters, after_id, limit, with_facets)
+                self.query_cache.put(key, result, filters_scope(filters, after_id, with_facets),
+                                     generation, len(result.ids))
+        recipes = {r.id: r for r in self._fetch_ids(result.ids)}
+        return [recipes[rid] for rid in result.ids if rid in recipes], result
+
+    def _fetch_ids(self, ids: List[int]) -> List[Recipe]:
+        return [self._recipe(row) for row in self._iter_rows(_SELECT_IDS, (json.dumps(ids),))]
+
+
+def _dump(recipe: Optional[Recipe]) -> Optional[str]:
+    return None if recipe is None else recipe.model_dump_json()
+
+
+def _load(payload: Optional[str]) -> Optional[Recipe]:
+    return None if payload is None else Recipe.model_construct(**json.loads(payload))
+
+
+def _encode(recipe: Recipe):
+    names = {normalize(i) for i in recipe.ingredients}
+    return normalize(recipe.cuisine), json.dumps(recipe.ingredients), len(names)
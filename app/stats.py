@@ -0,0 +1,154 @@
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.models import Recipe
+
+# Upper bounds (exclusive) of the prep/cook time histogram buckets, in minutes
+TIME_BUCKETS = (10, 20, 30, 45, 60, 90, 120)
+
+
+def _bucket_labels() -> List[str]:
+    labels, low = [], 0
+    for high in TIME_BUCKETS:
+        labels.append(f"{low}-{high - 1}")
+        low = high
+    return labels + [f"{low}+", "unknown"]
+
+
+BUCKET_LABELS = _bucket_labels()
+
+
+def time_bucket(minutes: Optional[int]) -> int:
+    """Index into BUCKET_LABELS for a prep or cook time."""
+    if minutes is None:
+        return len(TIME_BUCKETS) + 1
+    return bisect_right(TIME_BUCKETS, minutes)
+
+
+class RankedCounter:
+    """
+    Reference counter that can list its most common keys cheaply.
+
+    Keys are grouped into buckets by count, and the distinct counts are kept
+    sorted, so most_common(n) walks down from the highest count instead of
+    scanning every key. Increments and decrements are O(log distinct counts).
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._buckets: Dict[int, Set[str]] = {}
+        self._levels: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._counts)
+
+    def __getitem__(self, key: str) -> int:
+        return self._counts.get(key, 0)
+
+    def items(self):
+        return self._counts.items()
+
+    def add(self, key: str) -> None:
+        old = self._counts.get(key, 0)
+        self._counts[key] = old + 1
+        if old:
+            self._leave(key, old)
+        self._enter(key, old + 1)
+
+    def discard(self, key: str) -> None:
+        old = self._counts.get(key)
+        if old is None:
+            return
+        self._leave(key, old)
+        if old == 1:
+            del self._counts[key]
+        else:
+            self._counts[key] = old - 1
+            self._enter(key, old - 1)
+
+    def most_common(self, n: int) -> List[Tuple[str, int]]:
+        """Top n keys by count, ties broken alphabetically."""
+        result: List[Tuple[str, int]] = []
+        for level in reversed(self._levels):
+            wanted = n - len(result)
+            if wanted <= 0:
+                break
+            result.extend((key, level) for key in heapq.nsmallest(wanted, self._buckets[level]))
+        return result
+
+    def _leave(self, key: str, count: int) -> None:
+        bucket = self._buckets[count]
+        if len(bucket) == 1:
+            del self._buckets[count]
+            del self._levels[bisect_left(self._levels, count)]
+        else:
+            bucket.discard(key)
+
+    def _enter(self, key: str, count: int) -> None:
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            self._buckets[count] = {key}
+            insort(self._levels, count)
+        else:
+            bucket.add(key)
+
+
+class CatalogStats:
+    """
+    Aggregates over the recipe catalog, updated as recipes change.
+
+    Stores call add() for every new recipe and remove() with the old version
+    of every updated or deleted one, so reading the stats never touches the
+    recipes themselves. Cuisines and ingredients are counted by their exact
+    spelling, as the original /api/stats did; an ingredient listed twice in
+    one recipe counts once.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.prep_time_sum = 0
+        self.cook_time_sum = 0
+        self.cuisines = RankedCounter()
+        self.ingredients = RankedCounter()
+        self.prep_histogram = [0] * len(BUCKET_LABELS)
+        self.cook_histogram = [0] * len(BUCKET_LABELS)
+
+    def add(self, recipe: Recipe) -> None:
+        self._apply(recipe, 1)
+        self.cuisines.add(recipe.cuisine)
+        for ingredient in set(recipe.ingredients):
+            self.ingredients.add(ingredient)
+
+    def remove(self, recipe: Recipe) -> None:
+        self._apply(recipe, -1)
+        self.cuisines.discard(recipe.cuisine)
+        for ingredient in set(recipe.ingredients):
+            self.ingredients.discard(ingredient)
+
+    def _apply(self, recipe: Recipe, sign: int) -> None:
+        self.total += sign
+        self.prep_time_sum += sign * (recipe.prep_time or 0)
+        self.cook_time_sum += sign * (recipe.cook_time or 0)
+        self.prep_histogram[time_bucket(recipe.prep_time)] += sign
+        self.cook_histogram[time_bucket(recipe.cook_time)] += sign
+
+    def summary(self, top_n: int = 10) -> dict:
+        """The /api/stats payload; cost depends on top_n and the number of cuisines only."""
+        return {
+            "total_recipes": self.total,
+            "cuisines": list(self.cuisines),
+            "total_unique_ingredients": len(self.ingredients),
+            "avg_prep_time": self.prep_time_sum / self.total if self.total else 0,
+            "avg_cook_time": self.cook_time_sum / self.total if self.total else 0,
+            "recipes_per_cuisine": dict(self.cuisines.items()),
+            "top_ingredients": [
+                {"ingredient": name, "recipes": count}
+                for name, count in self.ingredients.most_common(top_n)
+            ],
+            "prep_time_histogram": dict(zip(BUCKET_LABELS, self.prep_histogram)),
+            "cook_time_histogram": dict(zip(BUCKET_LABELS, self.cook_histogram)),
+        }
@@ -0,0 +1,586 @@
+import heapq
+import logging
+import re
+import secrets
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from app.facets import FacetIndex, FacetResult
+from app.fuzzy_index import DEFAULT_MIN_SCORE, FuzzyIndex
+from app.ingredient_index import IngredientIndex
+from app.metrics import snapshot_index_rebuilds
+from app.models import Recipe, SearchFilters
+from app.pantry import PantryIndex
+from app.query_cache import (
+    DEFAULT_QUERY_CACHE_SIZE, QueryCache, filters_key, filters_scope, search_key, search_scope
+)
+from app.recipe_table import DEFAULT_OBJECT_CACHE_SIZE, RecipeTable
+from app.repository import FuzzyResult, PantryResult, RecipeRepository, SimilarResult, check_recipe_id
+from app.rwlock import RWLock
+from app.similarity import SimilarityIndex
+from app.stats import CatalogStats
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# How many IDs a full scan copies out of the sorted ID list at a time
+_SCAN_BATCH = 1000
+
+# Secondary index attributes, saved and restored together by snapshots
+INDEX_ATTRS = ("_by_cuisine", "_ingredients", "_pantry", "_fuzzy", "_facets", "_similar", "stats",
+               "_by_token", "_prep_times", "_cook_times")
+
+
+def normalize(text: str) -> str:
+    """Normalize a cuisine or ingredient string for index lookups."""
+    return text.casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split an ingredient string into normalized word tokens."""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class StoreState(NamedTuple):
+    table: RecipeTable          # live rows, sorted by ID
+    indexes: Dict[str, object]  # INDEX_ATTRS -> index object
+    next_id: int
+    version: str
+
+
+class RecipeStore(RecipeRepository):
+    """
+    In-memory recipe store with a primary-key index and secondary indexes.
+
+    Recipes are held in a RecipeTable (array columns and dictionary-encoded
+    strings) and become Recipe objects only when a query returns them.
+
+    Indexes maintained on every add/update/delete:
+    - id -> table row (primary key), plus a sorted ID list for keyset scans
+    - case-folded cuisine -> recipe IDs
+    - normalized ingredient -> recipe IDs, with an n-gram substring index
+    - ingredient word token -> recipe IDs
+    - sorted (prep_time, id) and (cook_time, id) pairs for range queries
+    - recipe x ingredient incidence columns for pantry ranking
+    - name and ingredient trigrams for fuzzy search
+    - columnar time/servings/cuisine arrays for faceted advanced search
+    - TF-IDF recipe vectors with inverted-file lists for similar recipes
+    - catalog statistics (counts, running sums, histograms)
+
+    Results of filtered searches and advanced searches are kept in a
+    QueryCache, which every indexed or unindexed recipe invalidates.
+
+    Query results are returned in ascending ID order, which matches the
+    insertion order of the original list-based database. Nothing is
+    persisted; see SQLiteRecipeStore for a durable backend.
+
+    The store is safe to share between threadpool workers: mutations take
+    the write side of a readers-writer lock and queries the read side, so
+    searches run in parallel with each other but never see an index half
+    updated. Recipes are replaced, never modified in place, so a recipe
+    returned by a query stays consistent after the lock is released.
+    """
+
+    def __init__(self, recipes: Iterable[Recipe] = (),
+                 object_cache_size: int = DEFAULT_OBJECT_CACHE_SIZE,
+                 query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE):
+        self._table = RecipeTable(object_cache_size)
+        self._ids: List[int] = []
+        self._by_cuisine: Dict[str, Set[int]] = {}
+        self._ingredients = IngredientIndex()
+        self._pantry = PantryIndex()
+        self._fuzzy = FuzzyIndex()
+        self._facets = FacetIndex()
+        self._similar = SimilarityIndex(auto_refresh=False)
+        # Background thread rebuilding a copy of _similar, if one was started
+        self._similar_refresh: Optional[threading.Thread] = None
+        self.stats = CatalogStats()
+        self.query_cache = QueryCache(query_cache_size)
+        self._by_token: Dict[str, Set[int]] = {}
+        self._prep_times: List[Tuple[int, int]] = []
+        self._cook_times: List[Tuple[int, int]] = []
+        self._next_id = 1
+        self._loading = False
+        self._lock = RWLock()
+        # Catalog version for ETags: a per-store random epoch plus a write counter
+        self._epoch = secrets.token_hex(4)
+        self._version = 0
+        # Set while the epoch is a snapshot's, which every store opened on it shares
+        self._shared_epoch = False
+        # Cleared while a store restored from a snapshot loads its indexes;
+        # set with _index_error if neither loading nor rebuilding them worked
+        self._indexes_ready = threading.Event()
+        self._indexes_ready.set()
+        self._index_error: Optional[Exception] = None
+        self._load(recipes)
+
+    @classmethod
+    def restore(cls, table: RecipeTable, next_id: int, epoch: str,
+                load_indexes: Callable[[], Optional[Dict[str, object]]]) -> "RecipeStore":
+        """
+        A store serving the rows of `table` (sorted by ID) right away.
+
+        Its catalog version starts at `epoch`, shared by every store opened on
+        the same snapshot; the first write moves it to an epoch of its own,
+        so stores that took different writes never report the same version.
+
+        The secondary indexes come from `load_indexes()`, called on a
+        background thread; if it returns None or fails they are rebuilt from
+        the table instead. Until then lookups by ID and full scans are
+        answered, while searches and writes wait for the indexes. If the
+        rebuild fails too, searches and writes raise RuntimeError.
+        """
+        store = cls(object_cache_size=table.object_cache_size)
+        store._table = table
+        # The table's ID column is the sorted ID list; copied on first write
+        store._ids = table.columns()["ids"]
+        store._next_id = next_id
+        store._epoch = epoch
+        store._version = 0
+        store._shared_epoch = True
+        store._indexes_ready.clear()
+        threading.Thread(target=store._restore_indexes, args=(load_indexes,),
+                         name="snapshot-indexes", daemon=True).start()
+        return store
+
+    @contextmanager
+    def frozen_state(self) -> Iterator[StoreState]:
+        """Hold off writes while the caller saves a copy of the rows and the live indexes."""
+        self._wait_for_indexes()
+        with self._lock.read():
+            yield StoreState(self._table.compacted(self._ids),
+                             {name: getattr(self, name) for name in INDEX_ATTRS},
+                             self._next_id, self.catalog_version())
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the secondary indexes of a restored store; False on timeout."""
+        return self._indexes_ready.wait(timeout)
+
+    # ==================== PRIMARY KEY ====================
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._table
+
+    def get(self, recipe_id: int) -> Optional[Recipe]:
+        """Get a recipe by ID, or None if it does not exist."""
+        # Table rows never change once written and compaction swaps in a new
+        # table, so no lock is needed
+        return self._table.get(recipe_id)
+
+    @property
+    def object_cache_size(self) -> int:
+        return self._table.object_cache_size
+
+    @object_cache_size.setter
+    def object_cache_size(self, size: int) -> None:
+        self._table.object_cache_size = size
+
+    def catalog_version(self) -> str:
+        return f"{self._epoch}-{self._version}"
+
+    # ==================== MUTATIONS ====================
+    def add(self, recipe: Recipe) -> Recipe:
+        """
+        Add a recipe to the store.
+
+        Recipes without an ID (or with an ID already in use) are assigned the
+        next ID from a monotonic counter.
+        """
+        self._wait_for_indexes()
+        with self._lock.write():
+            self._changed()
+            self._thaw_ids()
+            self._add(recipe)
+        self._refresh_similar()
+        return recipe
+
+    def _add(self, recipe: Recipe) -> Recipe:
+        check_recipe_id(recipe.id)
+        given_id = recipe.id
+        if recipe.id is None or recipe.id in self._table:
+            recipe.id = self._next_id
+        try:
+            self._table.add(recipe)
+        except Exception:
+            # Nothing was stored: leave the caller's recipe and the ID counter as they were
+            recipe.id = given_id
+            raise
+        self._next_id = max(self._next_id, recipe.id + 1)
+
+        if self._loading or not self._ids or recipe.id > self._ids[-1]:
+            self._ids.append(recipe.id)
+        else:
+            insort(self._ids, recipe.id)
+        self._index(recipe)
+        return recipe
+
+    def add_many(self, recipes: Iterable[Recipe]) -> List[Recipe]:
+        """Add recipes in bulk, in one pass over the sorted ID and time indexes."""
+        added: List[Recipe] = []
+        self._load(recipes, added.append)
+        return added
+
+    def _load(self, recipes: Iterable[Recipe],
+              on_added: Optional[Callable[[Recipe], None]] = None) -> None:
+        # Append ID and time entries unsorted and sort once at the end; the
+        # entries are mostly in order already, so the sort is close to linear.
+        # The constructor keeps no reference to the added recipes, so each
+        # one is freed as soon as its row is written
+        self._wait_for_indexes()
+        with self._lock.write():
+            self._changed()
+            self._thaw_ids()
+            # One flush instead of an invalidation per loaded recipe
+            self.query_cache.clear()
+            self._loading = True
+            try:
+                for recipe in recipes:
+                    self._add(recipe)
+                    if on_added is not None:
+                        on_added(recipe)
+            finally:
+                self._ids.sort()
+                self._prep_times.sort()
+                self._cook_times.sort()
+                self._loading = False
+        self._refresh_similar()
+
+    def update(self, recipe_id: int, recipe: Recipe) -> Optional[Recipe]:
+        """Replace an existing recipe. Returns None if the ID does not exist."""
+        self._wait_for_indexes()
+        with self._lock.write():
+            old = self._table.get(recipe_id)
+            if old is None:
+                return None
+
+            given_id, recipe.id = recipe.id, recipe_id
+            try:
+                self._table.add(recipe)
+            except Exception:
+                recipe.id = given_id
+                raise
+            self._changed()
+            self._unindex(old)
+            self._index(recipe)
+            self._compact_table()
+        self._refresh_similar()
+        return recipe
+
+    def delete(self, recipe_id: int) -> Optional[Recipe]:
+        """Remove a recipe by ID. Returns the removed recipe, or None."""
+        self._wait_for_indexes()
+        with self._lock.write():
+            old = self._table.get(recipe_id)
+            if old is not None:
+                self._changed()
+                self._thaw_ids()
+                self._table.remove(recipe_id)
+                self._unindex(old)
+                del self._ids[bisect_left(self._ids, recipe_id)]
+                self._compact_table()
+        self._refresh_similar()
+        return old
+
+    # ==================== SECONDARY INDEX QUERIES ====================
+    def by_cuisine(self, cuisine: str) -> List[Recipe]:
+        """Get recipes whose cuisine matches case-insensitively."""
+        self._wait_for_indexes()
+        with self._lock.read():
+            return self._resolve(self._by_cuisine.get(normalize(cuisine), ()))
+
+    def by_ingredient(self, ingredient: str) -> List[Recipe]:
+        """Get recipes with an ingredient containing the given substring."""
+        with self._lock.read():
+            return self._resolve(self.ingredient_ids(ingredient))
+
+    def by_token(self, token: str) -> List[Recipe]:
+        """Get recipes with an ingredient containing the given whole word."""
+        self._wait_for_indexes()
+        with self._lock.read():
+            return self._resolve(self._by_token.get(normalize(token), ()))
+
+    def iter_search(self, cuisine: Optional[str] = None, ingredient: Optional[str] = None,
+                    max_prep_time: Optional[int] = None, max_cook_time: Optional[int] = None,
+                    after_id: int = 0, limit: Optional[int] = None) -> Iterator[Recipe]:
+        """
+        Intersect ID sets from each index, then materialize recipes lazily.
+
+        Without filters this walks the sorted ID list from `after_id` one
+        batch at a time. With filters only the matching IDs are ordered, and
+        only the first `limit` of them when a limit is given; the ordered IDs
+        are kept in the query cache.
+        """
+        if cuisine is None and ingredient is None and max_prep_time is None and max_cook_time is None:
+            return islice(self._scan_from(after_id), limit)
+        key = search_key(cuisine, ingredient, max_prep_time, max_cook_time, after_id, limit)
+        ordered = self.query_cache.get(key)
+        if ordered is None:
+            generation = self.query_cache.generation
+            with self._lock.read():
+                ids = self._match_ids(cuisine, ingredient, max_prep_time, max_cook_time)
+            matched = (i for i in ids if i > after_id)
+            ordered = tuple(sorted(matched) if limit is None else heapq.nsmallest(limit, matched))
+            self.query_cache.put(key, ordered, search_scope(cuisine, ingredient, max_prep_time, max_cook_time),
+                                 generation, len(ordered))
+        return self._iter_ids(ordered)
+
+    def _match_ids(self, cuisine: Optional[str], ingredient: Optional[str],
+                   max_prep_time: Optional[int], max_cook_time: Optional[int]) -> Optional[Set[int]]:
+        """IDs matching every given filter, or None when no filter is given."""
+        ids: Optional[Set[int]] = None
+        for enabled, lookup, arg in (
+            (cuisine is not None, self.cuisine_ids, cuisine),
+            (ingredient is not None, self.ingredient_ids, ingredient),
+            (max_prep_time is not None, self.prep_time_ids, max_prep_time),
+            (max_cook_time is not None, self.cook_time_ids, max_cook_time),
+        ):
+            if enabled:
+                matched = lookup(arg)
+                ids = matched if ids is None else ids & matched
+                if not ids:
+                    return ids
+        return ids
+
+    def pantry_matches(self, pantry: Iterable[str], limit: int) -> PantryResult:
+        items = {normalize(item).strip() for item in pantry}
+        items.discard("")
+        names: Set[str] = set()
+        self._wait_for_indexes()
+        with self._lock.read():
+            for item in items:
+                names.update(self._ingredients.matching_words(item))
+
+            hits = self._pantry.top_k(names, len(items), limit)
+            recipes = self._table.get_many(hit.recipe_id for hit in hits)
+            return list(zip(recipes, hits)), names
+
+    def fuzzy_search(self, query: str, limit: int = 10,
+                     min_score: float = DEFAULT_MIN_SCORE) -> FuzzyResult:
+        self._wait_for_indexes()
+        with self._lock.read():
+            hits = self._fuzzy.search(query, limit, min_score)
+            return list(zip(self._table.get_many(hit.recipe_id for hit in hits), hits))
+
+    def similar_recipes(self, recipe_id: int, limit: int = 10) -> Optional[SimilarResult]:
+        self._wait_for_indexes()
+        with self._lock.read():
+            hits = self._similar.similar_to(recipe_id, limit)
+            if hits is None:
+                return None
+            return list(zip(self._table.get_many(hit.recipe_id for hit in hits), hits))
+
+    def similar_to_pantry(self, pantry: Iterable[str], limit: int = 10) -> SimilarResult:
+        self._wait_for_indexes()
+        with self._lock.read():
+            hits = self._similar.similar_to_ingredients(pantry, limit)
+            return list(zip(self._table.get_many(hit.recipe_id for hit in hits), hits))
+
+    def faceted_search(self, filters: SearchFilters, after_id: int = 0, limit: Optional[int] = None,
+                       with_facets: bool = False) -> Tuple[List[Recipe], FacetResult]:
+        self._wait_for_indexes()
+        key = filters_key(filters, after_id, limit, with_facets)
+        with self._lock.read():
+            # Writes invalidate under the write lock, so a hit here is current
+            result = self.query_cache.get(key)
+            if result is None:
+                generation = self.query_cache.generation
+                result = self._facets.search(filters, after_id, limit, with_facets)
+                self.query_cache.put(key, result, filters_scope(filters, after_id, with_facets),
+                                     generation, len(result.ids))
+            return self._table.get_many(result.ids), result
+
+    def stats_summary(self, top_n: int = 10) -> dict:
+        self._wait_for_indexes()
+        with self._lock.read():
+            return self.stats.summary(top_n)
+
+    # ==================== ID-LEVEL QUERIES ====================
+    def cuisine_ids(self, cuisine: str) -> Set[int]:
+        self._wait_for_indexes()
+        with self._lock.read():
+            return set(self._by_cuisine.get(normalize(cuisine), ()))
+
+    def ingredient_ids(self, ingredient: str) -> Set[int]:
+        self._wait_for_indexes()
+        with self._lock.read():
+            return self._ingredients.search(normalize(ingredient))
+
+    def prep_time_ids(self, max_prep_time: int) -> Set[int]:
+        self._wait_for_indexes()
+        with self._lock.read():
+            return _ids_up_to(self._prep_times, max_prep_time)
+
+    def cook_time_ids(self, max_cook_time: int) -> Set[int]:
+        self._wait_for_indexes()
+        with self._lock.read():
+            return _ids_up_to(self._cook_times, max_cook_time)
+
+    def resolve(self, ids: Iterable[int]) -> List[Recipe]:
+        """Turn a collection of IDs into recipes, ordered by ID."""
+        with self._lock.read():
+            return self._resolve(ids)
+
+    # ==================== INTERNALS ====================
+    def _wait_for_indexes(self) -> None:
+        if not self._indexes_ready.is_set():
+            self._indexes_ready.wait()
+        if self._index_error is not None:
+            raise RuntimeError("Snapshot indexes could not be restored") from self._index_error
+
+    def _changed(self) -> None:
+        if self._shared_epoch:
+            self._epoch = f"{self._epoch}.{secrets.token_hex(4)}"
+            self._shared_epoch = False
+        self._version += 1
+
+    def _restore_indexes(self, load_indexes: Callable[[], Optional[Dict[str, object]]]) -> None:
+        try:
+            indexes = load_indexes()
+            if indexes is None:
+                snapshot_index_rebuilds.labels("unusable").inc()
+        except Exception:
+            logger.exception("Could not load snapshot indexes; rebuilding them")
+            snapshot_index_rebuilds.labels("error").inc()
+            indexes = None
+        try:
+            if indexes is None:
+                rebuilt = RecipeStore(map(self._table.get, self._ids), object_cache_size=0)
+                indexes = {name: getattr(rebuilt, name) for name in INDEX_ATTRS}
+            for name, index in indexes.items():
+                setattr(self, name, index)
+            self.query_cache.clear()
+        except Exception as e:
+            logger.exception("Could not rebuild snapshot indexes")
+            self._index_error = e
+        finally:
+            # Never leave searches and writes waiting on a dead thread
+            self._indexes_ready.set()
+
+    def _refresh_similar(self) -> None:
+        # Re-embedding and k-means take seconds at catalog scale, so they run
+        # on a copy on a background thread, and the write that made the
+        # refresh due returns at once; only the copy and the swap hold the lock
+        if not self._similar.needs_refresh:
+            return
+        with self._lock.write():
+            index = self._similar
+            fresh = index.begin_refresh() if index.needs_refresh else None
+        if fresh is None:
+            return
+        self._similar_refresh = threading.Thread(target=self._finish_similar_refresh, args=(index, fresh),
+                                                 name="similarity-refresh", daemon=True)
+        self._similar_refresh.start()
+
+    def _finish_similar_refresh(self, index: SimilarityIndex, fresh: SimilarityIndex) -> None:
+        try:
+            fresh.refresh()
+        except Exception:
+            # The old index keeps serving; the next write tries again
+            logger.exception("Could not refresh the similarity index")
+            with self._lock.write():
+                index.abandon_refresh()
+            return
+        with self._lock.write():
+            if self._similar is index:
+                self._similar = index.end_refresh(fresh)
+
+    def _thaw_ids(self) -> None:
+        # A restored store's ID list is a view of the mapped snapshot
+        if not isinstance(self._ids, list):
+            self._ids = list(self._ids)
+
+    def _resolve(self, ids: Iterable[int]) -> List[Recipe]:
+        return self._table.get_many(sorted(ids))
+
+    def _scan_from(self, after_id: int) -> Iterator[Recipe]:
+        # Re-seek by ID for every batch so concurrent mutations never
+        # invalidate the scan position
+        while True:
+            with self._lock.read():
+                start = bisect_right(self._ids, after_id)
+                batch = self._ids[start:start + _SCAN_BATCH]
+            if not batch:
+                return
+            yield from self._iter_ids(batch)
+            after_id = batch[-1]
+
+    def _iter_ids(self, ids: Iterable[int]) -> Iterator[Recipe]:
+        for rid in ids:
+            recipe = self._table.get(rid)
+            # Skip recipes deleted after the IDs were collected
+            if recipe is not None:
+                yield recipe
+
+    def _compact_table(self) -> None:
+        if self._table.needs_compaction:
+            self._table = self._table.compacted()
+
+    def _index(self, recipe: Recipe) -> None:
+        rid = recipe.id
+        self._by_cuisine.setdefault(normalize(recipe.cuisine), set()).add(rid)
+        names = [normalize(ingredient) for ingredient in recipe.ingredients]
+        for name in names:
+            self._ingredients.add(name, rid)
+            for token in _TOKEN_RE.findall(name):
+                self._by_token.setdefault(token, set()).add(rid)
+        self._pantry.add(rid, names)
+        self._fuzzy.add(rid, recipe.name, recipe.ingredients)
+        self._facets.add(recipe)
+        self._similar.add(rid, recipe.name, recipe.cuisine, recipe.ingredients)
+        self.stats.add(recipe)
+        if recipe.prep_time:
+            self._add_time(self._prep_times, (recipe.prep_time, rid))
+        if recipe.cook_time:
+            self._add_time(self._cook_times, (recipe.cook_time, rid))
+        if not self._loading:
+            self.query_cache.invalidate(recipe)
+
+    def _add_time(self, entries: List[Tuple[int, int]], entry: Tuple[int, int]) -> None:
+        if self._loading:
+            entries.append(entry)
+        else:
+            insort(entries, entry)
+
+    def _unindex(self, recipe: Recipe) -> None:
+        rid = recipe.id
+        _discard(self._by_cuisine, normalize(recipe.cuisine), rid)
+        for ingredient in recipe.ingredients:
+            self._ingredients.discard(normalize(ingredient), rid)
+            for token in tokenize(ingredient):
+                _discard(self._by_token, token, rid)
+        self._pantry.remove(rid)
+        self._fuzzy.remove(rid, recipe.name, recipe.ingredients)
+        self._facets.remove(rid)
+        self._similar.remove(rid)
+        self.stats.remove(recipe)
+        if recipe.prep_time:
+            _remove_sorted(self._prep_times, (recipe.prep_time, rid))
+        if recipe.cook_time:
+            _remove_sorted(self._cook_times, (recipe.cook_time, rid))
+        self.query_cache.invalidate(recipe)
+
+
+def _discard(index: Dict[str, Set[int]], key: str, rid: int) -> None:
+    postings = index.get(key)
+    if postings is None:
+        return
+    postings.discard(rid)
+    if not postings:
+        del index[key]
+
+
+def _remove_sorted(entries: List[Tuple[int, int]], entry: Tuple[int, int]) -> None:
+    i = bisect_left(entries, entry)
+    if i < len(entries) and entries[i] == entry:
+        del entries[i]
+
+
+def _ids_up_to(entries: List[Tuple[int, int]], limit: int) -> Set[int]:
+    end = bisect_right(entries, (limit, float("inf")))
+    return {rid for _, rid in entries[:end]}
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Load-test every API endpoint concurrently, in-process over ASGI or over a local uvicorn.
+
+The server is loaded with a synthetic catalog (benchmarks/catalog.py) and
+its AI providers are replaced by a local FakeLLM with configurable latency,
+so the whole suite runs offline. Each scenario is driven by `--concurrency`
+client tasks for `--duration` seconds; throughput, p50/p95/p99 latency,
+error count and peak RSS of the serving process are reported.
+
+Results can be saved as a baseline and later runs compared against it: a
+scenario regresses when its throughput drops or its p95 latency grows by
+more than `--tolerance`, or when it starts returning errors. The exit
+status is 1 if anything regressed, so the comparison can gate CI.
+
+Usage:
+    python -m benchmarks.bench_api --size 10000 --save-baseline
+    python -m benchmarks.bench_api --size 10000 --compare
+    python -m benchmarks.bench_api --mode uvicorn --size 100000 --concurrency 32
+    python -m benchmarks.bench_api --scenarios get_recipe fuzzy ai_suggest --llm-first-token-delay 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from benchmarks.catalog import BASE_INGREDIENTS, CUISINES, DISHES, iter_recipes
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Statuses that are correct answers rather than failures (searches with no match)
+EXPECTED_STATUSES = {200, 201, 404}
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    params: Optional[dict] = None
+    json: Optional[object] = None
+    content: Optional[bytes] = None
+
+
+class Scenario(NamedTuple):
+    name: str
+    build: Callable[[random.Random, "Catalog"], Request]
+
+
+class Catalog:
+    """What scenarios need to know about the served catalog."""
+
+    def __init__(self, size: int):
+        self.size = size
+        # Deletes walk down from the top of the ID range; reads use the lower half
+        self.next_delete = size
+
+    def read_id(self, rng: random.Random) -> int:
+        return rng.randint(1, max(1, self.size // 2))
+
+    def delete_id(self) -> int:
+        self.next_delete -= 1
+        return self.next_delete + 1
+
+
+def _recipe(rng: random.Random) -> dict:
+    recipe = next(iter_recipes(1, seed=rng.randint(0, 10**9)))
+    return recipe.model_dump(exclude={"id"})
+
+
+def _ingredients(rng: random.Random) -> List[str]:
+    return rng.sample(BASE_INGREDIENTS, rng.randint(2, 4))
+
+
+def _bulk_body(rng: random.Random) -> bytes:
+    return "".join(json.dumps(_recipe(rng)) + "\n" for _ in range(100)).encode()
+
+
+SCENARIOS = [
+    Scenario("ui", lambda rng, c: Request("GET", "/")),
+    Scenario("health", lambda rng, c: Request("GET", "/api/health")),
+    Scenario("list_page", lambda rng, c: Request(
+        "GET", "/api/recipes", {"limit": 50, "cursor": c.read_id(rng)})),
+    Scenario("list_page_fields", lambda rng, c: Request(
+        "GET", "/api/recipes", {"limit": 50, "cursor": c.read_id(rng), "fields": "name,cuisine"})),
+    Scenario("get_recipe", lambda rng, c: Request("GET", f"/api/recipes/{c.read_id(rng)}")),
+    Scenario("by_cuisine", lambda rng, c: Request(
+        "GET", "/api/recipes/search/by-cuisine", {"cuisine": rng.choice(CUISINES), "limit": 50})),
+    Scenario("by_ingredient", lambda rng, c: Request(
+        "GET", "/api/recipes/search/by-ingredient", {"ingredient": rng.choice(BASE_INGREDIENTS), "limit": 50})),
+    Scenario("by_time", lambda rng, c: Request(
+        "GET", "/api/recipes/search/by-time", {"max_prep_time": rng.choice([10, 20, 30]), "limit": 50})),
+    Scenario("advanced_search", lambda rng, c: Request(
+        "POST", "/api/recipes/advanced-search", {"limit": 20, "facets": "true"},
+        {"cuisines": rng.sample(CUISINES, 2), "exclude_ingredients": [rng.choice(BASE_INGREDIENTS)],
+         "prep_time_max": 30, "sort": rng.choice(["id", "-prep_time", "total_time"])})),
+    Scenario("fuzzy", lambda rng, c: Request(
+        "GET", "/api/recipes/search/fuzzy",
+        {"q": f"{rng.choice(BASE_INGREDIENTS)[:-1]} {rng.choice(DISHES).lower()}"})),
+    Scenario("what_can_i_cook", lambda rng, c: Request(
+        "POST", "/api/recipes/what-can-i-cook", None, {"ingredients": _ingredients(rng) * 2, "limit": 10})),
+    Scenario("stats", lambda rng, c: Request("GET", "/api/stats")),
+    Scenario("add_recipe", lambda rng, c: Request("POST", "/api/recipes", None, _recipe(rng))),
+    Scenario("update_recipe", lambda rng, c: Request(
+        "PUT", f"/api/recipes/{c.read_id(rng)}", None, _recipe(rng))),
+    Scenario("delete_recipe", lambda rng, c: Request("DELETE", f"/api/recipes/{c.delete_id()}")),
+    Scenario("bulk_import", lambda rng, c: Request(
+        "POST", "/api/recipes/bulk", {"format": "ndjson"}, None, _bulk_body(rng))),
+    Scenario("export", lambda rng, c: Request("GET", "/api/recipes/export", {"format": "ndjson"})),
+    Scenario("ai_suggest", lambda rng, c: Request(
+        "GET", "/api/ai/suggest", {"ingredients": ",".join(_ingredients(rng))})),
+    Scenario("ai_suggest_post", lambda rng, c: Request("POST", "/api/ai/suggest", None, _ingredients(rng))),
+    Scenario("ai_suggest_stream", lambda rng, c: Request(
+        "GET", "/api/ai/suggest/stream", {"ingredients": ",".join(_ingredients(rng))})),
+    Scenario("ai_cache", lambda rng, c: Request("GET", "/api/ai/cache")),
+    Scenario("ai_providers", lambda rng, c: Request("GET", "/api/ai/providers")),
+    Scenario("metrics", lambda rng, c: Request("GET", "/metrics")),
+]
+
+
+# ==================== SERVER SETUP ====================
+def prepare_app(size: int, first_token_delay: float, token_delay: float):
+    """Load the synthetic catalog and route AI calls to a local FakeLLM."""
+    from app import ai_helper
+    from app import main as api
+    from app.fake_llm import FakeLLM
+    from app.store import RecipeStore
+
+    api.recipes_db = RecipeStore(iter_recipes(size))
+    fake = FakeLLM(first_token_delay=first_token_delay, token_delay=token_delay)
+    ai_helper.GROQ_API_KEY = "fake"
+    ai_helper.HF_API_KEY = None
+    ai_helper._get_groq_suggestion = fake.complete
+    ai_helper._stream_groq_suggestion = fake.stream
+    return api.app
+
+
+def serve(size: int, first_token_delay: float, token_delay: float, port: int) -> None:
+    import uvicorn
+
+    app = prepare_app(size, first_token_delay, token_delay)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Peak resident set size of this process, or of `pid` where /proc is available."""
+    if pid is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# ==================== LOAD GENERATION ====================
+async def drive(client: httpx.AsyncClient, scenario: Scenario, catalog: Catalog,
+                concurrency: int, duration: float, seed: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(worker_seed: int):
+        nonlocal errors
+        rng = random.Random(worker_seed)
+        while time.perf_counter() < deadline:
+            request = scenario.build(rng, catalog)
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    request.method, request.path, params=request.params,
+                    json=request.json, content=request.content)
+                ok = response.status_code in EXPECTED_STATUSES
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(seed * 1000 + i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies) or [0.0]
+
+    def percentile(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(percentile(0.95), 3),
+        "p99_ms": round(percentile(0.99), 3),
+    }
+
+
+async def run_all(client: httpx.AsyncClient, scenarios: List[Scenario], catalog: Catalog,
+                  args, rss: Callable[[], Optional[float]]) -> Dict[str, dict]:
+    results = {}
+    print(f"{'scenario':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'RSS MB':>9}")
+    for index, scenario in enumerate(scenarios):
+        result = await drive(client, scenario, catalog, args.concurrency, args.duration, index)
+        result["peak_rss_mb"] = rss()
+        results[scenario.name] = result
+        peak = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "-"
+        print(f"{scenario.name:<20}{result['rps']:>10,.0f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['errors']:>8}{peak:>9}")
+    return results
+
+
+async def run_asgi(scenarios, catalog, args) -> Dict[str, dict]:
+    app = prepare_app(args.size, args.llm_first_token_delay, args.llm_token_delay)
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits,
+                                 timeout=args.timeout) as client:
+        return await run_all(client, scenarios, catalog, args, peak_rss_mb)
+
+
+async def run_uvicorn(scenarios, catalog, args) -> Dict[str, dict]:
+    port = free_port()
+    server = multiprocessing.Process(
+        target=serve, args=(args.size, args.llm_first_token_delay, args.llm_token_delay, port),
+        daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            await wait_until_up(client, server)
+            return await run_all(client, scenarios, catalog, args, lambda: peak_rss_mb(server.pid))
+    finally:
+        server.terminate()
+        server.join()
+
+
+async def wait_until_up(client: httpx.AsyncClient, server: multiprocessing.Process) -> None:
+    while server.is_alive():
+        try:
+            if (await client.get("/api/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn server exited during startup")
+
+
+# ==================== BASELINES ====================
+def baseline_path(args) -> Path:
+    if args.baseline:
+        return Path(args.baseline)
+    return BASELINE_DIR / f"api-{args.mode}-{args.size}.json"
+
+
+def config(args) -> dict:
+    return {
+        "mode": args.mode, "size": args.size, "concurrency": args.concurrency,
+        "duration": args.duration, "llm_first_token_delay": args.llm_first_token_delay,
+        "llm_token_delay": args.llm_token_delay, "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """Describe every scenario that regressed against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['rps']:,.0f} req/s vs {base['rps']:,.0f}")
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms vs {base['p95_ms']:.2f} ms")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors vs {base['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--size", type=int, default=10_000, help="Synthetic catalog size (1k-1M)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per scenario")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--scenarios", nargs="+", choices=[s.name for s in SCENARIOS],
+                        default=[s.name for s in SCENARIOS])
+    parser.add_argument("--llm-first-token-delay", type=float, default=0.2)
+    parser.add_argument("--llm-token-delay", type=float, default=0.002)
+    parser.add_argument("--baseline", help=f"Baseline file (default: {BASELINE_DIR.name}/api-<mode>-<size>.json)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if s.name in args.scenarios]
+    catalog = Catalog(args.size)
+    print(f"{args.mode}: {args.size:,} recipes, {args.concurrency} concurrent clients, "
+          f"{args.duration:g}s per scenario, fake LLM first token {args.llm_first_token_delay}s")
+    runner = run_asgi if args.mode == "asgi" else run_uvicorn
+    results = asyncio.run(runner(scenarios, catalog, args))
+
+    path = baseline_path(args)
+    if args.compare:
+        baseline = json.loads(path.read_text())
+        if baseline["config"] != config(args):
+            print(f"warning: baseline was recorded with {baseline['config']}")
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) against {path}")
+        if regressions:
+            sys.exit(1)
+    if args.save_baseline:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"config": config(args), "results": results}, indent=2) + "\n")
+        print(f"baseline saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk NDJSON/CSV import and export throughput.
+
+Usage:
+    python -m benchmarks.bench_bulk_import --sizes 100000 1000000 --sqlite
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from app.bulk import RecipeImporter, export_chunks, import_lines
+from app.sqlite_store import SQLiteRecipeStore
+from app.store import RecipeStore
+from benchmarks.catalog import iter_recipes
+
+
+def write_file(directory, size, fmt):
+    path = os.path.join(directory, f"recipes-{size}.{fmt}")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in export_chunks(iter_recipes(size), fmt):
+            f.write(chunk)
+    return path
+
+
+def load(store, path, fmt, batch_size):
+    start = time.perf_counter()
+    with open(path, encoding="utf-8", newline="") as f:
+        report = import_lines(RecipeImporter(store, fmt), f, batch_size)
+    return time.perf_counter() - start, report
+
+
+def run(size, batch_size, with_sqlite):
+    print(f"\n== {size:,} recipes ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("ndjson", "csv"):
+            path = write_file(tmp, size, fmt)
+            mb = os.path.getsize(path) / 1e6
+
+            store = RecipeStore()
+            elapsed, report = load(store, path, fmt, batch_size)
+            print(f"{fmt:<7} {mb:6.0f} MB -> memory: {elapsed:6.1f}s "
+                  f"({report.imported / elapsed:,.0f} recipes/s, {report.failed} failed)")
+
+            start = time.perf_counter()
+            exported = sum(len(chunk) for chunk in export_chunks(store.iter_all(), fmt))
+            elapsed = time.perf_counter() - start
+            print(f"{fmt:<7} export from memory: {elapsed:6.1f}s ({exported / 1e6:.0f} MB)")
+            del store
+
+            if with_sqlite:
+                sqlite = SQLiteRecipeStore(os.path.join(tmp, f"{fmt}.db"))
+                elapsed, report = load(sqlite, path, fmt, batch_size)
+                print(f"{fmt:<7} {mb:6.0f} MB -> sqlite: {elapsed:6.1f}s "
+                      f"({report.imported / elapsed:,.0f} recipes/s)")
+                sqlite.close()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS so far: {peak:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--sqlite", action="store_true", help="also load into a SQLite store")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.batch_size, args.sqlite)
+
+
+if __name__ == "__main__":
+    main()
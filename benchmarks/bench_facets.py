@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark faceted advanced search against the row-by-row search it replaced.
+
+Each query combines a random mix of cuisines, included and excluded
+ingredient terms, time ranges and a sort, and is timed with and without
+facet counts. The baseline is RecipeStore.iter_search, which only supports a
+single cuisine and ingredient and no facets.
+
+Usage:
+    python -m benchmarks.bench_facets --sizes 100000 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.models import SearchFilters
+from app.store import RecipeStore
+from benchmarks.catalog import BASE_INGREDIENTS, CUISINES, generate_recipes
+
+SORTS = ["id", "-prep_time", "cook_time", "total_time", "-servings"]
+
+
+def make_filters(rng, count):
+    filters = []
+    for _ in range(count):
+        filters.append(SearchFilters(
+            cuisines=rng.sample(CUISINES, rng.randint(1, 3)),
+            include_ingredients=rng.sample(BASE_INGREDIENTS, rng.randint(0, 1)),
+            exclude_ingredients=rng.sample(BASE_INGREDIENTS, rng.randint(0, 2)),
+            prep_time_max=rng.choice([None, 15, 30]),
+            cook_time_min=rng.choice([None, 10, 20]),
+            sort=rng.choice(SORTS),
+        ))
+    return filters
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (f"p50 {statistics.median(samples):.2f} ms, "
+            f"p95 {samples[int(len(samples) * 0.95) - 1]:.2f} ms, "
+            f"p99 {samples[int(len(samples) * 0.99) - 1]:.2f} ms")
+
+
+def timed(fn, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(size, limit, repeat):
+    recipes = generate_recipes(size)
+    start = time.perf_counter()
+    store = RecipeStore(recipes)
+    print(f"\n== {size:,} recipes (store built in {time.perf_counter() - start:.1f}s) ==")
+
+    filters = make_filters(random.Random(1), repeat)
+    print(f"faceted, page of {limit}:       "
+          + percentiles(timed(lambda f: store.faceted_search(f, limit=limit), filters)))
+    print(f"faceted + facet counts:      "
+          + percentiles(timed(lambda f: store.faceted_search(f, limit=limit, with_facets=True), filters)))
+
+    def baseline(f):
+        ingredient = f.include_ingredients[0] if f.include_ingredients else None
+        return list(store.iter_search(cuisine=f.cuisines[0], ingredient=ingredient,
+                                      max_prep_time=f.prep_time_max, limit=limit))
+
+    print(f"baseline search (1 cuisine): " + percentiles(timed(baseline, filters)))
+    _, result = store.faceted_search(filters[-1], limit=limit, with_facets=True)
+    print(f"last query: {result.total:,} matches, cuisine facets {result.facets['cuisine']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.limit, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark fuzzy name/ingredient search latency and index build cost.
+
+Queries are dish names and ingredients from the synthetic catalog with one
+random typo (deletion, transposition or substitution) each.
+
+Usage:
+    python -m benchmarks.bench_fuzzy --sizes 100000 1000000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from app.fuzzy_index import FuzzyIndex
+from app.store import RecipeStore
+from benchmarks.catalog import BASE_INGREDIENTS, DISHES, generate_recipes
+
+
+def typo(rng, text):
+    i = rng.randrange(len(text) - 1)
+    kind = rng.choice(["delete", "swap", "replace"])
+    if kind == "delete":
+        return text[:i] + text[i + 1:]
+    if kind == "swap":
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:]
+
+
+def make_queries(rng, count):
+    queries = []
+    for _ in range(count):
+        base = rng.choice(BASE_INGREDIENTS).title()
+        queries.append(typo(rng, rng.choice([
+            f"{base} {rng.choice(DISHES)}",
+            rng.choice(DISHES),
+            rng.choice(BASE_INGREDIENTS),
+        ])))
+    return queries
+
+
+def run(size, limit, repeat):
+    recipes = generate_recipes(size)
+    start = time.perf_counter()
+    index = FuzzyIndex()
+    for recipe in recipes:
+        index.add(recipe.id, recipe.name, recipe.ingredients)
+    build = time.perf_counter() - start
+    print(f"\n== {size:,} recipes ==")
+    print(f"fuzzy index build: {build:.1f}s ({build / size * 1e6:.1f} us/recipe, {len(index):,} phrases)")
+
+    store = RecipeStore(recipes)
+    queries = make_queries(random.Random(1), repeat)
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        matches = store.fuzzy_search(query, limit)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    print(f"top {limit}: p50 {statistics.median(samples):.2f} ms, "
+          f"p95 {samples[int(len(samples) * 0.95) - 1]:.2f} ms, "
+          f"p99 {samples[int(len(samples) * 0.99) - 1]:.2f} ms, "
+          f"max {samples[-1]:.2f} ms")
+    recipe, hit = matches[0]
+    print(f"last query {queries[-1]!r} -> {hit.text!r} ({hit.field}, score {hit.score:.3f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.limit, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingredient substring search: n-gram index vs. linear scan.
+
+Usage:
+    python -m benchmarks.bench_ingredient_search --sizes 10000 100000 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+from app.store import RecipeStore
+from benchmarks.catalog import iter_recipes
+
+QUERIES = ["cheese", "parmesan cheese", "soy", "oil", "smoked salmon", "pep", "zz"]
+
+
+def linear_scan(recipes, ingredient):
+    """The original search_by_ingredient filter."""
+    return [r for r in recipes if any(ingredient.lower() in ing.lower() for ing in r.ingredients)]
+
+
+def time_query(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def run(size, repeat, scan_limit):
+    start = time.perf_counter()
+    store = RecipeStore(iter_recipes(size))
+    build_s = time.perf_counter() - start
+    recipes = store.all()
+
+    print(f"\n== {size:,} recipes (store build {build_s:.1f}s, "
+          f"{len(store._ingredients):,} distinct ingredients) ==")
+    print(f"{'query':<18}{'matches':>10}{'index ids ms':>14}{'index+resolve ms':>18}{'scan ms':>10}")
+    for query in QUERIES:
+        matches = len(store.ingredient_ids(query))
+        index_ms = time_query(lambda: store.ingredient_ids(query), repeat)
+        resolve_ms = time_query(lambda: store.by_ingredient(query), repeat)
+        if size <= scan_limit:
+            scan_ms = f"{time_query(lambda: linear_scan(recipes, query), max(1, repeat // 5)):.2f}"
+        else:
+            scan_ms = "skipped"
+        print(f"{query:<18}{matches:>10,}{index_ms:>14.3f}{resolve_ms:>18.2f}{scan_ms:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--scan-limit", type=int, default=1_000_000,
+                        help="skip the linear scan above this catalog size")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.repeat, args.scan_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Compare list-endpoint throughput with per-request serialization and with cached JSON bytes.
+
+"before" renders every recipe with json.dumps(model_dump()) on every
+request, as the list endpoints did before the JSON cache, lets FastAPI
+validate and serialize single recipes through response_model, and (for
+the SQLite store) rebuilds a Recipe object for every row read. "after" is the
+current code: each recipe is serialized once and responses are assembled
+from cached bytes. Conditional requests answered with 304 are timed as
+well. Requests run sequentially in-process over ASGI, so the numbers are
+per-request server cost plus the httpx client's own overhead.
+
+Usage:
+    python -m benchmarks.bench_json_cache --size 10000 --requests 500
+    python -m benchmarks.bench_json_cache --store sqlite
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from app import main as api
+from app import pagination
+from app.json_cache import RecipeJSONCache
+from app.sqlite_store import SQLiteRecipeStore
+from app.store import RecipeStore
+from benchmarks.catalog import CUISINES, iter_recipes
+
+
+class PerRequestJSON:
+    """Drop-in for the JSON cache that serializes on every call, as before."""
+
+    def render(self, recipe, fields=None):
+        return json.dumps(recipe.model_dump(include=fields)).encode()
+
+
+def scenarios(size, rng):
+    return [
+        ("page of 100", 1, lambda: ("/api/recipes", {"limit": 100, "cursor": rng.randrange(size - 100)})),
+        ("by-cuisine page of 50", 1,
+         lambda: ("/api/recipes/search/by-cuisine", {"cuisine": rng.choice(CUISINES), "limit": 50})),
+        ("single recipe", 1, lambda: (f"/api/recipes/{rng.randint(1, size)}", None)),
+        ("full catalog", 20, lambda: ("/api/recipes", None)),
+    ]
+
+
+async def time_requests(client, build, n, revalidate=False):
+    etags = {}
+    start = time.perf_counter()
+    for _ in range(n):
+        path, params = build()
+        key = (path, json.dumps(params, sort_keys=True))
+        headers = {"If-None-Match": etags[key]} if revalidate and key in etags else None
+        response = await client.get(path, params=params, headers=headers)
+        assert response.status_code in (200, 304), response.status_code
+        if revalidate and "ETag" in response.headers:
+            etags[key] = response.headers["ETag"]
+    return n / (time.perf_counter() - start)
+
+
+async def run(args, mode):
+    rng = random.Random(7)
+    transport = httpx.ASGITransport(app=api.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up: one full listing touches (and caches) every recipe
+        await client.get("/api/recipes")
+        for name, divisor, build in scenarios(args.size, rng):
+            n = max(args.requests // divisor, 1)
+            results[name] = await time_requests(client, build, n)
+        if mode == "after":
+            # Same URL revalidated: the first request gets an ETag, the rest 304
+            fixed = lambda: ("/api/recipes", {"limit": 100})
+            results["page of 100, revalidated"] = await time_requests(client, fixed, args.requests, True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store == "memory":
+            api.recipes_db = RecipeStore(iter_recipes(args.size))
+        else:
+            api.recipes_db = SQLiteRecipeStore(os.path.join(tmp, "bench.db"), iter_recipes(args.size))
+        print(f"{args.size:,} recipes, {args.store} store, {args.requests} requests per scenario")
+
+        cached_response = api.recipe_json_response
+        pagination.recipe_json_cache = PerRequestJSON()
+        # Returning the model lets FastAPI validate and serialize it via response_model
+        api.recipe_json_response = lambda recipe, request: recipe
+        if args.store == "sqlite":
+            api.recipes_db.object_cache_size = 0
+        before = asyncio.run(run(args, "before"))
+        pagination.recipe_json_cache = RecipeJSONCache()
+        api.recipe_json_response = cached_response
+        if args.store == "sqlite":
+            api.recipes_db.object_cache_size = args.size + 1
+        after = asyncio.run(run(args, "after"))
+        if args.store == "sqlite":
+            api.recipes_db.close()
+
+    print(f"{'scenario':<28}{'before req/s':>14}{'after req/s':>14}{'speedup':>10}")
+    for name, rate in after.items():
+        if name in before:
+            print(f"{name:<28}{before[name]:>14,.0f}{rate:>14,.0f}{rate / before[name]:>9.1f}x")
+        else:
+            print(f"{name:<28}{'':>14}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Measure time and server-side peak Python memory of GET /api/recipes listing modes.
+
+Usage:
+    python -m benchmarks.bench_listing --sizes 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from starlette.requests import Request
+
+from app import main as api
+from app.pagination import ListParams
+from app.store import RecipeStore
+from benchmarks.catalog import iter_recipes
+
+MODES = [
+    ("full JSON array", dict()),
+    ("full NDJSON", dict(format="ndjson")),
+    ("NDJSON, list fields", dict(format="ndjson", fields="name,cuisine,prep_time")),
+    ("page of 50", dict(limit=50, cursor=1000)),
+]
+
+
+async def drain(response):
+    # Pages are assembled into one body; unbounded listings are streamed
+    if not hasattr(response, "body_iterator"):
+        return len(response.body)
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def measure(params, trace):
+    # Call the handler directly and drain its body, so only server-side
+    # allocations are counted (the test client would buffer the whole body)
+    page = ListParams(**{"limit": None, "cursor": None, "fields": None, "format": "json", **params})
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    size = asyncio.run(drain(api.get_all_recipes(request, page)))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace else 0
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def run(size):
+    api.recipes_db = RecipeStore(iter_recipes(size))
+    print(f"\n== {size:,} recipes ==")
+    print(f"{'mode':<24}{'time':>10}{'peak MB':>10}{'body MB':>10}")
+    for label, params in MODES:
+        elapsed, _, body = measure(params, trace=False)
+        _, peak, _ = measure(params, trace=True)
+        print(f"{label:<24}{elapsed:>9.2f}s{peak / 1e6:>10.1f}{body / 1e6:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Compare RSS per recipe and search latency of the in-memory store with and without compact columns.
+
+"before" keeps one Recipe object per ID, as RecipeStore did before
+RecipeTable; "after" is the current store, which holds recipes as array
+columns and builds Recipe objects only when a query returns them. Each
+mode runs in a fresh interpreter, so the RSS growth from building the store
+is attributable to the catalog alone. RSS is measured again after a full
+scan, which materializes (and keeps up to object_cache_size of) the
+recipes; the first scan also pays for the garbage collector passes that
+creating those objects triggers. Every store index is included in the RSS
+figures.
+
+Usage:
+    python -m benchmarks.bench_memory --size 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from app.models import SearchFilters
+from app.store import RecipeStore
+from benchmarks.catalog import CUISINES, iter_recipes
+
+MODES = ["before", "after"]
+
+
+class ObjectTable(dict):
+    """The previous primary storage: ID -> Recipe object."""
+
+    object_cache_size = 0
+    needs_compaction = False
+
+    def add(self, recipe):
+        self[recipe.id] = recipe
+
+    def remove(self, recipe_id):
+        return self.pop(recipe_id, None) is not None
+
+    def get_many(self, ids):
+        return [self[i] for i in ids]
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def queries(store, size, rng):
+    return [
+        ("get by ID", lambda: store.get(rng.randint(1, size))),
+        ("cuisine, page of 50", lambda: list(store.iter_search(cuisine=rng.choice(CUISINES), limit=50))),
+        ("ingredient, page of 50", lambda: list(store.iter_search(ingredient="cheese", limit=50))),
+        ("advanced, page of 50", lambda: store.faceted_search(
+            SearchFilters(include_ingredients=["garlic"], prep_time_max=30), limit=50)),
+        ("fuzzy name", lambda: store.fuzzy_search("chiken cury", limit=10)),
+        ("by cuisine, all", lambda: store.by_cuisine(rng.choice(CUISINES))),
+    ]
+
+
+def time_query(run, budget=1.0):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < budget:
+        run()
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def measure(mode, size):
+    """Runs in the child interpreter; prints one JSON line of results."""
+    gc.collect()
+    baseline = rss_bytes()
+    store = RecipeStore()
+    if mode == "before":
+        store._table = ObjectTable()
+    # Load as the constructor does, without keeping the added recipes
+    store._load(iter_recipes(size))
+    gc.collect()
+    results = {"rss per recipe": (rss_bytes() - baseline) / size}
+
+    for label in ("full scan (s)", "full scan, again (s)"):
+        start = time.perf_counter()
+        scanned = sum(1 for _ in store.iter_search())
+        results[label] = time.perf_counter() - start
+        assert scanned == size
+    gc.collect()
+    results["rss per recipe after scan"] = (rss_bytes() - baseline) / size
+
+    rng = random.Random(3)
+    for name, run in queries(store, size, rng):
+        results[name] = time_query(run)
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.size)
+        return
+
+    results = {}
+    for mode in MODES:
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_memory", "--size", str(args.size), "--measure", mode],
+            check=True, capture_output=True, text=True,
+        )
+        results[mode] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    before, after = results["before"], results["after"]
+    print(f"{args.size:,} recipes")
+    print(f"{'metric':<28}{'before':>12}{'after':>12}{'ratio':>8}")
+    for name in after:
+        if name.startswith("rss"):
+            print(f"{name:<28}{before[name]:>11,.0f}B{after[name]:>11,.0f}B"
+                  f"{after[name] / before[name]:>7.2f}x")
+        elif name.endswith("(s)"):
+            print(f"{name:<28}{before[name]:>11.2f}s{after[name]:>11.2f}s"
+                  f"{after[name] / before[name]:>7.2f}x")
+        else:
+            print(f"{name + ' (us)':<28}{before[name] * 1e6:>12,.1f}{after[name] * 1e6:>12,.1f}"
+                  f"{after[name] / before[name]:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
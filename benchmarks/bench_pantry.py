@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark "what can I cook" pantry ranking latency.
+
+Usage:
+    python -m benchmarks.bench_pantry --sizes 100000 1000000 --pantry-size 20
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.store import RecipeStore
+from benchmarks.catalog import BASE_INGREDIENTS, iter_recipes
+
+
+def run(size, pantry_size, limit, repeat):
+    start = time.perf_counter()
+    store = RecipeStore(iter_recipes(size))
+    print(f"\n== {size:,} recipes (store build {time.perf_counter() - start:.1f}s) ==")
+
+    rng = random.Random(1)
+    samples = []
+    for _ in range(repeat):
+        pantry = rng.sample(BASE_INGREDIENTS, pantry_size)
+        start = time.perf_counter()
+        matches, names = store.pantry_matches(pantry, limit)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    print(f"pantry of {pantry_size}, top {limit}: "
+          f"p50 {statistics.median(samples):.2f} ms, "
+          f"p95 {samples[int(len(samples) * 0.95) - 1]:.2f} ms, "
+          f"max {samples[-1]:.2f} ms")
+    best = matches[0]
+    print(f"last query matched {len(names)} ingredient names; "
+          f"best hit: {best[0].name} ({best[1].matched}/{best[1].total}, score {best[1].score:.3f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--pantry-size", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.pantry_size, args.limit, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
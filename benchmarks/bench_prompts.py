@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Compare generation profiles: tokens, latency and Groq budget headroom per prompt style and token cap.
+
+Each profile sends `--requests` suggestions through the real Groq code path
+(`ai_helper._get_groq_suggestion`) against a local FakeGroq client that
+charges `--prefill-delay` per prompt token and `--token-delay` per
+completion token, so the run is offline. The rate budget is unlimited
+during the run; calls per minute are then worked out from the token
+reservation each call makes up front (prompt estimate + max_tokens) and
+from what it actually used, against GROQ_TOKENS_PER_MINUTE and
+GROQ_REQUESTS_PER_MINUTE.
+
+The first row is the original setup (full prompt, 1000-token cap); the
+others are the profiles the app serves with the given caps.
+
+Usage:
+    python -m benchmarks.bench_prompts
+    python -m benchmarks.bench_prompts --max-tokens 500 --summary-max-tokens 150 --token-delay 0.004
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app import ai_helper
+from app.fake_llm import FakeGroq
+from app.generation import COMPACT, FULL, GenerationProfile, build_prompt
+from app.rate_limit import ProviderBudget
+from benchmarks.catalog import BASE_INGREDIENTS
+
+
+async def run_profile(profile, requests, fake, rng_requests):
+    usage = []
+    create = fake.create
+
+    async def recording_create(**kwargs):
+        response = await create(**kwargs)
+        usage.append(response.usage)
+        return response
+
+    fake.chat.completions.create = recording_create
+    samples = []
+    for ingredients in rng_requests[:requests]:
+        start = time.perf_counter()
+        result = await ai_helper._get_groq_suggestion(ingredients, profile)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert result is not None
+    fake.chat.completions.create = create
+
+    reserved = statistics.mean(
+        ai_helper.estimate_tokens(build_prompt(ingredients, profile)) + profile.max_tokens
+        for ingredients in rng_requests[:requests]
+    )
+    used = statistics.mean(u.total_tokens for u in usage)
+    samples.sort()
+    return {
+        "prompt": statistics.mean(u.prompt_tokens for u in usage),
+        "completion": statistics.mean(u.completion_tokens for u in usage),
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+        "reserved": reserved,
+        "used": used,
+    }
+
+
+def calls_per_minute(tokens_per_call):
+    limits = [ai_helper.GROQ_REQUESTS_PER_MINUTE or float("inf")]
+    if ai_helper.GROQ_TOKENS_PER_MINUTE:
+        limits.append(ai_helper.GROQ_TOKENS_PER_MINUTE / tokens_per_call)
+    return min(limits)
+
+
+async def main_async(args):
+    rng = random.Random(1)
+    requests = [rng.sample(BASE_INGREDIENTS, rng.randint(2, 5)) for _ in range(args.requests)]
+    fake = FakeGroq(prefill_delay=args.prefill_delay, token_delay=args.token_delay)
+    clients = ai_helper._get_clients()
+    clients.groq = fake
+    ai_helper.groq_budget = ProviderBudget("groq")
+
+    profiles = [
+        ("original", GenerationProfile("suggest", FULL, 1000)),
+        ("full", GenerationProfile("suggest", FULL, args.max_tokens)),
+        ("compact", GenerationProfile("suggest", COMPACT, args.max_tokens)),
+        ("summary", GenerationProfile("summary", COMPACT, args.summary_max_tokens, summary=True)),
+    ]
+    print(f"{args.requests} requests per profile, fake Groq {args.prefill_delay * 1000:g} ms/prompt token, "
+          f"{args.token_delay * 1000:g} ms/completion token; budget {ai_helper.GROQ_TOKENS_PER_MINUTE:g} TPM, "
+          f"{ai_helper.GROQ_REQUESTS_PER_MINUTE:g} RPM")
+    print(f"{'profile':<10}{'cap':>6}{'prompt':>8}{'compl.':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'reserved':>10}{'used':>7}{'calls/min':>11}{'settled':>9}")
+    for label, profile in profiles:
+        r = await run_profile(profile, args.requests, fake, requests)
+        print(f"{label:<10}{profile.max_tokens:>6}{r['prompt']:>8.0f}{r['completion']:>8.0f}"
+              f"{r['p50']:>9.1f}{r['p95']:>9.1f}{r['reserved']:>10.0f}{r['used']:>7.0f}"
+              f"{calls_per_minute(r['reserved']):>11.1f}{calls_per_minute(r['used']):>9.1f}")
+    print("calls/min: admitted on the up-front reservation; settled: sustained once "
+          "reservations are settled to actual usage")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=ai_helper.AI_MAX_TOKENS)
+    parser.add_argument("--summary-max-tokens", type=int,
+                        default=ai_helper.GENERATION_PROFILES["summary"].max_tokens)
+    parser.add_argument("--prefill-delay", type=float, default=0.0002)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
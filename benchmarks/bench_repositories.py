@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compare the in-memory and SQLite recipe repositories on the same workload.
+
+Usage:
+    python -m benchmarks.bench_repositories --sizes 10000 100000 --repeat 50
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.sqlite_store import SQLiteRecipeStore
+from app.store import RecipeStore
+from benchmarks.catalog import BASE_INGREDIENTS, CUISINES, iter_recipes
+
+
+def timed(fn, repeat):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def workload(store, size, repeat):
+    rng = random.Random(3)
+    ids = [rng.randint(1, size) for _ in range(repeat)]
+    cuisines = [rng.choice(CUISINES) for _ in range(repeat)]
+    ingredients = [rng.choice(BASE_INGREDIENTS) for _ in range(repeat)]
+    pantries = [rng.sample(BASE_INGREDIENTS, 10) for _ in range(repeat)]
+    fresh = list(iter_recipes(repeat, seed=size, start_id=size * 10))
+    return {
+        "get by id": lambda i: store.get(ids[i]),
+        "by cuisine": lambda i: store.by_cuisine(cuisines[i]),
+        "by ingredient": lambda i: store.by_ingredient(ingredients[i]),
+        "by prep time <= 15": lambda i: store.by_time(max_prep_time=15),
+        "cuisine + ingredient + time": lambda i: store.search(
+            cuisine=cuisines[i], ingredient=ingredients[i], max_prep_time=30),
+        "pantry top 10": lambda i: store.pantry_matches(pantries[i], 10),
+        "add": lambda i: store.add(fresh[i]),
+    }
+
+
+def run(size, repeat):
+    print(f"\n== {size:,} recipes ==")
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        memory = RecipeStore(iter_recipes(size))
+        memory_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sqlite = SQLiteRecipeStore(os.path.join(tmp, "recipes.db"), iter_recipes(size))
+        sqlite_build = time.perf_counter() - start
+        db_mb = os.path.getsize(os.path.join(tmp, "recipes.db")) / 1e6
+
+        print(f"build: memory {memory_build:.1f}s, sqlite {sqlite_build:.1f}s ({db_mb:.0f} MB file)")
+        print(f"{'operation':<30}{'memory p50/p95 ms':>22}{'sqlite p50/p95 ms':>22}")
+        memory_ops = workload(memory, size, repeat)
+        sqlite_ops = workload(sqlite, size, repeat)
+        for name in memory_ops:
+            m50, m95 = timed(memory_ops[name], repeat)
+            s50, s95 = timed(sqlite_ops[name], repeat)
+            print(f"{name:<30}{m50:>12.2f} /{m95:>8.2f}{s50:>12.2f} /{s95:>8.2f}")
+
+        for label, store in (("memory", memory), ("sqlite", sqlite)):
+            start = time.perf_counter()
+            count = sum(1 for _ in store.iter_all())
+            print(f"stream all {count:,} recipes ({label}): {time.perf_counter() - start:.2f}s")
+        sqlite.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
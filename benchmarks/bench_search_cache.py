@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark the search result cache on a skewed query mix with interleaved writes.
+
+Queries are drawn the way a UI issues them: a cuisine, ingredient or time
+search, or an advanced search, with parameters picked from a Zipf-like
+distribution (a few popular cuisines and ingredients account for most
+requests, in any letter case) and the first page of 20 results. Every
+`--write-every` queries one recipe is added, updated or deleted, which
+invalidates the cached results it can affect.
+
+Each store is run with the cache disabled (query_cache_size=0) and enabled;
+the report gives the query latency, the cache hit rate and how many entries
+writes invalidated.
+
+Usage:
+    python -m benchmarks.bench_search_cache --size 100000
+    python -m benchmarks.bench_search_cache --size 100000 --stores memory sqlite --write-every 20
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.models import SearchFilters
+from app.query_cache import DEFAULT_QUERY_CACHE_SIZE
+from app.sqlite_store import SQLiteRecipeStore
+from app.store import RecipeStore
+from benchmarks.catalog import BASE_INGREDIENTS, CUISINES, iter_recipes
+
+PAGE = 21  # a page of 20 plus one to tell whether another follows
+
+
+def zipf(rng, items, s=1.1):
+    weights = [1 / (rank + 1) ** s for rank in range(len(items))]
+    return lambda: rng.choices(items, weights)[0]
+
+
+def make_queries(count, seed):
+    rng = random.Random(seed)
+    cuisine = zipf(rng, CUISINES)
+    ingredient = zipf(rng, BASE_INGREDIENTS)
+    minutes = zipf(rng, [30, 15, 60, 20, 45, 10])
+    cased = lambda text: rng.choice([text, text.lower(), text.upper()])  # noqa: E731
+    kinds = [
+        (0.35, lambda: ("search", {"cuisine": cased(cuisine())})),
+        (0.30, lambda: ("search", {"ingredient": cased(ingredient())})),
+        (0.15, lambda: ("search", {"max_prep_time": minutes(), "max_cook_time": minutes()})),
+        (0.20, lambda: ("filters", SearchFilters(
+            cuisines=[cuisine()], include_ingredients=[ingredient()],
+            prep_time_max=minutes(), sort=rng.choice(["id", "total_time"]),
+        ))),
+    ]
+    weights = [weight for weight, _ in kinds]
+    return [rng.choices(kinds, weights)[0][1]() for _ in range(count)]
+
+
+def run_query(store, query):
+    kind, params = query
+    if kind == "search":
+        return list(store.iter_search(**params, limit=PAGE))
+    return store.faceted_search(params, 0, PAGE, with_facets=True)
+
+
+def run(store, queries, write_every, seed):
+    rng = random.Random(seed)
+    writes = list(iter_recipes(len(queries) // write_every + 1 if write_every else 0, seed=seed + 1))
+    ids = [recipe.id for recipe in store.iter_all()]
+    samples = []
+    for i, query in enumerate(queries):
+        if write_every and i % write_every == write_every - 1:
+            op, recipe = rng.random(), writes.pop()
+            if op < 0.4:
+                ids.append(store.add(recipe.model_copy(update={"id": None})).id)
+            elif op < 0.8:
+                store.update(rng.choice(ids), recipe)
+            else:
+                target = ids.pop(rng.randrange(len(ids)))
+                store.delete(target)
+        start = time.perf_counter()
+        run_query(store, query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+def build(kind, size, cache_size, directory):
+    if kind == "memory":
+        return RecipeStore(iter_recipes(size), query_cache_size=cache_size)
+    path = os.path.join(directory, f"recipes-{cache_size}.db")
+    store = SQLiteRecipeStore(path, query_cache_size=cache_size)
+    store.add_many(iter_recipes(size))
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--write-every", type=int, default=50, help="queries per write (0: no writes)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_QUERY_CACHE_SIZE)
+    parser.add_argument("--stores", nargs="+", default=["memory"], choices=["memory", "sqlite"])
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries, seed=1)
+    writes = f"one write every {args.write_every} queries" if args.write_every else "no writes"
+    print(f"{args.size:,} recipes, {args.queries:,} queries, {writes}")
+    print(f"{'store':<8}{'cache':<7}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'hit rate':>10}"
+          f"{'invalidated':>13}{'entries':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in args.stores:
+            for cache_size in (0, args.cache_size):
+                store = build(kind, args.size, cache_size, directory)
+                mean, p50, p95 = run(store, queries, args.write_every, seed=2)
+                stats = store.query_cache.stats()
+                print(f"{kind:<8}{'on' if cache_size else 'off':<7}{mean:>9.3f}{p50:>9.3f}{p95:>9.3f}"
+                      f"{stats['hit_rate']:>10.3f}{stats['invalidated']:>13}{stats['size']:>9}")
+                if kind == "sqlite":
+                    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compare worker startup from a catalog snapshot with rebuilding the store from JSON.
+
+"rebuild" is what a worker does without a snapshot: parse and validate an
+NDJSON catalog and build every index. "snapshot" maps the file written
+from that store: the time to the first lookup by ID is the startup time,
+and the time until the unpickled indexes are in place is when searches
+stop waiting. Each step runs in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.bench_snapshot --size 1000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.catalog import iter_recipes
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def rebuild(catalog: str, snapshot_path: str) -> dict:
+    from app.bulk import RecipeImporter, import_lines
+    from app.snapshot import save_snapshot
+    from app.store import RecipeStore
+
+    start = time.perf_counter()
+    store = RecipeStore()
+    with open(catalog, encoding="utf-8") as f:
+        import_lines(RecipeImporter(store, keep_ids=True), f)
+    results = {"rebuild from JSON (s)": time.perf_counter() - start, "RSS after rebuild (MB)": rss_mb()}
+    start = time.perf_counter()
+    save_snapshot(store, snapshot_path)
+    results["write snapshot (s)"] = time.perf_counter() - start
+    return results
+
+
+def open_mapped(snapshot_path: str, size: int) -> dict:
+    from app.snapshot import open_snapshot
+
+    start = time.perf_counter()
+    store = open_snapshot(snapshot_path)
+    assert store.get(size // 2) is not None
+    results = {"open + first lookup (ms)": (time.perf_counter() - start) * 1e3,
+               "RSS after open (MB)": rss_mb()}
+    store.wait_until_ready()
+    results["indexes ready (s)"] = time.perf_counter() - start
+    results["RSS with indexes (MB)"] = rss_mb()
+    return results
+
+
+def child(step: str, *args: str) -> dict:
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_snapshot", "--step", step, *args],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--step", choices=["rebuild", "open"], help=argparse.SUPPRESS)
+    parser.add_argument("--catalog", help=argparse.SUPPRESS)
+    parser.add_argument("--snapshot", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.step == "rebuild":
+        print(json.dumps(rebuild(args.catalog, args.snapshot)))
+        return
+    if args.step == "open":
+        print(json.dumps(open_mapped(args.snapshot, args.size)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = os.path.join(tmp, "catalog.ndjson")
+        snapshot_path = os.path.join(tmp, "catalog.snap")
+        with open(catalog, "w", encoding="utf-8") as f:
+            for recipe in iter_recipes(args.size):
+                f.write(recipe.model_dump_json() + "\n")
+        results = child("rebuild", "--catalog", catalog, "--snapshot", snapshot_path)
+        results["JSON catalog (MB)"] = os.path.getsize(catalog) / 1e6
+        results["snapshot file (MB)"] = os.path.getsize(snapshot_path) / 1e6
+        results.update(child("open", "--snapshot", snapshot_path, "--size", str(args.size)))
+
+    print(f"{args.size:,} recipes")
+    for name, value in results.items():
+        print(f"{name:<28}{value:>12,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Measure read throughput of the shared SQLite store as worker processes are added.
+
+Each worker process opens its own SQLiteRecipeStore on one shared file, as a
+`uvicorn --workers N` deployment does, and runs a mixed read workload (get by
+ID, cuisine search, pantry ranking, fuzzy and faceted search, stats) for a
+fixed time. With --writers, extra processes add and update recipes at a
+steady rate meanwhile, so every read also pays for catching up with writes
+made elsewhere. Speedup and per-worker efficiency are reported against the
+single-worker run.
+
+With --url the same measurement is made over HTTP against a running server,
+e.g. one started with `RECIPE_STORE=sqlite uvicorn app.main:app --workers 4`.
+
+Usage:
+    python -m benchmarks.bench_workers --size 100000 --workers 1 2 4 8
+    python -m benchmarks.bench_workers --size 100000 --writers 1
+    python -m benchmarks.bench_workers --url http://127.0.0.1:8000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+from app.models import SearchFilters
+from app.sqlite_store import SQLiteRecipeStore
+from benchmarks.catalog import BASE_INGREDIENTS, CUISINES, iter_recipes
+
+WRITES_PER_SECOND = 20
+
+
+def store_operations(store, rng, size):
+    return [
+        lambda: store.get(rng.randint(1, size)),
+        lambda: list(store.iter_search(cuisine=rng.choice(CUISINES), limit=20)),
+        lambda: store.pantry_matches(rng.sample(BASE_INGREDIENTS, 5), 10),
+        lambda: store.fuzzy_search(rng.choice(BASE_INGREDIENTS)[:-1] + " stew", 10),
+        lambda: store.faceted_search(
+            SearchFilters(cuisines=rng.sample(CUISINES, 2), prep_time_max=30), limit=20),
+        lambda: store.stats_summary(5),
+    ]
+
+
+def http_operations(url, rng, size):
+    def get(path, **params):
+        query = urllib.parse.urlencode(params)
+        with urllib.request.urlopen(f"{url}{path}?{query}", timeout=30) as response:
+            return response.read()
+
+    def post(path, body, **params):
+        request = urllib.request.Request(
+            f"{url}{path}?{urllib.parse.urlencode(params)}", data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read()
+
+    return [
+        lambda: get(f"/api/recipes/{rng.randint(1, size)}"),
+        lambda: get("/api/recipes/search/by-cuisine", cuisine=rng.choice(CUISINES), limit=20),
+        lambda: post("/api/recipes/what-can-i-cook",
+                     {"ingredients": rng.sample(BASE_INGREDIENTS, 5), "limit": 10}),
+        lambda: get("/api/recipes/search/fuzzy", q=rng.choice(BASE_INGREDIENTS)[:-1] + " stew"),
+        lambda: post("/api/recipes/advanced-search",
+                     {"cuisines": rng.sample(CUISINES, 2), "prep_time_max": 30}, limit=20),
+        lambda: get("/api/stats", top=5),
+    ]
+
+
+def reader(target, size, seed, barrier, duration, results):
+    rng = random.Random(seed)
+    if target.startswith("http"):
+        operations = http_operations(target, rng, size)
+    else:
+        store = SQLiteRecipeStore(target)
+        operations = store_operations(store, rng, size)
+    barrier.wait()
+    deadline = time.perf_counter() + duration
+    done = 0
+    while time.perf_counter() < deadline:
+        rng.choice(operations)()
+        done += 1
+    results.put(done)
+
+
+def writer(path, size, seed, barrier, stop):
+    store = SQLiteRecipeStore(path)
+    rng = random.Random(seed)
+    fresh = iter_recipes(10**6, seed=seed, start_id=size * (seed + 10))
+    barrier.wait()
+    while not stop.is_set():
+        if rng.random() < 0.5:
+            store.add(next(fresh))
+        else:
+            store.update(rng.randint(1, size), next(fresh))
+        time.sleep(1 / WRITES_PER_SECOND)
+
+
+def run(target, size, workers, writers, duration):
+    barrier = multiprocessing.Barrier(workers + writers)
+    results = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=reader, args=(target, size, seed, barrier, duration, results))
+        for seed in range(workers)
+    ] + [
+        multiprocessing.Process(target=writer, args=(target, size, 1000 + seed, barrier, stop))
+        for seed in range(writers)
+    ]
+    for process in processes:
+        process.start()
+    total = sum(results.get() for _ in range(workers))
+    stop.set()
+    for process in processes:
+        process.join()
+    return total / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--writers", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--url", help="Benchmark a running server instead of the store")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            target, writers = args.url.rstrip("/"), 0
+            size = json.loads(urllib.request.urlopen(f"{target}/api/stats").read())["total_recipes"]
+        else:
+            target, writers, size = os.path.join(tmp, "recipes.db"), args.writers, args.size
+            start = time.perf_counter()
+            SQLiteRecipeStore(target, iter_recipes(size)).close()
+            print(f"built {size:,} recipes in {time.perf_counter() - start:.1f}s")
+
+        print(f"{os.cpu_count()} CPUs, {writers} writer process(es), {args.duration:.0f}s per run")
+        print(f"{'workers':>8}{'ops/s':>12}{'speedup':>10}{'efficiency':>12}")
+        baseline = None
+        for workers in args.workers:
+            rate = run(target, size, workers, writers, args.duration)
+            baseline = baseline or rate / workers
+            speedup = rate / baseline
+            print(f"{workers:>8}{rate:>12,.0f}{speedup:>9.2f}x{speedup / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Synthetic recipe catalog generator shared by the benchmark scripts.
+
+Recipes are built with Recipe.model_construct to skip validation, so that
+generating a million-recipe catalog takes seconds rather than minutes.
+"""
+
+import random
+from typing import Iterator, List
+
+from app.models import Recipe
+
+CUISINES = ["Italian", "Indian", "Asian", "Mexican", "American", "French",
+            "Thai", "Greek", "Japanese", "Spanish", "Korean", "Lebanese"]
+
+BASE_INGREDIENTS = [
+    "rice", "pasta", "garlic", "onion", "tomato", "cheese", "butter", "cream",
+    "chicken", "beef", "pork", "tofu", "egg", "milk", "flour", "sugar", "salt",
+    "pepper", "basil", "cilantro", "ginger", "soy sauce", "lemon", "lime",
+    "potato", "carrot", "spinach", "mushroom", "bell pepper", "olive oil",
+    "yogurt", "lentils", "chickpeas", "coconut milk", "noodles", "shrimp",
+    "salmon", "bacon", "avocado", "corn", "beans", "cumin", "paprika",
+    "cinnamon", "honey", "vinegar", "broccoli", "zucchini", "eggplant", "peas",
+]
+
+MODIFIERS = ["", "", "", "fresh", "chopped", "minced", "grated", "smoked",
+             "roasted", "dried", "ground", "parmesan", "cheddar", "red", "green",
+             "sliced", "diced", "frozen", "organic", "baby"]
+
+DISHES = ["Curry", "Stir Fry", "Salad", "Soup", "Stew", "Bowl", "Tacos", "Pie",
+          "Risotto", "Noodles", "Casserole", "Skewers", "Wrap", "Bake", "Fritters"]
+
+
+def _ingredient(rng: random.Random) -> str:
+    modifier = rng.choice(MODIFIERS)
+    base = rng.choice(BASE_INGREDIENTS)
+    return f"{modifier} {base}" if modifier else base
+
+
+def iter_recipes(n: int, seed: int = 0, start_id: int = 1) -> Iterator[Recipe]:
+    """Yield n synthetic recipes with IDs starting at start_id."""
+    rng = random.Random(seed)
+    for i in range(n):
+        ingredients = list({_ingredient(rng) for _ in range(rng.randint(3, 10))})
+        main = ingredients[0].split()[-1].title()
+        yield Recipe.model_construct(
+            id=start_id + i,
+            name=f"{main} {rng.choice(DISHES)} #{i}",
+            ingredients=ingredients,
+            instructions=f"Prepare the {', '.join(ingredients)}. Cook until done and serve warm.",
+            cuisine=rng.choice(CUISINES),
+            servings=rng.choice([1, 2, 4, 6, 8]),
+            prep_time=rng.choice([None, 5, 10, 15, 20, 30, 45, 60]),
+            cook_time=rng.choice([None, 0, 10, 20, 30, 45, 60, 90, 120]),
+        )
+
+
+def generate_recipes(n: int, seed: int = 0) -> List[Recipe]:
+    """Build a list of n synthetic recipes."""
+    return list(iter_recipes(n, seed=seed))
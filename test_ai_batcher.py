@@ -0,0 +1,217 @@
+"""
+Tests for AI request micro-batching (app/ai_batcher.py), provider rate
+budgets (app/rate_limit.py) and the batch suggestion endpoint.
+Run with: python -m pytest test_ai_batcher.py
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ai_helper
+from app.ai_batcher import MicroBatcher
+from app.main import app
+from app.rate_limit import ProviderBudget, TokenBucket
+from test_ai_helper import FakeClock, fresh_router, mock_hf, stub_upstream  # noqa: F401 (fixtures)
+
+
+class CountingUpstream:
+    def __init__(self, delay=0.01, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, ingredients):
+        self.calls.append(ingredients)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.fail:
+            raise RuntimeError("upstream failed")
+        return f"recipe for {', '.join(ingredients)}"
+
+
+def test_batcher_dedupes_and_bounds_parallelism():
+    upstream = CountingUpstream()
+    batcher = MicroBatcher(upstream, window=0.01, max_batch=100, max_parallel=3)
+
+    async def burst():
+        keys = [(f"item {i % 10}",) for i in range(40)]
+        return await asyncio.gather(*(batcher.submit(key, list(key)) for key in keys))
+
+    results = asyncio.run(burst())
+    assert results[0] == results[10] == "recipe for item 0"
+    assert len(upstream.calls) == 10
+    assert upstream.peak == 3
+    stats = batcher.stats()
+    assert stats["requests"] == 40 and stats["deduplicated"] == 30
+    assert stats["batches"] == 1 and stats["largest_batch"] == 10
+
+
+def test_batcher_flushes_full_batches_without_waiting_for_the_window():
+    upstream = CountingUpstream(delay=0)
+    batcher = MicroBatcher(upstream, window=10.0, max_batch=4, max_parallel=4)
+
+    async def burst():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit((str(i),), [str(i)]) for i in range(8))), timeout=1)
+
+    assert len(asyncio.run(burst())) == 8
+    assert batcher.stats()["batches"] == 2
+
+
+def test_batcher_failure_reaches_every_waiter_and_is_not_kept():
+    upstream = CountingUpstream(fail=True)
+    batcher = MicroBatcher(upstream, window=0.001)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(("rice",), ["rice"]) for _ in range(3)),
+                                       return_exceptions=True)
+        upstream.fail = False
+        return results, await batcher.submit(("rice",), ["rice"])
+
+    failures, retried = asyncio.run(run())
+    assert all(isinstance(error, RuntimeError) for error in failures)
+    assert retried == "recipe for rice"
+    assert len(upstream.calls) == 2
+
+
+def test_cancelled_dispatch_releases_its_waiters():
+    upstream = CountingUpstream(delay=10)
+    batcher = MicroBatcher(upstream, window=0.001, max_parallel=1)
+
+    async def run():
+        waiters = [asyncio.ensure_future(batcher.submit((item,), [item])) for item in ("rice", "rice", "beans")]
+        await asyncio.sleep(0.05)
+        # One call running, one queued for a slot; shutdown cancels both
+        for task in list(batcher._tasks):
+            task.cancel()
+        return await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), timeout=1)
+
+    results = asyncio.run(run())
+    assert all(isinstance(error, RuntimeError) and "cancelled" in str(error) for error in results)
+    assert batcher.stats()["failed"] == 2
+
+
+def test_token_bucket_refills_and_settles():
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)
+    assert bucket.wait_time(60) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now = 30
+    assert bucket.available() == pytest.approx(30)
+    bucket.give_back(100)
+    assert bucket.available() == 60
+    bucket.drain()
+    assert bucket.available() == 0
+    assert TokenBucket(per_minute=0).wait_time(10**9) == 0
+
+
+def test_budget_waits_for_room_or_rejects():
+    budget = ProviderBudget("groq", requests_per_minute=600, tokens_per_minute=6000)
+
+    async def run():
+        assert await budget.acquire(6000, max_wait=0)
+        started = time.monotonic()
+        assert await budget.acquire(10, max_wait=1)
+        waited = time.monotonic() - started
+        assert not await budget.acquire(3000, max_wait=0.5)
+        return waited
+
+    assert 0.05 < asyncio.run(run()) < 0.5
+    assert budget.stats()["granted"] == 2
+    assert budget.stats()["waited"] == 1
+    assert budget.stats()["rejected"] == 1
+
+
+def test_hf_calls_wait_for_the_request_budget(mock_hf, monkeypatch):
+    budget = ProviderBudget("huggingface", requests_per_minute=600)
+    budget.requests.drain()
+    monkeypatch.setattr(ai_helper, "hf_budget", budget)
+
+    async def burst():
+        started = time.monotonic()
+        results = await asyncio.gather(*[
+            ai_helper.get_ai_recipe_suggestion([f"ingredient {i}"]) for i in range(3)
+        ])
+        await ai_helper.close_ai_clients()
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(burst())
+    assert all(r["suggestion"] == "Mock recipe" for r in results)
+    # 10 requests per second from an empty bucket: the third waits ~0.3s
+    assert elapsed >= 0.25
+    assert budget.stats()["waited"] == 3
+
+
+def test_provider_429_drains_the_budget(mock_hf, monkeypatch):
+    budget = ProviderBudget("huggingface", requests_per_minute=60)
+    monkeypatch.setattr(ai_helper, "hf_budget", budget)
+    monkeypatch.setattr(ai_helper, "AI_RATE_LIMIT_MAX_WAIT", 0.1)
+
+    async def throttled(request):
+        return httpx.Response(429, json={"error": "rate limited"})
+
+    class ThrottledClients(ai_helper._ProviderClients):
+        def __init__(self):
+            super().__init__()
+            self.hf = httpx.AsyncClient(transport=httpx.MockTransport(throttled))
+
+    monkeypatch.setattr(ai_helper, "_ProviderClients", ThrottledClients)
+
+    async def run():
+        first = await ai_helper.get_ai_recipe_suggestion(["rice"])
+        second = await ai_helper.get_ai_recipe_suggestion(["beans"])
+        await ai_helper.close_ai_clients()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert "temporarily unavailable" in first["suggestion"]
+    assert "temporarily unavailable" in second["suggestion"]
+    stats = budget.stats()
+    assert stats["provider_throttled"] == 1
+    # The drained budget turned the second request away without a call
+    assert stats["granted"] == 1 and stats["rejected"] == 1
+
+
+def test_saturated_budget_skips_the_provider_without_tripping_its_breaker(stub_upstream, monkeypatch):
+    budget = ProviderBudget("groq", requests_per_minute=60)
+    budget.requests.drain()
+    monkeypatch.setattr(ai_helper, "groq_budget", budget)
+    monkeypatch.setattr(ai_helper, "AI_RATE_LIMIT_MAX_WAIT", 0)
+
+    for i in range(10):
+        result = asyncio.run(ai_helper.get_ai_recipe_suggestion([f"ingredient {i}"]))
+        assert result["suggestion"] == f"Recipe with ingredient {i}"
+
+    groq = ai_helper.provider_router.provider("groq")
+    assert groq.breaker.state == "closed" and groq.breaker.error_rate() == 0
+    assert groq.counters["throttled"] == 10 and groq.counters["failures"] == 0
+    assert stub_upstream == {"groq": 0, "hf": 10}
+    # Turned away by our own budget, so no hedge was needed
+    assert ai_helper.provider_router.counters["hedges_fired"] == 0
+
+
+def test_batch_endpoint_answers_in_order_and_shares_duplicates(stub_upstream):
+    client = TestClient(app)
+    batch = [["rice", "egg"], ["leek"], ["Egg", "Rice"], ["leek"], ["tofu"]]
+    response = client.post("/api/ai/suggest/batch", json={"requests": batch})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["ingredients_used"] for item in body] == batch
+    assert body[0]["suggestion"] == body[2]["suggestion"]
+    # Groq (stubbed to fail) and Hugging Face are each called once per distinct list
+    assert stub_upstream == {"groq": 3, "hf": 3}
+
+    assert client.post("/api/ai/suggest/batch", json={"requests": [["rice"], []]}).status_code == 400
+    assert client.post("/api/ai/suggest/batch", json={"requests": []}).status_code == 422
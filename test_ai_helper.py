@@ -0,0 +1,303 @@
+"""
+Tests for the AI suggestion pipeline (app/ai_helper.py, app/ai_cache.py),
+with the Groq and Hugging Face clients stubbed out.
+Run with: python -m pytest test_ai_helper.py
+"""
+
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ai_helper, main
+from app.ai_cache import SuggestionCache, cache_key
+from app.fake_llm import FakeLLM
+from app.main import app
+from app.rate_limit import ProviderBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fresh_router(monkeypatch):
+    """Give each test its own provider router and budgets so their state does not leak."""
+    monkeypatch.setattr(ai_helper, "provider_router", ai_helper.build_provider_router())
+    monkeypatch.setattr(ai_helper, "groq_budget", ProviderBudget("groq"))
+    monkeypatch.setattr(ai_helper, "hf_budget", ProviderBudget("huggingface"))
+
+
+@pytest.fixture
+def stub_upstream(monkeypatch):
+    """Replace both providers with a counting stub; Groq fails by default."""
+    calls = {"groq": 0, "hf": 0}
+
+    async def groq(ingredients, profile=None):
+        calls["groq"] += 1
+        return None
+
+    async def hf(ingredients, profile=None):
+        calls["hf"] += 1
+        await asyncio.sleep(0.05)
+        return {"suggestion": f"Recipe with {', '.join(ingredients)}", "ingredients_used": ingredients}
+
+    monkeypatch.setattr(ai_helper, "GROQ_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "HF_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "_get_groq_suggestion", groq)
+    monkeypatch.setattr(ai_helper, "_get_huggingface_suggestion", hf)
+    monkeypatch.setattr(ai_helper, "suggestion_cache", SuggestionCache(max_size=8, ttl=60))
+    return calls
+
+
+def suggest(ingredients):
+    return asyncio.run(ai_helper.get_ai_recipe_suggestion(ingredients))
+
+
+def test_cache_key_is_normalized_and_order_insensitive():
+    assert cache_key(["Tomato ", "garlic", "tomato", ""]) == cache_key(["GARLIC", "tomato"])
+
+
+def test_identical_requests_hit_the_cache(stub_upstream):
+    first = suggest(["chicken", "garlic"])
+    second = suggest(["Garlic", "Chicken"])
+
+    assert first["suggestion"] == second["suggestion"]
+    assert second["ingredients_used"] == ["Garlic", "Chicken"]
+    assert stub_upstream == {"groq": 1, "hf": 1}
+    stats = ai_helper.suggestion_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_failures_are_not_cached(stub_upstream, monkeypatch):
+    async def failing(ingredients, profile=None):
+        return None
+
+    monkeypatch.setattr(ai_helper, "_get_huggingface_suggestion", failing)
+    for _ in range(2):
+        result = suggest(["rice"])
+        assert "temporarily unavailable" in result["suggestion"]
+    assert ai_helper.suggestion_cache.stats()["misses"] == 2
+
+
+def test_concurrent_misses_are_coalesced(stub_upstream):
+    async def burst():
+        return await asyncio.gather(*[
+            ai_helper.get_ai_recipe_suggestion(["egg", "rice"]) for _ in range(10)
+        ])
+
+    results = asyncio.run(burst())
+    assert len({r["suggestion"] for r in results}) == 1
+    assert stub_upstream["hf"] == 1
+    stats = ai_helper.suggestion_cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["size"]) == (1, 9, 1)
+
+
+def test_leader_errors_propagate_to_waiters():
+    cache = SuggestionCache()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def burst():
+        return await asyncio.gather(
+            *[cache.get_or_compute(("x",), boom) for _ in range(3)],
+            return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.stats()["size"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    cache = SuggestionCache()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.get_or_compute(("x",), slow))
+        second = asyncio.ensure_future(cache.get_or_compute(("x",), slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+    assert calls == [1]
+    assert cache.stats()["size"] == 1
+
+
+def test_ttl_expiry_and_lru_eviction():
+    clock = FakeClock()
+    cache = SuggestionCache(max_size=2, ttl=10, clock=clock)
+
+    def get(key, value):
+        async def compute():
+            return value
+        return asyncio.run(cache.get_or_compute((key,), compute))
+
+    get("a", "A")
+    get("b", "B")
+    get("a", "A2")      # hit, refreshes "a"
+    get("c", "C")       # evicts "b"
+
+    assert get("b", "B2") == "B2"
+    assert cache.stats()["evictions"] == 2
+
+    clock.now = 11
+    assert get("c", "C2") == "C2"
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.fixture
+def mock_hf(monkeypatch):
+    """Route the pooled Hugging Face client to an in-process mock transport."""
+    state = {"active": 0, "peak": 0, "delay": 0.02}
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(state["delay"])
+        state["active"] -= 1
+        return httpx.Response(200, json=[{"generated_text": "Mock recipe"}])
+
+    real_clients = ai_helper._ProviderClients
+
+    class MockClients(real_clients):
+        def __init__(self):
+            super().__init__()
+            self.hf = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(ai_helper, "_ProviderClients", MockClients)
+    monkeypatch.setattr(ai_helper, "_clients", None)
+    monkeypatch.setattr(ai_helper, "GROQ_API_KEY", None)
+    monkeypatch.setattr(ai_helper, "HF_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "suggestion_cache", SuggestionCache())
+    return state
+
+
+def test_hf_calls_respect_concurrency_limit(mock_hf, monkeypatch):
+    monkeypatch.setattr(ai_helper, "HF_MAX_CONCURRENCY", 3)
+
+    async def burst():
+        results = await asyncio.gather(*[
+            ai_helper.get_ai_recipe_suggestion([f"ingredient {i}"]) for i in range(20)
+        ])
+        await ai_helper.close_ai_clients()
+        return results
+
+    results = asyncio.run(burst())
+    assert all(r["suggestion"] == "Mock recipe" for r in results)
+    assert mock_hf["peak"] == 3
+
+
+def test_slow_provider_times_out(mock_hf, monkeypatch):
+    monkeypatch.setattr(ai_helper, "AI_TIMEOUT", 0.05)
+    mock_hf["delay"] = 1.0
+
+    result = suggest(["rice"])
+    assert "temporarily unavailable" in result["suggestion"]
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    """Serve Groq streaming from a local FakeLLM."""
+    fake = FakeLLM(token_delay=0.001)
+    monkeypatch.setattr(ai_helper, "GROQ_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "HF_API_KEY", None)
+    monkeypatch.setattr(ai_helper, "_stream_groq_suggestion", fake.stream)
+    monkeypatch.setattr(ai_helper, "suggestion_cache", SuggestionCache())
+    return fake
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return events
+
+
+def test_stream_endpoint_sends_tokens_then_done(fake_groq):
+    client = TestClient(app)
+    response = client.get("/api/ai/suggest/stream", params={"ingredients": "chicken, garlic"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    tokens = [data["token"] for kind, data in events if kind == "message"]
+    assert tokens == fake_groq.tokens()
+    assert events[-1] == ("done", {"ingredients_used": ["chicken", "garlic"]})
+
+    # The finished stream is cached, so the next request is one chunk
+    again = parse_sse(client.get("/api/ai/suggest/stream", params={"ingredients": "garlic,chicken"}).text)
+    assert [data["token"] for kind, data in again if kind == "message"] == ["".join(tokens)]
+    assert fake_groq.calls == 1
+
+
+def test_stream_falls_back_to_hf_before_first_token(fake_groq, monkeypatch):
+    fake_groq.fail = True
+
+    async def hf(ingredients, profile=None):
+        return {"suggestion": "HF recipe", "ingredients_used": ingredients}
+
+    monkeypatch.setattr(ai_helper, "HF_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "_get_huggingface_suggestion", hf)
+    events = parse_sse(TestClient(app).get("/api/ai/suggest/stream", params={"ingredients": "rice"}).text)
+    assert events[0] == ("message", {"token": "HF recipe"})
+
+
+def test_stream_failure_is_logged_and_reported(monkeypatch, caplog):
+    async def broken(ingredients, profile=None):
+        yield "Pasta"
+        raise RuntimeError("upstream reset")
+
+    monkeypatch.setattr(main, "stream_ai_recipe_suggestion", broken)
+    with caplog.at_level(logging.ERROR, logger="app.main"):
+        events = parse_sse(TestClient(app).get("/api/ai/suggest/stream",
+                                                params={"ingredients": "unobtainium"}).text)
+    assert events == [("message", {"token": "Pasta"}), ("error", {"detail": "AI stream interrupted"})]
+    assert "upstream reset" in caplog.text
+
+
+def test_stream_stops_upstream_when_client_disconnects(fake_groq):
+    fake_groq.token_delay = 0.01
+    received = []
+
+    async def scenario():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await asyncio.sleep(0.05)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                received.append(message.get("body", b""))
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/api/ai/suggest/stream",
+            "raw_path": b"/api/ai/suggest/stream", "query_string": b"ingredients=chicken",
+            "headers": [], "client": ("test", 1), "server": ("test", 80), "root_path": "",
+        }
+        await app(scope, receive, send)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert fake_groq.cancelled
+    assert 0 < fake_groq.tokens_sent < len(fake_groq.tokens())
+    assert ai_helper.suggestion_cache.stats()["size"] == 0
@@ -0,0 +1,160 @@
+"""
+Tests for bulk NDJSON/CSV import and export (app/bulk.py).
+Run with: python -m pytest test_bulk.py
+"""
+
+import io
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import bulk, main
+from app.main import app
+from app.sqlite_store import SQLiteRecipeStore
+from app.store import RecipeStore
+from test_store import make_recipe
+
+
+def ndjson(recipes):
+    return "".join(r.model_dump_json() + "\n" for r in recipes)
+
+
+def content(recipes):
+    return [r.model_dump(exclude={"id"}) for r in recipes]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "recipes_db", RecipeStore())
+    return TestClient(app)
+
+
+def test_invalid_rows_are_reported_without_aborting_the_batch():
+    rng = random.Random(1)
+    good = [make_recipe(rng, recipe_id=500 + i) for i in range(5)]
+    lines = [good[0].model_dump_json(), "{not json", good[1].model_dump_json(), "",
+             json.dumps({"name": "No ingredients", "ingredients": [], "instructions": "x" * 20,
+                         "cuisine": "Thai"}),
+             *[r.model_dump_json() for r in good[2:]]]
+    store = RecipeStore()
+    report = bulk.import_lines(bulk.RecipeImporter(store), [line + "\n" for line in lines], batch_size=2)
+
+    assert (report.imported, report.failed) == (5, 2)
+    assert [e.row for e in report.errors] == [2, 5]
+    assert "ingredients" in report.errors[1].error
+    # Fresh IDs from the allocator, in input order
+    assert [r.id for r in store] == [1, 2, 3, 4, 5]
+    assert (report.first_id, report.last_id) == (1, 5)
+    assert content(store) == content(good)
+
+
+def test_keep_ids_keeps_free_ids_only():
+    rng = random.Random(2)
+    store = RecipeStore([make_recipe(rng, recipe_id=3)])
+    rows = [make_recipe(rng, recipe_id=i) for i in (10, 3)]
+    bulk.import_lines(bulk.RecipeImporter(store, keep_ids=True), io.StringIO(ndjson(rows)))
+    assert [r.id for r in store] == [3, 10, 11]
+
+    rows = [make_recipe(rng, recipe_id=i) for i in (-1, 2**32, 12)]
+    report = bulk.import_lines(bulk.RecipeImporter(store, keep_ids=True), io.StringIO(ndjson(rows)))
+    assert (report.imported, report.failed) == (1, 2)
+    assert [e.row for e in report.errors] == [1, 2] and "outside" in report.errors[0].error
+    assert [r.id for r in store] == [3, 10, 11, 12] and store.add(make_recipe(rng)).id == 13
+
+
+def test_error_list_is_capped():
+    store = RecipeStore()
+    report = bulk.import_lines(bulk.RecipeImporter(store), ["[]\n"] * (bulk.MAX_REPORTED_ERRORS + 5))
+    assert report.failed == bulk.MAX_REPORTED_ERRORS + 5
+    assert len(report.errors) == bulk.MAX_REPORTED_ERRORS
+    assert report.errors_truncated
+
+
+@pytest.mark.parametrize("fmt", bulk.FORMATS)
+def test_export_import_round_trip(fmt):
+    rng = random.Random(3)
+    recipes = [make_recipe(rng) for _ in range(50)]
+    for recipe in recipes:
+        recipe.servings = rng.choice([1, 2, 4])
+    # Quoted newlines and commas must survive CSV batching
+    recipes[7].instructions = 'Mix "well",\nthen bake.\nServe.'
+    # Unset fields stay unset instead of taking the model defaults
+    recipes[3].servings = None
+    recipes[3].prep_time = recipes[3].cook_time = None
+    # Separators and backslashes inside an ingredient are escaped
+    recipes[5].ingredients = ["salt | pepper", "a\\|b", "trailing\\", "C:\\tmp", "oil"]
+    source = RecipeStore(recipes)
+
+    exported = "".join(bulk.export_chunks(source.iter_all(), fmt))
+    target = RecipeStore()
+    report = bulk.import_lines(bulk.RecipeImporter(target, fmt, keep_ids=True),
+                               io.StringIO(exported, newline=""), batch_size=3)
+    assert report.failed == 0
+    assert [r.model_dump() for r in target] == [r.model_dump() for r in source]
+    assert target.get(recipes[3].id).servings is None
+
+
+def test_csv_empty_cells_take_defaults_and_unescaped_separators_split():
+    store = RecipeStore()
+    lines = ["name,ingredients,instructions,cuisine,servings,prep_time\n",
+             "Soup,leek|potato\\|mash|C:\\x,Simmer for an hour.,French,,null\n"]
+    report = bulk.import_lines(bulk.RecipeImporter(store, "csv"), lines)
+    assert report.failed == 0
+    recipe = next(iter(store))
+    assert recipe.ingredients == ["leek", "potato|mash", "C:\\x"]
+    assert (recipe.servings, recipe.prep_time) == (4, None)
+
+
+def test_bulk_endpoints(client):
+    rng = random.Random(4)
+    recipes = [make_recipe(rng) for _ in range(30)]
+    body = ndjson(recipes) + '{"name": "broken"}\n'
+    response = client.post("/api/recipes/bulk", params={"batch_size": 7}, content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"]) == (30, 1)
+    assert report["errors"][0]["row"] == 31
+
+    export = client.get("/api/recipes/export", params={"format": "csv"})
+    assert export.headers["content-type"].startswith("text/csv")
+    assert len(export.text.strip().splitlines()) == 31
+
+    again = client.post("/api/recipes/bulk", params={"format": "csv"}, content=export.text).json()
+    assert again["imported"] == 30
+    assert again["first_id"] == 31
+    assert main.recipes_db.stats.total == 60
+
+
+def test_invalid_utf8_rows_are_reported_without_aborting(client):
+    rng = random.Random(6)
+    lines = [make_recipe(rng).model_dump_json().encode() for _ in range(6)]
+    lines[3] = lines[3].replace(b"Recipe", b"Recipe \xff\xfe")
+    response = client.post("/api/recipes/bulk", params={"batch_size": 2}, content=b"\n".join(lines))
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"]) == (5, 1)
+    assert report["errors"] == [{"row": 4, "error": "row: not valid UTF-8"}]
+
+    csv_body = b"name,ingredients,instructions,cuisine\nBad \xc3,rice,Cook the rice well.,Thai\n" \
+               b"Good,rice,Cook the rice well.,Thai\n"
+    report = client.post("/api/recipes/bulk", params={"format": "csv"}, content=csv_body).json()
+    assert (report["imported"], report["failed"]) == (1, 1) and report["errors"][0]["row"] == 1
+
+
+def test_cli_import_and_export(tmp_path, capsys):
+    rng = random.Random(5)
+    source = tmp_path / "in.ndjson"
+    source.write_text(ndjson(make_recipe(rng) for _ in range(20)))
+    db = str(tmp_path / "recipes.db")
+
+    assert bulk.main(["import", str(source), "--db", db]) == 0
+    assert json.loads(capsys.readouterr().out)["imported"] == 20
+
+    out = tmp_path / "out.csv"
+    assert bulk.main(["export", str(out), "--db", db]) == 0
+    store = SQLiteRecipeStore(db)
+    assert len(store) == 20
+    assert out.read_text().splitlines()[0] == ",".join(bulk.CSV_FIELDS)
+    store.close()
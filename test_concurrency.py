@@ -0,0 +1,135 @@
+"""
+Stress test for concurrent store access from many threads (app/store.py,
+app/sqlite_store.py, app/rwlock.py).
+Run with: python -m pytest test_concurrency.py
+"""
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.rwlock import RWLock
+from test_stats import check as check_stats
+from test_store import CUISINES, check_indexes, make_recipe, make_store  # noqa: F401 (fixture)
+
+THREADS = 16
+OPS_PER_THREAD = 250
+
+
+def writer(store, seed, barrier):
+    """
+    Mutate only recipes this worker created, so the expected final state
+    of each of them is known exactly, whatever the interleaving.
+    """
+    rng = random.Random(seed)
+    expected = {}
+    barrier.wait()
+    for _ in range(OPS_PER_THREAD):
+        op = rng.random()
+        if op < 0.45 or not expected:
+            recipe = store.add(make_recipe(rng))
+            expected[recipe.id] = recipe.model_dump()
+        elif op < 0.75:
+            target = rng.choice(list(expected))
+            updated = store.update(target, make_recipe(rng))
+            expected[target] = updated.model_dump()
+        else:
+            target = rng.choice(list(expected))
+            assert store.delete(target) is not None
+            del expected[target]
+    return expected
+
+
+def reader(store, seed, barrier, stop):
+    rng = random.Random(seed)
+    barrier.wait()
+    reads = 0
+    while not stop.is_set() or reads < 20:
+        cuisine = rng.choice(CUISINES)
+        results = store.search(cuisine=cuisine, max_prep_time=rng.choice([10, 45]))
+        ids = [r.id for r in results]
+        assert ids == sorted(set(ids))
+        assert all(r.cuisine.casefold() == cuisine.casefold() for r in results)
+        assert all(r.prep_time for r in results)
+        store.pantry_matches(["cheese", "rice"], 5)
+        store.stats_summary(3)
+        reads += 1
+    return reads
+
+
+def test_concurrent_mutations_keep_store_consistent(make_store):
+    rng = random.Random(0)
+    initial = [make_recipe(rng) for _ in range(100)]
+    store = make_store(initial)
+    untouched = {r.id: r.model_dump() for r in store}
+
+    stop = threading.Event()
+    barrier = threading.Barrier(THREADS + 4)
+    with ThreadPoolExecutor(max_workers=THREADS + 4) as pool:
+        writers = [pool.submit(writer, store, seed, barrier) for seed in range(THREADS)]
+        readers = [pool.submit(reader, store, 1000 + seed, barrier, stop) for seed in range(4)]
+        expectations = [future.result() for future in writers]
+        stop.set()
+        assert all(future.result() >= 20 for future in readers)
+
+    # Unique IDs: no two writers were handed the same new ID
+    created = [rid for expected in expectations for rid in expected]
+    assert len(created) == len(set(created))
+
+    # No lost writes: every surviving recipe has exactly its last update
+    final = {r.id: r.model_dump() for r in store}
+    wanted = dict(untouched)
+    for expected in expectations:
+        wanted.update(expected)
+    assert final == wanted
+
+    check_indexes(store)
+    check_stats(store)
+
+
+def test_writer_waits_for_readers_and_blocks_new_ones():
+    lock = RWLock()
+    events = []
+    reading = threading.Event()
+    release_reader = threading.Event()
+
+    def slow_reader():
+        with lock.read():
+            reading.set()
+            release_reader.wait()
+            events.append("reader done")
+
+    def writer():
+        with lock.write():
+            events.append("writer")
+
+    def late_reader():
+        with lock.read():
+            events.append("late reader")
+
+    threads = [threading.Thread(target=slow_reader)]
+    threads[0].start()
+    reading.wait()
+    threads.append(threading.Thread(target=writer))
+    threads[1].start()
+    while not lock._writers_waiting:
+        pass
+    threads.append(threading.Thread(target=late_reader))
+    threads[2].start()
+
+    release_reader.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert events == ["reader done", "writer", "late reader"]
+
+
+def test_nested_read_does_not_wait_for_queued_writer():
+    lock = RWLock()
+    with lock.read():
+        writer = threading.Thread(target=lambda: lock.write().__enter__())
+        writer.daemon = True
+        writer.start()
+        while not lock._writers_waiting:
+            pass
+        with lock.read():
+            pass
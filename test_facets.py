@@ -0,0 +1,206 @@
+"""
+Tests for the columnar advanced-search engine (app/facets.py) in both stores
+and the /api/recipes/advanced-search endpoint.
+Run with: python -m pytest test_facets.py
+"""
+
+import random
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.facets import FacetIndex
+from app.main import app
+from app.models import SearchFilters
+from app.stats import BUCKET_LABELS, time_bucket
+from app.store import RecipeStore
+from test_store import CUISINES, make_recipe, make_store  # noqa: F401 (fixture)
+
+SORTS = ["id", "-id", "prep_time", "-prep_time", "cook_time", "-cook_time",
+         "total_time", "-total_time", "servings", "-servings"]
+TERMS = ["cheese", "sauce", "rice", "ch", "missing"]
+
+
+def random_filters(rng):
+    def maybe(value):
+        return value if rng.random() < 0.3 else None
+
+    return SearchFilters(
+        cuisine=maybe(rng.choice(CUISINES).lower()),
+        cuisines=rng.sample(CUISINES + ["Martian"], rng.randint(0, 2)),
+        ingredient=maybe(rng.choice(TERMS)),
+        include_ingredients=rng.sample(TERMS, rng.randint(0, 1)),
+        exclude_ingredients=rng.sample(TERMS, rng.randint(0, 2)),
+        prep_time_min=maybe(rng.choice([0, 5, 10])),
+        prep_time_max=maybe(rng.choice([0, 10, 20])),
+        cook_time_min=maybe(rng.choice([10, 30])),
+        cook_time_max=maybe(rng.choice([30, 60])),
+        servings_min=maybe(rng.choice([1, 2, 4])),
+        servings_max=maybe(rng.choice([2, 4, 6])),
+        sort=rng.choice(SORTS),
+    )
+
+
+def reference(recipes, f):
+    """Brute-force filtering, sorting and disjunctive facet counts."""
+    cuisines = {c.casefold() for c in f.cuisines + ([f.cuisine] if f.cuisine else [])}
+    include = f.include_ingredients + ([f.ingredient] if f.ingredient else [])
+
+    def has(recipe, term):
+        return any(term.casefold() in i.casefold() for i in recipe.ingredients)
+
+    def in_range(value, low, high):
+        if low is None and high is None:
+            return True
+        return bool(value) and (low is None or value >= low) and (high is None or value <= high)
+
+    def checks(r):
+        return {
+            "cuisine": not cuisines or r.cuisine.casefold() in cuisines,
+            "prep": in_range(r.prep_time, f.prep_time_min, f.prep_time_max or None),
+            "cook": in_range(r.cook_time, f.cook_time_min, f.cook_time_max or None),
+            "other": ((f.servings_min is None or (r.servings or -1) >= f.servings_min)
+                      and (f.servings_max is None or (r.servings is not None and r.servings <= f.servings_max))
+                      and all(has(r, t) for t in include)
+                      and not any(has(r, t) for t in f.exclude_ingredients)),
+        }
+
+    def passing(skip=None):
+        return [r for r in recipes if all(ok for name, ok in checks(r).items() if name != skip)]
+
+    def sort_key(r):
+        field, descending = f.sort.lstrip("-"), f.sort.startswith("-")
+        if field == "id":
+            return -r.id if descending else r.id
+        if field == "total_time":
+            value = None if r.prep_time is None and r.cook_time is None else (r.prep_time or 0) + (r.cook_time or 0)
+        else:
+            value = getattr(r, field)
+        if value is None:
+            return (1, 0, r.id)
+        return (0, -value if descending else value, r.id)
+
+    def histogram(rs, attr):
+        counts = Counter(BUCKET_LABELS[time_bucket(getattr(r, attr))] for r in rs)
+        return {label: counts[label] for label in BUCKET_LABELS}
+
+    cuisine_counts = Counter()
+    labels = {}
+    for r in recipes:
+        labels.setdefault(r.cuisine.casefold(), r.cuisine)
+    for r in passing("cuisine"):
+        cuisine_counts[labels[r.cuisine.casefold()]] += 1
+
+    matched = sorted(passing(), key=sort_key)
+    facets = {
+        "cuisine": dict(cuisine_counts),
+        "prep_time": histogram(passing("prep"), "prep_time"),
+        "cook_time": histogram(passing("cook"), "cook_time"),
+    }
+    return [r.id for r in matched], facets
+
+
+def test_faceted_search_matches_brute_force(make_store):
+    rng = random.Random(11)
+    store = make_store([make_recipe(rng) for _ in range(400)])
+    for step in range(3):
+        recipes = store.all()
+        for _ in range(40):
+            filters = random_filters(rng)
+            expected_ids, expected_facets = reference(recipes, filters)
+            found, result = store.faceted_search(filters, with_facets=True)
+            assert [r.id for r in found] == expected_ids == result.ids
+            assert result.total == len(expected_ids)
+            assert result.facets["prep_time"] == expected_facets["prep_time"]
+            assert result.facets["cook_time"] == expected_facets["cook_time"]
+            # Cuisines are grouped case-insensitively under the first spelling seen
+            assert (sorted(result.facets["cuisine"].values())
+                    == sorted(expected_facets["cuisine"].values()))
+
+        ids = [r.id for r in recipes]
+        for rid in rng.sample(ids, 80):
+            store.delete(rid)
+        for rid in rng.sample(ids, 80):
+            store.update(rid, make_recipe(rng))
+        store.add_many(make_recipe(rng) for _ in range(50))
+
+
+@pytest.mark.parametrize("sort", SORTS)
+def test_keyset_pages_follow_the_sort_order(make_store, sort):
+    rng = random.Random(12)
+    store = make_store([make_recipe(rng) for _ in range(150)])
+    filters = SearchFilters(exclude_ingredients=["onion"], sort=sort)
+    full = [r.id for r in store.faceted_search(filters)[0]]
+
+    pages, after = [], 0
+    while True:
+        page, result = store.faceted_search(filters, after_id=after, limit=16)
+        assert result.total == len(full)
+        if not page:
+            break
+        pages.extend(r.id for r in page)
+        after = page[-1].id
+    assert pages == full
+
+
+def test_compaction_keeps_rows_consistent():
+    rng = random.Random(13)
+    recipes = [make_recipe(rng, recipe_id=i) for i in range(1, 3001)]
+    index = FacetIndex()
+    for recipe in recipes:
+        index.add(recipe)
+    for recipe in recipes[:2500]:
+        index.remove(recipe.id)
+
+    assert len(index) == 500
+    assert index._rows < 3000
+    filters = SearchFilters(include_ingredients=["cheese"], sort="-cook_time")
+    assert index.search(filters).ids == reference(recipes[2500:], filters)[0]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = random.Random(14)
+    monkeypatch.setattr(main, "recipes_db", RecipeStore(make_recipe(rng) for _ in range(200)))
+    return TestClient(app)
+
+
+def test_advanced_search_facets_envelope(client):
+    body = {"cuisines": ["Indian", "Italian"], "exclude_ingredients": ["rice"], "sort": "-prep_time"}
+    response = client.post("/api/recipes/advanced-search", params={"facets": True, "limit": 5,
+                                                                  "fields": "name,prep_time"}, json=body)
+    assert response.status_code == 200
+    data = response.json()
+    expected_ids, expected_facets = reference(main.recipes_db.all(), SearchFilters(**body))
+    assert data["total"] == len(expected_ids)
+    assert [r["id"] for r in data["recipes"]] == expected_ids[:5]
+    assert set(data["recipes"][0]) == {"id", "name", "prep_time"}
+    assert data["facets"]["prep_time"] == expected_facets["prep_time"]
+    assert response.headers["X-Next-Cursor"] == str(expected_ids[4])
+
+    response = client.post("/api/recipes/advanced-search", params={"facets": True, "format": "ndjson"},
+                           json=body)
+    assert response.status_code == 422
+
+
+def test_advanced_search_keeps_the_list_response(client):
+    response = client.post("/api/recipes/advanced-search",
+                           json={"cuisine": "italian", "ingredient": "cheese", "prep_time_max": 20})
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()] == [
+        r.id for r in main.recipes_db.search(cuisine="italian", ingredient="cheese", max_prep_time=20)
+    ]
+    assert client.post("/api/recipes/advanced-search",
+                       json={"cuisines": ["Martian"]}).status_code == 404
+    assert client.post("/api/recipes/advanced-search", json={"sort": "name"}).status_code == 422
+
+
+def test_stale_cursor_for_sorted_search(client):
+    response = client.post("/api/recipes/advanced-search", params={"limit": 3}, json={"sort": "cook_time"})
+    cursor = response.headers["X-Next-Cursor"]
+    main.recipes_db.delete(int(cursor))
+    response = client.post("/api/recipes/advanced-search", params={"limit": 3, "cursor": cursor},
+                           json={"sort": "cook_time"})
+    assert response.status_code == 400
@@ -0,0 +1,156 @@
+"""
+Tests for fuzzy name/ingredient search (app/fuzzy_index.py) in both stores,
+the /api/recipes/search/fuzzy endpoint and local answers on the AI path.
+Run with: python -m pytest test_fuzzy.py
+"""
+
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ai_helper, main
+from app.fuzzy_index import FIELD_WEIGHTS, INGREDIENT, NAME, FuzzyIndex, trigram_similarity
+from app.main import app
+from app.models import Recipe
+from app.store import RecipeStore
+from test_store import INGREDIENTS, make_store  # noqa: F401 (fixture)
+
+DISHES = ["Chicken Tikka Masala", "Veg Fried Rice", "Spaghetti Carbonara", "Chicken Biryani",
+          "Pasta Alfredo", "Soy Sauce Noodles", "Rice Risotto", "Garlic Bread", "Tomato Soup"]
+QUERIES = ["carbonarra", "chiken", "biryani", "fried rice", "parmesan chese", "soy sause",
+           "risoto", "tomato", "ALFREDO pasta", "xyz", "r"]
+
+
+def make_dish(rng, recipe_id=None):
+    return Recipe(
+        id=recipe_id,
+        name=f"{rng.choice(DISHES)}{rng.choice(['', '', ' Deluxe', ' #' + str(rng.randint(1, 99))])}",
+        ingredients=rng.sample(INGREDIENTS, rng.randint(1, 4)),
+        instructions="Mix everything together and cook.",
+        cuisine="Fusion",
+    )
+
+
+def brute_force(recipes, query, limit, min_score=0.3):
+    """Reference ranking: every recipe scored by its best name or ingredient match."""
+    scored = []
+    for recipe in recipes:
+        score = max([trigram_similarity(query, recipe.name) * FIELD_WEIGHTS[NAME]] + [
+            trigram_similarity(query, ingredient) * FIELD_WEIGHTS[INGREDIENT]
+            for ingredient in recipe.ingredients
+        ])
+        if score >= min_score:
+            scored.append((-round(score, 9), recipe.id))
+    return sorted(scored)[:limit]
+
+
+def ranking(matches):
+    return [(-round(hit.score, 9), recipe.id) for recipe, hit in matches]
+
+
+def test_fuzzy_search_matches_brute_force_through_mutations(make_store):
+    rng = random.Random(3)
+    store = make_store([make_dish(rng) for _ in range(300)])
+    for step in range(3):
+        recipes = store.all()
+        for query in QUERIES:
+            for limit in (1, 7, 50):
+                assert ranking(store.fuzzy_search(query, limit)) == brute_force(recipes, query, limit)
+
+        ids = [r.id for r in recipes]
+        for rid in rng.sample(ids, 60):
+            store.delete(rid)
+        for rid in rng.sample(ids, 60):
+            store.update(rid, make_dish(rng))
+        store.add_many(make_dish(rng) for _ in range(40))
+
+
+def test_typos_find_the_dish():
+    store = RecipeStore(Recipe(name=name, ingredients=["rice"], instructions="Cook it well.",
+                               cuisine="Any") for name in DISHES)
+    (recipe, hit), *_ = store.fuzzy_search("spagetti carbonarra")
+    assert recipe.name == "Spaghetti Carbonara"
+    assert hit.field == NAME and hit.text == "Spaghetti Carbonara"
+
+    (recipe, hit), *_ = store.fuzzy_search("RICE")
+    assert hit.field == INGREDIENT and hit.score == pytest.approx(FIELD_WEIGHTS[INGREDIENT])
+    assert store.fuzzy_search("qqqq") == []
+
+
+def test_removed_phrases_are_compacted_away():
+    index = FuzzyIndex()
+    for rid in range(1, 3001):
+        index.add(rid, f"Dish number {rid}", ["salt"])
+    for rid in range(1, 2900):
+        index.remove(rid, f"Dish number {rid}", ["salt"])
+
+    assert len(index) == 102
+    assert index._rows < 3001
+    assert [hit.recipe_id for hit in index.search("dish number 2950", 1)] == [2950]
+    assert [hit.recipe_id for hit in index.search("salt", 3)] == [2900, 2901, 2902]
+    assert index.search("dish number 15", 10, min_score=0.9) == []
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = random.Random(5)
+    monkeypatch.setattr(main, "recipes_db", RecipeStore(make_dish(rng) for _ in range(100)))
+    return TestClient(app)
+
+
+def test_fuzzy_endpoint(client):
+    response = client.get("/api/recipes/search/fuzzy", params={"q": "chiken biriyani", "limit": 3})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 3
+    assert all(r["recipe"]["name"].startswith("Chicken Biryani") for r in results)
+    assert results[0]["matched_field"] == "name"
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+
+    assert client.get("/api/recipes/search/fuzzy", params={"q": "zzzz"}).status_code == 404
+    assert client.get("/api/recipes/search/fuzzy", params={"q": ""}).status_code == 422
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    async def fake_suggestion(ingredients, profile=None):
+        calls.append(ingredients)
+        return {"suggestion": "LLM recipe", "ingredients_used": ingredients}
+
+    monkeypatch.setattr(main, "get_ai_recipe_suggestion", fake_suggestion)
+    return calls
+
+
+def test_ai_suggest_answers_dish_names_locally(client, llm_calls):
+    response = client.get("/api/ai/suggest", params={"ingredients": "Spagheti Carbonara"}).json()
+    assert response["source"] == "local"
+    assert main.recipes_db.get(response["recipe_id"]).name.startswith("Spaghetti Carbonara")
+    assert response["suggestion"].startswith("**Recipe Name:** Spaghetti Carbonara")
+    assert llm_calls == []
+
+    # Ingredients match an ingredient better than any dish name
+    for ingredients in (["rice"], ["chicken", "garlic", "onion"]):
+        response = client.post("/api/ai/suggest", json=ingredients).json()
+        assert response["source"] == "ai" and response["recipe_id"] is None
+    assert llm_calls == [["rice"], ["chicken", "garlic", "onion"]]
+
+
+def test_ai_local_match_can_be_disabled(client, llm_calls, monkeypatch):
+    monkeypatch.setattr(ai_helper, "AI_LOCAL_MATCH", False)
+    response = client.get("/api/ai/suggest", params={"ingredients": "Spaghetti Carbonara"}).json()
+    assert response["source"] == "ai"
+    assert len(llm_calls) == 1
+
+
+def test_ai_stream_sends_local_match_as_one_chunk(client):
+    response = client.get("/api/ai/suggest/stream", params={"ingredients": "tomato soup"})
+    events = response.text.strip().split("\n\n")
+    assert len(events) == 2
+    assert json.loads(events[0][len("data: "):])["token"].startswith("**Recipe Name:** Tomato Soup")
+    done = json.loads(events[1].split("data: ", 1)[1])
+    assert done["source"] == "local"
+    assert main.recipes_db.get(done["recipe_id"]).name.startswith("Tomato Soup")
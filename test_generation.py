@@ -0,0 +1,101 @@
+"""
+Tests for generation profiles (app/generation.py): prompt styles, per-endpoint
+token caps, summary mode and per-request token metrics, with Groq replaced by
+a local FakeGroq client.
+Run with: python -m pytest test_generation.py
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ai_helper, metrics
+from app.ai_cache import SuggestionCache
+from app.fake_llm import DEFAULT_RECIPE, FakeGroq, word_tokens
+from app.generation import COMPACT, FULL, GenerationProfile, build_prompt
+from app.main import app
+from app.rate_limit import ProviderBudget
+from app.recipe_parser import parse_recipe
+from test_metrics import sample
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    fake = FakeGroq()
+    clients = SimpleNamespace(groq=fake, groq_limit=asyncio.Semaphore(4))
+    monkeypatch.setattr(ai_helper, "GROQ_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "HF_API_KEY", None)
+    monkeypatch.setattr(ai_helper, "_get_clients", lambda: clients)
+    monkeypatch.setattr(ai_helper, "groq_budget", ProviderBudget("groq"))
+    monkeypatch.setattr(ai_helper, "provider_router", ai_helper.build_provider_router())
+    monkeypatch.setattr(ai_helper, "suggestion_cache", SuggestionCache(max_size=8, ttl=60))
+    return fake
+
+
+def test_compact_prompt_keeps_the_parsed_layout_in_fewer_tokens():
+    compact = build_prompt(["chicken", "garlic"], GenerationProfile("suggest", COMPACT, 700))
+    full = build_prompt(["chicken", "garlic"], GenerationProfile("suggest", FULL, 700))
+    summary = build_prompt(["chicken", "garlic"], GenerationProfile("summary", FULL, 200, summary=True))
+
+    assert "chicken, garlic" in compact and "chicken, garlic" in full
+    for header in ("**Recipe Name:**", "**Ingredients:**", "**Instructions:**"):
+        assert header in compact and header in full
+    assert "**Tips:**" in full and "**Tips:**" not in compact
+    assert ai_helper.estimate_tokens(compact) * 2 < ai_helper.estimate_tokens(full)
+    assert "**Summary:**" in summary and "**Instructions:**" not in summary
+
+    # The compact answer still parses into a recipe
+    reply = FakeGroq().reply(compact)
+    assert parse_recipe(reply, ["chicken", "garlic"]) is not None
+
+
+def test_endpoints_pick_their_profile():
+    assert ai_helper.generation_profile("batch").name == "batch"
+    summary = ai_helper.generation_profile("stream", summary=True)
+    assert summary.summary and summary.max_tokens == ai_helper.GENERATION_PROFILES["summary"].max_tokens
+
+
+def test_summary_is_cached_apart_and_not_saved(groq):
+    client = TestClient(app)
+    short = client.get("/api/ai/suggest", params={"ingredients": "quinoa, leek", "summary": "true"}).json()
+    assert short["summary"] and short["recipe"] is None
+    assert "**Summary:**" in short["suggestion"]
+
+    full = client.get("/api/ai/suggest", params={"ingredients": "quinoa, leek"}).json()
+    assert not full["summary"] and "**Instructions:**" in full["suggestion"]
+    assert groq.calls == 2
+
+    client.get("/api/ai/suggest", params={"ingredients": "leek, quinoa", "summary": "true"})
+    assert groq.calls == 2
+
+
+def test_token_usage_and_truncation_are_recorded_per_profile(groq):
+    tight = GenerationProfile("suggest", COMPACT, 20)
+    before = metrics.registry.render()
+    result = asyncio.run(ai_helper.get_ai_recipe_suggestion(["quinoa"], tight))
+    after = metrics.registry.render()
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    assert result["suggestion"] == "".join(word_tokens(DEFAULT_RECIPE)[:20])
+    assert delta("llm_request_tokens_count", provider="groq", profile="suggest", kind="prompt") == 1
+    assert delta("llm_request_tokens_sum", provider="groq", profile="suggest", kind="completion") == 20
+    assert delta("llm_truncated_total", provider="groq", profile="suggest") == 1
+    # One reservation was taken from the budget
+    assert ai_helper.groq_budget.counters["granted"] == 1
+
+
+def test_stream_uses_the_profile_cap(groq):
+    profile = GenerationProfile("stream", COMPACT, 15)
+
+    async def collect():
+        return [token async for token in ai_helper._stream_groq_suggestion(["quinoa"], profile)]
+
+    before = metrics.registry.render()
+    assert len(asyncio.run(collect())) == 15
+    after = metrics.registry.render()
+    assert (sample(after, "llm_truncated_total", provider="groq", profile="stream")
+            - sample(before, "llm_truncated_total", provider="groq", profile="stream")) == 1
@@ -0,0 +1,122 @@
+"""
+Tests for the metrics subsystem (app/metrics.py) and the /metrics endpoint.
+Run with: python -m pytest test_metrics.py
+"""
+
+import asyncio
+import logging
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ai_helper, metrics
+from app.ai_cache import SuggestionCache
+from app.main import app
+from app.metrics import Registry
+from app.rate_limit import ProviderBudget
+
+
+def sample(text, name, **labels):
+    """The value of one sample in a Prometheus text scrape, or 0 if absent."""
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    prefix = f"{name}{{{wanted}}} " if labels else f"{name} "
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def test_histogram_sums_per_thread_shards():
+    registry = Registry()
+    histogram = registry.histogram("work_seconds", "Work time.", ("kind",), buckets=(0.1, 1.0))
+    barrier = threading.Barrier(8)
+
+    def record():
+        barrier.wait()
+        for i in range(1000):
+            histogram.labels("io").observe(0.05 if i % 2 else 0.5)
+        histogram.labels("cpu").observe(5.0)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert "# TYPE work_seconds histogram" in text
+    assert sample(text, "work_seconds_bucket", kind="io", le="0.1") == 4000
+    assert sample(text, "work_seconds_bucket", kind="io", le="1") == 8000
+    assert sample(text, "work_seconds_bucket", kind="io", le="+Inf") == 8000
+    assert sample(text, "work_seconds_count", kind="io") == 8000
+    assert sample(text, "work_seconds_sum", kind="io") == pytest.approx(4000 * 0.05 + 4000 * 0.5)
+    assert sample(text, "work_seconds_bucket", kind="cpu", le="1") == 0
+    assert sample(text, "work_seconds_count", kind="cpu") == 8
+
+
+def test_counter_labels_are_escaped_and_collectors_isolated(caplog):
+    registry = Registry()
+    counter = registry.counter("events_total", "Events.", ("name",))
+    counter.labels('say "hi"\n').inc(2)
+    registry.collected("broken", "Always fails.", "gauge", lambda: 1 / 0)
+    registry.collected("size", "A size.", "gauge", lambda: [((), 3)])
+
+    with caplog.at_level(logging.ERROR, logger="app.metrics"):
+        text = registry.render()
+    assert 'events_total{name="say \\"hi\\"\\n"} 2' in text
+    assert "size 3" in text
+    assert "# HELP broken" not in text
+    assert "Metrics collection error in broken" in caplog.text
+
+
+def test_endpoint_records_route_templates():
+    client = TestClient(app)
+    before = client.get("/metrics").text
+    client.get("/api/recipes/1")
+    client.get("/api/recipes/999999")
+    client.get("/no/such/path")
+    after = client.get("/metrics").text
+
+    def delta(**labels):
+        name = "http_request_duration_seconds_count"
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    assert delta(method="GET", route="/api/recipes/{recipe_id}", status="200") == 1
+    assert delta(method="GET", route="/api/recipes/{recipe_id}", status="404") == 1
+    assert delta(method="GET", route=metrics.UNMATCHED_ROUTE, status="404") == 1
+    assert sample(after, "recipes_stored") >= 1
+
+
+def test_llm_calls_record_latency_errors_and_tokens(monkeypatch):
+    class Usage:
+        prompt_tokens = 120
+        completion_tokens = 30
+
+    async def groq(ingredients, profile=None):
+        metrics.count_tokens("groq", Usage())
+        return None
+
+    async def hf(ingredients, profile=None):
+        return {"suggestion": "soup", "ingredients_used": ingredients}
+
+    monkeypatch.setattr(ai_helper, "GROQ_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "HF_API_KEY", "test")
+    monkeypatch.setattr(ai_helper, "_get_groq_suggestion", groq)
+    monkeypatch.setattr(ai_helper, "_get_huggingface_suggestion", hf)
+    monkeypatch.setattr(ai_helper, "suggestion_cache", SuggestionCache(max_size=8, ttl=60))
+    monkeypatch.setattr(ai_helper, "provider_router", ai_helper.build_provider_router())
+    monkeypatch.setattr(ai_helper, "groq_budget", ProviderBudget("groq"))
+
+    before = metrics.registry.render()
+    assert asyncio.run(ai_helper.get_ai_recipe_suggestion(["leek"]))["suggestion"] == "soup"
+    after = metrics.registry.render()
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    assert delta("llm_request_duration_seconds_count", provider="groq", outcome="error") == 1
+    assert delta("llm_request_duration_seconds_count", provider="huggingface", outcome="success") == 1
+    assert delta("llm_errors_total", provider="groq", reason="error") == 1
+    assert delta("llm_tokens_total", provider="groq", kind="prompt") == 120
+    assert delta("llm_tokens_total", provider="groq", kind="completion") == 30
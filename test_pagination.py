@@ -0,0 +1,135 @@
+"""
+Tests for paginated, projected and NDJSON recipe listings (app/pagination.py).
+Run with: python -m pytest test_pagination.py
+"""
+
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.json_cache import RecipeJSONCache
+from app.main import app
+from app.store import RecipeStore
+from test_store import make_recipe, make_store  # noqa: F401 (fixture)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = random.Random(9)
+    monkeypatch.setattr(main, "recipes_db", RecipeStore(make_recipe(rng) for _ in range(120)))
+    return TestClient(app)
+
+
+def all_pages(client, path, params=None, method="get", body=None):
+    params = dict(params or {}, limit=25)
+    ids = []
+    while True:
+        response = client.request(method, path, params=params, json=body)
+        assert response.status_code == 200
+        ids.extend(r["id"] for r in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+        params["cursor"] = cursor
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/recipes", {}),
+    ("/api/recipes/search/by-cuisine", {"cuisine": "Indian"}),
+    ("/api/recipes/search/by-ingredient", {"ingredient": "cheese"}),
+    ("/api/recipes/search/by-time", {"max_prep_time": 20}),
+])
+def test_cursor_pages_match_unpaginated_results(client, path, params):
+    full = [r["id"] for r in client.get(path, params=params).json()]
+    assert len(full) > 25
+    assert all_pages(client, path, params) == full
+
+
+def test_advanced_search_is_paginated(client):
+    body = {"ingredient": "sauce"}
+    full = [r["id"] for r in client.post("/api/recipes/advanced-search", json=body).json()]
+    assert all_pages(client, "/api/recipes/advanced-search", method="post", body=body) == full
+
+
+def test_last_page_has_no_cursor(client):
+    response = client.get("/api/recipes", params={"limit": 1000})
+    assert len(response.json()) == 120
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_fields_projection_always_keeps_id(client):
+    recipes = client.get("/api/recipes", params={"fields": "name, cuisine", "limit": 3}).json()
+    assert [set(r) for r in recipes] == [{"id", "name", "cuisine"}] * 3
+
+
+def test_unknown_fields_are_rejected(client):
+    response = client.get("/api/recipes", params={"fields": "name,calories"})
+    assert response.status_code == 422
+    assert "calories" in response.json()["detail"]
+
+
+def test_ndjson_streams_one_recipe_per_line(client):
+    response = client.get("/api/recipes/search/by-cuisine",
+                          params={"cuisine": "italian", "format": "ndjson", "fields": "cuisine"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines and all(r["cuisine"].lower() == "italian" for r in lines)
+
+
+def test_empty_first_page_is_404_but_empty_later_page_is_not(client):
+    missing = client.get("/api/recipes/search/by-ingredient", params={"ingredient": "saffron"})
+    assert missing.status_code == 404
+    past_end = client.get("/api/recipes/search/by-cuisine", params={"cuisine": "indian", "cursor": 10**6})
+    assert past_end.status_code == 200 and past_end.json() == []
+
+
+def test_json_cache_serializes_each_recipe_object_once():
+    rng = random.Random(3)
+    cache = RecipeJSONCache(max_size=2)
+    recipe = make_recipe(rng, recipe_id=1)
+    body = cache.get(recipe)
+    assert json.loads(body) == json.loads(recipe.model_dump_json())
+    assert cache.get(recipe) is body
+    # An updated recipe is a new object, so it misses
+    replacement = recipe.model_copy(update={"name": "Renamed"})
+    assert json.loads(cache.get(replacement))["name"] == "Renamed"
+    assert json.loads(cache.render(replacement, {"id", "name"})) == {"id": 1, "name": "Renamed"}
+    cache.get(make_recipe(rng, recipe_id=2))
+    cache.get(make_recipe(rng, recipe_id=3))
+    assert len(cache) == 1
+
+
+def test_unchanged_lists_and_recipes_return_304(make_store, monkeypatch):
+    rng = random.Random(4)
+    monkeypatch.setattr(main, "recipes_db", make_store([make_recipe(rng) for _ in range(40)]))
+    client = TestClient(app)
+
+    for params in ({}, {"limit": 10}, {"format": "ndjson"}):
+        first = client.get("/api/recipes", params=params)
+        etag = first.headers["ETag"]
+        again = client.get("/api/recipes", params=params, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["ETag"] == etag
+    listing = client.get("/api/recipes/search/by-ingredient", params={"ingredient": "cheese"})
+    list_etag = listing.headers["ETag"]
+
+    recipe = client.get("/api/recipes/1")
+    recipe_etag = recipe.headers["ETag"]
+    assert recipe.json() == main.recipes_db.get(1).model_dump()
+    assert client.get("/api/recipes/1", headers={"If-None-Match": f'W/{recipe_etag}'}).status_code == 304
+
+    # Any write changes the list ETag, but only the written recipe's own ETag
+    other = {**client.get("/api/recipes/2").json(), "name": "Other"}
+    assert client.put("/api/recipes/2", json=other).status_code == 200
+    assert client.get("/api/recipes/1", headers={"If-None-Match": recipe_etag}).status_code == 304
+    relisted = client.get("/api/recipes/search/by-ingredient", params={"ingredient": "cheese"},
+                          headers={"If-None-Match": list_etag})
+    assert relisted.status_code == 200 and relisted.headers["ETag"] != list_etag
+
+    client.put("/api/recipes/1", json={**recipe.json(), "name": "Changed"})
+    updated = client.get("/api/recipes/1", headers={"If-None-Match": recipe_etag})
+    assert updated.status_code == 200 and updated.json()["name"] == "Changed"
+    assert updated.headers["ETag"] != recipe_etag
@@ -0,0 +1,219 @@
+"""
+Tests for hedged provider routing and circuit breakers (app/provider_router.py),
+using local stub providers with injected latency and failures.
+Run with: python -m pytest test_provider_router.py
+"""
+
+import asyncio
+import logging
+import time
+
+from app import ai_helper
+from app.provider_router import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Provider, ProviderRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubProvider:
+    """Answers after `delay` seconds, or fails if `fail` is set."""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.started = 0
+        self.finished = 0
+        self.cancelled = 0
+
+    async def __call__(self, ingredients):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        self.finished += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return {"suggestion": f"from {self.name}", "ingredients_used": ingredients}
+
+
+def make_router(primary, secondary, clock=None, **kwargs):
+    clock = clock or time.monotonic
+    return ProviderRouter(
+        [
+            Provider(primary.name, primary, breaker=CircuitBreaker(min_calls=3, open_seconds=10, clock=clock)),
+            Provider(secondary.name, secondary, breaker=CircuitBreaker(min_calls=3, open_seconds=10, clock=clock)),
+        ],
+        **kwargs
+    )
+
+
+def run(router, ingredients=("rice",)):
+    return asyncio.run(router.complete(list(ingredients)))
+
+
+def test_fast_primary_wins_without_hedging():
+    groq, hf = StubProvider("groq", delay=0.01), StubProvider("hf")
+    router = make_router(groq, hf, default_hedge_delay=0.5)
+
+    assert run(router)["suggestion"] == "from groq"
+    assert hf.started == 0
+    assert router.counters["primary_wins"] == 1
+    assert router.counters["hedges_fired"] == 0
+
+
+def test_slow_primary_is_hedged_and_loser_cancelled():
+    groq, hf = StubProvider("groq", delay=1.0), StubProvider("hf", delay=0.01)
+    router = make_router(groq, hf, default_hedge_delay=0.05)
+
+    start = time.monotonic()
+    result = run(router)
+    elapsed = time.monotonic() - start
+
+    assert result["suggestion"] == "from hf"
+    assert elapsed < 0.5
+    assert groq.cancelled == 1
+    assert router.counters["hedges_fired"] == 1
+    assert router.counters["hedge_wins"] == 1
+    assert router.provider("groq").counters["cancelled"] == 1
+
+
+def test_failed_primary_falls_back_without_waiting_for_hedge_delay():
+    groq, hf = StubProvider("groq", fail=True), StubProvider("hf", delay=0.01)
+    router = make_router(groq, hf, default_hedge_delay=5.0)
+
+    start = time.monotonic()
+    assert run(router)["suggestion"] == "from hf"
+    assert time.monotonic() - start < 0.5
+    assert router.counters["fallbacks"] == 1
+    assert router.counters["fallback_wins"] == 1
+
+
+def test_all_providers_failing_returns_none(caplog):
+    router = make_router(StubProvider("groq", fail=True), StubProvider("hf", fail=True))
+    with caplog.at_level(logging.WARNING, logger="app.provider_router"):
+        assert run(router) is None
+    assert "groq provider error: groq failed" in caplog.text
+    assert router.counters["all_failed"] == 1
+
+
+def test_breaker_opens_skips_provider_and_recovers_via_half_open_probe():
+    clock = FakeClock()
+    groq, hf = StubProvider("groq", fail=True), StubProvider("hf")
+    router = make_router(groq, hf, clock=clock)
+    breaker = router.provider("groq").breaker
+
+    for _ in range(3):
+        run(router)
+    assert breaker.state == OPEN
+    assert groq.started == 3
+
+    # While open, requests go straight to the fallback
+    assert run(router)["suggestion"] == "from hf"
+    assert groq.started == 3
+    assert router.provider("groq").counters["rejected"] == 1
+
+    # After the cooldown a single probe is let through; it fails and reopens
+    clock.now = 11
+    run(router)
+    assert groq.started == 4
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+    # The next probe succeeds and closes the breaker
+    clock.now = 22
+    groq.fail = False
+    assert run(router)["suggestion"] == "from groq"
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_only_one_probe_at_a_time():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_seconds=5, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 6
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(min_calls=2, failure_rate=0.5, slow_call_seconds=1.0)
+    breaker.record_success(0.1)
+    breaker.record_success(2.0)
+    assert breaker.state == OPEN
+
+
+def test_app_breakers_flag_slow_calls_before_they_time_out():
+    router = ai_helper.build_provider_router()
+    for name in ("groq", "huggingface"):
+        assert 0 < router.provider(name).breaker.slow_call_seconds < ai_helper.AI_TIMEOUT
+
+
+def test_admission_waits_and_refusals_stay_out_of_the_breaker():
+    groq, hf = StubProvider("groq", delay=0.01), StubProvider("hf")
+    admitted = {"groq": True}
+
+    async def admit(ingredients):
+        await asyncio.sleep(0.2)
+        return admitted["groq"]
+
+    router = ProviderRouter(
+        [
+            Provider("groq", groq, breaker=CircuitBreaker(min_calls=3), admit=admit),
+            Provider("hf", hf, breaker=CircuitBreaker(min_calls=3)),
+        ],
+        default_hedge_delay=0.1
+    )
+    provider = router.provider("groq")
+
+    # Waiting for the budget neither fires the hedge nor counts as latency
+    assert run(router)["suggestion"] == "from groq"
+    assert router.counters["hedges_fired"] == 0
+    assert provider.breaker.latency_percentile(1.0) < 0.1
+
+    # Refusals fall back at once and are not failures
+    admitted["groq"] = False
+    for _ in range(5):
+        assert run(router)["suggestion"] == "from hf"
+    assert provider.breaker.state == CLOSED
+    assert provider.counters["throttled"] == 5 and provider.counters["failures"] == 0
+    assert groq.started == 1
+
+    assert asyncio.run(router.call_one("groq", ["rice"])) is None
+    assert provider.counters["throttled"] == 6 and provider.breaker.state == CLOSED
+
+
+def test_hedge_delay_tracks_observed_p95_latency():
+    router = make_router(StubProvider("groq"), StubProvider("hf"),
+                         default_hedge_delay=2.0, min_hedge_delay=0.05, max_hedge_delay=3.0)
+    groq = router.provider("groq")
+    assert router.hedge_delay(groq) == 2.0
+
+    for latency in [0.1] * 95 + [0.9] * 5:
+        groq.breaker.record_success(latency)
+    assert router.hedge_delay(groq) == 0.9
+
+    groq.breaker.record_success(10.0)
+    assert router.hedge_delay(groq) <= 3.0
+
+
+def test_metrics_expose_routing_and_breaker_state():
+    router = make_router(StubProvider("groq", delay=0.01), StubProvider("hf"))
+    run(router)
+    metrics = router.metrics()
+    assert metrics["routing"]["requests"] == 1
+    assert metrics["providers"]["groq"]["breaker_state"] == CLOSED
+    assert metrics["providers"]["groq"]["successes"] == 1
+    assert metrics["providers"]["hf"]["calls"] == 0
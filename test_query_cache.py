@@ -0,0 +1,136 @@
+"""
+Tests for the search result cache (app/query_cache.py) in both stores and
+the /api/recipes/search/cache endpoint.
+Run with: python -m pytest test_query_cache.py
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.models import Recipe, SearchFilters
+from app.query_cache import QueryCache, search_scope
+from app.sqlite_store import SQLiteRecipeStore
+from app.store import RecipeStore
+from test_store import make_recipe, make_store  # noqa: F401 (fixture)
+
+QUERIES = [
+    {"cuisine": "italian"}, {"cuisine": "INDIAN"}, {"ingredient": "cheese"}, {"ingredient": "sauce"},
+    {"max_prep_time": 10}, {"max_prep_time": 20, "max_cook_time": 30}, {"cuisine": "Asian", "ingredient": "rice"},
+]
+FILTERS = [
+    SearchFilters(cuisine="Mexican"), SearchFilters(cuisines=["Italian", "asian"], sort="-prep_time"),
+    SearchFilters(include_ingredients=["garlic"], exclude_ingredients=["cream"], sort="total_time"),
+    SearchFilters(prep_time_max=20, servings_min=1),
+]
+
+
+def results(store):
+    """Every cached query, twice, so the second run is served from the cache."""
+    out = []
+    for _ in range(2):
+        for query in QUERIES:
+            out.append([r.id for r in store.iter_search(**query)])
+            out.append([r.id for r in store.iter_search(**query, after_id=5, limit=4)])
+        for filters in FILTERS:
+            for with_facets in (False, True):
+                recipes, result = store.faceted_search(filters, 0, 5, with_facets)
+                # Facet labels keep the first spelling a store saw of each cuisine
+                facets = {name: {label.casefold(): n for label, n in counts.items()}
+                          for name, counts in (result.facets or {}).items()}
+                out.append(([r.id for r in recipes], result.total, facets))
+            if recipes:
+                recipes, _ = store.faceted_search(filters, recipes[1].id if len(recipes) > 1 else 0, 3)
+                out.append([r.id for r in recipes])
+    return out
+
+
+def test_cached_results_follow_random_mutations(make_store):
+    rng = random.Random(11)
+    store = make_store([make_recipe(rng) for _ in range(60)])
+    for _ in range(150):
+        assert results(store) == results(RecipeStore(store.all(), query_cache_size=0))
+        ids = [r.id for r in store]
+        op = rng.random()
+        if op < 0.4:
+            store.add(make_recipe(rng))
+        elif op < 0.75:
+            store.update(rng.choice(ids), make_recipe(rng))
+        else:
+            store.delete(rng.choice(ids))
+    stats = store.query_cache.stats()
+    assert stats["hits"] > stats["misses"] > 0 and stats["invalidated"] > 0
+
+
+def test_writes_only_drop_the_entries_they_can_affect(make_store):
+    rng = random.Random(12)
+    store = make_store([make_recipe(rng) for _ in range(40)])
+    for query in ({"cuisine": "Indian"}, {"cuisine": "Italian"}, {"ingredient": "saffron"}, {"ingredient": "rice"}):
+        list(store.iter_search(**query))
+    assert len(store.query_cache) == 4
+
+    store.add(Recipe(name="Risotto", ingredients=["rice", "parmesan cheese"],
+                     instructions="Stir the rice with stock until creamy.", cuisine="ITALIAN"))
+    hits = store.query_cache.counters["hits"]
+    list(store.iter_search(cuisine="indian"))
+    list(store.iter_search(ingredient="saffron"))
+    assert store.query_cache.counters["hits"] == hits + 2
+    assert len(store.query_cache) == 2
+
+    store.add_many([make_recipe(rng) for _ in range(3)])
+    assert len(store.query_cache) <= 2
+
+
+def test_results_computed_before_a_write_are_not_stored():
+    cache = QueryCache()
+    generation = cache.generation
+    cache.invalidate(Recipe(name="Dal", ingredients=["lentils"], instructions="Simmer the lentils.",
+                            cuisine="Indian"))
+    cache.put("key", (1, 2), search_scope("Italian", None, None, None), generation, 2)
+    assert cache.get("key") is None and cache.counters["discarded"] == 1
+
+
+def test_lru_is_bounded_by_entries_and_ids():
+    cache = QueryCache(max_size=3, max_ids=10)
+    scope = search_scope(None, "rice", None, None)
+    for i in range(4):
+        cache.put(i, (i,), scope, cache.generation, 1)
+    assert cache.get(0) is None and cache.get(1) == (1,)
+    cache.put("big", tuple(range(9)), scope, cache.generation, 9)
+    # 2 and 3 go to make room; 1 was used more recently
+    assert cache.get(1) == (1,) and len(cache) == 2 and cache.stats()["ids"] == 10
+    assert cache.counters["evictions"] == 3
+
+
+def test_sqlite_cache_sees_other_processes_writes(tmp_path):
+    path = str(tmp_path / "recipes.db")
+    rng = random.Random(13)
+    first = SQLiteRecipeStore(path, [make_recipe(rng) for _ in range(20)])
+    second = SQLiteRecipeStore(path)
+    before = [r.id for r in second.iter_search(cuisine="Spanish")]
+    assert before == [] and second.faceted_search(SearchFilters(cuisine="spanish"))[1].total == 0
+
+    added = first.add(Recipe(name="Paella", ingredients=["rice", "saffron"],
+                             instructions="Simmer everything in a wide pan.", cuisine="Spanish"))
+    assert [r.id for r in second.iter_search(cuisine="Spanish")] == [added.id]
+    assert second.faceted_search(SearchFilters(cuisine="spanish"))[1].total == 1
+    first.close()
+    second.close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = random.Random(14)
+    monkeypatch.setattr(main, "recipes_db", RecipeStore(make_recipe(rng) for _ in range(50)))
+    return TestClient(app)
+
+
+def test_search_cache_endpoint_reports_hit_rate(client):
+    for cuisine in ["Italian", "italian", "ITALIAN", "Indian"]:
+        assert client.get("/api/recipes/search/by-cuisine", params={"cuisine": cuisine}).status_code == 200
+    stats = client.get("/api/recipes/search/cache").json()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 2, 2)
+    assert stats["hit_rate"] == 0.5
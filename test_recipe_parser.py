@@ -0,0 +1,159 @@
+"""
+Tests for parsing generated recipes (app/recipe_parser.py) against captured
+sample outputs in test_data/ai_recipes, and for storing them on the AI path.
+Run with: python -m pytest test_recipe_parser.py
+"""
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ai_helper, main
+from app.ai_helper import format_local_suggestion
+from app.fake_llm import DEFAULT_RECIPE
+from app.main import app
+from app.recipe_parser import UNKNOWN_CUISINE, parse_recipe
+from app.recipes import seed_recipes
+from app.store import RecipeStore
+
+SAMPLES = Path(__file__).parent / "test_data" / "ai_recipes"
+
+# Sample file -> expected (name, cuisine, prep_time, cook_time, servings, ingredients, steps)
+EXPECTED = {
+    "groq_canonical.txt": (
+        "Chicken Biryani", "Indian", 30, 45, 4,
+        ["basmati rice", "chicken thighs", "plain yogurt", "onions", "garlic", "ginger paste",
+         "garam masala", "turmeric powder", "saffron", "ghee", "salt", "mint leaves"], 6),
+    "groq_headings.txt": (
+        "Garlic Butter Shrimp Pasta", "Italian-American", 10, 20, 2,
+        ["spaghetti", "shrimp", "unsalted butter", "garlic", "red pepper flakes", "juice of 1 lemon",
+         "parsley"], 5),
+    "groq_plain_labels.txt": (
+        "Poha", "Indian", 10, 15, 2,
+        ["thick poha", "onion", "potato", "green chillies", "mustard seeds", "curry leaves", "turmeric",
+         "peanuts", "oil", "salt", "lemon wedges and coriander"], 5),
+    "groq_hours_and_groups.txt": (
+        "Beef Bourguignon", "French", 30, 150, 6,
+        ["beef chuck", "bacon lardons", "red wine", "beef stock", "tomato paste", "carrots",
+         "button mushrooms", "pearl onions", "butter"], 5),
+    "groq_no_cuisine_total_time.txt": (
+        "Tomato Egg Stir-Fry", UNKNOWN_CUISINE, 5, 15, 2,
+        ["eggs", "ripe tomatoes", "spring onions", "sugar", "vegetable oil", "salt"], 4),
+    "groq_bold_steps.txt": (
+        "Mushroom Risotto", "Italian", 10, 30, 4,
+        ["arborio rice", "warm vegetable stock", "mixed mushrooms", "shallot", "dry white wine",
+         "parmesan cheese", "butter"], 5),
+    "hf_echo.txt": (
+        "Egg Fried Rice", UNKNOWN_CUISINE, None, None, None,
+        ["cooked rice", "eggs", "soy sauce", "oil"], 3),
+}
+UNPARSEABLE = ["hf_unstructured.txt", "not_configured.txt"]
+
+
+def test_every_sample_has_an_expectation():
+    assert sorted(p.name for p in SAMPLES.glob("*.txt")) == sorted([*EXPECTED, *UNPARSEABLE])
+
+
+@pytest.mark.parametrize("sample", sorted(EXPECTED))
+def test_parses_captured_outputs(sample):
+    recipe = parse_recipe((SAMPLES / sample).read_text())
+    name, cuisine, prep_time, cook_time, servings, ingredients, steps = EXPECTED[sample]
+    assert recipe is not None
+    assert (recipe.name, recipe.cuisine) == (name, cuisine)
+    assert (recipe.prep_time, recipe.cook_time, recipe.servings) == (prep_time, cook_time, servings)
+    assert recipe.ingredients == ingredients
+    lines = recipe.instructions.split("\n")
+    assert [line.split(". ", 1)[0] for line in lines] == [str(n) for n in range(1, steps + 1)]
+    # Tips, notes and sign-offs are not steps
+    assert not any(word in recipe.instructions.lower() for word in ("tip", "enjoy", "next day"))
+
+
+@pytest.mark.parametrize("sample", UNPARSEABLE)
+def test_text_that_is_not_a_recipe_is_rejected(sample):
+    assert parse_recipe((SAMPLES / sample).read_text()) is None
+
+
+def test_round_trips_the_local_suggestion_format():
+    for recipe in seed_recipes:
+        parsed = parse_recipe(format_local_suggestion(recipe))
+        assert parsed.name == recipe.name
+        assert parsed.cuisine == recipe.cuisine
+        assert parsed.ingredients == recipe.ingredients
+        assert (parsed.prep_time, parsed.cook_time, parsed.servings) == \
+            (recipe.prep_time, recipe.cook_time, recipe.servings)
+
+
+def test_default_name_covers_untitled_recipes():
+    text = "Ingredients:\n- rice\n- water\n\nInstructions:\n1. Boil the rice in the water until tender."
+    assert parse_recipe(text) is None
+    assert parse_recipe(text, default_name="Rice").name == "Rice"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "recipes_db", RecipeStore(seed_recipes))
+    monkeypatch.setattr(ai_helper, "_generated", OrderedDict())
+    return TestClient(app)
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    async def fake_suggestion(ingredients, profile=None):
+        calls.append(ingredients)
+        return {"suggestion": DEFAULT_RECIPE, "ingredients_used": ingredients}
+
+    monkeypatch.setattr(main, "get_ai_recipe_suggestion", fake_suggestion)
+    return calls
+
+
+def test_generated_recipes_are_structured_but_not_stored_by_default(client, llm_calls):
+    response = client.post("/api/ai/suggest", json=["chicken", "tomato"]).json()
+    assert response["source"] == "ai" and response["recipe_id"] is None
+    assert response["recipe"]["name"] == "Garlic Tomato Chicken"
+    assert len(main.recipes_db) == len(seed_recipes)
+
+    client.post("/api/ai/suggest", json=["tomato", "chicken"])
+    assert len(llm_calls) == 2
+
+
+def test_saved_recipes_answer_repeat_and_dish_name_requests(client, llm_calls, monkeypatch):
+    monkeypatch.setattr(ai_helper, "AI_SAVE_RECIPES", True)
+    first = client.post("/api/ai/suggest", json=["chicken", "tomato"]).json()
+    assert first["source"] == "ai"
+    stored = main.recipes_db.get(first["recipe_id"])
+    assert stored.name == "Garlic Tomato Chicken" and stored.cuisine == "Italian"
+
+    # Same ingredients in another order, and the dish by name, skip the LLM
+    for request in (["Tomato", "chicken"], ["garlic tomato chiken"]):
+        response = client.post("/api/ai/suggest", json=request).json()
+        assert response["source"] == "local"
+        assert response["recipe_id"] == first["recipe_id"]
+    assert llm_calls == [["chicken", "tomato"]]
+
+    # Another request producing the same dish reuses the stored recipe
+    again = client.post("/api/ai/suggest", json=["chicken", "basil"]).json()
+    assert again["recipe_id"] == first["recipe_id"]
+    assert len(main.recipes_db) == len(seed_recipes) + 1
+
+    # Deleting the recipe sends the request back to the LLM
+    main.recipes_db.delete(first["recipe_id"])
+    client.post("/api/ai/suggest", json=["chicken", "tomato"])
+    assert len(llm_calls) == 3
+
+
+def test_stream_reports_the_saved_recipe(client, monkeypatch):
+    monkeypatch.setattr(ai_helper, "AI_SAVE_RECIPES", True)
+
+    async def fake_stream(ingredients, profile=None):
+        for line in DEFAULT_RECIPE.splitlines(keepends=True):
+            yield line
+
+    monkeypatch.setattr(main, "stream_ai_recipe_suggestion", fake_stream)
+    response = client.get("/api/ai/suggest/stream", params={"ingredients": "chicken,tomato"})
+    done = json.loads(response.text.strip().split("\n\n")[-1].split("data: ", 1)[1])
+    assert main.recipes_db.get(done["recipe_id"]).name == "Garlic Tomato Chicken"
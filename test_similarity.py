@@ -0,0 +1,171 @@
+"""
+Tests for similar-recipe recommendations (app/similarity.py) in both stores
+and the /api/recipes/{id}/similar and /api/recipes/similar-to-pantry endpoints.
+Run with: python -m pytest test_similarity.py
+"""
+
+import random
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.models import Recipe
+from app.similarity import SimilarityIndex
+from app.store import RecipeStore
+from test_store import make_recipe, make_store  # noqa: F401 (fixture)
+
+BASES = ["rice", "pasta", "garlic", "onion", "tomato", "cheese", "chicken", "beef", "tofu", "lemon",
+         "ginger", "basil", "cumin", "potato", "carrot", "spinach", "mushroom", "shrimp", "beans", "corn"]
+MODIFIERS = ["", "", "fresh", "smoked", "grated", "parmesan", "red", "dried"]
+CUISINES = ["Italian", "Indian", "Mexican", "Thai"]
+DISHES = ["Curry", "Salad", "Soup", "Bake", "Bowl"]
+
+
+def make_dish(rng, recipe_id=None):
+    ingredients = {f"{rng.choice(MODIFIERS)} {rng.choice(BASES)}".strip() for _ in range(rng.randint(2, 6))}
+    return Recipe.model_construct(
+        id=recipe_id, name=f"{rng.choice(BASES).title()} {rng.choice(DISHES)}",
+        ingredients=sorted(ingredients), instructions="Mix everything together and cook.",
+        cuisine=rng.choice(CUISINES), servings=4, prep_time=None, cook_time=None,
+    )
+
+
+def build_index(recipes):
+    index = SimilarityIndex()
+    for recipe in recipes:
+        index.add(recipe.id, recipe.name, recipe.cuisine, recipe.ingredients)
+    return index
+
+
+def test_clustered_search_finds_most_exact_neighbours():
+    rng = random.Random(5)
+    index = build_index(make_dish(rng, i) for i in range(1, 6001))
+    assert index._centroids is not None
+
+    found = total = 0
+    for recipe_id in rng.sample(range(1, 6001), 50):
+        exact = index.similar_to(recipe_id, 10, exact=True)
+        approximate = index.similar_to(recipe_id, 10)
+        assert recipe_id not in [hit.recipe_id for hit in exact]
+        assert [hit.score for hit in exact] == sorted((hit.score for hit in exact), reverse=True)
+        assert all(0 < hit.score <= 1.0001 for hit in approximate)
+        found += len({hit.recipe_id for hit in approximate} & {hit.recipe_id for hit in exact})
+        total += len(exact)
+    assert found / total > 0.7
+    # Scanning every list is an exact search
+    assert index.similar_to(7, 10, probes=10 ** 6) == index.similar_to(7, 10, exact=True)
+
+
+def test_vectors_follow_updates_and_deletes():
+    rng = random.Random(6)
+    index = build_index(make_dish(rng, i) for i in range(1, 201))
+    twin = index.similar_to(1, 1)[0].recipe_id
+    index.remove(twin)
+    assert twin not in [hit.recipe_id for hit in index.similar_to(1, 200, exact=True)]
+    assert index.similar_to(twin, 5) is None
+
+    # Recipe 2 becomes a copy of recipe 1 and is now its closest match
+    one = make_dish(random.Random(7), 1)
+    index.add(1, one.name, one.cuisine, one.ingredients)
+    index.add(2, one.name, one.cuisine, one.ingredients)
+    best = index.similar_to(1, 1, exact=True)[0]
+    assert best.recipe_id == 2 and best.score == pytest.approx(1)
+
+
+def test_refresh_drops_dead_rows_and_keeps_results():
+    rng = random.Random(8)
+    recipes = [make_dish(rng, i) for i in range(1, 5001)]
+    index = build_index(recipes)
+    for recipe_id in range(1, 5001, 2):
+        index.remove(recipe_id)
+    index._refresh()
+    assert index._rows == len(index) == 2500 and index._dead == 0
+    # Same vectors as an index that never saw the removed recipes
+    fresh = build_index(recipes[1::2])
+    fresh._refresh()
+    for recipe_id in (2, 1000, 4000):
+        hits, expected = index.similar_to(recipe_id, 10), fresh.similar_to(recipe_id, 10)
+        assert [hit.recipe_id for hit in hits] == [hit.recipe_id for hit in expected]
+        assert [hit.score for hit in hits] == pytest.approx([hit.score for hit in expected])
+    for recipe_id in range(5001, 6001):
+        recipe = make_dish(rng, recipe_id)
+        index.add(recipe_id, recipe.name, recipe.cuisine, recipe.ingredients)
+    assert len(index.similar_to(5500, 10)) == 10
+
+
+def test_stores_agree_and_track_mutations(make_store):
+    rng = random.Random(9)
+    store = make_store([make_recipe(rng) for _ in range(200)])
+    reference = RecipeStore(store.all())
+    for step in range(2):
+        for recipe_id in (1, 60, 150):
+            ranked = store.similar_recipes(recipe_id, 5)
+            assert [hit for _, hit in ranked] == [hit for _, hit in reference.similar_recipes(recipe_id, 5)]
+            assert all(recipe.id == hit.recipe_id for recipe, hit in ranked)
+        pantry = ["Parmesan cheese", "garlic"]
+        assert ([recipe.id for recipe, _ in store.similar_to_pantry(pantry, 5)]
+                == [recipe.id for recipe, _ in reference.similar_to_pantry(pantry, 5)])
+        for target in (store, reference):
+            target.delete(50)
+            target.update(150, make_recipe(random.Random(step)))
+    assert store.similar_recipes(50, 5) is None
+    assert store.similar_to_pantry(["unobtainium"], 5) == []
+
+
+def test_refresh_runs_in_the_background_outside_the_store_lock(make_store, monkeypatch):
+    rng = random.Random(11)
+    store = make_store([make_dish(rng) for _ in range(300)])
+    added = make_dish(rng)
+    refresh = SimilarityIndex.refresh
+    release = threading.Event()
+
+    def blocked_refresh(index):
+        release.wait(5)
+        refresh(index)
+
+    monkeypatch.setattr(SimilarityIndex, "refresh", blocked_refresh)
+    stale = store._similar
+    stale._changes = 10 ** 6  # due for a refresh
+    # The write that made the refresh due does not wait for it
+    store.update(3, make_dish(rng))
+    assert store._similar_refresh.is_alive()
+
+    # Writes and reads get through while the copy is rebuilt
+    store.add(added)
+    store.delete(7)
+    assert store.similar_recipes(1, 3)
+    assert store._similar is stale
+    release.set()
+    store._similar_refresh.join(5)
+
+    # The rebuilt index was swapped in with the writes made meanwhile replayed
+    assert store._similar is not stale and store._similar._pending is None
+    # Rows were compacted by the refresh; only the replayed delete left a dead one
+    assert store._similar._dead == 1 and len(store._similar) == len(store) == 300
+    assert store.similar_recipes(7, 3) is None
+    assert added.id in [hit.recipe_id for _, hit in store.similar_recipes(3, 300)]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = random.Random(10)
+    monkeypatch.setattr(main, "recipes_db", RecipeStore(make_dish(rng) for _ in range(100)))
+    return TestClient(app)
+
+
+def test_similar_endpoints(client):
+    response = client.get("/api/recipes/3/similar", params={"limit": 4})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 4 and all(r["recipe"]["id"] != 3 for r in results)
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert client.get("/api/recipes/999/similar").status_code == 404
+
+    response = client.post("/api/recipes/similar-to-pantry", json={"ingredients": ["rice", "garlic"], "limit": 3})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    response = client.post("/api/recipes/similar-to-pantry", json={"ingredients": ["unobtainium"]})
+    assert response.status_code == 404
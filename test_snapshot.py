@@ -0,0 +1,160 @@
+"""
+Tests for memory-mapped catalog snapshots (app/snapshot.py).
+Run with: python -m pytest test_snapshot.py
+"""
+
+import logging
+import random
+
+import pytest
+
+from app import snapshot
+from app import store as store_module
+from app.metrics import snapshot_index_rebuilds
+from app.models import SearchFilters
+from app.snapshot import open_snapshot, save_snapshot, snapshot_info
+from app.store import RecipeStore
+from test_store import CUISINES, check_indexes, make_recipe
+
+
+@pytest.fixture
+def source():
+    rng = random.Random(11)
+    store = RecipeStore(make_recipe(rng) for _ in range(300))
+    for rid in rng.sample(range(1, 301), 40):
+        store.delete(rid)
+    for rid in rng.sample(sorted(r.id for r in store.iter_all()), 40):
+        store.update(rid, make_recipe(rng))
+    return store
+
+
+def assert_same_catalog(opened, store):
+    assert len(opened) == len(store)
+    assert [r.model_dump() for r in opened.iter_all()] == [r.model_dump() for r in store.iter_all()]
+    for cuisine in CUISINES:
+        assert [r.id for r in opened.by_cuisine(cuisine)] == [r.id for r in store.by_cuisine(cuisine)]
+    filters = SearchFilters(include_ingredients=["cheese"], sort="-prep_time")
+    assert opened.faceted_search(filters, with_facets=True) == store.faceted_search(filters, with_facets=True)
+    assert opened.fuzzy_search("parmesn") == store.fuzzy_search("parmesn")
+    assert opened.pantry_matches(["rice", "garlic"], 5) == store.pantry_matches(["rice", "garlic"], 5)
+    assert opened.stats_summary() == store.stats_summary()
+
+
+def test_snapshot_round_trips_the_catalog_and_indexes(source, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    header = save_snapshot(source, path)
+    assert snapshot_info(path)["recipes"] == len(source) == header["recipes"]
+
+    opened = open_snapshot(path)
+    # Lookups are served from the mapping while the indexes still load
+    some_id = next(source.iter_all()).id
+    assert opened.get(some_id) == source.get(some_id)
+    assert opened.wait_until_ready(10)
+    assert_same_catalog(opened, source)
+    # Workers opening the same snapshot agree on ETags
+    assert open_snapshot(path).catalog_version() == opened.catalog_version()
+
+
+def test_opened_snapshot_accepts_writes_and_can_be_saved_again(source, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    save_snapshot(source, path)
+    opened = open_snapshot(path)
+
+    rng = random.Random(12)
+    for store in (source, opened):
+        store_rng = random.Random(13)
+        added = store.add(make_recipe(store_rng))
+        store.update(added.id - 1, make_recipe(store_rng))
+        store.delete(next(store.iter_all()).id)
+    assert_same_catalog(opened, source)
+    check_indexes(opened)
+
+    save_snapshot(opened, path)
+    reopened = open_snapshot(path)
+    reopened.wait_until_ready(10)
+    assert_same_catalog(reopened, source)
+    assert reopened.add(make_recipe(rng)).id == source.add(make_recipe(rng)).id
+
+
+def test_stores_opened_on_one_snapshot_diverge_in_version_after_writes(source, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    save_snapshot(source, path)
+    first, second = open_snapshot(path), open_snapshot(path)
+    assert first.catalog_version() == second.catalog_version()
+
+    rng = random.Random(14)
+    first.add(make_recipe(rng))
+    second.update(next(second.iter_all()).id, make_recipe(rng))
+    assert first.catalog_version() != second.catalog_version()
+    # A restarted worker reopens the snapshot and must not reuse either version
+    restarted = open_snapshot(path)
+    restarted.add(make_recipe(rng))
+    assert restarted.catalog_version() not in (first.catalog_version(), second.catalog_version())
+
+
+def test_indexes_are_rebuilt_when_index_classes_change(source, tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.snap")
+    save_snapshot(source, path)
+    monkeypatch.setattr(snapshot, "index_layout", lambda: {"changed": []})
+    opened = open_snapshot(path)
+    opened.wait_until_ready(10)
+    assert_same_catalog(opened, source)
+
+
+def test_index_rebuilds_are_logged_and_counted(source, tmp_path, monkeypatch, caplog):
+    path = str(tmp_path / "catalog.snap")
+    save_snapshot(source, path)
+
+    def rebuilds(reason):
+        return snapshot_index_rebuilds.labels(reason).value()
+
+    unusable, error = rebuilds("unusable"), rebuilds("error")
+    monkeypatch.setattr(snapshot, "index_layout", lambda: {"changed": []})
+    with caplog.at_level(logging.WARNING, logger="app.snapshot"):
+        open_snapshot(path).wait_until_ready(10)
+    assert rebuilds("unusable") == unusable + 1
+    assert "other index classes" in caplog.text
+
+    monkeypatch.undo()
+    monkeypatch.setattr(snapshot.pickle, "loads", lambda data: 1 / 0)
+    with caplog.at_level(logging.ERROR, logger="app.store"):
+        opened = open_snapshot(path)
+        opened.wait_until_ready(10)
+    assert rebuilds("error") == error + 1
+    assert "Could not load snapshot indexes" in caplog.text
+    assert_same_catalog(opened, source)
+
+
+def test_failed_index_rebuild_turns_into_errors_instead_of_hanging(source, tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.snap")
+    save_snapshot(source, path)
+
+    def broken_rebuild(*args, **kwargs):
+        raise MemoryError("no room to rebuild")
+
+    monkeypatch.setattr(snapshot, "index_layout", lambda: {"changed": []})
+    monkeypatch.setattr(store_module, "RecipeStore", broken_rebuild)
+    opened = open_snapshot(path)
+    assert opened.wait_until_ready(10)
+
+    # Rows are still served; anything needing the indexes fails fast
+    some_id = next(source.iter_all()).id
+    assert opened.get(some_id) == source.get(some_id)
+    with pytest.raises(RuntimeError, match="could not be restored"):
+        opened.fuzzy_search("curry")
+    with pytest.raises(RuntimeError, match="could not be restored"):
+        opened.delete(some_id)
+
+
+def test_rejects_files_that_are_not_readable_snapshots(source, tmp_path, monkeypatch):
+    other = tmp_path / "other.snap"
+    other.write_bytes(b'{"not": "a snapshot"}')
+    with pytest.raises(ValueError, match="Not a recipe snapshot"):
+        open_snapshot(str(other))
+
+    path = str(tmp_path / "catalog.snap")
+    save_snapshot(source, path)
+    monkeypatch.setattr(snapshot, "FORMAT_VERSION", snapshot.FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="not supported"):
+        open_snapshot(path)
+
@@ -0,0 +1,85 @@
+"""
+Tests for incrementally maintained catalog statistics (app/stats.py).
+Run with: python -m pytest test_stats.py
+"""
+
+import random
+from collections import Counter
+
+from app.stats import BUCKET_LABELS, CatalogStats, RankedCounter, time_bucket
+from test_store import make_recipe, make_store  # noqa: F401 (fixture)
+
+
+def recompute(recipes, top_n):
+    """Reference implementation: rebuild every aggregate from scratch."""
+    recipes = list(recipes)
+    total = len(recipes)
+    ingredients = Counter(i for r in recipes for i in set(r.ingredients))
+    prep, cook = [0] * len(BUCKET_LABELS), [0] * len(BUCKET_LABELS)
+    for r in recipes:
+        prep[time_bucket(r.prep_time)] += 1
+        cook[time_bucket(r.cook_time)] += 1
+    return {
+        "total_recipes": total,
+        "cuisines": sorted({r.cuisine for r in recipes}),
+        "total_unique_ingredients": len(ingredients),
+        "avg_prep_time": sum(r.prep_time or 0 for r in recipes) / total if total else 0,
+        "avg_cook_time": sum(r.cook_time or 0 for r in recipes) / total if total else 0,
+        "recipes_per_cuisine": dict(Counter(r.cuisine for r in recipes)),
+        "top_ingredients": [
+            {"ingredient": name, "recipes": count}
+            for name, count in sorted(ingredients.items(), key=lambda kv: (-kv[1], kv[0]))[:top_n]
+        ],
+        "prep_time_histogram": dict(zip(BUCKET_LABELS, prep)),
+        "cook_time_histogram": dict(zip(BUCKET_LABELS, cook)),
+    }
+
+
+def check(store, top_n=5):
+    summary = store.stats.summary(top_n)
+    summary["cuisines"] = sorted(summary["cuisines"])
+    assert summary == recompute(store, top_n)
+
+
+def test_incremental_stats_match_full_recompute(make_store):
+    rng = random.Random(21)
+    store = make_store(make_recipe(rng) for _ in range(40))
+    check(store)
+
+    for step in range(400):
+        ids = [r.id for r in store]
+        op = rng.random()
+        if op < 0.4 or not ids:
+            store.add(make_recipe(rng))
+        elif op < 0.7:
+            store.update(rng.choice(ids), make_recipe(rng))
+        else:
+            store.delete(rng.choice(ids))
+        if step % 50 == 0:
+            check(store, top_n=rng.choice([1, 3, 20]))
+    check(store)
+
+    for recipe_id in [r.id for r in store]:
+        store.delete(recipe_id)
+    check(store)
+    assert store.stats.summary()["cuisines"] == []
+
+
+def test_duplicate_ingredients_count_once_per_recipe():
+    stats = CatalogStats()
+    recipe = make_recipe(random.Random(1))
+    recipe.ingredients = ["salt", "salt", "Salt"]
+    stats.add(recipe)
+    assert stats.ingredients["salt"] == 1
+    stats.remove(recipe)
+    assert len(stats.ingredients) == 0
+
+
+def test_ranked_counter_most_common():
+    counter = RankedCounter()
+    for key in "aabbbcccd":
+        counter.add(key)
+    counter.discard("c")
+    counter.discard("missing")
+    assert counter.most_common(3) == [("b", 3), ("a", 2), ("c", 2)]
+    assert counter.most_common(10)[-1] == ("d", 1)
@@ -0,0 +1,312 @@
+"""
+Tests for the recipe repositories: the indexed in-memory store (app/store.py)
+and the SQLite store (app/sqlite_store.py). Every test runs against both.
+Run with: python -m pytest test_store.py
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import app
+from app.models import Recipe, SearchFilters
+from app.sqlite_store import SQLiteRecipeStore
+from app.store import RecipeStore
+
+CUISINES = ["Italian", "Indian", "Asian", "Mexican", "American"]
+INGREDIENTS = ["rice", "pasta", "garlic", "parmesan cheese", "cheese", "soy sauce",
+               "chicken", "tomato sauce", "onion", "cream"]
+
+
+def make_recipe(rng, recipe_id=None):
+    return Recipe(
+        id=recipe_id,
+        name=f"Recipe {rng.randint(0, 10**6)}",
+        ingredients=rng.sample(INGREDIENTS, rng.randint(1, 4)),
+        instructions="Mix everything together and cook.",
+        cuisine=rng.choice(CUISINES).upper() if rng.random() < 0.3 else rng.choice(CUISINES),
+        prep_time=rng.choice([None, 0, 5, 10, 20, 45]),
+        cook_time=rng.choice([None, 0, 10, 30, 60]),
+    )
+
+
+def scan_ids(recipes, cuisine=None, ingredient=None, max_prep=None, max_cook=None):
+    """Reference implementation: the original linear-scan filters."""
+    results = list(recipes)
+    if cuisine is not None:
+        results = [r for r in results if r.cuisine.lower() == cuisine.lower()]
+    if ingredient is not None:
+        results = [r for r in results if any(ingredient.lower() in i.lower() for i in r.ingredients)]
+    if max_prep is not None:
+        results = [r for r in results if r.prep_time and r.prep_time <= max_prep]
+    if max_cook is not None:
+        results = [r for r in results if r.cook_time and r.cook_time <= max_cook]
+    return sorted(r.id for r in results)
+
+
+def check_indexes(store):
+    recipes = store.all()
+    for cuisine in CUISINES:
+        assert [r.id for r in store.by_cuisine(cuisine)] == scan_ids(recipes, cuisine=cuisine)
+    for term in ["cheese", "CHEESE", "sauce", "an ch", "ric", "ch", "a", "missing"]:
+        assert [r.id for r in store.by_ingredient(term)] == scan_ids(recipes, ingredient=term)
+    for limit in [0, 5, 15, 60]:
+        assert [r.id for r in store.by_time(max_prep_time=limit)] == scan_ids(recipes, max_prep=limit)
+        assert [r.id for r in store.by_time(max_cook_time=limit)] == scan_ids(recipes, max_cook=limit)
+        assert [r.id for r in store.by_time(limit, limit)] == scan_ids(recipes, max_prep=limit, max_cook=limit)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    """Factory building an empty or seeded store of each backend."""
+    stores = []
+
+    def build(seed=()):
+        if request.param == "memory":
+            return RecipeStore(seed)
+        store = SQLiteRecipeStore(str(tmp_path / f"recipes-{len(stores)}.db"), seed)
+        stores.append(store)
+        return store
+
+    yield build
+    for store in stores:
+        store.close()
+
+
+def test_get_and_id_allocation(make_store):
+    store = make_store()
+    rng = random.Random(0)
+    first = store.add(make_recipe(rng))
+    second = store.add(make_recipe(rng))
+    assert (first.id, second.id) == (1, 2)
+    assert store.get(2).model_dump() == second.model_dump()
+    assert store.get(99) is None
+
+    store.delete(2)
+    assert store.add(make_recipe(rng)).id == 3
+
+
+def test_explicit_ids_are_kept_unless_taken(make_store):
+    rng = random.Random(3)
+    store = make_store([make_recipe(rng, recipe_id=10)])
+    assert store.add(make_recipe(rng, recipe_id=4)).id == 4
+    assert store.add(make_recipe(rng, recipe_id=10)).id == 11
+    assert [r.id for r in store] == [4, 10, 11]
+
+
+def test_indexes_survive_random_mutations(make_store):
+    rng = random.Random(42)
+    store = make_store(make_recipe(rng, recipe_id=i) for i in range(1, 51))
+    check_indexes(store)
+
+    for _ in range(300):
+        op = rng.random()
+        ids = [r.id for r in store]
+        if op < 0.4 or not ids:
+            store.add(make_recipe(rng))
+        elif op < 0.7:
+            target = rng.choice(ids)
+            assert store.update(target, make_recipe(rng)).id == target
+        else:
+            assert store.delete(rng.choice(ids)) is not None
+    check_indexes(store)
+
+
+def test_update_and_delete_missing_ids(make_store):
+    store = make_store()
+    assert store.update(1, make_recipe(random.Random(1))) is None
+    assert store.delete(1) is None
+
+
+def brute_force_pantry(store, pantry):
+    """Reference ranking: score every recipe against the pantry directly."""
+    items = {p.lower() for p in pantry}
+    ranked = []
+    for r in store:
+        names = {i.lower() for i in r.ingredients}
+        matched = sum(1 for n in names if any(item in n.split() or item == n for item in items))
+        if matched:
+            score = matched / max(len(names) + len(items) - matched, len(names))
+            ranked.append((-score, len(names) - matched, r.id))
+    return [rid for _, _, rid in sorted(ranked)]
+
+
+def test_pantry_ranking_matches_brute_force_after_compaction(make_store):
+    rng = random.Random(7)
+    store = make_store(make_recipe(rng) for _ in range(3000))
+    for rid in rng.sample([r.id for r in store], 2000):
+        store.delete(rid)
+    for rid in rng.sample([r.id for r in store], 200):
+        store.update(rid, make_recipe(rng))
+
+    for pantry in [["cheese", "garlic"], ["Rice", "soy sauce", "onion", "cream"], ["chicken"]]:
+        matches, _ = store.pantry_matches(pantry, limit=len(store))
+        assert [recipe.id for recipe, _ in matches] == brute_force_pantry(store, pantry)
+
+    top, _ = store.pantry_matches(["cheese", "garlic"], limit=5)
+    assert len(top) == 5
+    assert [recipe.id for recipe, _ in top] == brute_force_pantry(store, ["cheese", "garlic"])[:5]
+
+
+def test_sqlite_store_persists_across_connections(tmp_path):
+    path = str(tmp_path / "recipes.db")
+    rng = random.Random(5)
+    store = SQLiteRecipeStore(path, [make_recipe(rng) for _ in range(20)])
+    store.delete(3)
+    store.close()
+
+    # Seeding is skipped when the database already holds recipes
+    reopened = SQLiteRecipeStore(path, [make_recipe(rng) for _ in range(5)])
+    assert len(reopened) == 19
+    assert reopened.get(3) is None
+    check_indexes(reopened)
+    reopened.close()
+
+
+def same_stats(a, b):
+    # The cuisine list follows insertion order, which a rebuild does not keep
+    summaries = [store.stats_summary(5) for store in (a, b)]
+    for summary in summaries:
+        summary["cuisines"] = sorted(summary["cuisines"])
+    return summaries[0] == summaries[1]
+
+
+def test_sqlite_stores_sharing_a_file_see_each_others_writes(tmp_path):
+    """Two stores on one file stand in for two uvicorn worker processes."""
+    path = str(tmp_path / "recipes.db")
+    rng = random.Random(8)
+    seed = [make_recipe(rng) for _ in range(10)]
+    first = SQLiteRecipeStore(path, seed, change_log_size=5)
+    # Seeding is skipped by the second worker, which loads what the first stored
+    second = SQLiteRecipeStore(path, [make_recipe(rng) for _ in range(10)], change_log_size=5)
+    assert len(second) == 10
+
+    added = first.add(Recipe(name="Saffron Paella", ingredients=["rice", "saffron"],
+                             instructions="Simmer everything in a wide pan.", cuisine="Spanish"))
+    first.update(1, make_recipe(rng))
+    first.delete(2)
+    matches = second.fuzzy_search("safron paela", limit=1)
+    assert [recipe.id for recipe, _ in matches] == [added.id]
+    assert same_stats(first, second)
+
+    # Falling further behind than the change log reaches forces a rebuild
+    first.add_many([make_recipe(rng) for _ in range(8)])
+    first.delete(added.id)
+    assert same_stats(first, second)
+    assert second.fuzzy_search("saffron paella", min_score=0.9) == []
+    recipes, result = second.faceted_search(SearchFilters(cuisine="Spanish"), with_facets=True)
+    assert recipes == [] and result.total == 0
+    first.close()
+    second.close()
+
+
+def test_keyset_pages_cover_search_results(make_store):
+    rng = random.Random(11)
+    store = make_store(make_recipe(rng) for _ in range(200))
+    for filters in [{}, {"cuisine": "italian"}, {"ingredient": "sauce", "max_cook_time": 30}]:
+        expected = [r.id for r in store.search(**filters)]
+        seen, after_id = [], 0
+        while True:
+            page = [r.id for r in store.iter_search(**filters, after_id=after_id, limit=7)]
+            seen.extend(page)
+            if len(page) < 7:
+                break
+            after_id = page[-1]
+        assert seen == expected
+
+
+def test_keyset_scan_tolerates_mutations_between_pages(make_store):
+    rng = random.Random(12)
+    store = make_store(make_recipe(rng) for _ in range(50))
+    first = [r.id for r in store.iter_search(limit=10)]
+    store.delete(first[-1] + 1)
+    store.delete(first[0])
+    added = store.add(make_recipe(rng))
+    rest = [r.id for r in store.iter_search(after_id=first[-1])]
+    assert rest == [i for i in range(first[-1] + 2, 51)] + [added.id]
+
+
+def test_unchanged_recipes_are_returned_as_the_same_object(make_store):
+    rng = random.Random(8)
+    store = make_store([make_recipe(rng) for _ in range(5)])
+    version = store.catalog_version()
+    first = store.get(1)
+    assert store.get(1) is first
+    assert next(store.iter_search()) is first
+    assert store.catalog_version() == version
+
+    store.update(1, make_recipe(rng))
+    assert store.get(1) is not first
+    assert store.catalog_version() != version
+    version = store.catalog_version()
+    store.delete(99)
+    assert store.catalog_version() == version
+
+
+def test_memory_store_columns_round_trip_through_compaction():
+    rng = random.Random(9)
+    store = RecipeStore()
+    expected = {}
+    for recipe in store.add_many(make_recipe(rng) for _ in range(1500)):
+        expected[recipe.id] = recipe.model_dump()
+    unusual = store.add(Recipe(name="Crème brûlée 🍮", ingredients=["cream", "CREAM", "sugar"],
+                               instructions="Bake in a bain-marie, then torch the top.",
+                               cuisine="French", servings=None))
+    expected[unusual.id] = unusual.model_dump()
+
+    # Enough deletes and replacements to make dead rows outnumber live ones
+    table = store._table
+    for rid in rng.sample(sorted(expected), 900):
+        store.delete(rid)
+        del expected[rid]
+    for rid in rng.sample(sorted(expected), 200):
+        expected[rid] = store.update(rid, make_recipe(rng)).model_dump()
+    assert store._table is not table and store._table.dead_rows < 200
+
+    assert {r.id: r.model_dump() for r in store.all()} == expected
+    check_indexes(store)
+
+
+
+def test_rejected_writes_leave_the_memory_store_consistent():
+    rng = random.Random(10)
+    store = RecipeStore([make_recipe(rng) for _ in range(5)])
+    # Bypass validation to reach the 32-bit columns with a value they cannot hold
+    bad = Recipe.model_construct(**dict(make_recipe(rng).model_dump(), prep_time=3_000_000_000))
+    with pytest.raises(OverflowError):
+        store.add(bad)
+    assert bad.id is None and len(store) == 5 and store.stats_summary()["total_recipes"] == 5
+
+    added = store.add(make_recipe(rng))
+    assert added.id == 6 and store.get(6).model_dump() == added.model_dump()
+    with pytest.raises(OverflowError):
+        store.update(6, bad)
+    assert bad.id is None and store.get(6).model_dump() == added.model_dump()
+    check_indexes(store)
+
+
+def test_api_rejects_values_the_store_cannot_hold(monkeypatch):
+    rng = random.Random(11)
+    monkeypatch.setattr(main, "recipes_db", RecipeStore(make_recipe(rng) for _ in range(6)))
+    client = TestClient(app)
+    body = make_recipe(rng).model_dump(exclude={"id"})
+    for field, value in [("prep_time", 3_000_000_000), ("servings", -(2**31)), ("cook_time", -1)]:
+        assert client.post("/api/recipes", json=dict(body, **{field: value})).status_code == 422
+
+    created = client.post("/api/recipes", json=body)
+    assert created.status_code == 201 and created.json()["id"] == 7
+    assert client.get("/api/recipes/7").json() == created.json()
+    assert client.get("/api/recipes/6").status_code == 200
+
+
+def test_ids_outside_32_bits_are_rejected(make_store):
+    rng = random.Random(12)
+    store = make_store([make_recipe(rng) for _ in range(5)])
+    for bad_id in (-3, 0, 2**31, 2**32 + 1):
+        with pytest.raises(ValueError, match="outside"):
+            store.add(make_recipe(rng, bad_id))
+    assert len(store) == 5 and store.add(make_recipe(rng)).id == 6
+    recipes, _ = store.faceted_search(SearchFilters(sort="prep_time"))
+    assert sorted(r.id for r in recipes) == list(range(1, 7))